@@ -46,6 +46,12 @@ app.add_middleware(
 _enc = tiktoken.encoding_for_model("gpt-4o-mini")
 
 
+@app.on_event("startup")
+async def warm_collections():
+    """Collection handle / count / HNSW 인덱스를 첫 질의 전에 로드 (`CHROMA_WARMUP`)."""
+    vector_store.warm_up()
+
+
 def count_tokens(text: str) -> int:
     return len(_enc.encode(text))
 
@@ -96,9 +102,8 @@ async def embed_document(req: EmbedRequest):
     )
 
     # Check if already embedded
-    if vector_store.collection_exists(collection_name):
-        cols = vector_store.list_collections()
-        count = next((c["count"] for c in cols if c["name"] == collection_name), 0)
+    count = vector_store.collection_count(collection_name)
+    if count:
         return EmbedResponse(
             collection_name=collection_name,
             chunk_count=count,
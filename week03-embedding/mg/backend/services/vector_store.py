@@ -1,3 +1,21 @@
+"""ChromaDB wrapper.
+
+Collection registry: `get_collection` and `count` each read Chroma's
+SQLite metadata, and every search used to do both before querying. Handles
+and chunk counts are now cached per collection name:
+
+- `_handle(name)` / `_count(name)` fetch once, then serve from memory.
+  A missing collection is not cached (it may be created next)
+- `add_chunks` and `delete_collection` drop the entry
+- A query on a cached handle that fails (collection deleted by another
+  process) drops the entry and retries once with a fresh handle
+- `warm_up(names)` at startup: handle + count + one 1-NN query per
+  collection, so the HNSW index is loaded into memory before the first
+  user query instead of during it. `CHROMA_WARMUP` picks the collections:
+  `*` (default) = all, empty = none, else comma-separated names
+"""
+
+import os
 import time
 from dataclasses import dataclass
 from pathlib import Path
@@ -7,6 +25,12 @@ import chromadb
 _PERSIST_DIR = str(Path(__file__).resolve().parent.parent / "chroma_data")
 _client = chromadb.PersistentClient(path=_PERSIST_DIR)
 
+CHROMA_WARMUP = os.environ.get("CHROMA_WARMUP", "*")
+
+_handles: dict[str, chromadb.Collection] = {}
+_counts: dict[str, int] = {}
+_warmed: dict[str, int] = {}
+
 
 @dataclass
 class VectorSearchResult:
@@ -22,6 +46,66 @@ def create_collection(name: str) -> chromadb.Collection:
     )
 
 
+# ─── Collection registry ───
+
+
+def _invalidate(name: str) -> None:
+    _handles.pop(name, None)
+    _counts.pop(name, None)
+
+
+def _handle(name: str) -> chromadb.Collection:
+    """Cached `get_collection`. Raises like Chroma when it doesn't exist."""
+    if name not in _handles:
+        _handles[name] = _client.get_collection(name)
+    return _handles[name]
+
+
+def _count(name: str) -> int:
+    """Cached chunk count of an existing collection."""
+    if name not in _counts:
+        _counts[name] = _handle(name).count()
+    return _counts[name]
+
+
+def _with_handle(name: str, fn):
+    """fn(collection); on a cached handle that went stale, retry once with a fresh one."""
+    cached = name in _handles
+    try:
+        return fn(_handle(name))
+    except Exception:
+        if not cached:
+            raise
+        _invalidate(name)
+        return fn(_handle(name))
+
+
+def warm_up(names: list[str] | None = None) -> dict[str, int]:
+    """Load handle, count and HNSW index of collections. Returns {name: ms}.
+
+    `names=None` reads `CHROMA_WARMUP` (`*` = every collection).
+    """
+    if names is None:
+        spec = CHROMA_WARMUP.strip()
+        if spec == "*":
+            names = [c["name"] for c in list_collections()]
+        else:
+            names = [n.strip() for n in spec.split(",") if n.strip()]
+    for name in names:
+        start = time.perf_counter()
+        try:
+            col = _handle(name)
+            if _count(name):
+                # 1-NN 질의 한 번으로 HNSW 인덱스를 메모리에 올림
+                first = col.get(limit=1, include=["embeddings"])
+                col.query(query_embeddings=[list(first["embeddings"][0])], n_results=1, include=[])
+        except Exception:
+            continue
+        _warmed[name] = int((time.perf_counter() - start) * 1000)
+    return {n: _warmed[n] for n in names if n in _warmed}
+
+
+
 def add_chunks(
     collection_name: str,
     texts: list[str],
@@ -38,6 +122,7 @@ def add_chunks(
         documents=texts,
         metadatas=metadatas or [{"index": i} for i in range(len(texts))],
     )
+    _invalidate(collection_name)
     return int((time.perf_counter() - start) * 1000)
 
 
@@ -48,12 +133,11 @@ def search(
 ) -> tuple[list[VectorSearchResult], int]:
     """Search a collection. Returns (results, search_time_ms)."""
     start = time.perf_counter()
-    collection = _client.get_collection(collection_name)
-    results = collection.query(
+    results = _with_handle(collection_name, lambda col: col.query(
         query_embeddings=[query_embedding],
         n_results=top_k,
         include=["documents", "distances", "metadatas"],
-    )
+    ))
     search_time_ms = int((time.perf_counter() - start) * 1000)
 
     scored = []
@@ -71,13 +155,17 @@ def search(
     return scored, search_time_ms
 
 
-def collection_exists(name: str) -> bool:
-    """Check if a collection exists and has data."""
+def collection_count(name: str) -> int:
+    """Chunk count, 0 when the collection doesn't exist."""
     try:
-        col = _client.get_collection(name)
-        return col.count() > 0
+        return _count(name)
     except Exception:
-        return False
+        return 0
+
+
+def collection_exists(name: str) -> bool:
+    """Check if a collection exists and has data."""
+    return collection_count(name) > 0
 
 
 def list_collections() -> list[dict]:
@@ -94,15 +182,20 @@ def list_collections() -> list[dict]:
 
 
 def delete_collection(name: str) -> None:
-    _client.delete_collection(name)
+    try:
+        _client.delete_collection(name)
+    finally:
+        _invalidate(name)
+        _warmed.pop(name, None)
 
 
 def get_all_embeddings(
     collection_name: str,
 ) -> tuple[list[list[float]], list[str], list[int]]:
     """Get all embeddings for visualization. Returns (embeddings, texts, indices)."""
-    collection = _client.get_collection(collection_name)
-    result = collection.get(include=["embeddings", "documents", "metadatas"])
+    result = _with_handle(
+        collection_name, lambda col: col.get(include=["embeddings", "documents", "metadatas"])
+    )
     embeddings = result["embeddings"]
     texts = result["documents"]
     indices = [m.get("index", i) for i, m in enumerate(result["metadatas"])]
@@ -0,0 +1,112 @@
+"""Labeled questions for the adaptive complexity router (`services/complexity_router.py`).
+
+Questions are over `data/samples.py`; labels follow the adaptive classifier
+prompt (CLASSIFY_SYSTEM):
+- SIMPLE: 단순 사실/정의
+- MODERATE: 비교, 설명, 원리
+- COMPLEX: 다단계 추론, 종합 분석
+
+`origin: "week13"` marks the week13 evaluation questions
+(`week13-evaluation/mg/backend/evaluation/dataset.py`, same labels); the
+rest were written for the router. The report also scores the week13 ones
+with a model trained only on the rest, since they were written
+independently of the features.
+"""
+
+COMPLEXITY_LABELS: list[dict] = [
+    # ── ai-intro ──────────────────────────────────────────
+    {"sample_id": "ai-intro", "question": "인공지능이라는 용어는 언제 누가 처음 사용했나?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "ai-intro", "question": "약인공지능과 강인공지능의 차이는?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "ai-intro", "question": "지도학습의 대표적인 문제 유형은?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "ai-intro", "question": "강화학습은 어디에 활용되나?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "ai-intro", "question": "CNN은 어떤 구조이고 어디에 쓰이나?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "ai-intro", "question": "트랜스포머의 핵심 메커니즘은 무엇인가?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "ai-intro", "question": "책임 있는 AI를 위해 어떤 원칙이 강조되나?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "ai-intro", "question": "딥러닝이 발전한 배경과 대규모 언어 모델까지 이어진 흐름을 설명해줘", "complexity": "COMPLEX", "origin": "week13"},
+    {"sample_id": "ai-intro", "question": "머신러닝이란?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "비지도학습의 예시는 뭐야?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "자연어 처리의 정의는?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "컴퓨터 비전은 어떤 분야에 쓰이나?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "지도학습과 비지도학습은 어떻게 다른가?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "딥러닝이 머신러닝보다 이미지 인식에 강한 이유는?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "셀프 어텐션이 왜 중요한가?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "RNN과 트랜스포머를 비교해줘", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "AI 편향 문제는 왜 생기나?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "강화학습은 어떤 원리로 학습하나?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "머신러닝, 딥러닝, 자연어 처리가 서로 어떻게 연결되는지 전체 구조를 정리해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "AI 윤리 원칙을 실제 서비스에 적용할 때 고려사항과 해결 방법은?", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "컴퓨터 비전과 자연어 처리의 발전 과정을 비교하고 앞으로의 전망을 분석해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "ai-intro", "question": "인공지능의 분류 체계와 각 학습 방식의 장단점, 활용 사례를 종합해줘", "complexity": "COMPLEX", "origin": "router"},
+
+    # ── python-guide ──────────────────────────────────────
+    {"sample_id": "python-guide", "question": "파이썬은 누가 언제 개발했나?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "python-guide", "question": "딕셔너리에서 키로 값에 접근하는 시간 복잡도는?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "python-guide", "question": "리스트 컴프리헨션 예시를 알려줘", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "python-guide", "question": "데코레이터는 어떤 개념을 기반으로 하나?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "python-guide", "question": "파일을 다룰 때 with 문을 쓰는 이유는?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "python-guide", "question": "asyncio에서 async와 await는 각각 무슨 역할을 하나?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "python-guide", "question": "파이썬 테스트 프레임워크 중 가장 널리 쓰이는 것은?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "python-guide", "question": "파이썬이 쓰이는 분야와 분야별 대표 라이브러리를 정리해줘", "complexity": "COMPLEX", "origin": "week13"},
+    {"sample_id": "python-guide", "question": "튜플이란?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "python-guide", "question": "파이썬의 기본 자료형은 몇 가지인가?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "python-guide", "question": "타입 힌팅은 몇 버전부터 도입되었나?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "python-guide", "question": "FastAPI는 무엇인가?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "python-guide", "question": "리스트와 튜플의 차이는?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "python-guide", "question": "예외 처리에서 finally 블록은 왜 필요한가?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "python-guide", "question": "Django와 Flask는 어떻게 다른가?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "python-guide", "question": "클래스 상속은 어떤 원리로 동작하나?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "python-guide", "question": "제너레이터가 메모리를 아끼는 이유는?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "python-guide", "question": "비동기 웹 서버를 만들 때 asyncio, 타입 힌팅, 테스트를 어떻게 함께 적용해야 하는지 설명해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "python-guide", "question": "데이터 분석 프로젝트에서 pandas와 numpy를 쓰는 과정과 주의할 점을 단계별로 정리해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "python-guide", "question": "모듈과 패키지 구조를 설계할 때 고려사항과 흔한 실수, 해결 방법은?", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "python-guide", "question": "객체 지향과 함수형 스타일을 비교하고 어떤 상황에 어떤 방식을 선택해야 하는지 분석해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "python-guide", "question": "웹 프레임워크 세 가지의 특징과 장단점, 적합한 프로젝트 유형을 종합해줘", "complexity": "COMPLEX", "origin": "router"},
+
+    # ── climate-report ────────────────────────────────────
+    {"sample_id": "climate-report", "question": "산업혁명 이전 대비 지구 평균 기온은 얼마나 올랐나?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "climate-report", "question": "해수면은 매년 얼마나 상승하고 있나?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "climate-report", "question": "메탄은 CO2보다 온실효과가 얼마나 강한가?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "climate-report", "question": "산호초 백화 현상이 계속되면 어떻게 되나?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "climate-report", "question": "도시 열섬 효과가 생기는 원인은?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "climate-report", "question": "CBAM은 어떤 제도이고 왜 도입되었나?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "climate-report", "question": "탄소 가격제의 두 가지 방식은?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "climate-report", "question": "손실과 피해 기금이 만들어진 과정과 탄소 포집 같은 기술적 대응을 함께 설명해줘", "complexity": "COMPLEX", "origin": "week13"},
+    {"sample_id": "climate-report", "question": "파리협정은 언제 채택되었나?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "climate-report", "question": "CCUS란?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "climate-report", "question": "온실가스 배출이 가장 많은 산업은?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "climate-report", "question": "해양 산성화의 정의는?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "climate-report", "question": "감축과 적응 전략의 차이는?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "climate-report", "question": "해양 산성화는 왜 생태계에 위험한가?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "climate-report", "question": "탄소세와 배출권 거래제를 비교해줘", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "climate-report", "question": "스마트 그리드는 어떤 원리로 재생에너지 확대를 돕나?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "climate-report", "question": "기후변화가 식량 안보에 미치는 영향은 어떻게 나타나나?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "climate-report", "question": "물-에너지-식량 넥서스 관점에서 기후변화 대응 정책의 우선순위를 분석해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "climate-report", "question": "개발도상국의 탄소 중립 도전과 기후 정의 논의를 연결해서 종합적으로 설명해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "climate-report", "question": "재생에너지, 에너지 저장, 원자력을 함께 고려할 때 전력 전환 전략의 장단점과 과제는?", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "climate-report", "question": "도시 열섬, 홍수, 대기질 문제를 함께 해결하려면 어떤 단계로 대응해야 하는지 정리해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "climate-report", "question": "지구공학의 가능성과 위험을 CCUS와 비교하여 평가해줘", "complexity": "COMPLEX", "origin": "router"},
+
+    # ── startup-guide ─────────────────────────────────────
+    {"sample_id": "startup-guide", "question": "시리즈 A 투자 규모는 보통 얼마인가?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "startup-guide", "question": "제품-시장 적합성(PMF)이란 무엇인가?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "startup-guide", "question": "그로스 해킹이라는 용어를 처음 쓴 사람은?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "startup-guide", "question": "초기 직원에게 스톡옵션은 보통 어느 정도 주나?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "startup-guide", "question": "쿠팡의 핵심 전략은?", "complexity": "SIMPLE", "origin": "week13"},
+    {"sample_id": "startup-guide", "question": "번 레이트와 런웨이는 어떻게 계산하나?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "startup-guide", "question": "구독 모델의 장점과 단점은?", "complexity": "MODERATE", "origin": "week13"},
+    {"sample_id": "startup-guide", "question": "당근마켓과 에어비앤비 사례로 좋은 아이디어의 조건을 종합해줘", "complexity": "COMPLEX", "origin": "week13"},
+    {"sample_id": "startup-guide", "question": "MVP란?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "토스는 언제 창업했나?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "비즈니스 모델 캔버스는 몇 개의 블록으로 구성되나?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "엔젤 투자자란 누구인가?", "complexity": "SIMPLE", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "스타트업과 중소기업의 차이는?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "린 스타트업 방법론은 왜 빠른 실험을 강조하나?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "기술 부채는 어떻게 관리하나?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "프리미엄 모델과 구독 모델을 비교해줘", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "스타트업이 실패하는 주요 원인은 무엇이고 왜 그런가?", "complexity": "MODERATE", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "시드부터 시리즈 B까지 투자 유치 과정과 단계별 준비 사항을 정리해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "초기 팀 구성, 조직 문화, 스톡옵션 설계를 함께 고려한 팀 빌딩 전략을 설명해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "글로벌 확장을 준비할 때 고려사항과 실패 사례에서 얻을 교훈은?", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "쿠팡, 토스, 배달의민족의 성장 전략을 비교 분석해줘", "complexity": "COMPLEX", "origin": "router"},
+    {"sample_id": "startup-guide", "question": "데이터 기반 의사결정과 핵심 지표 관리를 제품 로드맵에 연결하는 방법을 단계별로 설명해줘", "complexity": "COMPLEX", "origin": "router"},
+]
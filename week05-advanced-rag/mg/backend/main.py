@@ -4,9 +4,12 @@ load_dotenv()
 
 import asyncio
 import hashlib
+import json
+import time
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import tiktoken
 
 from models.schemas import (
@@ -25,9 +28,9 @@ from models.schemas import (
     SourceChunk,
 )
 from services.chunking_service import chunk_text
-from services.embedding_service import embed_texts
+from services.embedding_store import embed_with_store, embedding_store_stats
 from services.llm_service import PRICING
-from services import vector_store
+from services import bm25_index, chroma_async, hyde_service, reranker_service, vector_store
 from services.basic_pipeline import run_basic_rag
 from services.advanced_pipeline import (
     run_hyde_rag,
@@ -53,6 +56,12 @@ app.add_middleware(
 _enc = tiktoken.encoding_for_model("gpt-4o-mini")
 
 
+@app.on_event("startup")
+async def warm_collections():
+    """Collection handle / count / HNSW 인덱스를 첫 질의 전에 로드 (`CHROMA_WARMUP`)."""
+    await vector_store.warm_up()
+
+
 def count_tokens(text: str) -> int:
     return len(_enc.encode(text))
 
@@ -95,11 +104,11 @@ async def get_sample(sample_id: str):
 async def embed_document(req: EmbedRequest):
     col_name = make_collection_name(req.document, req.chunk_size, req.chunk_overlap)
 
-    if vector_store.collection_exists(col_name):
-        col = vector_store.create_collection(col_name)
+    existing = await vector_store.collection_count(col_name)
+    if existing:
         return EmbedResponse(
             collection_name=col_name,
-            chunk_count=col.count(),
+            chunk_count=existing,
             dimension=1536,
             embed_time_ms=0,
             store_time_ms=0,
@@ -110,12 +119,19 @@ async def embed_document(req: EmbedRequest):
     chunks = chunk_text(req.document, req.chunk_size, req.chunk_overlap)
     texts = [c.text for c in chunks]
 
-    embeddings, embed_ms = await embed_texts(texts)
+    # 다른 chunking 설정 / 다른 collection 에서 이미 임베딩한 청크는 재사용
+    reuse: dict = {}
+    embeddings, embed_ms = await embed_with_store(texts, stats=reuse)
 
     metadatas = [{"index": c.index} for c in chunks]
-    store_ms = vector_store.add_chunks(col_name, texts, embeddings, metadatas)
+    store_ms = await vector_store.add_chunks(col_name, texts, embeddings, metadatas)
 
-    token_count = sum(count_tokens(t) for t in texts)
+    # Hybrid search 용 BM25 역색인 — 질의마다 전체 문서를 다시 읽지 않도록 여기서 한 번 만듦
+    start = time.perf_counter()
+    await bm25_index.build(col_name, texts, [c.index for c in chunks])
+    store_ms += int((time.perf_counter() - start) * 1000)
+
+    token_count = sum(count_tokens(t) for t in reuse["embedded_texts"])
     embed_cost = round(token_count * PRICING["embedding"], 6)
     total_ms = embed_ms + store_ms
 
@@ -127,6 +143,7 @@ async def embed_document(req: EmbedRequest):
         store_time_ms=store_ms,
         total_time_ms=total_ms,
         embed_cost=embed_cost,
+        reused_count=reuse["reused"],
     )
 
 
@@ -135,16 +152,36 @@ async def embed_document(req: EmbedRequest):
 
 @app.get("/api/collections", response_model=CollectionsResponse)
 async def get_collections():
-    cols = vector_store.list_collections()
+    cols = await vector_store.list_collections()
     return CollectionsResponse(
         collections=[CollectionItem(name=c["name"], count=c["count"]) for c in cols]
     )
 
 
+@app.get("/api/chroma/stats")
+async def get_chroma_stats():
+    """Chroma thread-pool queue depth / wait time per op (read, write), collection registry."""
+    return {**chroma_async.chroma_stats(), "registry": vector_store.registry_stats()}
+
+
+@app.get("/api/embed/stats")
+async def get_embed_stats():
+    """Embedding store reuse rate and size (chunks embedded once across collections)."""
+    return await asyncio.to_thread(embedding_store_stats)
+
+
+@app.get("/api/rerank/stats")
+async def get_rerank_stats():
+    """Reranker score cache hit rate and LLM calls since startup."""
+    return reranker_service.rerank_stats()
+
+
 @app.delete("/api/collections/{name}")
 async def delete_collection(name: str):
     try:
-        vector_store.delete_collection(name)
+        await vector_store.delete_collection(name)
+        bm25_index.drop(name)
+        hyde_service.drop_collection(name)
         return {"deleted": name}
     except Exception:
         raise HTTPException(404, f"Collection '{name}' not found")
@@ -183,6 +220,7 @@ def _to_response(result: dict) -> RagResponse:
         selected_pipeline=result.get("selected_pipeline"),
         complexity=result.get("complexity"),
         classify_reason=result.get("classify_reason"),
+        grading=result.get("grading"),
     )
 
 
@@ -219,3 +257,91 @@ async def compare(req: CompareRequest):
         )
     except Exception:
         raise HTTPException(500, detail="Compare 실행 중 오류가 발생했습니다")
+
+
+# ─── Streaming (SSE) — step 이벤트 → 답변 토큰 → 최종 결과 ───
+#
+#   data: {"type": "step", "data": {...PipelineStep}}      단계가 끝날 때마다
+#   data: {"type": "token", "data": "..."}                 답변 delta
+#   data: {"type": "answer_reset"}                         Self-RAG 재생성 — 받은 토큰 폐기
+#   data: {"type": "result", "data": {...RagResponse}}     timing.ttft_ms 포함
+#   data: {"type": "error", "detail": "..."}
+#
+# /api/compare/stream 은 두 모드의 이벤트를 도착 순서대로 섞어 보내고 각 이벤트에
+# "side": "basic" | "advanced" (CompareResponse 필드명) 를 붙인 뒤 {"type": "done"} 로 끝냄
+
+
+def _sse(event: dict) -> str:
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def _start_stream(runner, req, queue: asyncio.Queue, side: str | None = None) -> asyncio.Task:
+    """Run `runner` with callbacks that push SSE events onto `queue`."""
+    tag = {"side": side} if side else {}
+    start = time.perf_counter()
+    ttft: dict[str, int] = {}
+
+    def on_step(step: dict) -> None:
+        queue.put_nowait({"type": "step", **tag, "data": step})
+
+    def on_token(delta: str | None) -> None:
+        if delta is None:
+            queue.put_nowait({"type": "answer_reset", **tag})
+            return
+        ttft.setdefault("ms", int((time.perf_counter() - start) * 1000))
+        queue.put_nowait({"type": "token", **tag, "data": delta})
+
+    async def _run() -> None:
+        try:
+            result = await runner(
+                req.question, req.collection_name, req.top_k, req.model,
+                on_step=on_step, on_token=on_token,
+            )
+            data = _to_response(result).model_dump()
+            if "ms" in ttft:
+                data["timing"]["ttft_ms"] = ttft["ms"]
+            queue.put_nowait({"type": "result", **tag, "data": data})
+        except Exception:
+            queue.put_nowait({"type": "error", **tag, "detail": "RAG 파이프라인 실행 중 오류가 발생했습니다"})
+
+    return asyncio.create_task(_run())
+
+
+async def _drain(queue: asyncio.Queue, tasks: list[asyncio.Task]):
+    """Yield queued events as SSE until every task has sent result/error."""
+    remaining = len(tasks)
+    try:
+        while remaining:
+            event = await queue.get()
+            if event["type"] in ("result", "error"):
+                remaining -= 1
+            yield _sse(event)
+    finally:
+        for task in tasks:              # 클라이언트가 끊으면 실행 중인 파이프라인도 취소
+            task.cancel()
+
+
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@app.post("/api/rag/stream")
+async def rag_stream(req: RagRequest):
+    queue: asyncio.Queue = asyncio.Queue()
+    task = _start_stream(_RUNNERS.get(req.mode, run_basic_rag), req, queue)
+    return StreamingResponse(_drain(queue, [task]), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+
+@app.post("/api/compare/stream")
+async def compare_stream(req: CompareRequest):
+    queue: asyncio.Queue = asyncio.Queue()
+    tasks = [
+        _start_stream(_RUNNERS.get(req.mode_a, run_basic_rag), req, queue, side="basic"),
+        _start_stream(_RUNNERS.get(req.mode_b, run_advanced_rag), req, queue, side="advanced"),
+    ]
+
+    async def _events():
+        async for chunk in _drain(queue, tasks):
+            yield chunk
+        yield _sse({"type": "done"})
+
+    return StreamingResponse(_events(), media_type="text/event-stream", headers=_SSE_HEADERS)
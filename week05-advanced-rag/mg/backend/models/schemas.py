@@ -31,6 +31,7 @@ class EmbedResponse(BaseModel):
     store_time_ms: int
     total_time_ms: int
     embed_cost: float
+    reused_count: int = 0
 
 
 class CollectionItem(BaseModel):
@@ -80,6 +81,7 @@ class RagResponse(BaseModel):
     selected_pipeline: str | None = None
     complexity: str | None = None
     classify_reason: str | None = None
+    grading: dict | None = None
 
 
 class CompareRequest(BaseModel):
@@ -4,10 +4,17 @@ Classifies question complexity:
 - SIMPLE: basic RAG (fast, cheap)
 - MODERATE: HyDE or Rerank
 - COMPLEX: Advanced RAG (HyDE + Rerank)
+
+Classification is local (`complexity_router`: text features + BM25 probe,
+no network); the LLM classifier runs only when the local confidence is
+below `FALLBACK_BELOW` (or with `classifier="llm"`).
 """
 
 import json
+import time
+from typing import Callable, Optional
 
+from services import complexity_router
 from services.llm_service import ask_json
 from services.basic_pipeline import run_basic_rag
 from services.advanced_pipeline import run_hyde_rag, run_rerank_rag, run_advanced_rag
@@ -30,15 +37,8 @@ _PIPELINE_MAP = {
 }
 
 
-async def run_adaptive_rag(
-    question: str,
-    collection_name: str,
-    top_k: int = 5,
-    model: str = "gpt-4o-mini",
-) -> dict:
-    """Adaptive RAG: classify complexity → route to appropriate pipeline."""
-
-    # Step 1: Classify question complexity
+async def llm_classify(question: str, model: str = "gpt-4o-mini") -> tuple[str, str, int, float]:
+    """LLM complexity label. Returns (complexity, reason, time_ms, cost_usd)."""
     classify_content, classify_ms, classify_cost = await ask_json(
         system_prompt=CLASSIFY_SYSTEM,
         user_prompt=question,
@@ -55,19 +55,60 @@ async def run_adaptive_rag(
 
     if complexity not in _PIPELINE_MAP:
         complexity = "MODERATE"
+    return complexity, classify_reason, classify_ms, classify_cost
 
-    pipeline_name, pipeline_fn = _PIPELINE_MAP[complexity]
 
-    # Step 2: Run selected pipeline
-    result = await pipeline_fn(question, collection_name, top_k, model)
+async def run_adaptive_rag(
+    question: str,
+    collection_name: str,
+    top_k: int = 5,
+    model: str = "gpt-4o-mini",
+    on_step: Optional[Callable[[dict], None]] = None,
+    on_token: Optional[Callable[[Optional[str]], None]] = None,
+    classifier: str = "auto",
+) -> dict:
+    """Adaptive RAG: classify complexity → route to appropriate pipeline.
+
+    classifier: "auto" (local, LLM below the confidence threshold) | "local" | "llm"
+    """
+
+    # Step 1: Classify question complexity
+    classify_cost = 0.0
+    if classifier == "llm":
+        complexity, classify_reason, classify_ms, classify_cost = await llm_classify(question, model)
+        source = "LLM"
+    else:
+        t0 = time.perf_counter()
+        complexity, local_conf, probs = await complexity_router.classify(question, collection_name)
+        classify_ms = int((time.perf_counter() - t0) * 1000)
+        classify_reason = (
+            f"로컬 분류기 신뢰도 {local_conf:.2f} "
+            f"({', '.join(f'{k} {v:.2f}' for k, v in probs.items())})"
+        )
+        source = "로컬"
+        if classifier == "auto" and local_conf < complexity_router.FALLBACK_BELOW:
+            complexity, llm_reason, llm_ms, classify_cost = await llm_classify(question, model)
+            classify_ms += llm_ms
+            classify_reason = f"{llm_reason} (로컬 신뢰도 {local_conf:.2f} → LLM 분류)"
+            source = "LLM"
+
+    pipeline_name, pipeline_fn = _PIPELINE_MAP[complexity]
 
     # Prepend classification step
     classify_step = {
         "name": "classify",
         "label": "복잡도 분류",
         "time_ms": classify_ms,
-        "detail": f"{complexity} → {pipeline_name} 파이프라인 선택",
+        "detail": f"{source} 분류: {complexity} → {pipeline_name} 파이프라인 선택",
     }
+    if on_step:
+        on_step(classify_step)
+
+    # Step 2: Run selected pipeline
+    result = await pipeline_fn(
+        question, collection_name, top_k, model, on_step=on_step, on_token=on_token,
+    )
+
     result["steps"] = [classify_step] + result["steps"]
     result["timing"]["classify_ms"] = classify_ms
     result["timing"]["total_ms"] += classify_ms
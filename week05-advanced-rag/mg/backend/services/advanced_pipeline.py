@@ -3,37 +3,65 @@
 - HyDE: Hypothetical Document Embeddings
 - Rerank: LLM-based reranking
 - Advanced: HyDE + Rerank combined
+
+HyDE retrieval (`_hyde_search`) can also embed and search the raw question
+while the hypothetical is being generated (`direct_search`) and RRF-fuse
+both lists — on by default in Advanced, where the reranker then sees
+candidates from both queries at no extra latency.
 """
 
+import asyncio
+import time
+from typing import Callable, Optional
+
 from services.embedding_service import embed_single
-from services import vector_store
+from services import fusion, vector_store
 from services.llm_service import ask_with_context
-from services.hyde_service import generate_hypothetical
+from services.hyde_service import HYDE_MAX_CHARS, generate_hypothetical
 from services.reranker_service import rerank
-from services.rag_utils import SYSTEM_PROMPT, format_context, chunks_from_results
+from services.rag_utils import SYSTEM_PROMPT, format_context, chunks_from_results, StepLog
 
 
-async def run_hyde_rag(
+async def _direct_search(question: str, collection_name: str, k: int) -> tuple[list[dict], int]:
+    """Embed + search the raw question. Returns (chunks, time_ms)."""
+    query_emb, embed_ms = await embed_single(question)
+    results, search_ms = await vector_store.search(collection_name, query_emb, k)
+    return chunks_from_results(results), embed_ms + search_ms
+
+
+async def _hyde_search(
     question: str,
     collection_name: str,
-    top_k: int = 5,
-    model: str = "gpt-4o-mini",
-) -> dict:
-    """HyDE RAG: question → hypothetical doc → embed → search → generate."""
-    steps = []
-    total_cost = 0.0
+    model: str,
+    k: int,
+    steps: list,
+    direct_search: bool,
+    max_chars: Optional[int],
+    search_label: str,
+) -> tuple[list[dict], str, dict, float]:
+    """HyDE → embed → search, optionally fused with a concurrent raw-question search.
 
-    # Step 1: Generate hypothetical document
-    hyde_text, hyde_ms, hyde_cost = await generate_hypothetical(question, model)
-    total_cost += hyde_cost
+    Returns: (chunks, hyde_text, timing, hyde_cost_usd)
+    """
+    direct = asyncio.create_task(_direct_search(question, collection_name, k)) if direct_search else None
+    try:
+        hyde_info: dict = {}
+        hyde_text, hyde_ms, hyde_cost = await generate_hypothetical(
+            question, model, collection_name, max_chars=max_chars, stats=hyde_info,
+        )
+    except BaseException:
+        if direct:
+            direct.cancel()
+        raise
+    note = {"hit": " (캐시)", "shared": " (동시 요청과 공유)"}.get(hyde_info.get("cache"), "")
     steps.append({
         "name": "hyde",
         "label": "HyDE 생성",
         "time_ms": hyde_ms,
-        "detail": f"가상 답변 {len(hyde_text)}자",
+        "detail": f"가상 답변 {len(hyde_text)}자{note}",
     })
 
-    # Step 2: Embed hypothetical document (NOT the original question)
+    # Embed hypothetical document (NOT the original question)
     query_emb, embed_ms = await embed_single(hyde_text)
     steps.append({
         "name": "embed",
@@ -41,20 +69,66 @@ async def run_hyde_rag(
         "time_ms": embed_ms,
     })
 
-    # Step 3: Vector search
-    results, search_ms = vector_store.search(collection_name, query_emb, top_k)
+    results, search_ms = await vector_store.search(collection_name, query_emb, k)
     chunks = chunks_from_results(results)
     steps.append({
         "name": "search",
-        "label": "벡터 검색",
+        "label": search_label,
         "time_ms": search_ms,
         "detail": f"{len(chunks)}개 청크 검색됨",
     })
+    timing = {"hyde_ms": hyde_ms, "embed_ms": embed_ms, "search_ms": search_ms}
+    if direct is None:
+        return chunks, hyde_text, timing, hyde_cost
+
+    direct_chunks, direct_ms = await direct
+    steps.append({
+        "name": "search",
+        "label": "질문 검색 (병렬)",
+        "time_ms": direct_ms,
+        "detail": f"HyDE 생성 중 원 질문으로 {len(direct_chunks)}개 검색",
+    })
+    # HyDE 리스트가 먼저 — 동점이면 HyDE 쪽 순위가 앞
+    fused = fusion.fuse_hits([chunks, direct_chunks], key=lambda c: c["index"], score=None, top_k=k)
+    overlap = len({c["index"] for c in chunks} & {c["index"] for c in direct_chunks})
+    chunks = [hit for hit, _ in fused]
+    steps.append({
+        "name": "rrf",
+        "label": "RRF 병합",
+        "time_ms": 0,
+        "detail": f"HyDE + 질문 결과 병합 (겹침 {overlap}개) → {len(chunks)}개",
+    })
+    timing["direct_ms"] = direct_ms
+    return chunks, hyde_text, timing, hyde_cost
+
+
+async def run_hyde_rag(
+    question: str,
+    collection_name: str,
+    top_k: int = 5,
+    model: str = "gpt-4o-mini",
+    on_step: Optional[Callable[[dict], None]] = None,
+    on_token: Optional[Callable[[Optional[str]], None]] = None,
+    direct_search: bool = False,
+    hyde_max_chars: Optional[int] = HYDE_MAX_CHARS,
+) -> dict:
+    """HyDE RAG: question → hypothetical doc → embed → search → generate."""
+    start = time.perf_counter()
+    steps = StepLog(on_step)
+    total_cost = 0.0
+
+    # Step 1-3: HyDE → embed → search (+ 질문 직접 검색 병렬, 선택)
+    chunks, hyde_text, search_timing, hyde_cost = await _hyde_search(
+        question, collection_name, model, top_k, steps,
+        direct_search=direct_search, max_chars=hyde_max_chars, search_label="벡터 검색",
+    )
+    total_cost += hyde_cost
 
     # Step 4: Generate answer
     context = format_context(chunks)
     llm_result = await ask_with_context(
-        question, context, model, system_prompt=SYSTEM_PROMPT
+        question, context, model, system_prompt=SYSTEM_PROMPT,
+        on_token=on_token,
     )
     total_cost += llm_result.cost_usd
     steps.append({
@@ -63,18 +137,14 @@ async def run_hyde_rag(
         "time_ms": llm_result.time_ms,
     })
 
-    total_ms = hyde_ms + embed_ms + search_ms + llm_result.time_ms
-
     return {
         "answer": llm_result.answer,
         "sources": chunks,
         "steps": steps,
         "timing": {
-            "hyde_ms": hyde_ms,
-            "embed_ms": embed_ms,
-            "search_ms": search_ms,
+            **search_timing,
             "llm_ms": llm_result.time_ms,
-            "total_ms": total_ms,
+            "total_ms": int((time.perf_counter() - start) * 1000),
         },
         "cost_usd": round(total_cost, 6),
         "total_tokens": llm_result.total_tokens,
@@ -88,9 +158,11 @@ async def run_rerank_rag(
     collection_name: str,
     top_k: int = 5,
     model: str = "gpt-4o-mini",
+    on_step: Optional[Callable[[dict], None]] = None,
+    on_token: Optional[Callable[[Optional[str]], None]] = None,
 ) -> dict:
     """Rerank RAG: question → embed → wide search → rerank → generate."""
-    steps = []
+    steps = StepLog(on_step)
     total_cost = 0.0
     initial_k = top_k * 4
 
@@ -103,7 +175,7 @@ async def run_rerank_rag(
     })
 
     # Step 2: Wide vector search
-    results, search_ms = vector_store.search(collection_name, query_emb, initial_k)
+    results, search_ms = await vector_store.search(collection_name, query_emb, initial_k)
     initial_chunks = chunks_from_results(results)
     steps.append({
         "name": "search",
@@ -113,21 +185,24 @@ async def run_rerank_rag(
     })
 
     # Step 3: LLM Reranking
+    rerank_stats: dict = {}
     reranked, rerank_ms, rerank_cost = await rerank(
-        question, initial_chunks, top_n=top_k, model=model
+        question, initial_chunks, top_n=top_k, model=model, stats=rerank_stats
     )
     total_cost += rerank_cost
     steps.append({
         "name": "rerank",
         "label": "리랭킹",
         "time_ms": rerank_ms,
-        "detail": f"{len(initial_chunks)}개 → {len(reranked)}개",
+        "detail": f"{len(initial_chunks)}개 → {len(reranked)}개 "
+                  f"(캐시 {rerank_stats['cache_hits']}개, LLM {rerank_stats['llm_calls']}회)",
     })
 
     # Step 4: Generate
     context = format_context(reranked)
     llm_result = await ask_with_context(
-        question, context, model, system_prompt=SYSTEM_PROMPT
+        question, context, model, system_prompt=SYSTEM_PROMPT,
+        on_token=on_token,
     )
     total_cost += llm_result.cost_usd
     steps.append({
@@ -160,56 +235,43 @@ async def run_advanced_rag(
     collection_name: str,
     top_k: int = 5,
     model: str = "gpt-4o-mini",
+    on_step: Optional[Callable[[dict], None]] = None,
+    on_token: Optional[Callable[[Optional[str]], None]] = None,
+    direct_search: bool = True,
+    hyde_max_chars: Optional[int] = HYDE_MAX_CHARS,
 ) -> dict:
     """Advanced RAG: HyDE + Rerank combined."""
-    steps = []
+    start = time.perf_counter()
+    steps = StepLog(on_step)
     total_cost = 0.0
     initial_k = top_k * 4
 
-    # Step 1: HyDE
-    hyde_text, hyde_ms, hyde_cost = await generate_hypothetical(question, model)
+    # Step 1-3: HyDE → embed → wide search, 질문 직접 검색과 병렬 + RRF 병합
+    initial_chunks, hyde_text, search_timing, hyde_cost = await _hyde_search(
+        question, collection_name, model, initial_k, steps,
+        direct_search=direct_search, max_chars=hyde_max_chars, search_label="벡터 검색 (확장)",
+    )
     total_cost += hyde_cost
-    steps.append({
-        "name": "hyde",
-        "label": "HyDE 생성",
-        "time_ms": hyde_ms,
-        "detail": f"가상 답변 {len(hyde_text)}자",
-    })
-
-    # Step 2: Embed hypothetical
-    query_emb, embed_ms = await embed_single(hyde_text)
-    steps.append({
-        "name": "embed",
-        "label": "가상 문서 임베딩",
-        "time_ms": embed_ms,
-    })
-
-    # Step 3: Wide vector search
-    results, search_ms = vector_store.search(collection_name, query_emb, initial_k)
-    initial_chunks = chunks_from_results(results)
-    steps.append({
-        "name": "search",
-        "label": "벡터 검색 (확장)",
-        "time_ms": search_ms,
-        "detail": f"{len(initial_chunks)}개 후보 검색",
-    })
 
     # Step 4: Rerank
+    rerank_stats: dict = {}
     reranked, rerank_ms, rerank_cost = await rerank(
-        question, initial_chunks, top_n=top_k, model=model
+        question, initial_chunks, top_n=top_k, model=model, stats=rerank_stats
     )
     total_cost += rerank_cost
     steps.append({
         "name": "rerank",
         "label": "리랭킹",
         "time_ms": rerank_ms,
-        "detail": f"{len(initial_chunks)}개 → {len(reranked)}개",
+        "detail": f"{len(initial_chunks)}개 → {len(reranked)}개 "
+                  f"(캐시 {rerank_stats['cache_hits']}개, LLM {rerank_stats['llm_calls']}회)",
     })
 
     # Step 5: Generate
     context = format_context(reranked)
     llm_result = await ask_with_context(
-        question, context, model, system_prompt=SYSTEM_PROMPT
+        question, context, model, system_prompt=SYSTEM_PROMPT,
+        on_token=on_token,
     )
     total_cost += llm_result.cost_usd
     steps.append({
@@ -218,19 +280,15 @@ async def run_advanced_rag(
         "time_ms": llm_result.time_ms,
     })
 
-    total_ms = hyde_ms + embed_ms + search_ms + rerank_ms + llm_result.time_ms
-
     return {
         "answer": llm_result.answer,
         "sources": reranked,
         "steps": steps,
         "timing": {
-            "hyde_ms": hyde_ms,
-            "embed_ms": embed_ms,
-            "search_ms": search_ms,
+            **search_timing,
             "rerank_ms": rerank_ms,
             "llm_ms": llm_result.time_ms,
-            "total_ms": total_ms,
+            "total_ms": int((time.perf_counter() - start) * 1000),
         },
         "cost_usd": round(total_cost, 6),
         "total_tokens": llm_result.total_tokens,
@@ -3,10 +3,12 @@
 Question → Embed → Vector Search → LLM Generate
 """
 
+from typing import Callable, Optional
+
 from services.embedding_service import embed_single
 from services import vector_store
 from services.llm_service import ask_with_context
-from services.rag_utils import SYSTEM_PROMPT, format_context, chunks_from_results
+from services.rag_utils import SYSTEM_PROMPT, format_context, chunks_from_results, StepLog
 
 
 async def run_basic_rag(
@@ -14,9 +16,11 @@ async def run_basic_rag(
     collection_name: str,
     top_k: int = 5,
     model: str = "gpt-4o-mini",
+    on_step: Optional[Callable[[dict], None]] = None,
+    on_token: Optional[Callable[[Optional[str]], None]] = None,
 ) -> dict:
     """Basic RAG: question → embed → search → generate."""
-    steps = []
+    steps = StepLog(on_step)
 
     # Step 1: Embed question
     query_emb, embed_ms = await embed_single(question)
@@ -27,7 +31,7 @@ async def run_basic_rag(
     })
 
     # Step 2: Vector search
-    results, search_ms = vector_store.search(collection_name, query_emb, top_k)
+    results, search_ms = await vector_store.search(collection_name, query_emb, top_k)
     chunks = chunks_from_results(results)
     steps.append({
         "name": "search",
@@ -39,7 +43,8 @@ async def run_basic_rag(
     # Step 3: Generate
     context = format_context(chunks)
     llm_result = await ask_with_context(
-        question, context, model, system_prompt=SYSTEM_PROMPT
+        question, context, model, system_prompt=SYSTEM_PROMPT,
+        on_token=on_token,
     )
     steps.append({
         "name": "generate",
@@ -0,0 +1,291 @@
+"""Persistent BM25 inverted index per collection (for hybrid search).
+
+`_bm25_search` used to fetch every document of the collection from Chroma,
+re-tokenize it and build a fresh `BM25Okapi` on each query — O(corpus) per
+question. The index is now built once, when `/api/embed` stores the chunks,
+and saved next to the Chroma data:
+
+    chroma_data/bm25/{collection}.npz   indptr, doc_ids, tfs, doc_len, idf, chunk_index
+    chroma_data/bm25/{collection}.json  terms, texts, parameters
+
+Design choices:
+- Same scoring as `rank_bm25.BM25Okapi` (k1=1.5, b=0.75, negative IDF
+  floored at epsilon × mean IDF) and the same whitespace tokenizer, so the
+  ranking does not change — only its cost
+- CSR postings: terms sorted by id, `indptr[t]:indptr[t+1]` slices the
+  (doc_id, tf) pairs of term t. Per-posting BM25 weights are precomputed
+  on load, so a query only touches the postings of its own terms —
+  scores are summed with `np.unique` + `np.bincount` over those postings
+  and the top-k picked with `np.argpartition`
+- Only documents containing at least one query term are returned
+- Loaded lazily on first query and cached per process. Collections
+  embedded before this index existed are indexed from Chroma on first use
+- Chunks of a collection never change after `/api/embed`, so an index is
+  rebuilt only if the collection is deleted and embedded again
+
+    py -m services.bm25_index bench --scale 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+INDEX_DIR = Path(__file__).resolve().parent.parent / "chroma_data" / "bm25"
+K1 = 1.5
+B = 0.75
+EPSILON = 0.25
+FORMAT_VERSION = 1
+
+
+def tokenize(text: str) -> list[str]:
+    """Whitespace split — the tokenizer hybrid search has always used."""
+    return text.split()
+
+
+class BM25Index:
+    def __init__(self, terms: list[str], texts: list[str], chunk_index: np.ndarray,
+                 indptr: np.ndarray, doc_ids: np.ndarray, tfs: np.ndarray,
+                 doc_len: np.ndarray, idf: np.ndarray):
+        self.terms = terms
+        self.vocab = {t: i for i, t in enumerate(terms)}
+        self.texts = texts
+        self.chunk_index = chunk_index
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.idf = idf
+        # posting 마다 idf · tf(k1+1) / (tf + k1(1-b+b·dl/avgdl)) 를 미리 계산
+        avgdl = float(doc_len.mean()) if len(doc_len) else 0.0
+        norm = K1 * (1 - B + B * doc_len / avgdl) if avgdl else np.full(len(doc_len), K1)
+        term_of_posting = np.repeat(np.arange(len(terms)), np.diff(indptr))
+        tf = tfs.astype(np.float32)
+        self.weights = (idf[term_of_posting] * tf * (K1 + 1) / (tf + norm[doc_ids])).astype(np.float32)
+
+    @property
+    def size(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def build(cls, texts: list[str], chunk_index: list[int]) -> "BM25Index":
+        vocab: dict[str, int] = {}
+        rows_term: list[int] = []
+        rows_doc: list[int] = []
+        rows_tf: list[int] = []
+        doc_len = np.zeros(len(texts), dtype=np.float32)
+        for d, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_len[d] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                rows_term.append(vocab.setdefault(term, len(vocab)))
+                rows_doc.append(d)
+                rows_tf.append(tf)
+
+        term_ids = np.asarray(rows_term, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")
+        counts = np.bincount(term_ids, minlength=len(vocab))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        # rank_bm25.BM25Okapi 와 같은 IDF — 음수는 epsilon × 평균 IDF 로
+        n = len(texts)
+        df = counts.astype(np.float64)
+        idf = np.log(n - df + 0.5) - np.log(df + 0.5)
+        if len(idf):
+            idf[idf < 0] = EPSILON * idf.mean()
+
+        terms = [""] * len(vocab)
+        for term, i in vocab.items():
+            terms[i] = term
+        return cls(
+            terms, list(texts), np.asarray(chunk_index, dtype=np.int32), indptr,
+            np.asarray(rows_doc, dtype=np.int32)[order], np.asarray(rows_tf, dtype=np.int32)[order],
+            doc_len, idf.astype(np.float32),
+        )
+
+    def search(self, query: str, top_k: int) -> list[dict]:
+        """Top-k documents by BM25 score, as hybrid search result dicts."""
+        slices = []
+        for term in tokenize(query):              # 반복된 질의어는 BM25Okapi 처럼 여러 번 더함
+            t = self.vocab.get(term)
+            if t is not None:
+                slices.append(slice(self.indptr[t], self.indptr[t + 1]))
+        if not slices or top_k <= 0:
+            return []
+        docs = np.concatenate([self.doc_ids[s] for s in slices])
+        weights = np.concatenate([self.weights[s] for s in slices])
+        hit_docs, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+
+        k = min(top_k, len(hit_docs))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(hit_docs) else np.arange(len(hit_docs))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {
+                "index": int(self.chunk_index[hit_docs[i]]),
+                "text": self.texts[hit_docs[i]],
+                "bm25_score": float(scores[i]),
+            }
+            for i in top
+        ]
+
+    def save(self, name: str) -> None:
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        npz, meta = INDEX_DIR / f"{name}.npz", INDEX_DIR / f"{name}.json"
+        # 임시 파일에 쓰고 교체 — 쓰다 죽어도 반쪽 인덱스를 읽지 않음
+        with open(f"{npz}.tmp", "wb") as f:
+            np.savez(f, indptr=self.indptr, doc_ids=self.doc_ids, tfs=self.tfs,
+                     doc_len=self.doc_len, idf=self.idf, chunk_index=self.chunk_index)
+        with open(f"{meta}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": FORMAT_VERSION, "k1": K1, "b": B, "epsilon": EPSILON,
+                       "terms": self.terms, "texts": self.texts}, f, ensure_ascii=False)
+        os.replace(f"{npz}.tmp", npz)
+        os.replace(f"{meta}.tmp", meta)
+
+    @classmethod
+    def load(cls, name: str) -> "BM25Index | None":
+        npz, meta = INDEX_DIR / f"{name}.npz", INDEX_DIR / f"{name}.json"
+        if not npz.exists() or not meta.exists():
+            return None
+        with open(meta, encoding="utf-8") as f:
+            info = json.load(f)
+        if (info.get("version"), info.get("k1"), info.get("b"), info.get("epsilon")) != (FORMAT_VERSION, K1, B, EPSILON):
+            return None
+        arrays = np.load(npz)
+        return cls(info["terms"], info["texts"], arrays["chunk_index"], arrays["indptr"],
+                   arrays["doc_ids"], arrays["tfs"], arrays["doc_len"], arrays["idf"])
+
+
+_cache: dict[str, BM25Index] = {}
+_locks: dict[str, asyncio.Lock] = {}
+
+
+async def build(collection_name: str, texts: list[str], chunk_index: list[int]) -> BM25Index:
+    """Build, persist and cache the index for a freshly embedded collection."""
+    def _build_and_save() -> BM25Index:
+        index = BM25Index.build(texts, chunk_index)
+        index.save(collection_name)
+        return index
+
+    index = await asyncio.to_thread(_build_and_save)
+    _cache[collection_name] = index
+    return index
+
+
+async def get_index(collection_name: str) -> BM25Index | None:
+    """Cached → on disk → built from the Chroma collection (older collections)."""
+    if collection_name in _cache:
+        return _cache[collection_name]
+    lock = _locks.setdefault(collection_name, asyncio.Lock())
+    async with lock:
+        if collection_name in _cache:
+            return _cache[collection_name]
+        index = await asyncio.to_thread(BM25Index.load, collection_name)
+        if index is None:
+            from services import vector_store
+            docs = await vector_store.get_documents(collection_name)
+            if not docs["documents"]:
+                return None
+            metas = docs["metadatas"] or [{}] * len(docs["documents"])
+            index = await build(collection_name, docs["documents"],
+                                [(m or {}).get("index", i) for i, m in enumerate(metas)])
+        _cache[collection_name] = index
+        return index
+
+
+def drop(collection_name: str) -> None:
+    """Forget the index of a deleted collection (memory and disk)."""
+    _cache.pop(collection_name, None)
+    for suffix in (".npz", ".json"):
+        try:
+            os.remove(INDEX_DIR / f"{collection_name}{suffix}")
+        except OSError:
+            pass
+
+
+# ─── Benchmark ───
+
+
+def _bench_corpus(scale: int) -> list[str]:
+    from data.samples import SAMPLES
+    from services.chunking_service import chunk_text
+
+    base = [c.text for s in SAMPLES for c in chunk_text(s["content"], 500, 50)]
+    # 복제본마다 고유 토큰을 붙여 서로 다른 문서로 만듦 (df·문서 길이 분포는 유지)
+    return [f"{text} copy{k}" for k in range(scale) for text in base]
+
+
+def _bench_queries() -> list[str]:
+    from data.samples import SAMPLES
+
+    queries = []
+    for s in SAMPLES:
+        lines = [l.strip() for l in s["content"].splitlines() if len(l.strip()) > 20]
+        queries += [" ".join(l.split()[:6]) for l in lines[1:6]]
+    return queries
+
+
+def _ms(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 3),
+    }
+
+
+def run_bench(scale: int, top_k: int = 15) -> dict:
+    queries = _bench_queries()
+    report: dict = {"queries": len(queries), "top_k": top_k}
+    for label, n in (("x1", 1), (f"x{scale}", scale)):
+        texts = _bench_corpus(n)
+        t0 = time.perf_counter()
+        index = BM25Index.build(texts, list(range(len(texts))))
+        build_s = time.perf_counter() - t0
+        timings = []
+        for q in queries:
+            t = time.perf_counter()
+            index.search(q, top_k)
+            timings.append(time.perf_counter() - t)
+        row = {"docs": len(texts), "postings": int(len(index.doc_ids)), "build_ms": round(build_s * 1000, 1),
+               "index": _ms(timings)}
+        try:
+            from rank_bm25 import BM25Okapi
+        except ImportError:
+            row["rebuild_per_query"] = "rank_bm25 미설치"
+        else:
+            # 이전 방식: 질의마다 전체 토큰화 + BM25Okapi 생성
+            timings, agree = [], 0
+            for q in queries[: max(3, len(queries) // (n if n > 10 else 1))]:
+                t = time.perf_counter()
+                scores = BM25Okapi([tokenize(d) for d in texts]).get_scores(tokenize(q))
+                timings.append(time.perf_counter() - t)
+                # 복제본끼리는 점수가 같아 순서가 갈릴 수 있음 — 상위 점수 값으로 비교
+                old_top = np.sort(scores[scores > 0])[::-1][:top_k]
+                new_top = np.array([r["bm25_score"] for r in index.search(q, top_k)])
+                agree += len(old_top) == len(new_top) and bool(np.allclose(old_top, new_top, rtol=1e-4))
+            row["rebuild_per_query"] = {**_ms(timings), "same_top_k_scores": f"{agree}/{len(timings)}"}
+        report[label] = row
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="BM25 인덱스 벤치마크 (SAMPLES 복제)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    bench = sub.add_parser("bench")
+    bench.add_argument("--scale", type=int, default=100)
+    bench.add_argument("--top-k", type=int, default=15)
+    args = parser.parse_args()
+    print(json.dumps(run_bench(args.scale, args.top_k), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""Local question-complexity classifier for Adaptive RAG.
+
+`run_adaptive_rag` asked the LLM (`ask_json`) to label every question
+SIMPLE / MODERATE / COMPLEX before running anything — one extra round trip
+(~0.5-1 s) per request. This module labels it locally and the LLM is asked
+only when the local model is unsure:
+
+    label, confidence, probs = await classify(question, collection_name)
+
+Features (all cheap, no network):
+- length: characters, whitespace tokens
+- conjunction markers (과/와 …, 그리고, 및, 함께, 각각, 쉼표) and
+  comparison markers (차이, 비교, 장단점, 어떻게 다른 …)
+- question words: factoid (누가, 언제, 얼마, 무엇, ~란?), why/how (왜,
+  어떻게, 이유, 원리), synthesis (설명해줘, 정리해줘, 종합, 분석, 과정)
+- probe search: top-1 margin `(s1 - s2) / s1`, top-1 score per query
+  token and query-term coverage from the collection's BM25 index
+  (`bm25_index`, already on disk since `/api/embed`). One chunk that
+  clearly dominates → a lookup question; a flat top → the answer is
+  spread out. BM25 rather than a vector probe because it needs no
+  embedding call and can be computed for the training set offline
+
+Model: multinomial logistic regression (numpy, L2, standardized features)
+trained on `data/complexity_labels.py` on first use (~0.4 s once per
+process, mostly chunking the samples for the probe). The served model
+leaves out the 32 `origin: "week13"` questions — they are the week13
+evaluation set, so routing them stays out-of-sample (the same split as the
+report's hold-out score). `confidence` is the top class probability; below
+`ADAPTIVE_LLM_FALLBACK_BELOW` (default 0.6) the caller falls back to the
+LLM classifier.
+
+    py -m services.complexity_router report          # leave-one-out + week13 hold-out 정확도
+    py -m services.complexity_router report --llm    # LLM 분류기와 비교 (API 호출)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+LABELS = ("SIMPLE", "MODERATE", "COMPLEX")
+FALLBACK_BELOW = float(os.environ.get("ADAPTIVE_LLM_FALLBACK_BELOW", "0.6"))
+L2 = 0.05
+STEPS = 800
+LEARNING_RATE = 0.5
+
+_CONJUNCTION = re.compile(r"[가-힣A-Za-z0-9)]+(과|와)\s|그리고|및|함께|각각|동시에|,|·")
+_COMPARISON = re.compile(r"차이|비교|장단점|장점과 단점|어떻게 다른|다른 점|공통점|보다|vs", re.IGNORECASE)
+_FACTOID = re.compile(r"누가|누구|언제|얼마|몇|어디|무엇인가|무엇|뭐야|(이)?란\s*\?|정의는")
+_WHY_HOW = re.compile(r"왜|어떻게|이유|원인|원리|역할|어떤 구조|방법")
+_SYNTHESIS = re.compile(r"설명해|정리해|종합|분석|흐름|과정|고려|단계|전략|평가해|교훈|연결")
+_IMPERATIVE = re.compile(r"(해줘|해 줘|하시오|주세요|알려줘)\s*[.?!]?$")
+
+FEATURE_NAMES = (
+    "chars", "tokens", "conjunctions", "comparisons", "factoid", "why_how",
+    "synthesis", "imperative", "probe_margin", "probe_top1", "probe_coverage",
+)
+
+
+def text_features(question: str) -> list[float]:
+    q = question.strip()
+    return [
+        len(q) / 40,
+        len(q.split()) / 8,
+        len(_CONJUNCTION.findall(q)),
+        len(_COMPARISON.findall(q)),
+        len(_FACTOID.findall(q)),
+        len(_WHY_HOW.findall(q)),
+        len(_SYNTHESIS.findall(q)),
+        1.0 if _IMPERATIVE.search(q) else 0.0,
+    ]
+
+
+def probe_features(index, question: str) -> list[float]:
+    """[margin, top-1 per query token, coverage] from a BM25 index (or zeros)."""
+    tokens = question.split()
+    if index is None or not tokens:
+        return [0.0, 0.0, 0.0]
+    hits = index.search(question, 2)
+    coverage = sum(1 for t in tokens if t in index.vocab) / len(tokens)
+    if not hits:
+        return [0.0, 0.0, coverage]
+    s1 = hits[0]["bm25_score"]
+    s2 = hits[1]["bm25_score"] if len(hits) > 1 else 0.0
+    return [(s1 - s2) / s1 if s1 > 0 else 0.0, s1 / len(tokens), coverage]
+
+
+# ─── Model ───
+
+
+class ComplexityModel:
+    """Softmax regression over standardized features."""
+
+    def __init__(self, mean: np.ndarray, std: np.ndarray, weights: np.ndarray, bias: np.ndarray):
+        self.mean = mean
+        self.std = std
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def fit(cls, X: np.ndarray, y: np.ndarray) -> "ComplexityModel":
+        mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        Z = (X - mean) / std
+        n, d = Z.shape
+        W = np.zeros((d, len(LABELS)))
+        b = np.zeros(len(LABELS))
+        onehot = np.eye(len(LABELS))[y]
+        for _ in range(STEPS):
+            p = _softmax(Z @ W + b)
+            grad = p - onehot
+            W -= LEARNING_RATE * (Z.T @ grad / n + L2 * W)
+            b -= LEARNING_RATE * grad.mean(axis=0)
+        return cls(mean, std, W, b)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return _softmax(((X - self.mean) / self.std) @ self.weights + self.bias)
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def _sample_indexes() -> dict:
+    """BM25 index per sample, chunked like `/api/embed` defaults (500/50)."""
+    from data.samples import SAMPLES
+    from services.bm25_index import BM25Index
+    from services.chunking_service import chunk_text
+
+    out = {}
+    for s in SAMPLES:
+        chunks = chunk_text(s["content"], 500, 50)
+        out[s["id"]] = BM25Index.build([c.text for c in chunks], [c.index for c in chunks])
+    return out
+
+
+def training_set() -> tuple[np.ndarray, np.ndarray, list[dict]]:
+    from data.complexity_labels import COMPLEXITY_LABELS
+
+    indexes = _sample_indexes()
+    X = np.array([
+        text_features(item["question"]) + probe_features(indexes.get(item["sample_id"]), item["question"])
+        for item in COMPLEXITY_LABELS
+    ])
+    y = np.array([LABELS.index(item["complexity"]) for item in COMPLEXITY_LABELS])
+    return X, y, COMPLEXITY_LABELS
+
+
+_model: ComplexityModel | None = None
+_model_lock = asyncio.Lock()
+
+
+def _train() -> ComplexityModel:
+    X, y, items = training_set()
+    # week13 평가 질문은 빼고 학습 — 평가가 학습 데이터를 라우팅하지 않도록
+    keep = np.array([item.get("origin") != "week13" for item in items])
+    return ComplexityModel.fit(X[keep], y[keep])
+
+
+async def get_model() -> ComplexityModel:
+    global _model
+    if _model is None:
+        async with _model_lock:
+            if _model is None:
+                _model = await asyncio.to_thread(_train)
+    return _model
+
+
+async def classify(question: str, collection_name: str | None = None) -> tuple[str, float, dict[str, float]]:
+    """Local complexity label. Returns (label, confidence, {label: probability})."""
+    from services import bm25_index
+
+    model = await get_model()
+    index = await bm25_index.get_index(collection_name) if collection_name else None
+    x = np.array([text_features(question) + probe_features(index, question)])
+    probs = model.predict_proba(x)[0]
+    best = int(probs.argmax())
+    return LABELS[best], float(probs[best]), {l: round(float(p), 4) for l, p in zip(LABELS, probs)}
+
+
+# ─── Accuracy report ───
+
+
+def _confusion(y_true: list[int], y_pred: list[int]) -> dict:
+    m = np.zeros((len(LABELS), len(LABELS)), dtype=int)
+    for t, p in zip(y_true, y_pred):
+        m[t, p] += 1
+    return {LABELS[i]: dict(zip(LABELS, m[i].tolist())) for i in range(len(LABELS))}
+
+
+async def run_report(with_llm: bool, threshold: float, model_name: str) -> dict:
+    X, y, items = await asyncio.to_thread(training_set)
+    n = len(y)
+
+    # leave-one-out: 각 질문을 빼고 학습한 모델로 그 질문을 분류
+    local_pred, local_conf = [], []
+    for i in range(n):
+        keep = np.arange(n) != i
+        probs = ComplexityModel.fit(X[keep], y[keep]).predict_proba(X[i:i + 1])[0]
+        local_pred.append(int(probs.argmax()))
+        local_conf.append(float(probs.max()))
+    confident = [c >= threshold for c in local_conf]
+    report: dict = {
+        "questions": n,
+        "threshold": threshold,
+        "local": {
+            "accuracy": round(float(np.mean(np.array(local_pred) == y)), 4),
+            "confident_share": round(float(np.mean(confident)), 4),
+            "accuracy_when_confident": round(float(np.mean(
+                [p == t for p, t, c in zip(local_pred, y, confident) if c] or [0])), 4),
+            "confusion": _confusion(y.tolist(), local_pred),
+        },
+    }
+    # week13 질문은 feature 와 무관하게 작성됨 — 나머지로만 학습해 따로 채점
+    held = np.array([item.get("origin") == "week13" for item in items])
+    if held.any() and (~held).any():
+        probs = ComplexityModel.fit(X[~held], y[~held]).predict_proba(X[held])
+        report["week13_holdout"] = {
+            "questions": int(held.sum()),
+            "accuracy": round(float(np.mean(probs.argmax(axis=1) == y[held])), 4),
+            "confident_share": round(float(np.mean(probs.max(axis=1) >= threshold)), 4),
+        }
+    if not with_llm:
+        return report
+
+    from services.adaptive_pipeline import llm_classify
+
+    llm_pred, llm_ms = [], []
+    for item in items:
+        label, _, elapsed_ms, _ = await llm_classify(item["question"], model_name)
+        llm_pred.append(LABELS.index(label))
+        llm_ms.append(elapsed_ms)
+    routed = [lp if c else mp for lp, mp, c in zip(local_pred, llm_pred, confident)]
+    report["llm"] = {
+        "accuracy": round(float(np.mean(np.array(llm_pred) == y)), 4),
+        "p50_ms": int(np.median(llm_ms)),
+        "confusion": _confusion(y.tolist(), llm_pred),
+    }
+    report["local_llm_agreement"] = round(float(np.mean(np.array(local_pred) == np.array(llm_pred))), 4)
+    report["routed"] = {
+        "accuracy": round(float(np.mean(np.array(routed) == y)), 4),
+        "llm_calls_saved": f"{sum(confident)}/{n}",
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="복잡도 분류기 정확도 (COMPLEXITY_LABELS, leave-one-out)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    rep = sub.add_parser("report")
+    rep.add_argument("--llm", action="store_true", help="LLM 분류기도 실행해 비교 (API 호출)")
+    rep.add_argument("--threshold", type=float, default=FALLBACK_BELOW)
+    rep.add_argument("--model", default="gpt-4o-mini")
+    args = parser.parse_args()
+    if args.llm:
+        from dotenv import load_dotenv
+        load_dotenv()
+    t0 = time.perf_counter()
+    report = asyncio.run(run_report(args.llm, args.threshold, args.model))
+    report["seconds"] = round(time.perf_counter() - t0, 2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,32 +4,44 @@ Evaluates retrieved document quality and takes corrective action:
 - CORRECT: use retrieved docs as-is
 - AMBIGUOUS: refine query and re-search
 - INCORRECT: rewrite query from different angle and re-search
+
+Grading is one batched call per round (`services/grading.py`): per-chunk
+grades, the verdict and — when not CORRECT — the refined query come back
+together, so the separate refine call is gone. Chunks below the similarity
+floor are dropped before grading, grade-0 chunks are left out of the
+context, and rounds stop at `max_rounds` or when the grading budget is spent.
 """
 
-import json
+import time
+from typing import Callable, Optional
 
 from services.embedding_service import embed_single
 from services import vector_store
-from services.llm_service import ask_with_context, ask_json, ask_short
-from services.rag_utils import SYSTEM_PROMPT, format_context, chunks_from_results
+from services.grading import (
+    GRADE_BUDGET_MS, GRADE_BUDGET_TOKENS, GradingBudget, grade_list, numbered, prefilter,
+)
+from services.llm_service import ask_with_context
+from services.rag_utils import SYSTEM_PROMPT, format_context, chunks_from_results, StepLog
+
+GRADE_DOCS_SYSTEM = """질문과 검색된 문서들의 관련성을 한 번에 평가하세요.
 
-EVALUATE_DOCS_SYSTEM = """질문과 검색된 문서들의 관련성을 평가하세요.
+각 문서 [번호] 의 grade:
+- 2: 질문에 직접 답하는 내용
+- 1: 부분적으로 관련 있는 내용
+- 0: 관련 없음
 
-평가 기준:
+전체 판정 (verdict):
 - CORRECT: 검색된 문서가 질문에 답하기에 충분함
 - AMBIGUOUS: 부분적으로 관련 있지만 불충분함
 - INCORRECT: 검색된 문서가 질문과 거의 관련 없음
 
-반드시 다음 JSON 형식으로만 응답하세요:
-{"verdict": "CORRECT", "confidence": 0.85, "reason": "판단 이유"}"""
-
-REFINE_QUERY_SYSTEM = (
-    "원래 질문으로 검색한 결과가 불충분합니다. "
-    "더 나은 검색을 위해 질문을 다른 관점에서 재작성하세요. "
-    "재작성된 질문만 출력하세요."
-)
+verdict 가 CORRECT 가 아니면, 더 나은 검색을 위해 질문을 다른 관점에서 재작성한
+refined_query 를 함께 작성하세요.
 
+반드시 다음 JSON 형식으로만 응답하세요:
+{"grades": [{"id": 1, "grade": 2}, {"id": 2, "grade": 0}], "verdict": "AMBIGUOUS", "confidence": 0.7, "reason": "판단 이유", "refined_query": "재작성된 질문"}"""
 
+_VERDICTS = ("CORRECT", "AMBIGUOUS", "INCORRECT")
 
 
 async def run_crag(
@@ -37,101 +49,117 @@ async def run_crag(
     collection_name: str,
     top_k: int = 5,
     model: str = "gpt-4o-mini",
+    on_step: Optional[Callable[[dict], None]] = None,
+    on_token: Optional[Callable[[Optional[str]], None]] = None,
+    max_rounds: int = 1,
+    budget_tokens: Optional[int] = GRADE_BUDGET_TOKENS,
+    budget_ms: Optional[int] = GRADE_BUDGET_MS,
 ) -> dict:
-    """CRAG: search → evaluate docs → correct if needed → generate."""
-    steps = []
+    """CRAG: search → grade docs (batched) → correct if needed → generate."""
+    start = time.perf_counter()
+    steps = StepLog(on_step)
     total_cost = 0.0
 
     # Step 1: Embed + Search
     query_emb, embed_ms = await embed_single(question)
     steps.append({"name": "embed", "label": "질문 임베딩", "time_ms": embed_ms})
 
-    results, search_ms = vector_store.search(collection_name, query_emb, top_k)
+    results, search_ms = await vector_store.search(collection_name, query_emb, top_k)
     chunks = chunks_from_results(results)
     steps.append({
         "name": "search", "label": "벡터 검색",
         "time_ms": search_ms, "detail": f"{len(chunks)}개 청크",
     })
 
-    # Step 2: Evaluate retrieved documents
-    context = format_context(chunks)
-    eval_prompt = f"질문: {question}\n\n검색된 문서:\n{context}"
-    eval_content, eval_ms, eval_cost = await ask_json(
-        system_prompt=EVALUATE_DOCS_SYSTEM,
-        user_prompt=eval_prompt,
-        model=model,
-    )
-    total_cost += eval_cost
-
-    try:
-        eval_data = json.loads(eval_content)
-        verdict = eval_data.get("verdict", "CORRECT")
-        confidence = eval_data.get("confidence", 0.5)
-        eval_reason = eval_data.get("reason", "")
-    except (json.JSONDecodeError, AttributeError):
-        verdict = "CORRECT"
-        confidence = 0.5
-        eval_reason = "평가 파싱 실패"
-
-    steps.append({
-        "name": "evaluate", "label": "문서 품질 평가",
-        "time_ms": eval_ms,
-        "detail": f"{verdict} (신뢰도: {confidence:.0%})",
-    })
-
+    # Step 2-3: 라운드마다 배치 채점 1회 → CORRECT 가 아니면 수정 쿼리로 재검색
+    budget = GradingBudget(budget_tokens, budget_ms)
+    graded: list[dict] = []          # 채점된 chunk (+ "grade")
+    ungraded: list[dict] = []        # 마지막 재검색 결과 (채점 라운드 소진)
+    seen = {c["index"] for c in chunks}
+    pending = chunks
+    prefiltered = 0
+    verdict = None
     corrective_action = None
-    refine_ms = 0
+    eval_ms = 0
     re_search_ms = 0
-    re_embed_ms = 0
-
-    # Step 3: Corrective action if needed
-    if verdict in ("AMBIGUOUS", "INCORRECT"):
-        corrective_action = verdict
-
-        # Refine query
-        refine_prompt = f"원래 질문: {question}\n검색 결과 평가: {verdict} - {eval_reason}"
-        refined_query, refine_ms, refine_cost = await ask_short(
-            system_prompt=REFINE_QUERY_SYSTEM,
-            user_prompt=refine_prompt,
-            model=model,
-            temperature=0.5,
-            max_tokens=150,
+    rounds = 0
+    while True:
+        kept, dropped = prefilter(pending)
+        prefiltered += len(dropped)
+        docs = numbered(kept) if kept else "(유사도 기준을 넘은 문서 없음)"
+        data, round_ms = await budget.ask(
+            GRADE_DOCS_SYSTEM, f"질문: {question}\n\n검색된 문서:\n{docs}", model,
+        )
+        rounds += 1
+        eval_ms += round_ms
+        data = data or {}
+        round_verdict = data.get("verdict") if data.get("verdict") in _VERDICTS else (
+            "CORRECT" if kept else "INCORRECT"
         )
-        total_cost += refine_cost
+        confidence = data.get("confidence", 0.5)
+        if not isinstance(confidence, (int, float)):
+            confidence = 0.5
+        grades = grade_list(data, "grades", len(kept))
+        # 채점이 빠진 chunk 는 버리지 않음 (grade 1)
+        graded += [{**c, "grade": grades.get(i, 1)} for i, c in enumerate(kept)]
+        relevant = sum(1 for i in range(len(kept)) if grades.get(i, 1) > 0)
+        verdict = verdict or round_verdict
+        steps.append({
+            "name": "evaluate", "label": "문서 품질 평가" if rounds == 1 else f"재검색 문서 평가 ({rounds})",
+            "time_ms": round_ms,
+            "detail": f"{round_verdict} (신뢰도: {confidence:.0%}), 관련 {relevant}/{len(kept)}개"
+                      + (f", 유사도 미달 {len(dropped)}개 제외" if dropped else ""),
+        })
+        if round_verdict == "CORRECT":
+            break
+
+        corrective_action = corrective_action or round_verdict
+        refined_query = str(data.get("refined_query") or question)
         steps.append({
             "name": "refine", "label": "쿼리 수정",
-            "time_ms": refine_ms, "detail": f"수정: {refined_query[:60]}...",
+            "time_ms": 0, "detail": f"수정 (평가와 같은 호출): {refined_query[:60]}...",
         })
 
         # Re-search with refined query
         re_emb, re_embed_ms = await embed_single(refined_query)
-        re_results, re_search_ms = vector_store.search(collection_name, re_emb, top_k)
-        new_chunks = chunks_from_results(re_results)
+        re_results, re_ms = await vector_store.search(collection_name, re_emb, top_k)
+        new_chunks = [c for c in chunks_from_results(re_results) if c["index"] not in seen]
+        seen |= {c["index"] for c in new_chunks}
+        re_search_ms += re_embed_ms + re_ms
         steps.append({
             "name": "re_search", "label": "재검색",
-            "time_ms": re_embed_ms + re_search_ms,
-            "detail": f"수정된 쿼리로 {len(new_chunks)}개 검색",
+            "time_ms": re_embed_ms + re_ms,
+            "detail": f"수정된 쿼리로 새 청크 {len(new_chunks)}개",
         })
-
-        # Merge: deduplicate, prefer higher scores
-        chunk_map = {c["index"]: c for c in chunks}
-        for nc in new_chunks:
-            if nc["index"] not in chunk_map or nc["score"] > chunk_map[nc["index"]]["score"]:
-                chunk_map[nc["index"]] = nc
-        chunks = sorted(chunk_map.values(), key=lambda c: c["score"], reverse=True)[:top_k]
-        context = format_context(chunks)
+        if not new_chunks:
+            break
+        if rounds >= max_rounds or budget.exhausted():
+            ungraded = prefilter(new_chunks)[0]
+            break
+        pending = new_chunks
+
+    # 관련 있다고 채점된 chunk (grade 높은 순, 같은 grade 는 유사도 순) → 채점 안 된 재검색 결과
+    relevant_chunks = sorted(
+        (c for c in graded if c["grade"] > 0), key=lambda c: (-c["grade"], -c["score"]),
+    )
+    selected = relevant_chunks + sorted(ungraded, key=lambda c: -c["score"])
+    chunks = [
+        {k: v for k, v in c.items() if k != "grade"} for c in selected[:top_k]
+    ] or chunks
+    context = format_context(chunks)
+    total_cost += budget.cost
 
     # Step 4: Generate
     llm_result = await ask_with_context(
-        question, context, model, system_prompt=SYSTEM_PROMPT
+        question, context, model, system_prompt=SYSTEM_PROMPT,
+        on_token=on_token,
     )
     total_cost += llm_result.cost_usd
     steps.append({"name": "generate", "label": "LLM 생성", "time_ms": llm_result.time_ms})
 
-    total_ms = (
-        embed_ms + search_ms + eval_ms + refine_ms +
-        re_embed_ms + re_search_ms + llm_result.time_ms
-    )
+    total_ms = int((time.perf_counter() - start) * 1000)
+    # 이전 구현: 문서 평가 1회 + (CORRECT 가 아니면) 쿼리 수정 1회
+    baseline_calls = 1 + (1 if corrective_action else 0)
 
     return {
         "answer": llm_result.answer,
@@ -139,7 +167,7 @@ async def run_crag(
         "steps": steps,
         "timing": {
             "embed_ms": embed_ms, "search_ms": search_ms, "eval_ms": eval_ms,
-            "refine_ms": refine_ms, "re_search_ms": re_embed_ms + re_search_ms,
+            "re_search_ms": re_search_ms,
             "llm_ms": llm_result.time_ms, "total_ms": total_ms,
         },
         "cost_usd": round(total_cost, 6),
@@ -147,4 +175,5 @@ async def run_crag(
         "mode": "crag",
         "corrective_action": corrective_action,
         "eval_verdict": verdict,
+        "grading": budget.report(baseline_calls, prefiltered, total_ms),
     }
@@ -4,12 +4,14 @@ from openai import AsyncOpenAI
 
 _client = AsyncOpenAI()
 
+EMBED_MODEL = "text-embedding-3-small"
+
 
 async def embed_texts(texts: list[str]) -> tuple[list[list[float]], int]:
     """Embed a list of texts. Returns (embeddings, time_ms)."""
     start = time.perf_counter()
     response = await _client.embeddings.create(
-        model="text-embedding-3-small",
+        model=EMBED_MODEL,
         input=texts,
     )
     elapsed_ms = int((time.perf_counter() - start) * 1000)
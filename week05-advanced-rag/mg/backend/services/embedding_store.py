@@ -0,0 +1,138 @@
+"""Content-addressed embedding store shared by all collections.
+
+`/api/embed` names a collection after (document, chunk_size, overlap), so a
+new chunking configuration — or the same one after the collection was
+deleted — re-embedded every chunk, although many chunk texts come out the
+same (changing only the overlap keeps about half of them). Embeddings are
+now stored by chunk text:
+
+- Key: sha256 of the chunk text + embedding model, in SQLite
+  (`chroma_data/embedding_cache.sqlite`), vectors as float32 bytes.
+  Collection and chunking parameters are not part of the key, so any
+  collection reuses any other collection's chunks
+- Only texts never seen before go to the API (once per distinct text, even
+  when a document repeats a chunk), in their original order
+- `EMBED_STORE_MAX` rows at most; the oldest are evicted first
+
+Public API:
+- await embed_with_store(texts, stats=None) → (embeddings, time_ms);
+  `stats` (dict) gets `reused` / `embedded` / `embedded_texts`
+- embedding_store_stats() → counters for /api/embed/stats
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from services.embedding_service import EMBED_MODEL, embed_texts
+
+STORE_PATH = Path(__file__).resolve().parent.parent / "chroma_data" / "embedding_cache.sqlite"
+EMBED_STORE_MAX = int(os.environ.get("EMBED_STORE_MAX", "200000"))
+
+_db: sqlite3.Connection | None = None
+_db_lock = threading.Lock()
+_stats = {"requests": 0, "texts": 0, "reused": 0, "embedded": 0}
+
+
+def _conn() -> sqlite3.Connection:
+    global _db
+    if _db is None:
+        STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _db = sqlite3.connect(STORE_PATH, check_same_thread=False, isolation_level=None)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " hash TEXT PRIMARY KEY, vector BLOB, created REAL)"
+        )
+        _db.execute("CREATE INDEX IF NOT EXISTS embeddings_created ON embeddings(created)")
+    return _db
+
+
+def content_hash(text: str, model: str = EMBED_MODEL) -> str:
+    return hashlib.sha256(f"{model}\n{text}".encode()).hexdigest()
+
+
+def _get(hashes: list[str]) -> dict[str, list[float]]:
+    found: dict[str, list[float]] = {}
+    with _db_lock:
+        db = _conn()
+        # SQLite 변수 개수 제한 (기본 999) 아래로 나눠 조회
+        for i in range(0, len(hashes), 900):
+            part = hashes[i:i + 900]
+            rows = db.execute(
+                f"SELECT hash, vector FROM embeddings WHERE hash IN ({','.join('?' * len(part))})",
+                part,
+            ).fetchall()
+            for h, blob in rows:
+                found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+    return found
+
+
+def _put(vectors: dict[str, list[float]]) -> None:
+    if not vectors:
+        return
+    now = time.time()
+    with _db_lock:
+        db = _conn()
+        db.executemany(
+            "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+            [(h, np.asarray(v, dtype=np.float32).tobytes(), now) for h, v in vectors.items()],
+        )
+        (count,) = db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > EMBED_STORE_MAX:
+            db.execute(
+                "DELETE FROM embeddings WHERE rowid IN"
+                " (SELECT rowid FROM embeddings ORDER BY created LIMIT ?)",
+                (count - EMBED_STORE_MAX,),
+            )
+
+
+async def embed_with_store(texts: list[str], stats: dict | None = None) -> tuple[list[list[float]], int]:
+    """Embed texts, calling the API only for texts not in the store.
+
+    Returns: (embeddings, time_ms)
+    """
+    start = time.perf_counter()
+    hashes = [content_hash(t) for t in texts]
+    vectors = await asyncio.to_thread(_get, list(dict.fromkeys(hashes)))
+
+    # 처음 보는 텍스트만, 같은 텍스트는 한 번
+    missing: dict[str, str] = {}
+    for h, t in zip(hashes, texts):
+        if h not in vectors and h not in missing:
+            missing[h] = t
+    if missing:
+        new, _ = await embed_texts(list(missing.values()))
+        fresh = dict(zip(missing, new))
+        vectors.update(fresh)
+        await asyncio.to_thread(_put, fresh)
+
+    reused = sum(1 for h in hashes if h not in missing)
+    _stats["requests"] += 1
+    _stats["texts"] += len(texts)
+    _stats["reused"] += reused
+    _stats["embedded"] += len(missing)
+    if stats is not None:
+        stats.update({
+            "reused": reused,
+            "embedded": len(missing),
+            "embedded_texts": list(missing.values()),
+        })
+    return [vectors[h] for h in hashes], int((time.perf_counter() - start) * 1000)
+
+
+def embedding_store_stats() -> dict:
+    """Reuse counters since startup, plus store size."""
+    with _db_lock:
+        (rows,) = _conn().execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    return {
+        **_stats,
+        "store_rows": rows,
+        "reuse_rate": round(_stats["reused"] / _stats["texts"], 4) if _stats["texts"] else 0.0,
+    }
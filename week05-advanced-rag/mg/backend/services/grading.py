@@ -0,0 +1,118 @@
+"""Shared grading helpers for CRAG and Self-RAG.
+
+Both pipelines used to make one LLM call per grading question — CRAG:
+evaluate docs, then refine the query; Self-RAG: judge "is retrieval
+needed?", then evaluate the answer — each a full round trip in sequence.
+They now:
+
+- Batch: one structured-output (`json_object`) call per round answers
+  everything that round needs (per-chunk grades + verdict + refined query;
+  answer score + per-chunk relevance)
+- Pre-filter: chunks whose vector similarity is below `GRADE_SIM_FLOOR`
+  are dropped locally before grading — they cost prompt tokens and are
+  almost never graded relevant
+- Budget: a loop gets `GradingBudget(max_tokens, max_ms)`; before each
+  round it checks grading tokens and wall-clock time since the loop began
+  and stops early once either is spent
+- Report: `result["grading"]` — calls made vs what the previous
+  implementation would have made for the same path, chunks pre-filtered,
+  tokens, stop reason, and an estimate of the previous end-to-end latency
+  (this run + saved calls × mean grading call time)
+"""
+
+import json
+import os
+import time
+
+from services.llm_service import ask_json
+
+GRADE_SIM_FLOOR = float(os.environ.get("GRADE_SIM_FLOOR", "0.2"))
+GRADE_BUDGET_TOKENS = int(os.environ.get("GRADE_BUDGET_TOKENS", "8000"))
+GRADE_BUDGET_MS = int(os.environ.get("GRADE_BUDGET_MS", "8000"))
+
+_call_ms = {"calls": 0, "ms": 0}      # 절약한 호출의 시간 추정용 (프로세스 누적)
+
+
+def prefilter(chunks: list[dict], floor: float = GRADE_SIM_FLOOR) -> tuple[list[dict], list[dict]]:
+    """(kept, dropped) by vector similarity `score` against the floor."""
+    kept = [c for c in chunks if c.get("score", 0.0) >= floor]
+    dropped = [c for c in chunks if c.get("score", 0.0) < floor]
+    return kept, dropped
+
+
+def numbered(chunks: list[dict]) -> str:
+    """Chunks as `[1] text` lines — grades refer to these numbers."""
+    return "\n\n".join(f"[{i + 1}] {c['text']}" for i, c in enumerate(chunks))
+
+
+class GradingBudget:
+    """Token / latency budget of one grading loop, plus its call log."""
+
+    def __init__(self, max_tokens: int | None = GRADE_BUDGET_TOKENS, max_ms: int | None = GRADE_BUDGET_MS):
+        self.max_tokens = max_tokens
+        self.max_ms = max_ms
+        self.start = time.perf_counter()
+        self.calls = 0
+        self.tokens = 0
+        self.call_ms = 0
+        self.cost = 0.0
+        self.stop = ""
+
+    def exhausted(self) -> bool:
+        """True (and `stop` set) once tokens or time are spent."""
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            self.stop = "budget_tokens"
+        elif self.max_ms is not None and (time.perf_counter() - self.start) * 1000 >= self.max_ms:
+            self.stop = "budget_ms"
+        return bool(self.stop)
+
+    async def ask(self, system_prompt: str, user_prompt: str, model: str) -> tuple[dict | None, int]:
+        """One grading call. Returns (parsed JSON or None, time_ms)."""
+        usage: dict = {}
+        content, elapsed_ms, cost = await ask_json(
+            system_prompt=system_prompt, user_prompt=user_prompt, model=model, usage=usage,
+        )
+        self.calls += 1
+        self.tokens += usage.get("total_tokens", 0)
+        self.call_ms += elapsed_ms
+        self.cost += cost
+        _call_ms["calls"] += 1
+        _call_ms["ms"] += elapsed_ms
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            return None, elapsed_ms
+        return (data if isinstance(data, dict) else None), elapsed_ms
+
+    def report(self, baseline_calls: int, prefiltered: int, total_ms: int) -> dict:
+        """`result["grading"]` — compared with the previous per-question calls."""
+        saved = baseline_calls - self.calls
+        if self.calls:
+            mean_ms = self.call_ms / self.calls
+        else:
+            mean_ms = _call_ms["ms"] / _call_ms["calls"] if _call_ms["calls"] else 0
+        return {
+            "calls": self.calls,
+            "baseline_calls": baseline_calls,
+            "calls_saved": saved,
+            "prefiltered": prefiltered,
+            "tokens": self.tokens,
+            "stop": self.stop or "done",
+            "total_ms": total_ms,
+            "baseline_ms_est": int(total_ms + max(0, saved) * mean_ms),
+        }
+
+
+def grade_list(data: dict | None, key: str, n: int) -> dict[int, int]:
+    """`{"grades": [{"id": 1, "grade": 2}, ...]}` → {0-based index: grade}."""
+    out: dict[int, int] = {}
+    if not data:
+        return out
+    for item in data.get(key) or []:
+        try:
+            i, g = int(item.get("id", 0)) - 1, int(item.get("grade", 0))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if 0 <= i < n:
+            out[i] = g
+    return out
@@ -3,8 +3,31 @@
 Generate a hypothetical answer to the question,
 then embed that hypothetical (instead of the raw question)
 so the search vector is closer to actual document content.
+
+The hypothetical is a full LLM completion on the critical path of the HyDE
+and Advanced modes, so:
+
+- Cache: (question, model, collection) → hypothetical text, in memory (LRU,
+  `HYDE_CACHE_MAX`). The question is normalized for case/whitespace. A
+  repeated question skips the LLM; two requests for the same key at once
+  (Compare HyDE vs Advanced) share one generation. Deleting a collection
+  drops its entries
+- Length cap: `max_chars` streams the completion and stops once that many
+  characters arrived, then trims back to the last sentence end — the
+  embedding needs the gist, not the third sentence
+
+Public API:
+- await generate_hypothetical(question, model, collection_name, max_chars, stats)
+  → (hypothetical_text, time_ms, cost_usd)
+- drop_collection(name)
+- clear() — forget everything (evaluation runs between pipelines)
 """
 
+import asyncio
+import os
+import re
+from collections import OrderedDict
+
 from services.llm_service import ask_short
 
 HYDE_SYSTEM = (
@@ -14,19 +37,87 @@ HYDE_SYSTEM = (
     "답변만 작성하고, 다른 설명은 하지 마세요."
 )
 
+HYDE_CACHE_MAX = int(os.environ.get("HYDE_CACHE_MAX", "1000"))
+HYDE_MAX_CHARS = 300        # 2-3문장 ≈ 150~300자 — 넘으면 생성을 끊음
 
-async def generate_hypothetical(
-    question: str,
-    model: str = "gpt-4o-mini",
-) -> tuple[str, int, float]:
-    """Generate a hypothetical document for HyDE.
+_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_inflight: dict[tuple, asyncio.Task] = {}
+_SENTENCE_END = re.compile(r"[.!?。](?=\s|$)")
 
-    Returns: (hypothetical_text, time_ms, cost_usd)
-    """
-    return await ask_short(
+
+def _key(question: str, model: str, collection_name: str | None, max_chars: int | None) -> tuple:
+    return (" ".join(question.lower().split()), model, collection_name or "", max_chars)
+
+
+def _trim_to_sentence(text: str) -> str:
+    """Cut a length-capped completion back to its last full sentence."""
+    ends = [m.end() for m in _SENTENCE_END.finditer(text)]
+    if ends and ends[-1] >= len(text) // 2:
+        return text[:ends[-1]]
+    return text
+
+
+async def _generate(question: str, model: str, max_chars: int | None) -> tuple[str, int, float]:
+    text, elapsed_ms, cost = await ask_short(
         system_prompt=HYDE_SYSTEM,
         user_prompt=question,
         model=model,
         temperature=0.7,
         max_tokens=200,
+        max_chars=max_chars,
     )
+    if max_chars is not None and len(text) >= max_chars:
+        text = _trim_to_sentence(text)
+    return text, elapsed_ms, cost
+
+
+async def generate_hypothetical(
+    question: str,
+    model: str = "gpt-4o-mini",
+    collection_name: str | None = None,
+    max_chars: int | None = HYDE_MAX_CHARS,
+    stats: dict | None = None,
+) -> tuple[str, int, float]:
+    """Generate a hypothetical document for HyDE.
+
+    Returns: (hypothetical_text, time_ms, cost_usd). A cache hit costs 0;
+    `stats` (dict) gets `cache` = "hit" | "shared" | "miss".
+    """
+    key = _key(question, model, collection_name, max_chars)
+    if key in _cache:
+        _cache.move_to_end(key)
+        if stats is not None:
+            stats["cache"] = "hit"
+        return _cache[key], 0, 0.0
+
+    task = _inflight.get(key)
+    if task is not None:
+        # 같은 질문을 이미 생성 중 — 결과만 기다림 (비용은 먼저 시작한 쪽에)
+        text, elapsed_ms, _ = await asyncio.shield(task)
+        if stats is not None:
+            stats["cache"] = "shared"
+        return text, elapsed_ms, 0.0
+
+    task = asyncio.ensure_future(_generate(question, model, max_chars))
+    _inflight[key] = task
+    try:
+        text, elapsed_ms, cost = await asyncio.shield(task)
+    finally:
+        _inflight.pop(key, None)
+    _cache[key] = text
+    while len(_cache) > HYDE_CACHE_MAX:
+        _cache.popitem(last=False)
+    if stats is not None:
+        stats["cache"] = "miss"
+    return text, elapsed_ms, cost
+
+
+def clear() -> None:
+    """Forget all cached hypotheticals."""
+    _cache.clear()
+
+
+def drop_collection(collection_name: str) -> None:
+    """Forget cached hypotheticals of a deleted collection."""
+    for key in [k for k in _cache if k[2] == collection_name]:
+        del _cache[key]
@@ -1,9 +1,25 @@
 import time
 from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable
 
+import tiktoken
 from openai import AsyncOpenAI
 
 _client = AsyncOpenAI()
+_enc = None
+
+
+def _count_prompt(text: str) -> int:
+    """Token count with the gpt-4o tokenizer, loaded on first use — tiktoken
+    downloads its BPE file, so without network fall back to ~4 bytes/token."""
+    global _enc
+    if _enc is None:
+        try:
+            _enc = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            return max(1, len(text.encode("utf-8")) // 4)
+    return len(_enc.encode(text))
 
 PRICING = {
     "gpt-4o": {"input": 2.50 / 1_000_000, "output": 10.00 / 1_000_000},
@@ -32,27 +48,53 @@ async def ask_with_context(
     context: str,
     model: str = "gpt-4o-mini",
     system_prompt: str | None = None,
+    on_token: Callable[[str], None] | None = None,
 ) -> LLMResponse:
+    """Answer from context. With `on_token`, the answer is streamed and each
+    delta passed to it as it arrives; the return value is the same."""
     start_time = time.perf_counter()
 
     sys_content = system_prompt or "다음 문서를 참고하여 질문에 답변하세요."
     sys_content += f"\n\n---\n{context}\n---"
-
-    response = await _client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": sys_content},
-            {"role": "user", "content": question},
-        ],
-        temperature=0.3,
-    )
+    messages = [
+        {"role": "system", "content": sys_content},
+        {"role": "user", "content": question},
+    ]
+
+    if on_token is None:
+        response = await _client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.3,
+        )
+        answer = response.choices[0].message.content or ""
+        usage = response.usage
+    else:
+        stream = await _client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.3,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        parts: list[str] = []
+        usage = None
+        async for chunk in stream:
+            if chunk.usage:
+                usage = chunk.usage          # include_usage → 마지막 chunk 에만 옴
+            if chunk.choices and chunk.choices[0].delta.content:
+                delta = chunk.choices[0].delta.content
+                parts.append(delta)
+                on_token(delta)
+        answer = "".join(parts)
+        if usage is None:
+            usage = SimpleNamespace(prompt_tokens=0, completion_tokens=0, total_tokens=0)
 
     elapsed_ms = int((time.perf_counter() - start_time) * 1000)
-    usage = response.usage
     cost = _calc_cost(usage, model)
 
     return LLMResponse(
-        answer=response.choices[0].message.content or "",
+        answer=answer,
         prompt_tokens=usage.prompt_tokens,
         completion_tokens=usage.completion_tokens,
         total_tokens=usage.total_tokens,
@@ -67,8 +109,12 @@ async def ask_json(
     model: str = "gpt-4o-mini",
     temperature: float = 0,
     max_tokens: int = 1024,
+    usage: dict | None = None,
 ) -> tuple[str, int, float]:
-    """LLM call expecting JSON response. Returns (content, time_ms, cost_usd)."""
+    """LLM call expecting JSON response. Returns (content, time_ms, cost_usd).
+
+    `usage` (dict), if given, is filled with the call's token counts.
+    """
     start_time = time.perf_counter()
 
     response = await _client.chat.completions.create(
@@ -83,8 +129,13 @@ async def ask_json(
     )
 
     elapsed_ms = int((time.perf_counter() - start_time) * 1000)
-    usage = response.usage
-    cost = round(_calc_cost(usage, model), 6)
+    cost = round(_calc_cost(response.usage, model), 6)
+    if usage is not None:
+        usage.update(
+            prompt_tokens=response.usage.prompt_tokens,
+            completion_tokens=response.usage.completion_tokens,
+            total_tokens=response.usage.total_tokens,
+        )
 
     return response.choices[0].message.content or "{}", elapsed_ms, cost
 
@@ -95,22 +146,57 @@ async def ask_short(
     model: str = "gpt-4o-mini",
     temperature: float = 0.7,
     max_tokens: int = 300,
+    max_chars: int | None = None,
 ) -> tuple[str, int, float]:
-    """Short LLM call (e.g. HyDE). Returns (content, time_ms, cost_usd)."""
-    start_time = time.perf_counter()
+    """Short LLM call (e.g. HyDE). Returns (content, time_ms, cost_usd).
 
-    response = await _client.chat.completions.create(
+    With `max_chars`, the completion is streamed and the stream closed as
+    soon as that many characters have arrived (the text may end mid-sentence).
+    """
+    start_time = time.perf_counter()
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+    if max_chars is None:
+        response = await _client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+        cost = round(_calc_cost(response.usage, model), 6)
+        return response.choices[0].message.content or "", elapsed_ms, cost
+
+    stream = await _client.chat.completions.create(
         model=model,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
+        messages=messages,
         temperature=temperature,
         max_tokens=max_tokens,
+        stream=True,
+        stream_options={"include_usage": True},
     )
-
+    parts: list[str] = []
+    length = 0
+    deltas = 0
+    usage = None
+    async for chunk in stream:
+        if chunk.usage:
+            usage = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            delta = chunk.choices[0].delta.content
+            parts.append(delta)
+            length += len(delta)
+            deltas += 1
+            if length >= max_chars:
+                await stream.close()         # 나머지 토큰은 생성·과금되지 않음
+                break
     elapsed_ms = int((time.perf_counter() - start_time) * 1000)
-    usage = response.usage
+    if usage is None:
+        # 도중에 끊으면 usage chunk 가 오지 않음 — delta 하나 ≈ 토큰 하나로 추정
+        usage = SimpleNamespace(prompt_tokens=_count_prompt(system_prompt + user_prompt) + 8,
+                                completion_tokens=deltas)
     cost = round(_calc_cost(usage, model), 6)
-
-    return response.choices[0].message.content or "", elapsed_ms, cost
+    return "".join(parts), elapsed_ms, cost
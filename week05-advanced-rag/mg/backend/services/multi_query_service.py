@@ -1,16 +1,25 @@
 """Multi-Query RAG — Generate multiple query variations for broader retrieval.
 
-Creates 3 variations of the original question,
-searches each independently, then deduplicates and merges results.
+Creates 3 variations of the original question, searches them all,
+then fuses the ranked lists with Reciprocal Rank Fusion.
+
+Latency: the original question is embedded and searched while the
+variations are being written (`parallel_original`, on by default), then
+the variations are embedded in one `embed_texts` call and searched in one
+Chroma query (`search_many`). The original question's results don't wait
+for the variation LLM call, and if that call fails the answer still comes
+from them.
 """
 
 import asyncio
 import json
+import time
+from typing import Callable, Optional
 
-from services.embedding_service import embed_single
-from services import vector_store
+from services.embedding_service import embed_single, embed_texts
+from services import fusion, vector_store
 from services.llm_service import ask_json, ask_with_context
-from services.rag_utils import SYSTEM_PROMPT, format_context
+from services.rag_utils import SYSTEM_PROMPT, format_context, StepLog
 
 MULTI_QUERY_SYSTEM = """사용자의 질문을 3가지 다른 관점에서 재작성하세요.
 각 변형은 원래 질문과 같은 정보를 찾지만 다른 표현/관점을 사용합니다.
@@ -19,8 +28,6 @@ MULTI_QUERY_SYSTEM = """사용자의 질문을 3가지 다른 관점에서 재
 {"queries": ["변형1", "변형2", "변형3"]}"""
 
 
-
-
 async def _generate_queries(
     question: str, model: str
 ) -> tuple[list[str], int, float]:
@@ -40,68 +47,100 @@ async def _generate_queries(
     return queries, elapsed_ms, cost
 
 
+async def _search_original(
+    question: str, collection_name: str, search_k: int
+) -> tuple[list[vector_store.VectorSearchResult], int, int]:
+    """Embed + search the original question. Returns (results, embed_ms, search_ms)."""
+    query_emb, embed_ms = await embed_single(question)
+    results, search_ms = await vector_store.search(collection_name, query_emb, search_k)
+    return results, embed_ms, search_ms
+
+
 async def run_multi_query_rag(
     question: str,
     collection_name: str,
     top_k: int = 5,
     model: str = "gpt-4o-mini",
+    on_step: Optional[Callable[[dict], None]] = None,
+    on_token: Optional[Callable[[Optional[str]], None]] = None,
+    parallel_original: bool = True,
 ) -> dict:
-    """Multi-Query RAG: generate variations → search each → merge → generate."""
-    steps = []
+    """Multi-Query RAG: generate variations (‖ search original) → batch search → RRF → generate."""
+    steps = StepLog(on_step)
     total_cost = 0.0
-
-    # Step 1: Generate query variations
-    queries, gen_ms, gen_cost = await _generate_queries(question, model)
+    search_k = top_k * 2
+    start = time.perf_counter()
+
+    # Step 1: Generate query variations (searching the original meanwhile)
+    if parallel_original:
+        generated, original = await asyncio.gather(
+            _generate_queries(question, model),
+            _search_original(question, collection_name, search_k),
+            return_exceptions=True,
+        )
+        if isinstance(original, BaseException):
+            raise original
+        orig_results, orig_embed_ms, orig_search_ms = original
+        if isinstance(generated, BaseException):
+            # 변형 생성 실패 → 원 질문 결과만으로 답변 (basic RAG 로 강등)
+            print(f"  [multi_query] 변형 생성 실패 → 원 질문만 사용 ({generated})")
+            generated = ([], 0, 0.0)
+        queries, gen_ms, gen_cost = generated
+    else:
+        queries, gen_ms, gen_cost = await _generate_queries(question, model)
+        orig_results, orig_embed_ms, orig_search_ms = None, 0, 0
     total_cost += gen_cost
     all_queries = [question] + queries  # original + 3 variations
     steps.append({
         "name": "multi_query", "label": "질문 변형 생성",
-        "time_ms": gen_ms, "detail": f"{len(queries)}개 변형 생성",
+        "time_ms": gen_ms,
+        "detail": f"{len(queries)}개 변형 생성"
+        + (f" (원 질문 검색 {orig_embed_ms + orig_search_ms}ms 병렬)" if parallel_original else ""),
     })
 
-    # Step 2: Embed all queries in parallel
-    import time as _time
-    embed_start = _time.perf_counter()
-    embed_results = await asyncio.gather(
-        *(embed_single(q) for q in all_queries)
-    )
-    total_embed_ms = int((_time.perf_counter() - embed_start) * 1000)
-
+    # Step 2: Embed the (remaining) queries in one call
+    batch = queries if parallel_original else all_queries
+    embeddings, batch_embed_ms = await embed_texts(batch) if batch else ([], 0)
+    embed_ms = orig_embed_ms + batch_embed_ms
     steps.append({
-        "name": "embed", "label": "질문들 임베딩 (병렬)",
-        "time_ms": total_embed_ms, "detail": f"{len(all_queries)}개 질문",
+        "name": "embed", "label": "질문들 임베딩 (배치)",
+        "time_ms": batch_embed_ms,
+        "detail": f"{len(batch)}개 질문 1회 호출" if batch else "변형 없음 — 생략",
     })
 
-    # Step 3: Search each embedding
-    all_chunks: dict[int, dict] = {}
-    total_search_ms = 0
-
-    for query_emb, _ in embed_results:
-        results, search_ms = vector_store.search(collection_name, query_emb, top_k)
-        total_search_ms += search_ms
-
-        for r in results:
-            if r.index not in all_chunks or r.score > all_chunks[r.index]["score"]:
-                all_chunks[r.index] = {
-                    "index": r.index,
-                    "text": r.text,
-                    "score": round(r.score, 4),
-                }
-
+    # Step 3: One Chroma query for all of them (original question's list first)
+    batch_results, batch_search_ms = await vector_store.search_many(collection_name, embeddings, search_k)
+    result_lists = ([orig_results] if parallel_original else []) + batch_results
+    search_ms = orig_search_ms + batch_search_ms
+    hit_lists = [
+        [{"index": r.index, "text": r.text, "score": round(r.score, 4)} for r in results]
+        for results in result_lists
+    ]
+
+    # Step 4: RRF over the per-query lists (original question first)
+    rrf_start = time.perf_counter()
+    merged = fusion.fuse_hits(hit_lists, key=lambda c: c["index"], score=None, top_k=top_k)
+    best_ids, best_scores = fusion.fuse(
+        [([c["index"] for c in hits], [c["score"] for c in hits]) for hits in hit_lists],
+        method="combmax", normalize="none",
+    )
+    best_score = dict(zip(best_ids, best_scores.tolist()))
+    final = [
+        {**c, "score": round(best_score[c["index"]], 4), "rrf_score": round(rrf_score, 4)}
+        for c, rrf_score in merged
+    ]
+    rrf_ms = int((time.perf_counter() - rrf_start) * 1000)
     steps.append({
-        "name": "search", "label": "다중 검색",
-        "time_ms": total_search_ms,
-        "detail": f"{len(all_queries)}회 검색 → {len(all_chunks)}개 고유 청크",
+        "name": "search", "label": "다중 검색 (1회 쿼리) + RRF",
+        "time_ms": batch_search_ms + rrf_ms,
+        "detail": f"{len(all_queries)}개 질문 → {len(best_ids)}개 고유 청크 → {len(final)}개 선택",
     })
 
-    # Step 3: Sort by score, take top_k
-    merged = sorted(all_chunks.values(), key=lambda c: c["score"], reverse=True)
-    final = merged[:top_k]
-
-    # Step 4: Generate
+    # Step 5: Generate
     context = format_context(final)
     llm_result = await ask_with_context(
-        question, context, model, system_prompt=SYSTEM_PROMPT
+        question, context, model, system_prompt=SYSTEM_PROMPT,
+        on_token=on_token,
     )
     total_cost += llm_result.cost_usd
     steps.append({
@@ -109,16 +148,16 @@ async def run_multi_query_rag(
         "time_ms": llm_result.time_ms,
     })
 
-    total_ms = gen_ms + total_embed_ms + total_search_ms + llm_result.time_ms
+    total_ms = int((time.perf_counter() - start) * 1000)
 
     return {
         "answer": llm_result.answer,
         "sources": final,
         "steps": steps,
         "timing": {
-            "query_gen_ms": gen_ms, "embed_ms": total_embed_ms,
-            "search_ms": total_search_ms, "llm_ms": llm_result.time_ms,
-            "total_ms": total_ms,
+            "query_gen_ms": gen_ms, "embed_ms": embed_ms,
+            "search_ms": search_ms, "rrf_ms": rrf_ms,
+            "llm_ms": llm_result.time_ms, "total_ms": total_ms,
         },
         "cost_usd": round(total_cost, 6),
         "total_tokens": llm_result.total_tokens,
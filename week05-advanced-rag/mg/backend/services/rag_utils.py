@@ -1,5 +1,7 @@
 """Shared utilities for RAG pipelines."""
 
+from typing import Callable, Optional
+
 SYSTEM_PROMPT = (
     "다음 문서를 참고하여 질문에 답변하세요. "
     "문서에 없는 내용은 '문서에 해당 정보가 없습니다'라고 답하세요."
@@ -17,3 +19,21 @@ def chunks_from_results(results) -> list[dict]:
         {"index": r.index, "text": r.text, "score": round(r.score, 4)}
         for r in results
     ]
+
+
+class StepLog(list):
+    """The pipeline's `steps` list; also reports each step as it is appended.
+
+    Runners take `on_step` (called with the step dict once the step is done)
+    and `on_token` (answer tokens, see `ask_with_context`) so the SSE
+    endpoints can stream progress without a second code path.
+    """
+
+    def __init__(self, on_step: Optional[Callable[[dict], None]] = None):
+        super().__init__()
+        self.on_step = on_step
+
+    def append(self, step: dict) -> None:
+        super().append(step)
+        if self.on_step:
+            self.on_step(step)
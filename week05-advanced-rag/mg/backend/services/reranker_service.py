@@ -2,9 +2,44 @@
 
 Takes initial search results and re-scores them using LLM
 for more accurate relevance ranking.
+
+Scoring used to send every candidate (top_k*4, 300 chars each) in one
+prompt and to pay for the same (question, chunk) pairs on every request.
+It is now a small engine:
+
+- Cache: (question hash, chunk id) → score in SQLite
+  (`chroma_data/rerank_cache.sqlite`, or `RERANK_CACHE_PATH`). The question is hashed after
+  whitespace/case normalization and the chunk id is a hash of its text, so
+  a pair is scored once whatever collection it came from. Model, truncation
+  length and prompt version are part of the key. A repeated question skips
+  the LLM entirely
+- Sliding window (listwise): uncached candidates are scored in retrieval
+  order, `window` at a time. From the second window on, the current
+  leaders (`overlap` of them) are scored again alongside the new chunks, so
+  every window compares newcomers against the same yardstick
+- Early exit: before each window, if `top_n` chunks (cached or scored)
+  already score at least `early_exit_score` (0-10), the remaining windows
+  are skipped — later retrieval ranks rarely beat a first window that is
+  clearly dominant
+- Budget: `budget_ms` / `budget_usd` stop before the next window once spent.
+  Chunks never scored keep their retrieval order below the scored ones
+- `max_chars` controls per-chunk truncation (default 300)
+
+Public API:
+- await rerank(question, chunks, top_n, model, ..., stats=None)
+  → (reranked_chunks, time_ms, cost_usd); `stats` (dict) is filled with
+  cache hits, LLM calls, skipped windows
+- rerank_stats() → cache / call counters for /api/rerank/stats
 """
 
+import asyncio
+import hashlib
 import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
 
 from services.llm_service import ask_json
 
@@ -20,52 +55,233 @@ RERANK_SYSTEM = """다음 질문과 각 텍스트 청크의 관련성을 0~10점
 반드시 다음 JSON 형식으로만 응답하세요:
 {"results": [{"index": 0, "score": 8}, {"index": 1, "score": 3}]}"""
 
+PROMPT_VERSION = 1
+CACHE_PATH = Path(os.environ.get(
+    "RERANK_CACHE_PATH",
+    Path(__file__).resolve().parent.parent / "chroma_data" / "rerank_cache.sqlite",
+))
+RERANK_CACHE_MAX = int(os.environ.get("RERANK_CACHE_MAX", "50000"))
+RERANK_WINDOW = 20      # top_k*4 (=20) 후보는 지금처럼 한 번에 — 그 이상일 때만 창을 나눔
+RERANK_OVERLAP = 3
+EARLY_EXIT_SCORE = 8.0
+MAX_CHARS = 300
 
-async def rerank(
-    question: str,
-    chunks: list[dict],
-    top_n: int = 5,
-    model: str = "gpt-4o-mini",
-) -> tuple[list[dict], int, float]:
-    """Rerank chunks by LLM-scored relevance.
+_db: sqlite3.Connection | None = None
+_db_lock = threading.Lock()
+_stats = {"requests": 0, "cache_hits": 0, "cache_misses": 0, "llm_calls": 0,
+          "windows_skipped": 0, "budget_stops": 0, "cost_usd": 0.0}
+
+
+def _conn() -> sqlite3.Connection:
+    global _db
+    if _db is None:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _db = sqlite3.connect(CACHE_PATH, check_same_thread=False, isolation_level=None)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " qhash TEXT, chunk_id TEXT, variant TEXT, score REAL, created REAL,"
+            " PRIMARY KEY (qhash, chunk_id, variant))"
+        )
+        _db.execute("CREATE INDEX IF NOT EXISTS scores_created ON scores(created)")
+    return _db
+
+
+def question_hash(question: str) -> str:
+    return hashlib.sha256(" ".join(question.lower().split()).encode()).hexdigest()[:32]
+
+
+def chunk_id(chunk: dict) -> str:
+    return hashlib.sha256(chunk["text"].encode()).hexdigest()[:32]
+
+
+def _variant(model: str, max_chars: int) -> str:
+    return f"{model}|{max_chars}|v{PROMPT_VERSION}"
+
+
+def _get_cached(qhash: str, ids: list[str], variant: str) -> dict[str, float]:
+    if not ids:
+        return {}
+    with _db_lock:
+        rows = _conn().execute(
+            f"SELECT chunk_id, score FROM scores WHERE qhash = ? AND variant = ?"
+            f" AND chunk_id IN ({','.join('?' * len(ids))})",
+            [qhash, variant, *ids],
+        ).fetchall()
+    return dict(rows)
+
+
+def _put_cached(qhash: str, scores: dict[str, float], variant: str) -> None:
+    if not scores:
+        return
+    now = time.time()
+    with _db_lock:
+        db = _conn()
+        db.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+            [(qhash, cid, variant, s, now) for cid, s in scores.items()],
+        )
+        (count,) = db.execute("SELECT COUNT(*) FROM scores").fetchone()
+        if count > RERANK_CACHE_MAX:
+            db.execute(
+                "DELETE FROM scores WHERE rowid IN"
+                " (SELECT rowid FROM scores ORDER BY created LIMIT ?)",
+                (count - RERANK_CACHE_MAX,),
+            )
 
-    Returns: (reranked_chunks, time_ms, cost_usd)
-    """
-    if not chunks:
-        return [], 0, 0.0
 
+async def _score_window(
+    question: str, window: list[dict], model: str, max_chars: int
+) -> tuple[dict[int, float] | None, float]:
+    """LLM scores (0-10) for one window, by position. None if unparsable."""
     chunk_texts = "\n\n".join(
-        f"[청크 {i}] {c['text'][:300]}" for i, c in enumerate(chunks)
+        f"[청크 {i}] {c['text'][:max_chars]}" for i, c in enumerate(window)
     )
     user_msg = f"질문: {question}\n\n{chunk_texts}"
 
-    content, elapsed_ms, cost = await ask_json(
+    content, _, cost = await ask_json(
         system_prompt=RERANK_SYSTEM,
         user_prompt=user_msg,
         model=model,
         temperature=0,
     )
+    _stats["llm_calls"] += 1
+    _stats["cost_usd"] += cost
 
-    # Parse LLM scores
     score_map: dict[int, float] = {}
     try:
         data = json.loads(content)
-        results_list = data.get("results", [])
-        for item in results_list:
+        for item in data.get("results", []):
             idx = item.get("index", -1)
-            score = item.get("score", 0)
-            score_map[idx] = score
-    except (json.JSONDecodeError, AttributeError):
-        # Fallback: keep original order
-        for i in range(len(chunks)):
-            score_map[i] = len(chunks) - i
-
-    # Build scored copies (avoid mutating caller's list)
+            if isinstance(idx, int) and 0 <= idx < len(window):
+                score_map[idx] = float(item.get("score", 0))
+    except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        return None, cost
+    return score_map, cost
+
+
+async def rerank(
+    question: str,
+    chunks: list[dict],
+    top_n: int = 5,
+    model: str = "gpt-4o-mini",
+    window: int = RERANK_WINDOW,
+    overlap: int = RERANK_OVERLAP,
+    early_exit_score: float | None = EARLY_EXIT_SCORE,
+    budget_ms: int | None = None,
+    budget_usd: float | None = None,
+    max_chars: int = MAX_CHARS,
+    stats: dict | None = None,
+) -> tuple[list[dict], int, float]:
+    """Rerank chunks by LLM-scored relevance.
+
+    Returns: (reranked_chunks, time_ms, cost_usd)
+    """
+    if not chunks:
+        if stats is not None:
+            stats.update({
+                "candidates": 0, "cache_hits": 0, "llm_calls": 0,
+                "windows": 0, "windows_skipped": 0, "stop": "empty", "unscored": 0,
+            })
+        return [], 0, 0.0
+
+    start = time.perf_counter()
+    _stats["requests"] += 1
+    qhash = question_hash(question)
+    variant = _variant(model, max_chars)
+    ids = [chunk_id(c) for c in chunks]
+
+    cached = await asyncio.to_thread(_get_cached, qhash, list(dict.fromkeys(ids)), variant)
+    scores: dict[str, float] = dict(cached)
+    hits = sum(1 for cid in ids if cid in cached)
+    _stats["cache_hits"] += hits
+    _stats["cache_misses"] += len(ids) - hits
+
+    # 캐시에 없는 chunk 만 검색 순위대로 (같은 텍스트는 한 번만)
+    pending: list[int] = []
+    seen: set[str] = set()
+    for i, cid in enumerate(ids):
+        if cid not in scores and cid not in seen:
+            seen.add(cid)
+            pending.append(i)
+    fresh_per_window = max(1, window - overlap)
+    total_windows = 0 if not pending else 1 + max(0, -(-(len(pending) - window) // fresh_per_window))
+
+    cost = 0.0
+    calls = 0
+    new_scores: dict[str, list[float]] = {}
+    stop_reason = ""
+    pos = 0
+    while pos < len(pending):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if calls and budget_ms is not None and elapsed_ms >= budget_ms:
+            stop_reason = "budget_ms"
+        elif calls and budget_usd is not None and cost >= budget_usd:
+            stop_reason = "budget_usd"
+        elif early_exit_score is not None and sum(1 for s in scores.values() if s >= early_exit_score) >= top_n:
+            stop_reason = "early_exit"
+        if stop_reason:
+            break
+
+        if calls == 0:
+            members = pending[:window]
+            pos = len(members)
+        else:
+            # 이전 창까지의 선두 청크를 기준점으로 함께 채점
+            leaders = sorted(
+                {ids[i]: i for i in range(len(chunks)) if ids[i] in scores}.items(),
+                key=lambda kv: scores[kv[0]], reverse=True,
+            )[:overlap]
+            fresh = pending[pos:pos + fresh_per_window]
+            members = [i for _, i in leaders] + fresh
+            pos += len(fresh)
+
+        window_chunks = [chunks[i] for i in members]
+        score_map, window_cost = await _score_window(question, window_chunks, model, max_chars)
+        cost += window_cost
+        calls += 1
+        if score_map is None:
+            continue
+        for w_pos, i in enumerate(members):
+            if w_pos in score_map:
+                new_scores.setdefault(ids[i], []).append(score_map[w_pos])
+                # 기준점으로 여러 번 채점된 청크는 평균
+                scores[ids[i]] = sum(new_scores[ids[i]]) / len(new_scores[ids[i]])
+
+    skipped = max(0, total_windows - calls)
+    _stats["windows_skipped"] += skipped if stop_reason == "early_exit" else 0
+    _stats["budget_stops"] += 1 if stop_reason.startswith("budget") else 0
+    await asyncio.to_thread(
+        _put_cached, qhash, {cid: scores[cid] for cid in new_scores}, variant,
+    )
+
+    # Build scored copies (avoid mutating caller's list); unscored keep retrieval order
     scored = [
-        {**chunk, "rerank_score": round(score_map.get(i, 0) / 10.0, 4)}
-        for i, chunk in enumerate(chunks)
+        {**chunk, "rerank_score": round(scores[cid] / 10.0, 4)}
+        for chunk, cid in zip(chunks, ids) if cid in scores
     ]
+    scored.sort(key=lambda c: c["rerank_score"], reverse=True)
+    unscored = [chunk for chunk, cid in zip(chunks, ids) if cid not in scores]
+    ranked = scored + unscored
 
-    # Sort by rerank score descending
-    ranked = sorted(scored, key=lambda c: c.get("rerank_score", 0), reverse=True)
+    elapsed_ms = int((time.perf_counter() - start) * 1000)
+    if stats is not None:
+        stats.update({
+            "candidates": len(chunks), "cache_hits": hits, "llm_calls": calls,
+            "windows": total_windows, "windows_skipped": skipped,
+            "stop": stop_reason or "done", "unscored": len(unscored),
+        })
     return ranked[:top_n], elapsed_ms, cost
+
+
+def rerank_stats() -> dict:
+    """Cache and LLM-call counters since startup, plus cache size."""
+    with _db_lock:
+        (rows,) = _conn().execute("SELECT COUNT(*) FROM scores").fetchone()
+    looked_up = _stats["cache_hits"] + _stats["cache_misses"]
+    return {
+        **_stats,
+        "cost_usd": round(_stats["cost_usd"], 6),
+        "cache_rows": rows,
+        "cache_hit_rate": round(_stats["cache_hits"] / looked_up, 4) if looked_up else 0.0,
+    }
@@ -5,14 +5,30 @@ The LLM decides:
 2. Generates an answer with retrieved context
 3. Self-evaluates the answer quality
 4. If quality is low, regenerates with stricter instructions
+
+"Is retrieval needed?" is answered locally by default (`judge="local"`):
+search first instead of asking the LLM. If no chunk clears the similarity
+floor (`GRADE_SIM_FLOOR`), the retrieval is not used and the answer is
+generated without context — the same path as the LLM judging "no
+retrieval". Otherwise the answer is generated from every retrieved chunk.
+The self-evaluation is one batched call that also grades each chunk above
+the floor, so a regeneration uses only the relevant ones. `sources` lists
+the chunks the final answer was generated from.
+`max_rounds` evaluate → regenerate rounds run within a grading budget
+(`services/grading.py`).
 """
 
-import json
+import time
+from typing import Callable, Optional
 
 from services.embedding_service import embed_single
 from services import vector_store
-from services.llm_service import ask_with_context, ask_json
-from services.rag_utils import SYSTEM_PROMPT, format_context, chunks_from_results
+from services.grading import (
+    GRADE_BUDGET_MS, GRADE_BUDGET_TOKENS, GRADE_SIM_FLOOR, GradingBudget, grade_list, numbered,
+    prefilter,
+)
+from services.llm_service import ask_with_context
+from services.rag_utils import SYSTEM_PROMPT, format_context, chunks_from_results, StepLog
 
 NEED_RETRIEVAL_SYSTEM = """사용자의 질문이 외부 문서 검색이 필요한지 판단하세요.
 
@@ -23,17 +39,17 @@ NEED_RETRIEVAL_SYSTEM = """사용자의 질문이 외부 문서 검색이 필요
 반드시 다음 JSON 형식으로만 응답하세요:
 {"need_retrieval": true, "reason": "판단 이유"}"""
 
-EVALUATE_SYSTEM = """생성된 답변의 품질을 평가하세요.
+EVALUATE_SYSTEM = """생성된 답변의 품질과 각 문서의 관련성을 한 번에 평가하세요.
 
-평가 기준:
+답변 평가 기준:
 - 문서 컨텍스트에 근거한 답변인가?
 - 질문에 정확히 답하고 있는가?
 - 할루시네이션(문서에 없는 내용 날조)이 있는가?
 
-반드시 다음 JSON 형식으로만 응답하세요:
-{"score": 8, "is_grounded": true, "feedback": "평가 내용"}"""
-
+각 문서 [번호] 의 grade: 1 = 질문과 관련 있음, 0 = 관련 없음
 
+반드시 다음 JSON 형식으로만 응답하세요:
+{"score": 8, "is_grounded": true, "feedback": "평가 내용", "grades": [{"id": 1, "grade": 1}, {"id": 2, "grade": 0}]}"""
 
 
 async def run_self_rag(
@@ -41,53 +57,76 @@ async def run_self_rag(
     collection_name: str,
     top_k: int = 5,
     model: str = "gpt-4o-mini",
+    on_step: Optional[Callable[[dict], None]] = None,
+    on_token: Optional[Callable[[Optional[str]], None]] = None,
+    judge: str = "local",
+    max_rounds: int = 1,
+    budget_tokens: Optional[int] = GRADE_BUDGET_TOKENS,
+    budget_ms: Optional[int] = GRADE_BUDGET_MS,
 ) -> dict:
     """Self-RAG: judge retrieval → retrieve → generate → self-evaluate → (re-generate)."""
-    steps = []
+    start = time.perf_counter()
+    steps = StepLog(on_step)
     total_cost = 0.0
-
-    # Step 1: Judge if retrieval is needed
-    judge_content, judge_ms, judge_cost = await ask_json(
-        system_prompt=NEED_RETRIEVAL_SYSTEM,
-        user_prompt=question,
-        model=model,
-    )
-    total_cost += judge_cost
-
-    try:
-        judge_data = json.loads(judge_content)
-        need_retrieval = judge_data.get("need_retrieval", True)
-        judge_reason = judge_data.get("reason", "")
-    except (json.JSONDecodeError, AttributeError):
-        need_retrieval = True
-        judge_reason = "판단 실패, 기본값: 검색 수행"
-
-    steps.append({
-        "name": "judge", "label": "검색 필요성 판단",
-        "time_ms": judge_ms,
-        "detail": f"{'검색 필요' if need_retrieval else '검색 불필요'}: {judge_reason}",
-    })
+    budget = GradingBudget(budget_tokens, budget_ms)
 
     chunks = []
+    graded: list[int] = []      # 채점에 보낼 chunk 의 위치 (유사도 기준 이상)
+    prefiltered = 0
     embed_ms = 0
     search_ms = 0
+    judge_ms = 0
+
+    if judge == "llm":
+        # Step 1: Judge if retrieval is needed (LLM)
+        judge_data, judge_ms = await budget.ask(NEED_RETRIEVAL_SYSTEM, question, model)
+        if judge_data is None:
+            need_retrieval = True
+            judge_reason = "판단 실패, 기본값: 검색 수행"
+        else:
+            need_retrieval = judge_data.get("need_retrieval", True)
+            judge_reason = judge_data.get("reason", "")
+        steps.append({
+            "name": "judge", "label": "검색 필요성 판단",
+            "time_ms": judge_ms,
+            "detail": f"{'검색 필요' if need_retrieval else '검색 불필요'}: {judge_reason}",
+        })
+    else:
+        need_retrieval = True
 
     if need_retrieval:
         # Step 2: Embed + Search
         query_emb, embed_ms = await embed_single(question)
         steps.append({"name": "embed", "label": "질문 임베딩", "time_ms": embed_ms})
 
-        results, search_ms = vector_store.search(collection_name, query_emb, top_k)
+        results, search_ms = await vector_store.search(collection_name, query_emb, top_k)
         chunks = chunks_from_results(results)
+        kept, dropped = prefilter(chunks)
         steps.append({
             "name": "search", "label": "벡터 검색",
             "time_ms": search_ms, "detail": f"{len(chunks)}개 청크",
         })
+        if judge != "llm":
+            # 기준을 넘는 문서가 없으면 검색 불필요로 판단 — 검색 결과 없이 답변
+            need_retrieval = bool(kept)
+            steps.append({
+                "name": "judge", "label": "검색 필요성 판단",
+                "time_ms": 0,
+                "detail": f"{'검색 필요' if need_retrieval else '검색 불필요'}: "
+                          f"로컬, 유사도 {GRADE_SIM_FLOOR} 이상 문서 {len(kept)}/{len(chunks)}개",
+            })
+        if need_retrieval:
+            kept_ids = {id(c) for c in kept}
+            graded = [i for i, c in enumerate(chunks) if id(c) in kept_ids]
+            prefiltered = len(dropped)
+        else:
+            chunks = []
 
     # Step 3: Generate answer
     context = format_context(chunks) if chunks else "검색된 문서가 없습니다."
     llm_result = await ask_with_context(
-        question, context, model, system_prompt=SYSTEM_PROMPT
+        question, context, model, system_prompt=SYSTEM_PROMPT,
+        on_token=on_token,
     )
     total_cost += llm_result.cost_usd
     steps.append({"name": "generate", "label": "답변 생성", "time_ms": llm_result.time_ms})
@@ -95,56 +134,69 @@ async def run_self_rag(
     answer = llm_result.answer
     gen_ms = llm_result.time_ms
 
-    # Step 4: Self-evaluate
-    eval_prompt = (
-        f"질문: {question}\n\n"
-        f"컨텍스트:\n{context}\n\n"
-        f"생성된 답변:\n{answer}"
-    )
-    eval_content, eval_ms, eval_cost = await ask_json(
-        system_prompt=EVALUATE_SYSTEM,
-        user_prompt=eval_prompt,
-        model=model,
-    )
-    total_cost += eval_cost
-
-    try:
-        eval_data = json.loads(eval_content)
-        eval_score = eval_data.get("score", 7)
-        is_grounded = eval_data.get("is_grounded", True)
-        feedback = eval_data.get("feedback", "")
-    except (json.JSONDecodeError, AttributeError):
-        eval_score = 7
-        is_grounded = True
-        feedback = "평가 파싱 실패"
-
-    steps.append({
-        "name": "evaluate", "label": "자체 평가",
-        "time_ms": eval_ms,
-        "detail": f"점수: {eval_score}/10, 근거 기반: {'Yes' if is_grounded else 'No'}",
-    })
-
-    # Step 5: Re-generate if score is low
+    # Step 4-5: Self-evaluate (+ 문서 관련성, 배치 1회) → 미달이면 재생성, 라운드 반복
+    eval_ms = 0
     regen_ms = 0
-    if eval_score < 6 or not is_grounded:
+    eval_score, is_grounded, feedback = 7, True, ""
+    for round_no in range(max_rounds):
+        if round_no and budget.exhausted():
+            break
+        eval_prompt = (
+            f"질문: {question}\n\n"
+            f"컨텍스트:\n{numbered([chunks[i] for i in graded]) if graded else context}\n\n"
+            f"생성된 답변:\n{answer}"
+        )
+        eval_data, round_ms = await budget.ask(EVALUATE_SYSTEM, eval_prompt, model)
+        eval_ms += round_ms
+        if eval_data is None:
+            eval_score, is_grounded, feedback = 7, True, "평가 파싱 실패"
+        else:
+            eval_score = eval_data.get("score", 7)
+            is_grounded = eval_data.get("is_grounded", True)
+            feedback = eval_data.get("feedback", "")
+        # 채점 번호 (유사도 기준 이상만) → chunks 위치. 기준 미달 chunk 는 관련 없음으로 봄
+        grades = {graded[i]: g for i, g in grade_list(eval_data, "grades", len(graded)).items()}
+        relevant = [c for i, c in enumerate(chunks) if i in graded and grades.get(i, 1) > 0]
+
+        steps.append({
+            "name": "evaluate", "label": "자체 평가" if round_no == 0 else f"자체 평가 ({round_no + 1})",
+            "time_ms": round_ms,
+            "detail": f"점수: {eval_score}/10, 근거 기반: {'Yes' if is_grounded else 'No'}"
+                      + (f", 관련 문서 {len(relevant)}/{len(chunks)}" if chunks else "")
+                      + (f" (유사도 미달 {prefiltered}개 채점 제외)" if prefiltered else ""),
+        })
+        if not (eval_score < 6 or not is_grounded):
+            break
+
+        # Re-generate with the chunks graded relevant
+        if relevant and len(relevant) < len(chunks):
+            chunks, graded = relevant, list(range(len(relevant)))
+            context = format_context(chunks)
         strict_prompt = (
             "이전 답변이 품질 기준에 미달했습니다. "
             f"피드백: {feedback}\n\n"
             "다음 문서만 근거로 하여 더 정확한 답변을 작성하세요. "
             "문서에 없는 내용은 절대 포함하지 마세요."
         )
+        if on_token:
+            on_token(None)      # 스트리밍 중인 첫 답변 폐기 신호
         regen_result = await ask_with_context(
-            question, context, model, system_prompt=strict_prompt
+            question, context, model, system_prompt=strict_prompt,
+            on_token=on_token,
         )
         total_cost += regen_result.cost_usd
         answer = regen_result.answer
-        regen_ms = regen_result.time_ms
+        regen_ms += regen_result.time_ms
         steps.append({
             "name": "regenerate", "label": "재생성",
-            "time_ms": regen_ms, "detail": f"피드백 반영 재생성",
+            "time_ms": regen_result.time_ms,
+            "detail": f"피드백 반영 재생성 (문서 {len(chunks)}개)",
         })
 
-    total_ms = judge_ms + embed_ms + search_ms + gen_ms + eval_ms + regen_ms
+    total_cost += budget.cost
+    total_ms = int((time.perf_counter() - start) * 1000)
+    # 이전 구현: 검색 필요성 판단 1회 + 자체 평가 1회
+    baseline_calls = 2
 
     return {
         "answer": answer,
@@ -159,4 +211,5 @@ async def run_self_rag(
         "total_tokens": llm_result.total_tokens,
         "mode": "self_rag",
         "self_eval": {"score": eval_score, "grounded": is_grounded, "feedback": feedback},
+        "grading": budget.report(baseline_calls, prefiltered, total_ms),
     }
@@ -1,12 +1,46 @@
+"""ChromaDB wrapper (async via `chroma_async`).
+
+Collection registry: `get_collection` and `count` each read Chroma's
+SQLite metadata, and every search used to do both before querying
+(`_bm25_search` / `get_documents` even went through get_or_create). Handles
+and chunk counts are now cached per collection name:
+
+- `_handle(name)` / `_count(name)` fetch once, then serve from memory.
+  A missing collection is not cached (it may be created next)
+- `add_chunks` refreshes the entry, `delete_collection` drops it. Each
+  name has a generation number bumped on invalidation; a read that started
+  before it does not store its (stale) result
+- A query on a cached handle that fails (collection deleted by another
+  process) drops the entry and retries once with a fresh handle
+- `warm_up(names)` at startup: handle + count + one 1-NN query per
+  collection, so the HNSW index is loaded into memory before the first
+  user query instead of during it. `CHROMA_WARMUP` picks the collections:
+  `*` (default) = all, empty = none, else comma-separated names
+"""
+
+import os
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
 
 import chromadb
 
+from services import chroma_async
+
 _PERSIST_DIR = str(Path(__file__).resolve().parent.parent / "chroma_data")
 _client = chromadb.PersistentClient(path=_PERSIST_DIR)
 
+CHROMA_WARMUP = os.environ.get("CHROMA_WARMUP", "*")
+
+_handles: dict[str, chromadb.Collection] = {}
+_counts: dict[str, int] = {}
+_generation: dict[str, int] = {}
+_registry_lock = threading.Lock()
+_registry_stats = {"handle_hits": 0, "handle_misses": 0, "count_hits": 0, "count_misses": 0,
+                   "invalidations": 0, "stale_retries": 0}
+_warmed: dict[str, int] = {}
+
 
 @dataclass
 class VectorSearchResult:
@@ -22,64 +56,197 @@ def create_collection(name: str) -> chromadb.Collection:
     )
 
 
-def add_chunks(
-    collection_name: str,
-    texts: list[str],
-    embeddings: list[list[float]],
-    metadatas: list[dict] | None = None,
-) -> int:
-    """Add chunks to a collection. Returns store_time_ms."""
+# ─── Collection registry ───
+
+
+def _invalidate(name: str) -> None:
+    with _registry_lock:
+        _handles.pop(name, None)
+        _counts.pop(name, None)
+        _generation[name] = _generation.get(name, 0) + 1
+        _registry_stats["invalidations"] += 1
+
+
+def _handle(name: str) -> chromadb.Collection:
+    """Cached `get_collection`. Raises like Chroma when it doesn't exist."""
+    with _registry_lock:
+        col = _handles.get(name)
+        gen = _generation.get(name, 0)
+        _registry_stats["handle_hits" if col is not None else "handle_misses"] += 1
+    if col is not None:
+        return col
+    col = _client.get_collection(name)
+    with _registry_lock:
+        if _generation.get(name, 0) == gen:
+            _handles[name] = col
+    return col
+
+
+def _count(name: str) -> int:
+    """Cached chunk count of an existing collection."""
+    with _registry_lock:
+        n = _counts.get(name)
+        gen = _generation.get(name, 0)
+        _registry_stats["count_hits" if n is not None else "count_misses"] += 1
+    if n is not None:
+        return n
+    n = _handle(name).count()
+    with _registry_lock:
+        if _generation.get(name, 0) == gen:
+            _counts[name] = n
+    return n
+
+
+def _with_handle(name: str, fn):
+    """fn(collection); on a cached handle that went stale, retry once with a fresh one."""
+    cached = name in _handles
+    try:
+        return fn(_handle(name))
+    except Exception:
+        if not cached:
+            raise
+        _registry_stats["stale_retries"] += 1
+        _invalidate(name)
+        return fn(_handle(name))
+
+
+def _warm_sync(name: str) -> int:
     start = time.perf_counter()
+    col = _handle(name)
+    if _count(name):
+        # 1-NN 질의 한 번으로 HNSW 인덱스를 메모리에 올림 (첫 사용자 질의가 이 비용을 내지 않도록)
+        first = col.get(limit=1, include=["embeddings"])
+        col.query(query_embeddings=[list(first["embeddings"][0])], n_results=1, include=[])
+    return int((time.perf_counter() - start) * 1000)
+
+
+async def warm_up(names: list[str] | None = None) -> dict[str, int]:
+    """Load handle, count and HNSW index of collections. Returns {name: ms}.
+
+    `names=None` reads `CHROMA_WARMUP` (`*` = every collection).
+    """
+    if names is None:
+        spec = CHROMA_WARMUP.strip()
+        if spec == "*":
+            names = [c["name"] for c in await list_collections()]
+        else:
+            names = [n.strip() for n in spec.split(",") if n.strip()]
+    for name in names:
+        try:
+            _warmed[name] = await chroma_async.read(_warm_sync, name)
+        except Exception:
+            continue
+    return {n: _warmed[n] for n in names if n in _warmed}
+
+
+def registry_stats() -> dict:
+    """Handle / count cache counters and warm-up times, for GET /api/chroma/stats."""
+    return {**_registry_stats, "cached_handles": len(_handles), "warmed_ms": dict(_warmed)}
+
+
+# ─── Read / write ───
+
+
+def _add_sync(collection_name, texts, embeddings, metadatas) -> None:
     collection = create_collection(collection_name)
-    ids = [f"chunk-{i}" for i in range(len(texts))]
     collection.add(
-        ids=ids,
+        ids=[f"chunk-{i}" for i in range(len(texts))],
         embeddings=embeddings,
         documents=texts,
         metadatas=metadatas or [{"index": i} for i in range(len(texts))],
     )
-    return int((time.perf_counter() - start) * 1000)
+    _invalidate(collection_name)
 
 
-def search(
+async def add_chunks(
     collection_name: str,
-    query_embedding: list[float],
-    top_k: int = 3,
-) -> tuple[list[VectorSearchResult], int]:
-    """Search a collection. Returns (results, search_time_ms)."""
+    texts: list[str],
+    embeddings: list[list[float]],
+    metadatas: list[dict] | None = None,
+) -> int:
+    """Add chunks to a collection. Returns store_time_ms."""
     start = time.perf_counter()
-    collection = _client.get_collection(collection_name)
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=min(top_k, collection.count()),
+    await chroma_async.write(_add_sync, collection_name, texts, embeddings, metadatas)
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _query_sync(collection_name, query_embeddings, top_k) -> dict:
+    return _with_handle(collection_name, lambda col: col.query(
+        query_embeddings=query_embeddings,
+        n_results=min(top_k, _count(collection_name)),
         include=["documents", "distances", "metadatas"],
-    )
-    search_time_ms = int((time.perf_counter() - start) * 1000)
+    ))
 
+
+def _to_results(results: dict, q: int) -> list[VectorSearchResult]:
     scored = []
-    for i in range(len(results["ids"][0])):
-        distance = results["distances"][0][i]
+    for i in range(len(results["ids"][q])):
+        distance = results["distances"][q][i]
         score = 1.0 - distance
-        idx = results["metadatas"][0][i].get("index", i)
+        idx = results["metadatas"][q][i].get("index", i)
         scored.append(
             VectorSearchResult(
                 index=idx,
-                text=results["documents"][0][i],
+                text=results["documents"][q][i],
                 score=score,
             )
         )
-    return scored, search_time_ms
+    return scored
+
+
+async def search(
+    collection_name: str,
+    query_embedding: list[float],
+    top_k: int = 3,
+) -> tuple[list[VectorSearchResult], int]:
+    """Search a collection. Returns (results, search_time_ms)."""
+    start = time.perf_counter()
+    results = await chroma_async.read(_query_sync, collection_name, [query_embedding], top_k)
+    search_time_ms = int((time.perf_counter() - start) * 1000)
+    return _to_results(results, 0), search_time_ms
 
 
-def collection_exists(name: str) -> bool:
+async def search_many(
+    collection_name: str,
+    query_embeddings: list[list[float]],
+    top_k: int = 3,
+) -> tuple[list[list[VectorSearchResult]], int]:
+    """Several queries in one Chroma call. Returns (results per query, search_time_ms)."""
+    if not query_embeddings:
+        return [], 0
+    start = time.perf_counter()
+    results = await chroma_async.read(_query_sync, collection_name, query_embeddings, top_k)
+    search_time_ms = int((time.perf_counter() - start) * 1000)
+    return [_to_results(results, q) for q in range(len(query_embeddings))], search_time_ms
+
+
+def _count_sync(name: str) -> int:
+    try:
+        return _count(name)
+    except Exception:
+        return 0
+
+
+async def collection_count(name: str) -> int:
+    """Chunk count, 0 when the collection doesn't exist."""
+    return await chroma_async.read(_count_sync, name)
+
+
+async def collection_exists(name: str) -> bool:
+    return await collection_count(name) > 0
+
+
+async def get_documents(name: str) -> dict:
+    """All documents + metadatas of a collection (BM25 corpus)."""
     try:
-        col = _client.get_collection(name)
-        return col.count() > 0
+        return await chroma_async.read(
+            _with_handle, name, lambda col: col.get(include=["documents", "metadatas"])
+        )
     except Exception:
-        return False
+        return {"ids": [], "documents": [], "metadatas": []}
 
 
-def list_collections() -> list[dict]:
+def _list_sync() -> list[dict]:
     cols = _client.list_collections()
     result = []
     for col in cols:
@@ -91,5 +258,17 @@ def list_collections() -> list[dict]:
     return result
 
 
-def delete_collection(name: str) -> None:
-    _client.delete_collection(name)
+async def list_collections() -> list[dict]:
+    return await chroma_async.read(_list_sync)
+
+
+def _delete_sync(name: str) -> None:
+    try:
+        _client.delete_collection(name)
+    finally:
+        _invalidate(name)
+        _warmed.pop(name, None)
+
+
+async def delete_collection(name: str) -> None:
+    await chroma_async.write(_delete_sync, name)
@@ -25,7 +25,7 @@ const MODE_DETAILS: Record<
     colorClass: { text: "text-good", bg: "bg-good/15", border: "border-good/30" },
   },
   advanced: {
-    pipeline: "HyDE → Embed → Wide Search → Rerank → Generate",
+    pipeline: "HyDE 검색 ∥ 질문 검색 → RRF → Rerank → Generate",
     colorClass: { text: "text-gold", bg: "bg-gold/15", border: "border-gold/30" },
   },
   hybrid: {
@@ -33,7 +33,7 @@ const MODE_DETAILS: Record<
     colorClass: { text: "text-gold-dim", bg: "bg-gold/10", border: "border-gold-dim/30" },
   },
   multi_query: {
-    pipeline: "질문 변형 → 다중 Embed → 다중 Search → Generate",
+    pipeline: "질문 변형 → 배치 Embed → 1회 Search → RRF → Generate",
     colorClass: { text: "text-info", bg: "bg-info/15", border: "border-info/30" },
   },
   self_rag: {
@@ -68,6 +68,7 @@ export default function Home() {
     deleteCollection,
     results,
     runningModes,
+    live,
     currentQuestion,
     setCurrentQuestion,
     runMode,
@@ -191,6 +192,7 @@ export default function Home() {
                   colorClass={detail.colorClass}
                   result={results[m.value] ?? null}
                   isRunning={runningModes.has(m.value)}
+                  live={live[m.value] ?? null}
                   hasCollection={!!embedResult}
                   hasQuestion={!!(question.trim() || currentQuestion)}
                   onRun={() => handleRunSingle(m.value as RagMode)}
@@ -48,6 +48,9 @@ export default function CollectionPanel({
           {embedResult.total_time_ms > 0 && (
             <span>{embedResult.total_time_ms}ms</span>
           )}
+          {!!embedResult.reused_count && (
+            <span>재사용 {embedResult.reused_count}개</span>
+          )}
         </div>
       )}
 
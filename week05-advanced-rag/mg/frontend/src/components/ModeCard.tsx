@@ -1,6 +1,6 @@
 "use client";
 
-import type { RagResponse } from "@/types/rag";
+import type { LiveRun, RagResponse } from "@/types/rag";
 import PipelineViz from "./PipelineViz";
 
 interface Props {
@@ -11,6 +11,7 @@ interface Props {
   colorClass: { text: string; bg: string; border: string };
   result: RagResponse | null;
   isRunning: boolean;
+  live: LiveRun | null;
   hasCollection: boolean;
   hasQuestion: boolean;
   onRun: () => void;
@@ -23,6 +24,7 @@ export default function ModeCard({
   colorClass,
   result,
   isRunning,
+  live,
   hasCollection,
   hasQuestion,
   onRun,
@@ -68,7 +70,17 @@ export default function ModeCard({
 
       {/* Result */}
       <div className="flex-1 p-4">
-        {isRunning ? (
+        {isRunning && live && (live.steps.length > 0 || live.answer) ? (
+          <div className="space-y-3">
+            <PipelineViz steps={live.steps} isLoading={false} />
+            {live.answer && (
+              <p className="whitespace-pre-wrap text-xs leading-relaxed text-pearl-dim">
+                {live.answer}
+                <span className="ml-0.5 inline-block h-3 w-1 animate-pulse bg-pearl-muted align-middle" />
+              </p>
+            )}
+          </div>
+        ) : isRunning ? (
           <div className="space-y-2">
             <div className="h-3 w-3/4 animate-pulse rounded bg-base-200" />
             <div className="h-3 w-full animate-pulse rounded bg-base-200" />
@@ -81,6 +93,7 @@ export default function ModeCard({
             {/* Stats */}
             <div className="flex gap-3 text-[11px] text-pearl-muted">
               <span>{result.timing.total_ms}ms</span>
+              {result.timing.ttft_ms != null && <span>첫 토큰 {result.timing.ttft_ms}ms</span>}
               <span>${result.cost_usd.toFixed(4)}</span>
               <span>{result.total_tokens} tok</span>
             </div>
@@ -123,6 +136,14 @@ export default function ModeCard({
                 </p>
               </div>
             )}
+            {result.grading && (
+              <p className="text-[10px] text-pearl-muted">
+                채점 LLM {result.grading.baseline_calls}→{result.grading.calls}회
+                {result.grading.prefiltered > 0 && ` · 사전 필터 ${result.grading.prefiltered}개`}
+                {result.grading.stop !== "done" && ` · 예산 종료`}
+                {` · 이전 구현 추정 ${result.grading.baseline_ms_est}ms`}
+              </p>
+            )}
             {result.complexity && result.selected_pipeline && (
               <div className="rounded-lg border border-purple/20 bg-purple/5 px-3 py-2">
                 <p className="text-[10px] font-medium text-purple">
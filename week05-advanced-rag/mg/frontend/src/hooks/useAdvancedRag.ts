@@ -7,6 +7,8 @@ import type {
   EmbedResult,
   RagResponse,
   RagMode,
+  LiveRun,
+  StreamEvent,
 } from "@/types/rag";
 
 const API = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
@@ -24,6 +26,7 @@ export function useAdvancedRag() {
   // Per-mode results
   const [results, setResults] = useState<Record<string, RagResponse>>({});
   const [runningModes, setRunningModes] = useState<Set<string>>(new Set());
+  const [live, setLive] = useState<Record<string, LiveRun>>({});
   const [currentQuestion, setCurrentQuestion] = useState("");
 
   useEffect(() => {
@@ -121,15 +124,18 @@ export function useAdvancedRag() {
     }
   }, [document, fetchCollections]);
 
-  // ─── Run single mode ───
+  // ─── Run single mode (SSE: step → token → result) ───
 
   const runMode = useCallback(
     async (mode: RagMode, question: string) => {
       if (!embedResult) return;
       setCurrentQuestion(question);
       setRunningModes((prev) => new Set(prev).add(mode));
+      setLive((prev) => ({ ...prev, [mode]: { steps: [], answer: "" } }));
+      const update = (fn: (run: LiveRun) => LiveRun) =>
+        setLive((prev) => ({ ...prev, [mode]: fn(prev[mode] ?? { steps: [], answer: "" }) }));
       try {
-        const res = await fetch(`${API}/api/rag`, {
+        const res = await fetch(`${API}/api/rag/stream`, {
           method: "POST",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify({
@@ -140,9 +146,30 @@ export function useAdvancedRag() {
             mode,
           }),
         });
-        if (!res.ok) throw new Error("RAG failed");
-        const data: RagResponse = await res.json();
-        setResults((prev) => ({ ...prev, [mode]: data }));
+        if (!res.ok || !res.body) throw new Error("RAG failed");
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        for (;;) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          const frames = buffer.split("\n\n");
+          buffer = frames.pop() ?? "";
+          for (const frame of frames) {
+            if (!frame.startsWith("data: ")) continue;
+            const event: StreamEvent = JSON.parse(frame.slice(6));
+            if (event.type === "step") {
+              update((run) => ({ ...run, steps: [...run.steps, event.data] }));
+            } else if (event.type === "token") {
+              update((run) => ({ ...run, answer: run.answer + event.data }));
+            } else if (event.type === "answer_reset") {
+              update((run) => ({ ...run, answer: "" }));
+            } else if (event.type === "result") {
+              setResults((prev) => ({ ...prev, [mode]: event.data }));
+            }
+          }
+        }
       } catch {
         /* ignore */
       } finally {
@@ -151,6 +178,11 @@ export function useAdvancedRag() {
           next.delete(mode);
           return next;
         });
+        setLive((prev) => {
+          const next = { ...prev };
+          delete next[mode];
+          return next;
+        });
       }
     },
     [embedResult, selectedModel]
@@ -173,6 +205,7 @@ export function useAdvancedRag() {
     deleteCollection,
     results,
     runningModes,
+    live,
     currentQuestion,
     setCurrentQuestion,
     runMode,
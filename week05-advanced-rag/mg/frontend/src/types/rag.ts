@@ -17,6 +17,8 @@ export interface EmbedResult {
   store_time_ms: number;
   total_time_ms: number;
   embed_cost: number;
+  /** 임베딩 저장소에서 재사용한 청크 수 (API 호출 없음) */
+  reused_count?: number;
 }
 
 export interface PipelineStep {
@@ -48,8 +50,36 @@ export interface RagResponse {
   eval_verdict?: string;
   selected_pipeline?: string;
   complexity?: string;
+  /** CRAG / Self-RAG 채점 호출 요약 (이전 구현 대비) */
+  grading?: GradingReport;
 }
 
+export interface GradingReport {
+  calls: number;
+  baseline_calls: number;
+  calls_saved: number;
+  prefiltered: number;
+  tokens: number;
+  stop: string;
+  total_ms: number;
+  baseline_ms_est: number;
+}
+
+/** 스트리밍 중인 모드의 진행 상황 (/api/rag/stream) */
+export interface LiveRun {
+  steps: PipelineStep[];
+  answer: string;
+}
+
+/** /api/rag/stream SSE 이벤트 — compare 스트림은 side 가 붙음 */
+export type StreamEvent =
+  | { type: "step"; data: PipelineStep; side?: "basic" | "advanced" }
+  | { type: "token"; data: string; side?: "basic" | "advanced" }
+  | { type: "answer_reset"; side?: "basic" | "advanced" }
+  | { type: "result"; data: RagResponse; side?: "basic" | "advanced" }
+  | { type: "error"; detail: string; side?: "basic" | "advanced" }
+  | { type: "done" };
+
 export interface CompareResult {
   basic: RagResponse;
   advanced: RagResponse;
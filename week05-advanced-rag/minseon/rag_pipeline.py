@@ -33,6 +33,7 @@ from services.document_service import load_document
 from services.chunking_service import split_text
 from services.embedding_service import embed_texts, EMBEDDING_MODEL
 from services.vector_store import VectorStore
+from services.fusion import chunk_key, fuse_hits
 from services.llm_service import stream_response, CHAT_MODEL
 from services.query_service import generate_queries
 from services.reranker_service import rerank
@@ -154,28 +155,31 @@ class AdvancedRagPipeline:
         tracker: CostTracker,
     ) -> list[dict]:
         """[Retrieval] 각 쿼리에 대해 Hybrid Search 후 결과 병합"""
-        seen: dict[str, dict] = {}
+        hit_lists: list[list[dict]] = []
 
         for query in queries:
             query_vector = embed_texts([query], tracker=tracker, stage="embedding")
-            hits = self.store.hybrid_search(
+            hit_lists.append(self.store.hybrid_search(
                 query=query,
                 query_vector=query_vector[0],
                 top_k=top_k * 2,
                 threshold=threshold,
                 max_per_source=max_per_source + 1,
-            )
-            for hit in hits:
-                meta = hit["metadata"]
-                key = f"{meta['source']}_{meta.get('chunk_index', 0)}"
-                if key not in seen or hit["similarity"] > seen[key]["similarity"]:
-                    seen[key] = hit
+            ))
 
-        all_hits = sorted(seen.values(), key=lambda x: x["similarity"], reverse=True)
+        # 쿼리 간 중복 청크는 가장 높은 유사도로 병합
+        all_hits = fuse_hits(
+            hit_lists,
+            key=lambda h: chunk_key(h["metadata"]["source"], h["metadata"].get("chunk_index", 0)),
+            score="similarity",
+            method="combmax",
+            normalize="none",
+        )
 
         source_counts: dict[str, int] = {}
         final = []
-        for hit in all_hits:
+        for hit, similarity in all_hits:
+            hit = {**hit, "similarity": similarity}
             source = hit["metadata"]["source"]
             count = source_counts.get(source, 0)
             if count < max_per_source:
@@ -9,10 +9,10 @@
 [해결: Hybrid Search]
   Vector Search: 의미론적 유사도 (코사인 유사도) → 문맥·의도 파악
   BM25 Search:   키워드 기반 정확도 (TF-IDF 계열) → 정확한 키워드 매칭
-  RRF Fusion:    Reciprocal Rank Fusion으로 두 결과를 최적 병합
+  RRF Fusion:    Reciprocal Rank Fusion으로 두 결과를 최적 병합 (services/fusion.py)
 
 [RRF (Reciprocal Rank Fusion)]
-  score(d) = Σ 1 / (k + rank(d))  (k=60, 표준값)
+  score(d) = Σ w / (k + rank(d))  (k=60 표준값, rank 는 1부터, w = 검색별 가중치)
   → 두 검색에서 모두 상위에 오른 문서가 최종 상위에 위치
   → 한 검색에서만 상위여도 낮은 점수로 포함 가능
 """
@@ -21,8 +21,11 @@ import re
 import uuid
 
 import chromadb
+import numpy as np
 from rank_bm25 import BM25Okapi
 
+from services.fusion import chunk_key, fuse_hits
+
 
 def _tokenize(text: str) -> list[str]:
     """한국어+영어 토크나이저: 단어 단위 분리"""
@@ -125,69 +128,52 @@ class VectorStore:
             include=["documents", "metadatas", "distances"],
         )
 
-        # key = "출처_청크인덱스" (중복 병합용)
-        all_hits: dict[str, dict] = {}
-        vector_ranks: dict[str, int] = {}
-
-        for rank, (doc, meta, dist) in enumerate(zip(
+        vector_hits: list[dict] = []
+        for doc, meta, dist in zip(
             vector_results["documents"][0],
             vector_results["metadatas"][0],
             vector_results["distances"][0],
-        )):
+        ):
             similarity = 1.0 - dist
             if similarity < threshold:
                 continue
-            key = f"{meta['source']}_{meta.get('chunk_index', 0)}"
-            all_hits[key] = {"content": doc, "similarity": similarity, "metadata": meta}
-            vector_ranks[key] = rank
+            vector_hits.append({"content": doc, "similarity": similarity, "metadata": meta})
 
         # ── Step 2: BM25 검색 ─────────────────────────────────
-        bm25_ranks: dict[str, int] = {}
+        bm25_hits: list[dict] = []
         if self._bm25 and self._bm25_docs:
             query_tokens = _tokenize(query)
             bm25_scores = self._bm25.get_scores(query_tokens)
+            ranked_indices = np.argsort(-bm25_scores, kind="stable")[:n_results]
 
-            ranked_indices = sorted(
-                range(len(bm25_scores)),
-                key=lambda i: bm25_scores[i],
-                reverse=True,
-            )
-
-            for rank, idx in enumerate(ranked_indices[:n_results]):
+            for idx in ranked_indices:
                 if bm25_scores[idx] <= 0:
                     break
                 doc_info = self._bm25_docs[idx]
-                meta = doc_info["metadata"]
-                key = f"{meta['source']}_{meta.get('chunk_index', 0)}"
-                bm25_ranks[key] = rank
-
-                # 벡터 검색에서 누락된 청크 추가 (BM25 전용 히트)
-                if key not in all_hits:
-                    all_hits[key] = {
-                        "content": doc_info["content"],
-                        "similarity": 0.0,
-                        "metadata": meta,
-                    }
-
-        # ── Step 3: RRF Fusion ────────────────────────────────
-        # score = vector_weight * 1/(k+v_rank) + bm25_weight * 1/(k+b_rank)
-        k = 60  # RRF 표준 상수
-        rrf_scores: dict[str, float] = {}
-        for key in all_hits:
-            v_rank = vector_ranks.get(key, n_results)
-            b_rank = bm25_ranks.get(key, n_results)
-            rrf_scores[key] = (
-                vector_weight * (1 / (k + v_rank)) +
-                bm25_weight * (1 / (k + b_rank))
-            )
+                # BM25 전용 히트는 벡터 유사도 0
+                bm25_hits.append({
+                    "content": doc_info["content"],
+                    "similarity": 0.0,
+                    "metadata": doc_info["metadata"],
+                })
+
+        # ── Step 3: Weighted RRF Fusion ───────────────────────
+        # score = vector_weight/(k+v_rank+1) + bm25_weight/(k+b_rank+1)
+        # 한쪽에서 누락된 청크는 그쪽 순위를 n_results 로 간주
+        # key = "출처:청크인덱스" (중복 병합용) — 같은 청크면 벡터 쪽 히트(유사도 포함)를 사용
+        fused = fuse_hits(
+            [vector_hits, bm25_hits],
+            key=lambda h: chunk_key(h["metadata"]["source"], h["metadata"].get("chunk_index", 0)),
+            score=None,
+            method="weighted_rrf",
+            weights=[vector_weight, bm25_weight],
+            missing_rank=n_results,
+        )
 
         # ── Step 4: 소스 다양성 보장 후 top_k 반환 ────────────
-        sorted_keys = sorted(rrf_scores, key=lambda x: rrf_scores[x], reverse=True)
-
         source_counts: dict[str, int] = {}
         final = []
-        for key in sorted_keys:
-            hit = all_hits[key]
+        for hit, _ in fused:
             source = hit["metadata"]["source"]
             count = source_counts.get(source, 0)
             if count < max_per_source:
@@ -40,8 +40,13 @@ DEFAULT_COLLECTION = "startup-guide-500-50"
 @app.on_event("startup")
 async def startup_init():
     """서버 시작 시 스타트업 문서 자동 임베딩."""
-    if vector_store.collection_exists(DEFAULT_COLLECTION):
-        return
+    if not vector_store.collection_exists(DEFAULT_COLLECTION):
+        await _embed_default()
+    # collection handle / count / HNSW 인덱스를 첫 질의 전에 로드 (`CHROMA_WARMUP`)
+    vector_store.warm_up()
+
+
+async def _embed_default() -> None:
     for s in SAMPLES:
         if s["id"] == "startup-guide":
             chunks = chunk_text(s["content"], 500, 50)
@@ -72,9 +77,9 @@ def make_collection_name(document: str, chunk_size: int, overlap: int) -> str:
 @app.get("/api/default")
 async def get_default():
     """기본 스타트업 문서 컬렉션 정보."""
-    if vector_store.collection_exists(DEFAULT_COLLECTION):
-        col = vector_store.create_collection(DEFAULT_COLLECTION)
-        return {"collection_name": DEFAULT_COLLECTION, "chunk_count": col.count(), "title": "스타트업 창업 가이드"}
+    count = vector_store.collection_count(DEFAULT_COLLECTION)
+    if count:
+        return {"collection_name": DEFAULT_COLLECTION, "chunk_count": count, "title": "스타트업 창업 가이드"}
     return {"collection_name": None, "chunk_count": 0, "title": None}
 
 
@@ -106,9 +111,9 @@ async def get_sample(sample_id: str):
 async def embed_document(req: EmbedRequest):
     col_name = make_collection_name(req.document, req.chunk_size, req.chunk_overlap)
 
-    if vector_store.collection_exists(col_name):
-        col = vector_store.create_collection(col_name)
-        return EmbedResponse(collection_name=col_name, chunk_count=col.count())
+    existing = vector_store.collection_count(col_name)
+    if existing:
+        return EmbedResponse(collection_name=col_name, chunk_count=existing)
 
     chunks = chunk_text(req.document, req.chunk_size, req.chunk_overlap)
     texts = [c.text for c in chunks]
@@ -155,9 +160,9 @@ async def upload_file(file: UploadFile = File(...)):
     h = hashlib.md5(text.encode()).hexdigest()[:6]
     col_name = f"file-{name_part}-{h}"
 
-    if vector_store.collection_exists(col_name):
-        col = vector_store.create_collection(col_name)
-        return EmbedResponse(collection_name=col_name, chunk_count=col.count())
+    existing = vector_store.collection_count(col_name)
+    if existing:
+        return EmbedResponse(collection_name=col_name, chunk_count=existing)
 
     chunks = chunk_text(text, 500, 50)
     texts = [c.text for c in chunks]
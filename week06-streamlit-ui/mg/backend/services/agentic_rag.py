@@ -13,7 +13,8 @@ Max 3 iterations to keep latency reasonable.
 import json
 from services.embedding_service import embed_single
 from services import vector_store
-from services.hybrid_search import _bm25_search, _reciprocal_rank_fusion
+from services.fusion import chunk_key
+from services.hybrid_search import _bm25_search, fuse_collections
 from services.reranker_service import rerank
 from services.llm_service import ask_json, stream_with_context
 from services.rag_utils import format_context
@@ -66,37 +67,22 @@ async def _search_collections(
 ) -> list[dict]:
     """Hybrid Search + Rerank across collections."""
     search_k = top_k * 2
-    all_chunks: list[dict] = []
+    per_collection: list[tuple[str, list[dict], list[dict]]] = []
 
     for col_name in collection_names:
         try:
             vec_results, _ = vector_store.search(col_name, query_emb, search_k)
             vec_chunks = [
-                {"index": r.index, "text": r.text, "score": round(r.score, 4), "source": col_name}
+                {"index": r.index, "text": r.text, "score": round(r.score, 4)}
                 for r in vec_results
             ]
             bm25_chunks, _ = _bm25_search(col_name, query, search_k)
-            for c in bm25_chunks:
-                c["source"] = col_name
-            merged = _reciprocal_rank_fusion(vec_chunks, bm25_chunks)
-            all_chunks.extend(merged)
+            per_collection.append((col_name, vec_chunks, bm25_chunks))
         except Exception:
             continue
 
-    if not all_chunks:
-        return []
-
-    # Deduplicate
-    seen: set[str] = set()
-    unique: list[dict] = []
-    for c in all_chunks:
-        key = c["text"][:100]
-        if key not in seen:
-            seen.add(key)
-            unique.append(c)
-
-    unique.sort(key=lambda c: c.get("rrf_score", c.get("score", 0)), reverse=True)
-    candidates = unique[:top_k * 3]
+    # RRF across every collection's lists, deduplicated by (collection, chunk index)
+    candidates = fuse_collections(per_collection, top_k=top_k * 3)
 
     if candidates:
         reranked, _, _ = await rerank(query, candidates, top_n=top_k, model=model)
@@ -191,12 +177,13 @@ async def agentic_rag_stream(
         )
 
         # Merge new chunks (deduplicate)
-        existing_texts = {c["text"][:100] for c in all_chunks}
+        existing = {chunk_key(c["source"], c["index"]) for c in all_chunks}
         added = 0
         for chunk in new_chunks:
-            if chunk["text"][:100] not in existing_texts:
+            key = chunk_key(chunk["source"], chunk["index"])
+            if key not in existing:
                 all_chunks.append(chunk)
-                existing_texts.add(chunk["text"][:100])
+                existing.add(key)
                 added += 1
 
         yield "thinking", {
@@ -0,0 +1,266 @@
+"""Rank fusion — merge N ranked lists into one (RRF, CombSUM, CombMNZ).
+
+Hybrid search, multi-query and CRAG each merged their ranked lists with a
+hand-written dict loop and a full sort. They now share this module:
+
+    ids, scores = fuse([(vec_ids, vec_scores), (bm25_ids, bm25_scores)], method="rrf", top_k=5)
+
+Methods — the fused score of an id sums over the lists that contain it
+(rank is the 0-based position in its list, w the list weight):
+- rrf           w / (k + rank + 1)            raw scores are ignored
+- weighted_rrf  same, weights required        e.g. vector 0.7 / BM25 0.3
+- combsum       w · norm(score)
+- combmnz       combsum × number of lists containing the id
+- combmax       max of w · norm(score)         "keep the best hit" merge
+
+Design choices:
+- Ids are stable chunk ids — the chunk index within one collection, or
+  `chunk_key(collection, index)` across collections — never text
+  prefixes, so two chunks that merely start alike are not merged
+- All lists are concatenated and the ids interned to dense ints once —
+  a lookup table for small int ids (chunk index), one dict pass for
+  string ids; every method is then a `np.bincount` over that array
+- An id repeated inside one list counts once, at its best rank
+- `missing_rank` (RRF only) scores an id absent from a list as if it sat
+  at that rank instead of contributing 0
+- Top-k by `np.partition`; only the k winners are sorted. Ties keep
+  the order of first appearance (earlier list, better rank first)
+- `normalize="minmax"` rescales each list to [0, 1] before Comb*; use
+  "none" when the scores already share a scale (cosine similarity)
+
+    py -m services.fusion bench --n 2000 --lists 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from itertools import chain
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+METHODS = ("rrf", "weighted_rrf", "combsum", "combmnz", "combmax")
+RRF_K = 60
+
+RankedList = tuple[Sequence, Optional[Sequence[float]]]   # (ids, scores) — best first
+
+
+def chunk_key(source: str, index: int) -> str:
+    """Stable id of a chunk across collections."""
+    return f"{source}:{index}"
+
+
+def minmax(scores: Sequence[float]) -> np.ndarray:
+    """Rescale to [0, 1]; a list of equal scores maps to all 1."""
+    s = np.asarray(scores, dtype=np.float64)
+    if not len(s):
+        return s
+    lo, hi = s.min(), s.max()
+    if hi - lo <= 0:
+        return np.ones_like(s)
+    return (s - lo) / (hi - lo)
+
+
+def _intern(lists: Sequence[RankedList], total: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Dense codes of the concatenated ids, first position of each code, the ids.
+
+    Codes are numbered in order of first appearance, so comparing codes
+    compares first appearances.
+    """
+    nonempty = [ids for ids, _ in lists if len(ids)]
+    if all(isinstance(ids[0], (int, np.integer)) for ids in nonempty):
+        all_ids = np.concatenate([np.asarray(ids, dtype=np.int64) for ids in nonempty])
+        lo, hi = int(all_ids.min()), int(all_ids.max())
+        if lo >= 0 and hi < 4 * total + 1024:
+            # chunk index 처럼 작은 정수 — 정렬 없이 표로 첫 위치를 찾음
+            first_at = np.full(hi + 1, total, dtype=np.int64)
+            np.minimum.at(first_at, all_ids, np.arange(total))
+            present = np.flatnonzero(first_at < total)
+            order = np.argsort(first_at[present], kind="stable")
+            table = np.empty(hi + 1, dtype=np.int64)
+            table[present[order]] = np.arange(len(present))
+            return table[all_ids], first_at[present[order]], present[order]
+    # 문자열 id (chunk_key) 등 — dict 로 한 번에 intern
+    vocab: dict = {}
+    codes = np.fromiter(
+        (vocab.setdefault(i, len(vocab)) for ids, _ in lists for i in ids),
+        dtype=np.int64, count=total,
+    )
+    new = np.ones(total, dtype=bool)
+    if total > 1:
+        running = np.maximum.accumulate(codes)
+        new[1:] = running[1:] > running[:-1]
+    return codes, np.flatnonzero(new), np.array(list(vocab), dtype=object)
+
+
+def _fuse(
+    lists: Sequence[RankedList],
+    method: str,
+    weights: Optional[Sequence[float]],
+    k: int,
+    normalize: str,
+    top_k: Optional[int],
+    missing_rank: Optional[int],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(positions in the concatenated lists, fused scores, ids) of the top-k."""
+    if method not in METHODS:
+        raise ValueError(f"알 수 없는 fusion method: {method} ({' | '.join(METHODS)})")
+    if method == "weighted_rrf" and weights is None:
+        raise ValueError("weighted_rrf 는 weights 가 필요합니다")
+    if weights is not None and len(weights) != len(lists):
+        raise ValueError(f"weights {len(weights)}개 ≠ 리스트 {len(lists)}개")
+    if normalize not in ("minmax", "none"):
+        raise ValueError(f"알 수 없는 normalize: {normalize} (minmax | none)")
+
+    sizes = np.array([len(ids) for ids, _ in lists], dtype=np.int64)
+    total = int(sizes.sum())
+    empty = np.zeros(0, dtype=np.int64)
+    if total == 0 or (top_k is not None and top_k <= 0):
+        return empty, np.zeros(0), np.zeros(0)
+
+    codes, first, uniq = _intern(lists, total)
+    n_lists = len(lists)
+    list_of = np.repeat(np.arange(n_lists), sizes)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    rank = np.arange(total) - np.repeat(starts, sizes)
+    w = np.ones(n_lists) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    if method in ("rrf", "weighted_rrf"):
+        contrib = w[list_of] / (k + rank + 1)
+        if missing_rank is not None:
+            contrib -= w[list_of] / (k + missing_rank + 1)
+    else:
+        per_list = []
+        for ids, scores in lists:
+            if scores is None:
+                raise ValueError(f"{method} 는 score 가 필요합니다")
+            if len(scores) != len(ids):
+                raise ValueError("ids 와 scores 의 길이가 다릅니다")
+            if len(ids):
+                per_list.append(minmax(scores) if normalize == "minmax" else np.asarray(scores, dtype=np.float64))
+        contrib = w[list_of] * np.concatenate(per_list)
+
+    # 한 리스트 안의 중복 id 는 가장 앞(최고 순위) 한 번만
+    n = len(uniq)
+    pair = codes * n_lists + list_of
+    if np.bincount(pair, minlength=n * n_lists).max() > 1:
+        _, keep = np.unique(pair, return_index=True)
+        codes, contrib = codes[keep], contrib[keep]
+
+    if method == "combmax":
+        fused = np.full(n, -np.inf)
+        np.maximum.at(fused, codes, contrib)
+    else:
+        fused = np.bincount(codes, weights=contrib, minlength=n)
+        if method == "combmnz":
+            fused *= np.bincount(codes, minlength=n)
+        if method in ("rrf", "weighted_rrf") and missing_rank is not None:
+            fused += float((w / (k + missing_rank + 1)).sum())
+
+    kk = n if top_k is None else min(top_k, n)
+    if kk < n:
+        kth = np.partition(-fused, kk - 1)[kk - 1]
+        cand = np.flatnonzero(-fused <= kth)          # 경계 동점까지 포함
+    else:
+        cand = np.arange(n)
+    cand = cand[np.lexsort((cand, -fused[cand]))][:kk]
+    return first[cand], fused[cand], uniq[cand]
+
+
+def fuse(
+    lists: Sequence[RankedList],
+    method: str = "rrf",
+    weights: Optional[Sequence[float]] = None,
+    k: int = RRF_K,
+    normalize: str = "minmax",
+    top_k: Optional[int] = None,
+    missing_rank: Optional[int] = None,
+) -> tuple[list, np.ndarray]:
+    """Fuse ranked (ids, scores) lists. Returns (top ids, their fused scores)."""
+    _, scores, ids = _fuse(lists, method, weights, k, normalize, top_k, missing_rank)
+    return ids.tolist(), scores
+
+
+def fuse_hits(
+    hit_lists: Sequence[Sequence[dict]],
+    key: Callable[[dict], object],
+    score: Optional[str] = "score",
+    method: str = "rrf",
+    weights: Optional[Sequence[float]] = None,
+    k: int = RRF_K,
+    normalize: str = "minmax",
+    top_k: Optional[int] = None,
+    missing_rank: Optional[int] = None,
+) -> list[tuple[dict, float]]:
+    """`fuse()` over lists of result dicts, keyed by `key(hit)`.
+
+    Returns (hit, fused score) best first. For an id found in several
+    lists the hit comes from its first appearance (earlier list first).
+    """
+    lists = [
+        ([key(h) for h in hits], [h.get(score, 0.0) for h in hits] if score else None)
+        for hits in hit_lists
+    ]
+    pos, scores, _ = _fuse(lists, method, weights, k, normalize, top_k, missing_rank)
+    flat = list(chain.from_iterable(hit_lists))
+    return [(flat[p], float(s)) for p, s in zip(pos.tolist(), scores)]
+
+
+# ─── Benchmark ───
+
+
+def _dict_rrf(lists: list[tuple[list, list]], k: int = RRF_K) -> list:
+    """The per-pipeline dict loop this module replaced — baseline only."""
+    scores: dict = {}
+    for ids, _ in lists:
+        for rank, i in enumerate(ids):
+            scores[i] = scores.get(i, 0) + 1.0 / (k + rank + 1)
+    return [i for i, _ in sorted(scores.items(), key=lambda x: x[1], reverse=True)]
+
+
+def run_bench(n: int, n_lists: int, top_k: int = 15, repeat: int = 200) -> dict:
+    rng = np.random.default_rng(0)
+    pool = n * 2        # 리스트끼리 절반 정도 겹치도록
+    lists_int = []
+    for _ in range(n_lists):
+        ids = rng.choice(pool, size=n, replace=False)
+        lists_int.append((ids, np.sort(rng.random(n))[::-1]))
+    lists_str = [([chunk_key("col", int(i)) for i in ids], s) for ids, s in lists_int]
+    report: dict = {"lists": n_lists, "per_list": n, "candidates": n * n_lists, "top_k": top_k}
+
+    def _time(fn) -> dict:
+        samples = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t)
+        samples.sort()
+        return {"p50_ms": round(statistics.median(samples) * 1000, 3),
+                "p95_ms": round(samples[int(0.95 * (len(samples) - 1))] * 1000, 3)}
+
+    for label, lists in (("int_ids", lists_int), ("str_ids", lists_str)):
+        row = {m: _time(lambda m=m: fuse(lists, method=m, top_k=top_k)) for m in ("rrf", "combsum", "combmnz")}
+        as_lists = [(list(ids), list(s)) for ids, s in lists]
+        row["dict_rrf_baseline"] = _time(lambda: _dict_rrf(as_lists))
+        ids, _ = fuse(lists, method="rrf", top_k=top_k)
+        row["same_top_k_as_baseline"] = ids == _dict_rrf(as_lists)[:top_k]
+        report[label] = row
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="rank fusion 벤치마크 (랜덤 ranked list)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    bench = sub.add_parser("bench")
+    bench.add_argument("--n", type=int, default=2000, help="리스트당 후보 수")
+    bench.add_argument("--lists", type=int, default=4)
+    bench.add_argument("--top-k", type=int, default=15)
+    args = parser.parse_args()
+    print(json.dumps(run_bench(args.n, args.lists, args.top_k), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
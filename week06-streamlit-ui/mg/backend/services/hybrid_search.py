@@ -8,7 +8,7 @@ import time
 from rank_bm25 import BM25Okapi
 
 from services.embedding_service import embed_single
-from services import vector_store
+from services import fusion, vector_store
 from services.llm_service import ask_with_context
 from services.rag_utils import SYSTEM_PROMPT, format_context
 
@@ -19,8 +19,7 @@ def _bm25_search(
     """BM25 keyword search over all documents in the collection."""
     start = time.perf_counter()
 
-    col = vector_store.create_collection(collection_name)
-    all_docs = col.get(include=["documents", "metadatas"])
+    all_docs = vector_store.get_documents(collection_name)
 
     if not all_docs["documents"]:
         return [], 0
@@ -54,31 +53,55 @@ def _reciprocal_rank_fusion(
     k: int = 60,
 ) -> list[dict]:
     """Merge two ranked lists using Reciprocal Rank Fusion (RRF)."""
-    scores: dict[int, float] = {}
-    text_map: dict[int, str] = {}
-    vec_score_map: dict[int, float] = {}
-
-    for rank, r in enumerate(vector_results):
-        idx = r["index"]
-        scores[idx] = scores.get(idx, 0) + 1.0 / (k + rank + 1)
-        text_map[idx] = r["text"]
-        vec_score_map[idx] = r.get("score", 0)
-
-    for rank, r in enumerate(bm25_results):
-        idx = r["index"]
-        scores[idx] = scores.get(idx, 0) + 1.0 / (k + rank + 1)
-        text_map[idx] = r["text"]
-
-    merged = []
-    for idx, rrf_score in sorted(scores.items(), key=lambda x: x[1], reverse=True):
-        merged.append({
-            "index": idx,
-            "text": text_map[idx],
-            "score": round(vec_score_map.get(idx, 0), 4),
+    fused = fusion.fuse_hits(
+        [vector_results, bm25_results], key=lambda r: r["index"], score=None, k=k,
+    )
+    vec_score_map = {r["index"]: r.get("score", 0) for r in vector_results}
+    return [
+        {
+            "index": hit["index"],
+            "text": hit["text"],
+            "score": round(vec_score_map.get(hit["index"], 0), 4),
             "rrf_score": round(rrf_score, 4),
-        })
+        }
+        for hit, rrf_score in fused
+    ]
+
 
-    return merged
+def fuse_collections(
+    per_collection: list[tuple[str, list[dict], list[dict]]],
+    top_k: int,
+    k: int = 60,
+) -> list[dict]:
+    """RRF over the vector and BM25 lists of several collections at once.
+
+    `per_collection` is [(collection, vector_results, bm25_results)]. Chunks
+    are identified by `fusion.chunk_key(collection, index)`, so the same
+    chunk found by both searches is merged and chunks of different
+    collections never are.
+    """
+    hit_lists: list[list[dict]] = []
+    vec_score_map: dict[str, float] = {}
+    for col_name, vec_results, bm25_results in per_collection:
+        for results in (vec_results, bm25_results):
+            hit_lists.append([{**r, "source": col_name} for r in results])
+        for r in vec_results:
+            vec_score_map[fusion.chunk_key(col_name, r["index"])] = r.get("score", 0)
+
+    fused = fusion.fuse_hits(
+        hit_lists, key=lambda r: fusion.chunk_key(r["source"], r["index"]),
+        score=None, k=k, top_k=top_k,
+    )
+    return [
+        {
+            "index": hit["index"],
+            "text": hit["text"],
+            "source": hit["source"],
+            "score": round(vec_score_map.get(fusion.chunk_key(hit["source"], hit["index"]), 0), 4),
+            "rrf_score": round(rrf_score, 4),
+        }
+        for hit, rrf_score in fused
+    ]
 
 
 async def run_hybrid_rag(
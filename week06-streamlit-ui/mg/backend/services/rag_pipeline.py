@@ -11,7 +11,7 @@ import time
 
 from services.embedding_service import embed_single
 from services import vector_store
-from services.hybrid_search import _bm25_search, _reciprocal_rank_fusion
+from services.hybrid_search import _bm25_search, fuse_collections
 from services.reranker_service import rerank
 from services.llm_service import stream_with_context
 from services.rag_utils import SYSTEM_PROMPT, format_context
@@ -43,42 +43,25 @@ async def _full_search_with_rerank(
 ) -> list[dict]:
     """Full Hybrid Search + Rerank across multiple collections. Reuses pre-computed embedding."""
     search_k = top_k * 2
-    all_chunks: list[dict] = []
+    per_collection: list[tuple[str, list[dict], list[dict]]] = []
 
     for col_name in collection_names:
         try:
             # Vector search (reuse embedding)
             vec_results, _ = vector_store.search(col_name, query_emb, search_k)
             vec_chunks = [
-                {"index": r.index, "text": r.text, "score": round(r.score, 4), "source": col_name}
+                {"index": r.index, "text": r.text, "score": round(r.score, 4)}
                 for r in vec_results
             ]
 
             # BM25
             bm25_chunks, _ = _bm25_search(col_name, question, search_k)
-            for c in bm25_chunks:
-                c["source"] = col_name
-
-            # RRF merge
-            merged = _reciprocal_rank_fusion(vec_chunks, bm25_chunks)
-            all_chunks.extend(merged)
+            per_collection.append((col_name, vec_chunks, bm25_chunks))
         except Exception:
             continue
 
-    if not all_chunks:
-        return []
-
-    # Deduplicate
-    seen: set[str] = set()
-    unique: list[dict] = []
-    for c in all_chunks:
-        key = c["text"][:100]
-        if key not in seen:
-            seen.add(key)
-            unique.append(c)
-
-    unique.sort(key=lambda c: c.get("rrf_score", c.get("score", 0)), reverse=True)
-    candidates = unique[:top_k * 3]
+    # RRF across every collection's lists, deduplicated by (collection, chunk index)
+    candidates = fuse_collections(per_collection, top_k=top_k * 3)
 
     if candidates:
         reranked, _, _ = await rerank(question, candidates, top_n=top_k, model=model)
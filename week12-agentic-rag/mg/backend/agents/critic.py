@@ -16,6 +16,7 @@ Output format (strict JSON):
 """
 
 import json
+import time
 from openai import AsyncOpenAI
 
 from config import DOMAIN_MODEL  # use mid-tier for critic — accuracy matters
@@ -69,11 +70,13 @@ async def critic_node(
     tool_results: list[dict],
     iteration: int = 1,
     model: str | None = None,
+    tracer=None,
 ) -> dict:
     """Score and critique the writer's draft. Returns:
         {score, passed, issues[], suggestions[], iteration}
     """
     model = model or DOMAIN_MODEL
+    t_start = time.perf_counter()
 
     user_block = f"""[사용자 질문]
 {question}
@@ -96,6 +99,10 @@ async def critic_node(
         response_format={"type": "json_object"},
         temperature=0.1,
     )
+    if tracer:
+        elapsed = time.perf_counter() - t_start
+        tracer.record_llm("critic", model, response.usage, elapsed)
+        tracer.record_stage("critic", elapsed)
 
     content = response.choices[0].message.content or "{}"
     try:
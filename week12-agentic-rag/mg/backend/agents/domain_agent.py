@@ -13,10 +13,11 @@ This is a "subgraph" inside each main graph node. The benefit over the
 """
 
 import json
+import time
 from datetime import datetime, timezone, timedelta
 from openai import AsyncOpenAI
 
-from tools.registry import _tools, execute_tool
+from tools.registry import _tools, execute_tool_shaped
 from tools import get_tools_for_domain
 from config import DOMAIN_MODEL
 
@@ -169,14 +170,19 @@ async def run_domain_agent(
     model: str | None = None,
     on_event=None,
     history: list[dict] | None = None,
+    tracer=None,
 ):
     """Run one domain agent. Returns (results, messages_log).
 
     on_event(event_type, data) — optional callback for UI events:
       - "tool_call":  {"domain", "tool", "args"}
       - "tool_result": {"domain", "tool", "result"}
+
+    tracer — optional RunTracer; records each LLM round and tool latency
+    under the "domain_agent" stage.
     """
     model = model or DOMAIN_MODEL
+    t_start = time.perf_counter()
     history = history or []
     now = datetime.now(KST).strftime("%Y년 %m월 %d일 %H:%M")
     system = f"{DOMAIN_PROMPTS[domain]}\n\n현재 시각: {now} (KST)"
@@ -197,12 +203,16 @@ async def run_domain_agent(
     collected = []
 
     for _ in range(MAX_AGENT_ROUNDS):
+        t_llm = time.perf_counter()
         response = await _client.chat.completions.create(
             model=model,
             messages=messages,
             tools=tool_schemas,
             temperature=0.2,
         )
+        if tracer:
+            tracer.record_llm("domain_agent", model, response.usage,
+                              time.perf_counter() - t_llm)
         msg = response.choices[0].message
 
         if not msg.tool_calls:
@@ -227,13 +237,17 @@ async def run_domain_agent(
                     "args": fn_args,
                 })
 
-            result = await execute_tool(fn_name, fn_args)
+            t_tool = time.perf_counter()
+            # result: compact view for the LLM / Writer / Critic, full_result: UI
+            result, full_result, ok = await execute_tool_shaped(fn_name, fn_args)
+            if tracer:
+                tracer.record_tool("domain_agent", fn_name, time.perf_counter() - t_tool, ok=ok)
 
             if on_event:
                 await on_event("tool_result", {
                     "domain": domain,
                     "tool": fn_name,
-                    "result": result[:600],
+                    "result": full_result[:600],
                 })
 
             collected.append({
@@ -241,6 +255,8 @@ async def run_domain_agent(
                 "tool": fn_name,
                 "args": fn_args,
                 "result": result,
+                "full_result": full_result,
+                "ok": ok,
             })
 
             messages.append({
@@ -249,4 +265,6 @@ async def run_domain_agent(
                 "content": result,
             })
 
+    if tracer:
+        tracer.record_stage("domain_agent", time.perf_counter() - t_start, detail=domain)
     return collected, messages
@@ -6,6 +6,7 @@ infrastructure).
 """
 
 import json
+import time
 from datetime import datetime, timezone, timedelta
 from openai import AsyncOpenAI
 
@@ -22,9 +23,10 @@ def _domain_text() -> str:
     return "\n".join(f"- {k}: {v}" for k, v in DOMAIN_DESCRIPTIONS.items())
 
 
-async def planner_node(state: dict, model: str | None = None) -> dict:
+async def planner_node(state: dict, model: str | None = None, tracer=None) -> dict:
     """Decompose the question into an ordered step plan."""
     model = model or SUPERVISOR_MODEL
+    t_start = time.perf_counter()
     question = state["question"]
     history: list[dict] = state.get("history", []) or []
     now_dt = datetime.now(KST)
@@ -82,6 +84,8 @@ async def planner_node(state: dict, model: str | None = None) -> dict:
         response_format={"type": "json_object"},
         temperature=0.1,
     )
+    if tracer:
+        tracer.record_llm("planner", model, response.usage, time.perf_counter() - t_start)
 
     content = response.choices[0].message.content or "{}"
     try:
@@ -110,6 +114,9 @@ async def planner_node(state: dict, model: str | None = None) -> dict:
             "result": None,
         })
 
+    if tracer:
+        tracer.record_stage("planner", time.perf_counter() - t_start)
+
     return {
         "plan": valid_steps,
         "_reasoning": reasoning,
@@ -7,6 +7,7 @@ Three possible outcomes:
 """
 
 import json
+import time
 from openai import AsyncOpenAI
 
 from config import SUPERVISOR_MODEL
@@ -41,9 +42,10 @@ def _format_remaining(plan: list[dict]) -> str:
     return "\n".join(lines) if lines else "  (남은 단계 없음)"
 
 
-async def replanner_node(state: dict, model: str | None = None) -> dict:
+async def replanner_node(state: dict, model: str | None = None, tracer=None) -> dict:
     """Decide whether to continue, revise, or finish."""
     model = model or SUPERVISOR_MODEL
+    t_start = time.perf_counter()
     question = state["question"]
     plan = state.get("plan", []) or []
 
@@ -97,6 +99,10 @@ new_plan 은 action=revise 일 때만 채우세요.
         response_format={"type": "json_object"},
         temperature=0.1,
     )
+    if tracer:
+        elapsed = time.perf_counter() - t_start
+        tracer.record_llm("replanner", model, response.usage, elapsed)
+        tracer.record_stage("replanner", elapsed)
 
     content = response.choices[0].message.content or "{}"
     try:
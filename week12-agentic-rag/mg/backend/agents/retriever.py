@@ -7,20 +7,34 @@ Unlike a simple "search → return" pipeline, this agent:
 4. If irrelevant, rewrites query and retries (up to 2 times)
 5. Returns chunks with citations
 
+Latency: the raw question is searched speculatively while the rewrite LLM
+call runs, and both result sets are merged for round 1. The rewrite also
+proposes an alternative query whose search is prefetched while round 1 is
+being evaluated, so a retry does not wait for another embedding + search.
+At most two speculative searches per run; unused ones are cancelled.
+
+Grading: a local cross-encoder (`services.relevance_grader`) scores each
+round on CPU; only rounds in its calibrated ambiguous band go to the LLM.
+
 This is the Self-RAG pattern (Asai et al., 2023) wrapped in our
 Plan-and-Execute graph as the `documents` domain.
 """
 
+import asyncio
 import json
+import time
 from openai import AsyncOpenAI
 
 from config import DOMAIN_MODEL
+from services.chunker import count_tokens
 from services.document_store import search as vector_search, Chunk
+from services import parent_store, relevance_grader
 
 _client = AsyncOpenAI()
 
 MAX_RETRIEVAL_ROUNDS = 2
 RELEVANCE_THRESHOLD = 3   # 5점 만점, 3 이상이면 충분
+WRITER_CONTEXT_TOKENS = 4000   # Writer 에 넘기는 parent 섹션 합계 상한
 
 
 _QUERY_REWRITE_SYSTEM = """당신은 검색 쿼리 변환 전문가입니다.
@@ -31,8 +45,10 @@ _QUERY_REWRITE_SYSTEM = """당신은 검색 쿼리 변환 전문가입니다.
 - 짧고 핵심 키워드 위주 (최대 30자)
 - 같은 의미라도 문서에 자주 쓰일 표현으로
 
+alternative 에는 같은 정보를 다른 표현(동의어, 상위 개념)으로 찾는 검색어를 하나 넣으세요.
+
 반드시 JSON 으로만 응답:
-{"query": "변환된 쿼리"}
+{"query": "변환된 쿼리", "alternative": "다른 표현의 검색어"}
 """
 
 
@@ -56,9 +72,14 @@ _RELEVANCE_SYSTEM = """당신은 검색 결과 평가자입니다.
 
 
 async def _rewrite_query(question: str, history_hint: str = "",
-                         model: str | None = None) -> str:
-    """Convert user question into a search-friendly query."""
+                         model: str | None = None, tracer=None) -> tuple[str, str]:
+    """Convert user question into a search-friendly query.
+
+    Returns (query, alternative). The alternative is a second phrasing used
+    to prefetch the retry search; empty when the model gives none.
+    """
     model = model or DOMAIN_MODEL
+    t_start = time.perf_counter()
     user = f"질문: {question}"
     if history_hint:
         user += f"\n\n이전 대화 맥락: {history_hint[:300]}"
@@ -72,19 +93,88 @@ async def _rewrite_query(question: str, history_hint: str = "",
         response_format={"type": "json_object"},
         temperature=0.1,
     )
+    if tracer:
+        tracer.record_llm("retriever", model, resp.usage, time.perf_counter() - t_start)
     try:
         parsed = json.loads(resp.choices[0].message.content or "{}")
-        return (parsed.get("query") or question)[:120]
+        return (parsed.get("query") or question)[:120], (parsed.get("alternative") or "")[:120]
     except json.JSONDecodeError:
-        return question
+        return question, ""
+
+
+def _same_query(a: str, b: str) -> bool:
+    return " ".join(a.split()).lower() == " ".join(b.split()).lower()
+
+
+def _merge_chunks(*result_sets: list[Chunk], top_k: int) -> list[Chunk]:
+    """Union by chunk id (best score wins), highest score first."""
+    best: dict[str, Chunk] = {}
+    for chunks in result_sets:
+        for c in chunks:
+            prev = best.get(c.id)
+            if prev is None or (c.score or 0) > (prev.score or 0):
+                best[c.id] = c
+    return sorted(best.values(), key=lambda c: c.score or 0, reverse=True)[:top_k]
+
+
+async def _timed_search(query: str, top_k: int, tracer=None,
+                        tool: str = "vector_search") -> list[Chunk]:
+    t_search = time.perf_counter()
+    chunks = await vector_search(query, top_k=top_k)
+    if tracer:
+        tracer.record_tool("retriever", tool, time.perf_counter() - t_search)
+    return chunks
+
+
+async def _drain(task: asyncio.Task | None) -> list[Chunk]:
+    """Result of a speculative search; failures just mean no extra candidates."""
+    if task is None:
+        return []
+    try:
+        return await task
+    except Exception:
+        return []
+
+
+def _cancel(*tasks: asyncio.Task | None) -> None:
+    for t in tasks:
+        if t is not None and not t.done():
+            t.cancel()
 
 
 async def _evaluate_relevance(question: str, chunks: list[Chunk],
-                              model: str | None = None) -> dict:
+                              model: str | None = None, tracer=None) -> dict:
+    """Score whether the retrieved chunks are sufficient (1~5).
+
+    The cross-encoder decides when its score is outside the ambiguous band;
+    otherwise (or when it is unavailable) the LLM grades the round.
+    """
+    if not chunks:
+        return {"score": 1, "reasoning": "검색 결과 없음", "alternative_query": "", "grader": "none"}
+
+    texts = [c.text for c in chunks[:5]]
+    local = await relevance_grader.grade(question, texts, tracer=tracer)
+    if local and not local["ambiguous"]:
+        return {
+            "score": local["score"],
+            "reasoning": f"cross-encoder logit {local['logit']:.2f}",
+            "alternative_query": "",
+            "grader": "cross_encoder",
+        }
+
+    evaluation = await _llm_relevance(question, chunks, model, tracer=tracer)
+    evaluation["grader"] = "llm"
+    if local:
+        evaluation["reasoning"] = f"{evaluation['reasoning']} (cross-encoder {local['logit']:.2f}, 경계 구간)"[:240]
+    relevance_grader.log_label(question, texts, evaluation["score"])
+    return evaluation
+
+
+async def _llm_relevance(question: str, chunks: list[Chunk],
+                         model: str | None = None, tracer=None) -> dict:
     """LLM scores whether the retrieved chunks are sufficient (1~5)."""
     model = model or DOMAIN_MODEL
-    if not chunks:
-        return {"score": 1, "reasoning": "검색 결과 없음", "alternative_query": ""}
+    t_start = time.perf_counter()
 
     chunk_text = "\n\n".join(
         f"[{i + 1}] ({c.doc_name} score={(c.score or 0):.2f})\n{c.text[:400]}"
@@ -102,6 +192,8 @@ async def _evaluate_relevance(question: str, chunks: list[Chunk],
         response_format={"type": "json_object"},
         temperature=0.1,
     )
+    if tracer:
+        tracer.record_llm("retriever", model, resp.usage, time.perf_counter() - t_start)
     try:
         parsed = json.loads(resp.choices[0].message.content or "{}")
         score = int(parsed.get("score", 3))
@@ -120,21 +212,23 @@ async def run_retriever(
     model: str | None = None,
     on_event=None,
     top_k: int = 5,
+    tracer=None,
 ) -> dict:
     """Run the agentic retrieval loop.
 
     Returns:
         {
             "chunks": [Chunk, ...],
-            "rounds": [{query, score, reasoning}, ...],
+            "rounds": [{query, score, reasoning, grader, merged_queries}, ...],
             "final_score": int,
         }
 
     on_event callback events:
         - "retrieval_round": {round, query, top_k}
-        - "retrieval_result": {round, chunks: [{doc_name, score, text_snippet}]}
-        - "retrieval_eval":   {round, score, reasoning, alternative_query}
+        - "retrieval_result": {round, merged_queries, chunks: [{doc_name, score, text_snippet}]}
+        - "retrieval_eval":   {round, score, reasoning, alternative_query, grader}
     """
+    t_start = time.perf_counter()
     history = history or []
     history_hint = " ".join(
         (h.get("content") or "")[:200] for h in history[-4:]
@@ -144,58 +238,106 @@ async def run_retriever(
     rounds_log: list[dict] = []
     best_chunks: list[Chunk] = []
     best_score = 0
-    current_query = await _rewrite_query(question, history_hint, model)
-
-    for round_num in range(1, MAX_RETRIEVAL_ROUNDS + 1):
-        if on_event:
-            await on_event("retrieval_round", {
-                "round": round_num, "query": current_query, "top_k": top_k,
-            })
-
-        chunks = await vector_search(current_query, top_k=top_k)
-
-        if on_event:
-            await on_event("retrieval_result", {
-                "round": round_num,
-                "chunks": [{
-                    "doc_name": c.doc_name,
-                    "page": c.page,
-                    "score": round(c.score or 0, 3),
-                    "text_snippet": c.text[:200],
-                } for c in chunks],
-            })
-
-        evaluation = await _evaluate_relevance(question, chunks, model)
-        score = evaluation["score"]
 
-        if on_event:
-            await on_event("retrieval_eval", {
+    # Round 1: raw-question search runs while the rewrite LLM call is in flight
+    raw_task = asyncio.create_task(
+        _timed_search(question, top_k, tracer, tool="vector_search_raw")
+    )
+    prefetch_task: asyncio.Task | None = None
+    prefetch_query = ""
+    try:
+        current_query, alt_query = await _rewrite_query(question, history_hint, model, tracer=tracer)
+
+        for round_num in range(1, MAX_RETRIEVAL_ROUNDS + 1):
+            merged_from: list[str] = []
+            if on_event:
+                await on_event("retrieval_round", {
+                    "round": round_num, "query": current_query, "top_k": top_k,
+                })
+
+            if round_num == 1:
+                speculative = await _drain(raw_task)
+                if _same_query(current_query, question):
+                    chunks = speculative
+                else:
+                    rewritten = await _timed_search(current_query, top_k, tracer)
+                    chunks = _merge_chunks(rewritten, speculative, top_k=top_k)
+                    merged_from = [question]
+            else:
+                prefetched = await _drain(prefetch_task) if _same_query(current_query, prefetch_query) else []
+                if prefetched:
+                    chunks = prefetched
+                else:
+                    chunks = await _timed_search(current_query, top_k, tracer)
+                    prefetched = await _drain(prefetch_task)
+                    if prefetched:
+                        chunks = _merge_chunks(chunks, prefetched, top_k=top_k)
+                        merged_from = [prefetch_query]
+                prefetch_task = None
+
+            if on_event:
+                await on_event("retrieval_result", {
+                    "round": round_num,
+                    "merged_queries": merged_from,
+                    "chunks": [{
+                        "doc_name": c.doc_name,
+                        "page": c.page,
+                        "page_end": c.page_end,
+                        "score": round(c.score or 0, 3),
+                        "text_snippet": c.text[:200],
+                    } for c in chunks],
+                })
+
+            # Prefetch the rewrite's alternative phrasing while this round is judged
+            if (round_num < MAX_RETRIEVAL_ROUNDS and prefetch_task is None and alt_query
+                    and not _same_query(alt_query, current_query)):
+                prefetch_query = alt_query
+                prefetch_task = asyncio.create_task(
+                    _timed_search(alt_query, top_k, tracer, tool="vector_search_prefetch")
+                )
+                alt_query = ""
+
+            evaluation = await _evaluate_relevance(question, chunks, model, tracer=tracer)
+            score = evaluation["score"]
+
+            if on_event:
+                await on_event("retrieval_eval", {
+                    "round": round_num,
+                    "score": score,
+                    "reasoning": evaluation["reasoning"],
+                    "alternative_query": evaluation["alternative_query"],
+                    "grader": evaluation["grader"],
+                })
+
+            rounds_log.append({
                 "round": round_num,
+                "query": current_query,
                 "score": score,
                 "reasoning": evaluation["reasoning"],
-                "alternative_query": evaluation["alternative_query"],
+                "grader": evaluation["grader"],
+                "chunks_count": len(chunks),
+                "merged_queries": merged_from,
             })
 
-        rounds_log.append({
-            "round": round_num,
-            "query": current_query,
-            "score": score,
-            "reasoning": evaluation["reasoning"],
-            "chunks_count": len(chunks),
-        })
+            if score > best_score:
+                best_score = score
+                best_chunks = chunks
 
-        if score > best_score:
-            best_score = score
-            best_chunks = chunks
+            if score >= RELEVANCE_THRESHOLD:
+                break
 
-        if score >= RELEVANCE_THRESHOLD:
-            break
+            # Retry with the evaluator's suggestion, else the prefetched phrasing
+            alt = evaluation.get("alternative_query") or ""
+            if not alt and prefetch_task is not None:
+                alt = prefetch_query
+            if not alt or _same_query(alt, current_query):
+                break
+            current_query = alt
+    finally:
+        _cancel(raw_task, prefetch_task)
 
-        # Try alternative query
-        alt = evaluation.get("alternative_query") or ""
-        if not alt or alt == current_query:
-            break
-        current_query = alt
+    if tracer:
+        tracer.record_stage("retriever", time.perf_counter() - t_start)
 
     return {
         "chunks": best_chunks,
@@ -204,14 +346,63 @@ async def run_retriever(
     }
 
 
-def format_chunks_for_writer(chunks: list[Chunk]) -> str:
-    """Format retrieved chunks as a citation-friendly block for the Writer."""
+def _location(doc_name: str, page: int | None, page_end: int | None) -> str:
+    loc = f"{doc_name}"
+    if page is not None and page_end not in (None, page):
+        loc += f", pp.{page}-{page_end}"
+    elif page is not None:
+        loc += f", p.{page}"
+    return loc
+
+
+def _writer_candidates(c: Chunk, parent, allow_parent: bool = True):
+    """Largest-first text options for one hit: (kind, text, tokens, page, page_end, span)."""
+    if parent is not None:
+        if allow_parent:
+            yield "parent", parent.text, parent.tokens, parent.page, parent.page_end, None
+        window = parent_store.child_window(parent, c.id, window=1)
+        if window:
+            text, start, end = window
+            yield "window", text, count_tokens(text), c.page, c.page_end, (start, end)
+    yield "child", c.text, count_tokens(c.text), c.page, c.page_end, None
+
+
+def format_chunks_for_writer(chunks: list[Chunk], max_tokens: int = WRITER_CONTEXT_TOKENS) -> str:
+    """Format retrieved chunks as a citation-friendly block for the Writer.
+
+    Small-to-big: each child is replaced by its parent section (deduplicated,
+    in rank order). When a parent no longer fits `max_tokens`, the child plus
+    its neighbours is used instead, then the child alone. Everything comes
+    from the local parent store — no extra vector queries.
+    """
     if not chunks:
         return "(검색 결과 없음)"
-    parts = []
-    for i, c in enumerate(chunks, start=1):
-        loc = f"{c.doc_name}"
-        if c.page is not None:
-            loc += f", p.{c.page}"
-        parts.append(f"[{i}] {loc}\n{c.text}")
-    return "\n\n".join(parts)
+    parents = parent_store.get_parents([c.parent_id for c in chunks if c.parent_id])
+    blocks: list[str] = []
+    used = 0
+    seen_parents: set[str] = set()
+    windows: dict[str, list[tuple[int, int]]] = {}    # parent_id → 이미 넣은 child window
+
+    for c in chunks:
+        parent = parents.get(c.parent_id or "")
+        if parent is not None:
+            if parent.id in seen_parents:
+                continue
+            if c.char_start is not None and any(
+                    s <= c.char_start and c.char_end <= e for s, e in windows.get(parent.id, [])):
+                continue
+
+        # parent 일부가 이미 window 로 들어갔으면 parent 전체는 중복
+        allow_parent = parent is not None and parent.id not in windows
+        for kind, text, tokens, page, page_end, span in _writer_candidates(c, parent, allow_parent):
+            # 예산 초과면 더 작은 후보로 — 첫 block 은 child 하나라도 넣는다
+            if used + tokens > max_tokens and (blocks or kind != "child"):
+                continue
+            used += tokens
+            blocks.append(f"[{len(blocks) + 1}] {_location(c.doc_name, page, page_end)}\n{text}")
+            if kind == "parent":
+                seen_parents.add(parent.id)
+            elif kind == "window":
+                windows.setdefault(parent.id, []).append(span)
+            break
+    return "\n\n".join(blocks)
@@ -4,26 +4,17 @@ The writer never calls tools. It receives the user question + all
 collected tool_results and streams a coherent Korean answer.
 """
 
+import time
 from datetime import datetime, timezone, timedelta
 from openai import AsyncOpenAI
 
 from config import WRITER_MODEL
+from services.context_packer import pack_tool_results
 
 _client = AsyncOpenAI()
 KST = timezone(timedelta(hours=9))
 
 
-def _format_tool_results(tool_results: list[dict]) -> str:
-    if not tool_results:
-        return "(수집된 도구 결과 없음)"
-    blocks = []
-    for r in tool_results:
-        blocks.append(
-            f"[{r['domain']}] {r['tool']}({r.get('args', {})})\n→ {r['result'][:1200]}"
-        )
-    return "\n\n".join(blocks)
-
-
 async def writer_stream(
     question: str,
     tool_results: list[dict],
@@ -31,6 +22,7 @@ async def writer_stream(
     history: list[dict] | None = None,
     revision_feedback: str | None = None,
     previous_draft: str | None = None,
+    tracer=None,
 ):
     """Stream the final answer token by token.
 
@@ -38,6 +30,7 @@ async def writer_stream(
     the Critic. The writer must address the feedback explicitly.
     """
     model = model or WRITER_MODEL
+    t_start = time.perf_counter()
     history = history or []
     now = datetime.now(KST).strftime("%Y년 %m월 %d일 %H:%M")
 
@@ -69,7 +62,7 @@ async def writer_stream(
         question,
         "",
         "[수집된 정보]",
-        _format_tool_results(tool_results),
+        pack_tool_results(question, tool_results, model, tracer),
     ]
 
     if is_revision and previous_draft:
@@ -98,9 +91,24 @@ async def writer_stream(
         messages=msgs,
         temperature=0.4,
         stream=True,
+        stream_options={"include_usage": True},
     )
 
+    ttft: float | None = None
+    usage = None
     async for chunk in stream:
+        # The usage chunk (include_usage) arrives last with empty choices
+        if getattr(chunk, "usage", None):
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
         delta = chunk.choices[0].delta
         if delta.content:
+            if ttft is None:
+                ttft = time.perf_counter() - t_start
             yield delta.content
+
+    if tracer:
+        elapsed = time.perf_counter() - t_start
+        tracer.record_llm("writer", model, usage, elapsed, ttft=ttft)
+        tracer.record_stage("writer", elapsed)
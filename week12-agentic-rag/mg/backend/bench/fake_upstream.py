@@ -0,0 +1,275 @@
+"""Fake OpenAI + fake tool upstream for offline load tests.
+
+One local FastAPI server that stands in for everything `/api/chat/stream`
+talks to over the network:
+
+- POST /v1/chat/completions — planner / replanner / critic / retriever JSON,
+  domain-agent tool calls, streaming writer tokens (+ include_usage chunk)
+- POST /v1/embeddings        — deterministic vectors (float or base64)
+- ANY  /tools/{host}/{path}  — stand-in for the Korean web services the
+  tools call (bench/run_server.py rewrites their URLs here)
+
+Latency and token rates are configurable so the graph can be measured
+without paying for or depending on OpenAI.
+
+Usage:
+    py -m bench.fake_upstream --port 9100 --llm-latency-ms 300 \\
+        --tokens-per-sec 80 --tool-latency-ms 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EMBED_DIM = 1536
+
+CONFIG = {
+    "llm_latency_ms": 300,       # time to first byte of every completion
+    "tokens_per_sec": 80.0,      # streaming writer token rate
+    "completion_tokens": 120,    # writer answer length (tokens)
+    "embed_latency_ms": 60,
+    "tool_latency_ms": 400,
+    "tool_call_rate": 1.0,       # P(domain agent issues a tool call on round 1)
+    "plan_steps": 1,
+    "relevance_score": 4,        # retriever self-eval score (1~5)
+    "critic_score": 8,
+}
+
+# question keyword → planner domain
+_DOMAIN_HINTS = [
+    ("문서", "documents"), ("업로드", "documents"),
+    ("야구", "sports"), ("kbo", "sports"), ("축구", "sports"),
+    ("날씨", "lifestyle"), ("미세먼지", "lifestyle"),
+    ("뉴스", "news"), ("주식", "finance"), ("로또", "info"), ("법", "info"),
+]
+
+app = FastAPI(title="fake-upstream")
+
+
+def _now() -> int:
+    return int(time.time())
+
+
+def _estimate_tokens(obj) -> int:
+    return max(1, len(json.dumps(obj, ensure_ascii=False)) // 3)
+
+
+def _system_prompt(messages: list[dict]) -> str:
+    for m in messages:
+        if m.get("role") == "system":
+            return m.get("content") or ""
+    return ""
+
+
+def _last_user(messages: list[dict]) -> str:
+    for m in reversed(messages):
+        if m.get("role") == "user":
+            return m.get("content") or ""
+    return ""
+
+
+def _pick_domain(question: str) -> str:
+    q = question.lower()
+    for hint, domain in _DOMAIN_HINTS:
+        if hint in q:
+            return domain
+    return "info"
+
+
+def _dummy_args(schema: dict) -> dict:
+    props = schema.get("properties", {}) or {}
+    args = {}
+    for name in schema.get("required", []) or []:
+        kind = (props.get(name) or {}).get("type", "string")
+        args[name] = {"integer": 1, "number": 1.0, "boolean": True}.get(kind, "서울")
+    return args
+
+
+def _json_reply(system: str, messages: list[dict]) -> dict:
+    """Role-aware JSON payload for response_format=json_object calls."""
+    question = _last_user(messages)
+    if "Replanner" in system:
+        return {"action": "continue", "reasoning": "fake: 계속 진행", "new_plan": []}
+    if "Planner" in system:
+        domain = _pick_domain(question)
+        steps = [
+            {"id": i + 1, "domain": domain, "task": f"{question[:40]} (step {i + 1})"}
+            for i in range(int(CONFIG["plan_steps"]))
+        ]
+        return {"reasoning": "fake plan", "steps": steps}
+    if "Critic" in system:
+        score = int(CONFIG["critic_score"])
+        return {"score": score, "passed": score >= 7, "issues": [], "suggestions": []}
+    if "검색 쿼리 변환" in system:
+        return {"query": question.replace("질문:", "").strip()[:30]}
+    if "검색 결과 평가자" in system:
+        return {"score": int(CONFIG["relevance_score"]), "reasoning": "fake eval",
+                "alternative_query": ""}
+    return {"result": "fake"}
+
+
+def _completion(model: str, message: dict, prompt_tokens: int, completion_tokens: int) -> dict:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": _now(),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": message,
+            "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+async def _stream_answer(model: str, prompt_tokens: int, include_usage: bool):
+    cid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    n = int(CONFIG["completion_tokens"])
+    delay = 1.0 / max(float(CONFIG["tokens_per_sec"]), 1e-3)
+
+    def chunk(delta: dict, finish: str | None = None) -> str:
+        body = {
+            "id": cid, "object": "chat.completion.chunk", "created": _now(), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+        return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for i in range(n):
+        yield chunk({"content": f"토큰{i} "})
+        await asyncio.sleep(delay)
+    yield chunk({}, finish="stop")
+    if include_usage:
+        usage = {
+            "id": cid, "object": "chat.completion.chunk", "created": _now(), "model": model,
+            "choices": [],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": n,
+                      "total_tokens": prompt_tokens + n},
+        }
+        yield f"data: {json.dumps(usage)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "gpt-4o-mini")
+    messages = body.get("messages", []) or []
+    prompt_tokens = _estimate_tokens(messages)
+
+    await asyncio.sleep(CONFIG["llm_latency_ms"] / 1000)
+
+    if body.get("stream"):
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        return StreamingResponse(
+            _stream_answer(model, prompt_tokens, include_usage),
+            media_type="text/event-stream",
+        )
+
+    tools = body.get("tools") or []
+    already_called = any(m.get("role") == "tool" for m in messages)
+    if tools and not already_called and random.random() < float(CONFIG["tool_call_rate"]):
+        fn = tools[0]["function"]
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:10]}",
+                "type": "function",
+                "function": {
+                    "name": fn["name"],
+                    "arguments": json.dumps(_dummy_args(fn.get("parameters") or {}),
+                                            ensure_ascii=False),
+                },
+            }],
+        }
+        return JSONResponse(_completion(model, message, prompt_tokens, 20))
+
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        payload = _json_reply(_system_prompt(messages), messages)
+        content = json.dumps(payload, ensure_ascii=False)
+    else:
+        content = "fake: 도구 결과 확인 완료"
+    message = {"role": "assistant", "content": content}
+    return JSONResponse(_completion(model, message, prompt_tokens, _estimate_tokens(content)))
+
+
+def _fake_vector(text: str) -> list[float]:
+    seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    vec = [rng.gauss(0.0, 1.0) for _ in range(EMBED_DIM)]
+    norm = sum(x * x for x in vec) ** 0.5 or 1.0
+    return [x / norm for x in vec]
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body.get("input", [])
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    await asyncio.sleep(CONFIG["embed_latency_ms"] / 1000)
+
+    as_base64 = body.get("encoding_format") == "base64"
+    data = []
+    for i, text in enumerate(inputs):
+        vec = _fake_vector(str(text))
+        if as_base64:
+            emb = base64.b64encode(struct.pack(f"<{len(vec)}f", *vec)).decode("ascii")
+        else:
+            emb = vec
+        data.append({"object": "embedding", "index": i, "embedding": emb})
+    tokens = sum(_estimate_tokens(t) for t in inputs)
+    return {
+        "object": "list",
+        "data": data,
+        "model": body.get("model", "text-embedding-3-small"),
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+@app.api_route("/tools/{host}/{path:path}", methods=["GET", "POST", "PUT"])
+async def tool_upstream(host: str, path: str):
+    """Generic stand-in for external tool APIs — fixed latency, empty payload."""
+    await asyncio.sleep(CONFIG["tool_latency_ms"] / 1000)
+    return {
+        "fake_upstream": f"{host}/{path}",
+        "data": {"list": []},
+        "items": [],
+        "response": {"body": {"items": []}},
+    }
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI + tool upstream")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    for key, value in CONFIG.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+    for key in CONFIG:
+        CONFIG[key] = getattr(args, key)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Load driver for /api/chat/stream.
+
+Runs N chat sessions at each concurrency level and reports
+- sessions/s (completed sessions / wall time)
+- time-to-first-token p50 / p95 / p99 (first `token` SSE event)
+- end-to-end session latency p50 / p95 / p99
+- server event-loop lag (mean per level from the /api/metrics histogram delta)
+
+With `--baseline` the run becomes a regression gate: exit code 1 when
+sessions/s drops or p95 TTFT rises by more than `--max-regression`.
+
+Usage:
+    py -m bench.load_driver --target http://127.0.0.1:8000 \\
+        --concurrency 1,4,16 --sessions 32 --out bench/result.json
+    py -m bench.load_driver --baseline bench/result.json --max-regression 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+QUESTIONS = [
+    "오늘 서울 날씨 어때?",
+    "이번주 KBO 순위 알려줘",
+    "최신 로또 당첨 번호는?",
+    "오늘 주요 뉴스 요약해줘",
+    "삼성전자 주식 시세 알려줘",
+    "업로드한 문서에서 핵심 내용 정리해줘",
+    "서울 미세먼지 수치는?",
+    "근로기준법 연차 규정 알려줘",
+]
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile (pct in 0~100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def _ms(value: float | None) -> float | None:
+    return round(value * 1000, 1) if value is not None else None
+
+
+async def run_session(client: httpx.AsyncClient, target: str, question: str, model: str) -> dict:
+    """One /api/chat/stream call. Returns ttft / total / event count / error."""
+    t0 = time.perf_counter()
+    ttft = None
+    events = 0
+    error = None
+    cached = False
+    try:
+        async with client.stream(
+            "POST", f"{target}/api/chat/stream",
+            json={"question": question, "model": model},
+        ) as resp:
+            if resp.status_code != 200:
+                return {"ttft": None, "total": time.perf_counter() - t0, "events": 0,
+                        "error": f"HTTP {resp.status_code}", "cached": False}
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                try:
+                    event = json.loads(line[6:])
+                except json.JSONDecodeError:
+                    continue
+                events += 1
+                etype = event.get("type")
+                if etype == "token" and ttft is None:
+                    ttft = time.perf_counter() - t0
+                elif etype == "error":
+                    error = (event.get("data") or {}).get("message", "error")
+                elif etype == "done":
+                    cached = bool((event.get("data") or {}).get("cached"))
+    except httpx.HTTPError as e:
+        error = f"{type(e).__name__}: {e}"
+    return {"ttft": ttft, "total": time.perf_counter() - t0, "events": events,
+            "error": error, "cached": cached}
+
+
+async def scrape_loop_lag(client: httpx.AsyncClient, target: str) -> dict:
+    """Read the lag gauges + histogram sum/count from /api/metrics."""
+    out = {"max": None, "sum": 0.0, "count": 0}
+    try:
+        resp = await client.get(f"{target}/api/metrics")
+        resp.raise_for_status()
+    except httpx.HTTPError:
+        return out
+    for line in resp.text.splitlines():
+        if line.startswith("#") or " " not in line:
+            continue
+        name, value = line.rsplit(" ", 1)
+        if name == "kagent_event_loop_lag_max_seconds":
+            out["max"] = float(value)
+        elif name == "kagent_event_loop_lag_seconds_sum":
+            out["sum"] = float(value)
+        elif name == "kagent_event_loop_lag_seconds_count":
+            out["count"] = int(float(value))
+    return out
+
+
+async def run_level(
+    target: str,
+    concurrency: int,
+    sessions: int,
+    model: str,
+    repeat_questions: bool,
+) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency + 2, max_keepalive_connections=concurrency + 2)
+    async with httpx.AsyncClient(timeout=httpx.Timeout(300.0, connect=10.0), limits=limits) as client:
+        before = await scrape_loop_lag(client, target)
+
+        async def one(i: int) -> dict:
+            question = QUESTIONS[i % len(QUESTIONS)]
+            if not repeat_questions:
+                # unique suffix → no answer-cache hits, every session runs the full graph
+                question = f"{question} ({uuid.uuid4().hex[:6]})"
+            async with sem:
+                return await run_session(client, target, question, model)
+
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(sessions)))
+        wall = time.perf_counter() - t0
+
+        after = await scrape_loop_lag(client, target)
+
+    ok = [r for r in results if r["error"] is None]
+    ttfts = [r["ttft"] for r in ok if r["ttft"] is not None]
+    totals = [r["total"] for r in ok]
+    lag_count = after["count"] - before["count"]
+    lag_sum = after["sum"] - before["sum"]
+
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "completed": len(ok),
+        "errors": len(results) - len(ok),
+        "cached": sum(1 for r in ok if r["cached"]),
+        "wall_s": round(wall, 3),
+        "sessions_per_s": round(len(ok) / wall, 3) if wall > 0 else 0.0,
+        "ttft_ms": {f"p{p}": _ms(percentile(ttfts, p)) for p in (50, 95, 99)},
+        "total_ms": {f"p{p}": _ms(percentile(totals, p)) for p in (50, 95, 99)},
+        "loop_lag_ms": {
+            "mean": _ms(lag_sum / lag_count) if lag_count > 0 else None,
+            "max_since_start": _ms(after["max"]),
+        },
+        "error_samples": sorted({r["error"] for r in results if r["error"]})[:5],
+    }
+
+
+def print_table(levels: list[dict]) -> None:
+    header = f"{'conc':>5} {'done':>6} {'err':>4} {'sess/s':>8} {'ttft p50':>9} {'p95':>8} {'p99':>8} {'total p95':>10} {'lag mean':>9}"
+    print(header)
+    print("-" * len(header))
+    for lv in levels:
+        t = lv["ttft_ms"]
+        print(
+            f"{lv['concurrency']:>5} {lv['completed']:>6} {lv['errors']:>4} "
+            f"{lv['sessions_per_s']:>8} {t['p50'] or '-':>9} {t['p95'] or '-':>8} {t['p99'] or '-':>8} "
+            f"{lv['total_ms']['p95'] or '-':>10} {lv['loop_lag_ms']['mean'] or '-':>9}"
+        )
+
+
+def compare_to_baseline(levels: list[dict], baseline: dict, max_regression: float) -> list[str]:
+    """Return human-readable regressions (empty list = pass)."""
+    failures = []
+    base_by_conc = {lv["concurrency"]: lv for lv in baseline.get("levels", [])}
+    for lv in levels:
+        base = base_by_conc.get(lv["concurrency"])
+        if not base:
+            continue
+        c = lv["concurrency"]
+        if lv["errors"] > base.get("errors", 0):
+            failures.append(f"c={c}: errors {base.get('errors', 0)} → {lv['errors']}")
+        b_tput, n_tput = base["sessions_per_s"], lv["sessions_per_s"]
+        if b_tput and n_tput < b_tput * (1 - max_regression):
+            failures.append(f"c={c}: sessions/s {b_tput} → {n_tput}")
+        b_p95, n_p95 = base["ttft_ms"].get("p95"), lv["ttft_ms"].get("p95")
+        if b_p95 and n_p95 and n_p95 > b_p95 * (1 + max_regression):
+            failures.append(f"c={c}: ttft p95 {b_p95}ms → {n_p95}ms")
+    return failures
+
+
+async def main_async(args) -> int:
+    target = args.target.rstrip("/")
+    levels = []
+    for c in [int(x) for x in args.concurrency.split(",") if x.strip()]:
+        sessions = max(args.sessions, c)
+        print(f"▶ concurrency={c} sessions={sessions}", flush=True)
+        levels.append(await run_level(target, c, sessions, args.model, args.repeat_questions))
+
+    print()
+    print_table(levels)
+
+    report = {
+        "target": target,
+        "model": args.model,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "levels": levels,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n결과 저장: {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        failures = compare_to_baseline(levels, baseline, args.max_regression)
+        if failures:
+            print(f"\n❌ 성능 회귀 (허용 {args.max_regression:.0%}):")
+            for f in failures:
+                print(f"  - {f}")
+            return 1
+        print(f"\n✅ baseline 대비 회귀 없음 (허용 {args.max_regression:.0%})")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load driver for /api/chat/stream")
+    parser.add_argument("--target", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated levels")
+    parser.add_argument("--sessions", type=int, default=32, help="sessions per level")
+    parser.add_argument("--model", default="auto")
+    parser.add_argument("--repeat-questions", action="store_true",
+                        help="reuse questions verbatim (measures the answer cache)")
+    parser.add_argument("--out", default="")
+    parser.add_argument("--baseline", default="")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
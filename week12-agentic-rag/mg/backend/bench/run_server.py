@@ -0,0 +1,83 @@
+"""Run the K-Agent backend against bench/fake_upstream.
+
+- OpenAI SDK → OPENAI_BASE_URL=<upstream>/v1 (set before `main` is imported)
+- Tool HTTP calls → every `httpx.AsyncClient` gets a transport that rewrites
+  external hosts to <upstream>/tools/<host>/<path>
+
+No code in agents/ or tools/ changes; the tools keep their hardcoded URLs.
+
+Usage:
+    py -m bench.run_server --upstream http://127.0.0.1:9100 --port 8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+_LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+
+class _RedirectTransport(httpx.AsyncBaseTransport):
+    """Send every non-local request to the fake tool upstream."""
+
+    def __init__(self, upstream: str):
+        self._upstream = httpx.URL(upstream)
+        self._inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = request.url
+        if url.host not in _LOCAL_HOSTS and url.host != self._upstream.host:
+            request.url = self._upstream.copy_with(
+                path=f"/tools/{url.host}{url.path}",
+                query=url.query,
+            )
+            request.headers["host"] = self._upstream.netloc.decode("ascii")
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def patch_httpx(upstream: str) -> None:
+    """Make `httpx.AsyncClient(...)` (as used by tools/*) go through the fake."""
+    original = httpx.AsyncClient
+
+    class _BenchAsyncClient(original):
+        def __init__(self, *args, **kwargs):
+            kwargs.pop("proxy", None)
+            kwargs.pop("mounts", None)
+            kwargs["transport"] = _RedirectTransport(upstream)
+            super().__init__(*args, **kwargs)
+
+    httpx.AsyncClient = _BenchAsyncClient
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="K-Agent backend wired to the fake upstream")
+    parser.add_argument("--upstream", default="http://127.0.0.1:9100")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    upstream = args.upstream.rstrip("/")
+    os.environ["OPENAI_BASE_URL"] = f"{upstream}/v1"
+    os.environ["OPENAI_API_KEY"] = "sk-bench-fake"
+    patch_httpx(upstream)
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(BACKEND_DIR)
+
+    import uvicorn
+    from main import app   # after env + patch: module-level AsyncOpenAI() clients pick them up
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Bulk document import — load a directory tree into the document store.
+
+`/api/documents/upload` takes one file per request. This CLI walks a
+directory, runs `ingest_file` over a pool of async workers (PDF extraction
+/ chunking in threads, embedding calls overlapping across workers) and
+checkpoints every file to a manifest.
+
+Manifest (JSONL, append-only — the last line per path wins):
+- `started` is written with the new doc_id before a file is ingested, so
+  after a crash the partial chunks of that doc_id are deleted and the
+  file is imported again
+- `done` records sha256 / size / mtime / doc_id / chunks / pages / tokens
+- `error` records the message; the file is retried on the next run
+- Unchanged files are skipped: same size + mtime without reading them,
+  otherwise same sha256. A changed file replaces its previous doc_id
+
+Stop the API server first: a second process writing the same persistent
+Chroma directory is not safe, and the server's answer cache wouldn't be
+invalidated for the new documents. With the server running, use
+`--enqueue` instead: the files go into the server's job queue
+(`services/ingest_jobs.py`) at bulk priority, behind interactive uploads,
+and this process writes nothing to Chroma.
+
+    py -m bulk_import ./docs
+    py -m bulk_import ./docs --workers 8 --manifest import.jsonl
+    py -m bulk_import ./docs --ext .pdf --limit 100
+    py -m bulk_import ./docs --enqueue
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from services import ingest_jobs
+from services.document_store import delete_document, new_doc_id
+from services.ingestion import SUPPORTED_EXTS, ingest_file
+
+DEFAULT_MANIFEST = Path(__file__).resolve().parent / "chroma_data" / "import_manifest.jsonl"
+PROGRESS_EVERY_S = 5.0
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest(path: Path) -> dict[str, dict]:
+    """Last entry per file path. A torn last line (crash mid-write) is ignored."""
+    entries: dict[str, dict] = {}
+    if not path.exists():
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[row["path"]] = row
+    return entries
+
+
+class Manifest:
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = load_manifest(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(path, "a", encoding="utf-8")
+
+    def record(self, row: dict) -> None:
+        self.entries[row["path"]] = row
+        self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.t0 = time.perf_counter()
+        self.counts = {"done": 0, "skipped": 0, "failed": 0, "pages": 0, "chunks": 0, "tokens": 0}
+        self._last_print = self.t0
+
+    def add(self, **kw) -> None:
+        for k, v in kw.items():
+            self.counts[k] += v
+        now = time.perf_counter()
+        if now - self._last_print >= PROGRESS_EVERY_S:
+            self._last_print = now
+            print(self.line(), flush=True)
+
+    def rates(self) -> dict:
+        elapsed = max(time.perf_counter() - self.t0, 1e-9)
+        c = self.counts
+        return {
+            "elapsed_s": round(elapsed, 1),
+            "files_per_s": round(c["done"] / elapsed, 2),
+            "pages_per_s": round(c["pages"] / elapsed, 2),
+            "chunks_per_s": round(c["chunks"] / elapsed, 2),
+            "tokens_per_s": round(c["tokens"] / elapsed, 1),
+        }
+
+    def line(self) -> str:
+        c, r = self.counts, self.rates()
+        seen = c["done"] + c["skipped"] + c["failed"]
+        return (f"[{seen}/{self.total}] done={c['done']} skipped={c['skipped']} failed={c['failed']} | "
+                f"{r['pages_per_s']} pages/s  {r['chunks_per_s']} chunks/s  {r['tokens_per_s']} tokens/s")
+
+
+def discover(root: Path, exts: tuple[str, ...]) -> list[Path]:
+    files = [p for p in root.rglob("*") if p.is_file() and p.suffix.lower() in exts
+             and not any(part.startswith(".") for part in p.relative_to(root).parts)]
+    return sorted(files)
+
+
+async def _import_one(path: Path, root: Path, manifest: Manifest, progress: Progress) -> None:
+    key = str(path.resolve())
+    stat = path.stat()
+    prev = manifest.entries.get(key)
+
+    if prev and prev["status"] == "done" and prev["size"] == stat.st_size and prev["mtime"] == stat.st_mtime:
+        progress.add(skipped=1)
+        return
+    digest = await asyncio.to_thread(_sha256, path)
+    if prev and prev["status"] == "done" and prev["sha256"] == digest:
+        manifest.record({**prev, "size": stat.st_size, "mtime": stat.st_mtime})   # touch 만 된 파일
+        progress.add(skipped=1)
+        return
+
+    # 이전 버전(변경된 파일) 또는 중단된 import 의 chunk 정리
+    if prev and prev.get("doc_id") and prev["status"] in ("done", "started"):
+        await delete_document(prev["doc_id"])
+
+    doc_id = new_doc_id()
+    base = {"path": key, "sha256": digest, "size": stat.st_size, "mtime": stat.st_mtime, "doc_id": doc_id}
+    manifest.record({**base, "status": "started"})
+    try:
+        result = await ingest_file(str(path), doc_name=str(path.relative_to(root)), doc_id=doc_id)
+    except Exception as e:
+        await delete_document(doc_id)
+        manifest.record({**base, "status": "error", "error": f"{type(e).__name__}: {e}"})
+        print(f"  ✗ {path.relative_to(root)}: {e}", file=sys.stderr, flush=True)
+        progress.add(failed=1)
+        return
+    manifest.record({
+        **base, "status": "done",
+        "chunks": result["chunks_added"], "pages": result["pages"], "tokens": result["tokens"],
+    })
+    progress.add(done=1, pages=result["pages"], chunks=result["chunks_added"], tokens=result["tokens"])
+
+
+async def run_import(root: Path, manifest_path: Path, workers: int,
+                     exts: tuple[str, ...], limit: int = 0) -> dict:
+    files = discover(root, exts)
+    if limit:
+        files = files[:limit]
+    manifest = Manifest(manifest_path)
+    progress = Progress(len(files))
+    queue: asyncio.Queue[Path] = asyncio.Queue()
+    for f in files:
+        queue.put_nowait(f)
+
+    async def worker() -> None:
+        while True:
+            try:
+                path = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await _import_one(path, root, manifest, progress)
+
+    # 중단된 import 중 파일이 사라진 것 — 남은 chunk 만 정리
+    wanted = {str(f.resolve()) for f in files}
+    for key, row in list(manifest.entries.items()):
+        if row["status"] == "started" and key not in wanted and not Path(key).exists():
+            await delete_document(row["doc_id"])
+            manifest.record({**row, "status": "removed"})
+
+    print(f"{len(files)} files under {root} → workers={workers}, manifest={manifest_path}", flush=True)
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    finally:
+        manifest.close()
+    print(progress.line(), flush=True)
+    return {**progress.counts, **progress.rates()}
+
+
+def enqueue(root: Path, exts: tuple[str, ...], limit: int = 0) -> int:
+    """Add the files to the server's job queue at bulk priority. Returns the count."""
+    files = discover(root, exts)
+    if limit:
+        files = files[:limit]
+    for path in files:
+        ingest_jobs.submit(str(path), doc_name=str(path.relative_to(root)),
+                           priority=ingest_jobs.PRIORITY_BULK, owns_file=False)
+    return len(files)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="디렉터리 단위 문서 일괄 인덱싱 (재시작 가능)")
+    parser.add_argument("root", help="가져올 디렉터리")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--manifest", default=str(DEFAULT_MANIFEST))
+    parser.add_argument("--ext", action="append", help="확장자 필터 (반복 가능, 기본: 지원 형식 전부)")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--enqueue", action="store_true",
+                        help="실행 중인 서버의 job 큐에 bulk 우선순위로 추가 (manifest 미사용)")
+    args = parser.parse_args()
+
+    root = Path(args.root).resolve()
+    if not root.is_dir():
+        parser.error(f"디렉터리가 아닙니다: {root}")
+    exts = tuple(e.lower() if e.startswith(".") else f".{e.lower()}" for e in args.ext) if args.ext else SUPPORTED_EXTS
+    if args.enqueue:
+        n = enqueue(root, exts, args.limit)
+        print(f"{n} files under {root} → job queue ({ingest_jobs.DB_PATH}), priority={ingest_jobs.PRIORITY_BULK}")
+        return
+    summary = asyncio.run(run_import(root, Path(args.manifest), args.workers, exts, args.limit))
+    print(json.dumps(summary, ensure_ascii=False))
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
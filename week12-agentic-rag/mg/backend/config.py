@@ -15,3 +15,22 @@ import os
 SUPERVISOR_MODEL = os.environ.get("MODEL_SUPERVISOR", "gpt-4o-mini")
 DOMAIN_MODEL = os.environ.get("MODEL_DOMAIN", "gpt-4o-mini")
 WRITER_MODEL = os.environ.get("MODEL_WRITER", "gpt-4o-mini")
+
+# Retriever relevance grading (services/relevance_grader.py)
+# "auto": local cross-encoder when sentence-transformers is installed and `calibrate` has
+#         written grader_calibration.json, LLM for ambiguous rounds (LLM only until then)
+# "llm":  always ask the LLM (previous behaviour)
+RELEVANCE_GRADER = os.environ.get("RELEVANCE_GRADER", "auto")
+RELEVANCE_GRADER_MODEL = os.environ.get(
+    "RELEVANCE_GRADER_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+)
+
+# Writer 의 [수집된 정보] 토큰 예산 (services/context_packer.py)
+# 0 이면 모델별 기본값 (context_packer.CONTEXT_BUDGETS)
+WRITER_CONTEXT_BUDGET = int(os.environ.get("WRITER_CONTEXT_BUDGET", "0"))
+
+# 문서 임베딩 provider (services/embedders.py)
+# "openai": text-embedding-3-small (기본)   "local": sentence-transformers CPU (네트워크 불필요)
+EMBEDDER = os.environ.get("EMBEDDER", "openai")
+EMBEDDER_MODEL = os.environ.get("EMBEDDER_MODEL", "")   # 빈 값이면 provider 별 기본 모델
+EMBEDDER_ONNX = os.environ.get("EMBEDDER_ONNX", "") in ("1", "true", "yes")
@@ -2,29 +2,39 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+import asyncio
+import hashlib
 import json
 import os
 import tempfile
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
+from python_multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
 
 # Trigger tool registration
 import tools  # noqa: F401
 
-from tools.registry import list_tool_names
+from tools.registry import list_tool_names, shaping_stats
 from tools import TOOL_DOMAINS, DOMAINS
 from services.graph import agent_stream, graph_metadata
 from services.memory import (
     list_threads, get_history, delete_thread, get_thread_summary,
 )
-from services.document_store import collection_stats, delete_document
-from services.ingestion import ingest_file, ingest_text
+from services.document_store import collection_stats, delete_document, find_by_hash
+from services.embedders import embedder_stats
+from services.ingestion import ingest_text
+from services import answer_cache, chroma_async, embed_budget, ingest_jobs, relevance_grader
+from services.telemetry import (
+    render_prometheus, register_collector, start_loop_lag_monitor, loop_lag_stats,
+)
 from config import SUPERVISOR_MODEL, DOMAIN_MODEL, WRITER_MODEL
 
 SUPPORTED_EXTS = {".pdf", ".txt", ".md", ".markdown"}
 MAX_FILE_BYTES = 20 * 1024 * 1024   # 20 MB
+UPLOAD_BLOCK_BYTES = 1024 * 1024    # 스트리밍 업로드 블록
+MULTIPART_OVERHEAD_BYTES = 64 * 1024  # Content-Length 검사 시 경계·파트 헤더 여유분
 
 app = FastAPI(title="K-Agent LangGraph Multi-Agent")
 app.add_middleware(
@@ -36,6 +46,36 @@ app.add_middleware(
 )
 
 
+def _cache_gauges() -> dict:
+    stats = answer_cache.cache_stats()
+    return {
+        "answer_cache_entries": stats["entries"],
+        "answer_cache_hit_rate": stats["hit_rate"],
+        "answer_cache_lookups_total": [
+            ({"result": "hit"}, stats["hits"]),
+            ({"result": "miss"}, stats["misses"]),
+            ({"result": "bypass"}, stats["bypassed"]),
+        ],
+    }
+
+
+register_collector(_cache_gauges)
+register_collector(loop_lag_stats)
+register_collector(relevance_grader.grader_stats)
+register_collector(shaping_stats)
+register_collector(ingest_jobs.job_stats)
+register_collector(embed_budget.budget_stats)
+register_collector(embedder_stats)
+register_collector(chroma_async.chroma_stats)
+
+
+@app.on_event("startup")
+async def _start_monitors():
+    start_loop_lag_monitor()
+    await ingest_jobs.start_workers()
+    asyncio.create_task(relevance_grader.warm_up())
+
+
 class ChatRequest(BaseModel):
     question: str
     model: str = "auto"  # "auto" → tiered routing per stage; otherwise overrides all stages
@@ -64,6 +104,15 @@ async def get_models():
     }
 
 
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text format — per-stage latency, tokens, tool latency."""
+    return PlainTextResponse(
+        render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.get("/api/graph")
 async def get_graph():
     """Static graph metadata for frontend visualization."""
@@ -126,49 +175,197 @@ class TextIngestRequest(BaseModel):
 @app.get("/api/documents")
 async def list_docs():
     """List all uploaded documents and their chunk counts."""
-    return collection_stats()
-
-
-@app.post("/api/documents/upload")
-async def upload_document(file: UploadFile = File(...)):
-    """Upload a PDF / TXT / MD file. Chunks + embeds + indexes."""
-    ext = os.path.splitext(file.filename or "")[1].lower()
-    if ext not in SUPPORTED_EXTS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"지원 형식: {', '.join(SUPPORTED_EXTS)} (받은: {ext})",
-        )
-
-    body = await file.read()
-    if len(body) > MAX_FILE_BYTES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"파일이 너무 큽니다 ({len(body) // 1024} KB > {MAX_FILE_BYTES // 1024} KB)",
-        )
-
-    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
-        tmp.write(body)
-        tmp_path = tmp.name
+    return await collection_stats()
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"파일이 너무 큽니다 (> {MAX_FILE_BYTES // 1024} KB)")
+
+
+async def _receive_upload(request: Request) -> tuple[str, str, str, int]:
+    """Stream the multipart `file` field of `request` into a spool file.
+
+    The body is parsed as it arrives, so the size limit and sha256 apply to
+    the bytes on the wire — nothing is buffered beyond one block.
+    Returns (filename, spool path, sha256, size). Raises 400 / 413 (partial file removed).
+    """
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_FILE_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise _too_large()
+    ctype, params = parse_options_header(request.headers.get("content-type", ""))
+    if ctype != b"multipart/form-data" or not params.get(b"boundary"):
+        raise HTTPException(status_code=400, detail="multipart/form-data 의 file 필드로 보내 주세요")
+
+    headers: dict[bytes, bytes] = {}
+    field, value = bytearray(), bytearray()
+    buf = bytearray()                    # 아직 디스크에 쓰지 않은 file 파트 데이터
+    part = {"in_file": False, "filename": None, "done": False}
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data, start, end):
+        field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(field).lower()] = bytes(value)
+        field.clear()
+        value.clear()
+
+    def on_headers_finished():
+        _, opts = parse_options_header(headers.get(b"content-disposition", b""))
+        part["in_file"] = (part["filename"] is None and opts.get(b"name") == b"file"
+                           and b"filename" in opts)
+        if part["in_file"]:
+            part["filename"] = opts[b"filename"].decode("utf-8", "replace")
+
+    def on_part_data(data, start, end):
+        if part["in_file"]:
+            buf.extend(data[start:end])
+
+    def on_part_end():
+        if part["in_file"]:
+            part["in_file"], part["done"] = False, True
+
+    parser = MultipartParser(params[b"boundary"], callbacks={
+        "on_part_begin": on_part_begin, "on_header_field": on_header_field,
+        "on_header_value": on_header_value, "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished, "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    digest = hashlib.sha256()
+    size = 0
+    tmp = None
+
+    async def flush():
+        nonlocal size
+        block = bytes(buf)
+        buf.clear()
+        size += len(block)
+        digest.update(block)
+        await asyncio.to_thread(tmp.write, block)
 
     try:
-        result = await ingest_file(tmp_path, doc_name=file.filename)
-    finally:
         try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+            async for chunk in request.stream():
+                parser.write(chunk)
+                if part["filename"] is not None and tmp is None:
+                    ext = os.path.splitext(part["filename"])[1].lower()
+                    if ext not in SUPPORTED_EXTS:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"지원 형식: {', '.join(SUPPORTED_EXTS)} (받은: {ext})",
+                        )
+                    tmp = tempfile.NamedTemporaryFile(suffix=ext, dir=ingest_jobs.UPLOAD_DIR, delete=False)
+                # Content-Length 가 없거나 틀려도 실제 받은 바이트로 즉시 413
+                if size + len(buf) > MAX_FILE_BYTES:
+                    raise _too_large()
+                if len(buf) >= UPLOAD_BLOCK_BYTES:
+                    await flush()
+            parser.finalize()
+        except MultipartParseError as e:
+            raise HTTPException(status_code=400, detail=f"멀티파트 본문을 해석할 수 없습니다: {e}") from e
+        if tmp is None or not part["done"]:
+            raise HTTPException(status_code=400, detail="file 필드가 없거나 본문이 중간에 끊겼습니다")
+        await flush()
+        await asyncio.to_thread(tmp.close)
+    except BaseException:
+        if tmp is not None:
+            tmp.close()
+            os.unlink(tmp.name)
+        raise
+    return part["filename"], tmp.name, digest.hexdigest(), size
+
+
+@app.post("/api/documents/upload", status_code=202)
+async def upload_document(request: Request):
+    """Upload a PDF / TXT / MD file (multipart field `file`) and ingest it in the background.
+
+    The request body is parsed while it streams in: an oversized
+    Content-Length is rejected before reading, and the 20 MB limit and
+    sha256 are applied block by block as the file is written to disk.
+
+    Returns {job_id, status: "queued"} — poll /api/documents/jobs/{job_id}.
+    Content already indexed (same sha256) returns {status: "duplicate"}.
+    """
+    filename, path, sha256, size = await _receive_upload(request)
 
-    return result
+    # 진행 중인 job 이 먼저 — 그 job 이 쓰는 중인 chunk 가 find_by_hash 에 걸리기 전에 합류
+    existing = ingest_jobs.find_active(sha256) or await find_by_hash(sha256)
+    if existing is not None:
+        os.unlink(path)
+        if isinstance(existing, ingest_jobs.Job):
+            return {"job_id": existing.id, "status": existing.status, "sha256": sha256, "bytes": size}
+        return {"status": "duplicate", "sha256": sha256, "bytes": size, **existing}
+
+    job = ingest_jobs.submit(path, filename, sha256, size,
+                             priority=ingest_jobs.PRIORITY_INTERACTIVE)
+    return {"job_id": job.id, "status": job.status, "sha256": sha256, "bytes": size}
+
+
+@app.get("/api/documents/jobs")
+async def list_ingest_jobs():
+    """Recent upload ingest jobs, newest first."""
+    return ingest_jobs.list_jobs()
+
+
+@app.get("/api/documents/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Status / stage / progress of one upload ingest job."""
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return job.to_dict()
+
+
+@app.delete("/api/documents/jobs/{job_id}")
+async def cancel_ingest_job(job_id: str):
+    """Cancel a queued / running job (its partial chunks are removed)."""
+    job = await ingest_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return job.to_dict()
+
+
+@app.post("/api/documents/jobs/{job_id}/retry")
+async def retry_ingest_job(job_id: str):
+    """Re-queue a failed or cancelled job."""
+    job = ingest_jobs.retry(job_id)
+    if job is None:
+        raise HTTPException(status_code=409, detail="재시도할 수 없는 작업입니다 (실패/취소 상태가 아니거나 파일 없음)")
+    return job.to_dict()
 
 
 @app.post("/api/documents/text")
 async def upload_text(req: TextIngestRequest):
     """Ingest raw text — useful for quick testing without a file."""
-    return await ingest_text(req.text, req.doc_name)
+    result = await ingest_text(req.text, req.doc_name)
+    answer_cache.invalidate(domain="documents")
+    return result
 
 
 @app.delete("/api/documents/{doc_id}")
 async def remove_document(doc_id: str):
     """Delete all chunks for a document."""
-    n = delete_document(doc_id)
+    n = await delete_document(doc_id)
+    answer_cache.invalidate(domain="documents")
     return {"removed_chunks": n}
+
+
+# ── Semantic answer cache ───────────────────────────────────────
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Answer cache hit-rate metrics."""
+    return answer_cache.cache_stats()
+
+
+@app.delete("/api/cache")
+async def invalidate_cache(domain: str | None = None, tool: str | None = None):
+    """Invalidate cached answers by domain / tool (no filter → all)."""
+    removed = answer_cache.invalidate(domain=domain, tool=tool)
+    return {"removed": removed}
@@ -0,0 +1,296 @@
+"""Semantic answer cache for the full agent pipeline.
+
+Near-identical questions ("오늘 로또 번호", "이번주 KBO 순위") otherwise run
+Planner → tools → Writer → Critic every time. This module stores final
+answers keyed by (normalized question, model) and replays them when a
+new question is close enough.
+
+Design choices:
+- Exact-match fast path on the normalized question text (no embedding call)
+- No embedding call either when nothing is cached for the model — an
+  empty or cold cache adds no round trip; the caller embeds for `store()`
+  with `embed_question()` alongside the planner
+- Cosine similarity over unit vectors for the semantic match
+- Freshness TTL derived from the tools used — sports scores live for minutes,
+  a law text for days. TTL 0 means "never cache" (e.g. current time)
+- Only critic-approved answers to history-free questions are cached;
+  follow-up questions depend on the thread context
+- LRU eviction with a fixed entry cap — single-process, in-memory
+
+Public API:
+- normalize_question(question)
+- lookup(question, model) / store(...) / embed_question(question)
+- ttl_for_results(tool_results)
+- invalidate(domain=None, tool=None) / clear()
+- cache_stats()
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from services.document_store import embed_one
+
+SIMILARITY_THRESHOLD = 0.93   # cosine, text-embedding-3-small
+MAX_ENTRIES = 500
+NO_TOOL_TTL = 24 * 3600       # plan 없이 모델 지식만으로 답한 경우
+DEFAULT_TOOL_TTL = 10 * 60
+
+# Freshness per domain (seconds). Tools override below.
+DOMAIN_TTL: dict[str, int] = {
+    "sports": 5 * 60,
+    "finance": 5 * 60,
+    "news": 10 * 60,
+    "lifestyle": 10 * 60,
+    "data": 30 * 60,
+    "shopping": 30 * 60,
+    "travel": 30 * 60,
+    "culture": 60 * 60,
+    "info": 60 * 60,
+    "government": 6 * 3600,
+    "education": 6 * 3600,
+    "health": 24 * 3600,
+    "documents": 24 * 3600,   # upload/delete 시 invalidate 로 무효화
+}
+
+TOOL_TTL: dict[str, int] = {
+    # 실시간 — 캐시 금지
+    "get_current_time": 0,
+    "date_arithmetic": 0,
+    "seoul_subway_arrival": 0,
+    "seoul_density": 0,
+    "emergency_room_beds": 0,
+    "hwp_convert": 0,
+    # 주 1회 갱신
+    "lotto_results": 60 * 60,
+    # 거의 변하지 않는 참조 데이터
+    "korean_law_search": 3 * 86400,
+    "joseon_sillok_search": 30 * 86400,
+    "korean_slang_lookup": 7 * 86400,
+    "korean_spell_check": 7 * 86400,
+    "korean_character_count": 7 * 86400,
+    "calculate": 7 * 86400,
+    "zipcode_search": 30 * 86400,
+    "real_estate_region_code": 30 * 86400,
+    "bus_terminal_list": 7 * 86400,
+    "library_book_detail": 7 * 86400,
+}
+
+
+@dataclass
+class CacheEntry:
+    question: str
+    norm: str
+    embedding: list[float]
+    answer: str
+    model: str
+    tools: list[str]
+    domains: list[str]
+    score: int | None
+    created_at: float
+    expires_at: float
+    hits: int = 0
+    extra: dict = field(default_factory=dict)
+
+
+_entries: "OrderedDict[tuple[str, str], CacheEntry]" = OrderedDict()   # (norm, model) → entry (LRU order)
+
+_stats = {
+    "hits": 0,
+    "exact_hits": 0,
+    "misses": 0,
+    "embeds_skipped": 0,
+    "bypassed": 0,
+    "stores": 0,
+    "skipped": 0,
+    "evictions": 0,
+    "expirations": 0,
+    "invalidations": 0,
+}
+
+
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """NFKC + lowercase + strip punctuation/whitespace runs."""
+    text = unicodedata.normalize("NFKC", question or "").lower()
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _unit(vec: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+def _dot(a: list[float], b: list[float]) -> float:
+    return math.fsum(x * y for x, y in zip(a, b))
+
+
+def _model_key(model: str | None) -> str:
+    return model if model and model != "auto" else "auto"
+
+
+def ttl_for_results(tool_results: list[dict]) -> int:
+    """Freshness = the shortest TTL among the tools that produced the answer."""
+    if not tool_results:
+        return NO_TOOL_TTL
+    ttls = []
+    for r in tool_results:
+        tool = r.get("tool") or ""
+        if tool in TOOL_TTL:
+            ttls.append(TOOL_TTL[tool])
+        else:
+            ttls.append(DOMAIN_TTL.get(r.get("domain") or "", DEFAULT_TOOL_TTL))
+    return min(ttls)
+
+
+def _expire(now: float) -> None:
+    stale = [k for k, e in _entries.items() if e.expires_at <= now]
+    for k in stale:
+        del _entries[k]
+    _stats["expirations"] += len(stale)
+
+
+async def embed_question(question: str) -> list[float] | None:
+    """Unit embedding of the normalized question; None when embedding fails."""
+    try:
+        return _unit(await embed_one(normalize_question(question) or question))
+    except Exception:
+        return None
+
+
+async def lookup(question: str, model: str | None = None) -> tuple[CacheEntry | None, float, list[float] | None]:
+    """Find a fresh cached answer for the question.
+
+    Returns (entry, similarity, embedding). The embedding is returned on a
+    miss so `store()` can reuse it without a second API call. It is None
+    when no entry exists for the model (nothing was embedded) or embedding
+    failed — both a plain miss.
+    """
+    now = time.time()
+    _expire(now)
+    norm = normalize_question(question)
+    mkey = _model_key(model)
+
+    exact = _entries.get((norm, mkey))
+    if exact:
+        _entries.move_to_end((norm, mkey))
+        exact.hits += 1
+        _stats["hits"] += 1
+        _stats["exact_hits"] += 1
+        return exact, 1.0, exact.embedding
+
+    if not any(e.model == mkey for e in _entries.values()):
+        _stats["misses"] += 1
+        _stats["embeds_skipped"] += 1
+        return None, 0.0, None
+
+    embedding = await embed_question(question)
+    if embedding is None:
+        _stats["misses"] += 1
+        return None, 0.0, None
+
+    best: CacheEntry | None = None
+    best_sim = 0.0
+    for entry in _entries.values():
+        if entry.model != mkey:
+            continue
+        sim = _dot(embedding, entry.embedding)
+        if sim > best_sim:
+            best, best_sim = entry, sim
+
+    if best is not None and best_sim >= SIMILARITY_THRESHOLD:
+        _entries.move_to_end((best.norm, best.model))
+        best.hits += 1
+        _stats["hits"] += 1
+        return best, best_sim, embedding
+
+    _stats["misses"] += 1
+    return None, best_sim, embedding
+
+
+def record_bypass() -> None:
+    """Count a request that skipped the cache (e.g. thread with history)."""
+    _stats["bypassed"] += 1
+
+
+def store(
+    question: str,
+    answer: str,
+    tool_results: list[dict],
+    model: str | None = None,
+    embedding: list[float] | None = None,
+    score: int | None = None,
+) -> CacheEntry | None:
+    """Cache a final answer. Returns None when the TTL says "don't cache"."""
+    ttl = ttl_for_results(tool_results)
+    if ttl <= 0 or not answer.strip() or embedding is None:
+        _stats["skipped"] += 1
+        return None
+
+    now = time.time()
+    norm = normalize_question(question)
+    entry = CacheEntry(
+        question=question,
+        norm=norm,
+        embedding=embedding,
+        answer=answer,
+        model=_model_key(model),
+        tools=sorted({r.get("tool", "") for r in tool_results}),
+        domains=sorted({r.get("domain", "") for r in tool_results}),
+        score=score,
+        created_at=now,
+        expires_at=now + ttl,
+    )
+    # 모델별로 따로 — 같은 질문의 다른 모델 답을 밀어내지 않음
+    key = (norm, entry.model)
+    _entries[key] = entry
+    _entries.move_to_end(key)
+    _stats["stores"] += 1
+
+    while len(_entries) > MAX_ENTRIES:
+        _entries.popitem(last=False)
+        _stats["evictions"] += 1
+    return entry
+
+
+def invalidate(domain: str | None = None, tool: str | None = None) -> int:
+    """Drop entries built from a domain or tool. No filter → drop all."""
+    if domain is None and tool is None:
+        return clear()
+    doomed = [
+        k for k, e in _entries.items()
+        if (domain is not None and domain in e.domains)
+        or (tool is not None and tool in e.tools)
+    ]
+    for k in doomed:
+        del _entries[k]
+    _stats["invalidations"] += len(doomed)
+    return len(doomed)
+
+
+def clear() -> int:
+    n = len(_entries)
+    _entries.clear()
+    _stats["invalidations"] += n
+    return n
+
+
+def cache_stats() -> dict:
+    """Hit-rate metrics for /api/cache/stats."""
+    _expire(time.time())
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "entries": len(_entries),
+        "lookups": lookups,
+        "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
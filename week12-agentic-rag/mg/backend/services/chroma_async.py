@@ -0,0 +1,113 @@
+"""Async facade for ChromaDB calls.
+
+chromadb's client is synchronous: `query` walks the HNSW index and `add` /
+`delete` write SQLite + index files. Called straight from `async def`
+handlers and agents, each call froze the event loop, so one upload or a
+slow search stalled every other chat stream.
+
+Design choices:
+- Every Chroma call goes through `read()` / `write()`, which run it on a
+  dedicated, bounded thread pool (not the default executor shared with
+  `asyncio.to_thread` users like the cross-encoder)
+- Writers are serialized with one asyncio lock; readers run concurrently
+  (up to CHROMA_READ_THREADS) and never wait for a writer — Chroma's own
+  locking keeps a query consistent during an add
+- The pool has one thread more than the reader limit, so a long upload
+  never takes a slot a search needs
+- Waiting happens in asyncio (semaphore / lock), not in the executor's
+  hidden queue, so queue depth and wait time are measurable
+
+Public API:
+- await read(fn, *args, **kwargs)
+- await write(fn, *args, **kwargs)
+- chroma_stats() → gauges for /api/metrics
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+CHROMA_READ_THREADS = int(os.environ.get("CHROMA_READ_THREADS", "4"))
+
+_pool = ThreadPoolExecutor(max_workers=CHROMA_READ_THREADS + 1, thread_name_prefix="chroma")
+_gates: dict[str, Any] = {}
+_gates_loop: asyncio.AbstractEventLoop | None = None
+
+_stats = {
+    op: {"waiting": 0, "running": 0, "total": 0, "errors": 0, "wait_s": 0.0, "wait_max_s": 0.0, "run_s": 0.0}
+    for op in ("read", "write")
+}
+
+
+def _gate(op: str):
+    """Reader semaphore / writer lock for the running loop (CLI runs use several loops)."""
+    global _gates_loop
+    loop = asyncio.get_running_loop()
+    if loop is not _gates_loop:
+        _gates.clear()
+        _gates.update(read=asyncio.Semaphore(CHROMA_READ_THREADS), write=asyncio.Lock())
+        _gates_loop = loop
+    return _gates[op]
+
+
+async def _run(op: str, fn: Callable, args, kwargs) -> Any:
+    s = _stats[op]
+    gate = _gate(op)
+    t_queued = time.perf_counter()
+    s["waiting"] += 1
+    try:
+        await gate.acquire()
+    finally:
+        s["waiting"] -= 1
+    waited = time.perf_counter() - t_queued
+    s["wait_s"] += waited
+    s["wait_max_s"] = max(s["wait_max_s"], waited)
+
+    s["running"] += 1
+    t_run = time.perf_counter()
+
+    def done(fut) -> None:
+        s["running"] -= 1
+        s["total"] += 1
+        s["run_s"] += time.perf_counter() - t_run
+        if not fut.cancelled() and fut.exception() is not None:
+            s["errors"] += 1
+        gate.release()
+
+    # 호출한 쪽이 취소돼도 스레드의 작업은 끝까지 돌므로, 끝날 때까지 gate 를 잡아 둠
+    fut = asyncio.get_running_loop().run_in_executor(_pool, lambda: fn(*args, **kwargs))
+    fut.add_done_callback(done)
+    return await asyncio.shield(fut)
+
+
+async def read(fn: Callable, *args, **kwargs) -> Any:
+    """Run a read-only Chroma call (query / get / count) off the event loop."""
+    return await _run("read", fn, args, kwargs)
+
+
+async def write(fn: Callable, *args, **kwargs) -> Any:
+    """Run a mutating Chroma call (add / upsert / delete), one at a time."""
+    return await _run("write", fn, args, kwargs)
+
+
+def chroma_stats() -> dict:
+    """Gauges for /api/metrics."""
+    out: dict[str, list] = {
+        "chroma_queue_depth": [], "chroma_running": [], "chroma_ops_total": [],
+        "chroma_errors_total": [], "chroma_wait_seconds_total": [], "chroma_wait_seconds_max": [],
+        "chroma_run_seconds_total": [],
+    }
+    for op, s in _stats.items():
+        labels = {"op": op}
+        out["chroma_queue_depth"].append((labels, s["waiting"]))
+        out["chroma_running"].append((labels, s["running"]))
+        out["chroma_ops_total"].append((labels, s["total"]))
+        out["chroma_errors_total"].append((labels, s["errors"]))
+        out["chroma_wait_seconds_total"].append((labels, round(s["wait_s"], 4)))
+        out["chroma_wait_seconds_max"].append((labels, round(s["wait_max_s"], 4)))
+        out["chroma_run_seconds_total"].append((labels, round(s["run_s"], 4)))
+    return out
@@ -0,0 +1,304 @@
+"""Sentence-aware, token-budgeted chunker with source offsets.
+
+Replaces the character-window splitter in ingestion. Sizes are measured
+in tokens of the embedding model's tokenizer, so every chunk fits the
+budget regardless of how Korean / English / numbers mix.
+
+Design choices:
+- Units are sentences (., ?, !, … incl. 다. 요. 까? and a bare 다/요/까/죠
+  at a line end), paragraphs and headings, found with one regex pass
+- Headings (`#`, 제N장/절, "1." / "1.2" numbered titles) start a new chunk
+  once the current one has MIN_SECTION_TOKENS of body, and the chunk after
+  a heading break gets no overlap from the previous section
+- Overlap is whole trailing sentences up to `overlap_tokens` — never a
+  cut through a word or sentence
+- A single unit over budget is split on whitespace; only a run without
+  any whitespace falls back to fixed character slices
+- Each chunk records [char_start, char_end) into the text that was passed
+  in, its token count, and for PDFs the first / last page it touches
+- Linear in text length: one regex scan, one batch encode of the units,
+  one encode of the final chunks
+- tiktoken downloads its BPE file on first use. When that fails (no
+  network), counts fall back to ~3 UTF-8 bytes per token — about one
+  Hangul syllable, so Korean chunks stay within budget and English ones
+  come out smaller
+
+Public API:
+- chunk_text(text, max_tokens, overlap_tokens) → list[TextChunk]
+- chunk_pages([(page_no, text), ...], ...) → list[TextChunk] (page spans)
+- chunk_hierarchy(text) / chunk_pages_hierarchy(pages)
+    → [(parent, [child, ...]), ...] for the parent-child index;
+    `child_count` sizes children in the embedding model's own tokenizer
+- count_tokens(text)
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+ENCODING = "cl100k_base"   # text-embedding-3-small tokenizer
+MAX_TOKENS = 600
+OVERLAP_TOKENS = 60
+MIN_SECTION_TOKENS = MAX_TOKENS // 4   # 이보다 짧은 섹션은 다음 섹션과 합침
+
+# Parent-child (small-to-big) 인덱스: child 만 임베딩, Writer 에는 parent
+PARENT_TOKENS = 1000
+CHILD_TOKENS = 200
+CHILD_OVERLAP_TOKENS = 20
+PAGE_SEPARATOR = "\n\n"
+
+_HEADING = (
+    r"^[ \t]*(?:(?:#{1,6}[ \t]+|제[ \t]*\d+[ \t]*[편장절조][ \t]|\d+(?:\.\d+)+\.?[ \t]+)[^\n]{0,80}"
+    r"|(?:\d+|[IVX]+)\.[ \t]+[^\n.?!]{1,40})$"
+)
+_PARAGRAPH = r"\n[ \t]*\n\s*"
+_SENTENCE_END = r"(?<!\d)[.?!…]+[\"'”’」』)\]]*(?=\s|$)|(?<=[다요까죠])(?=[ \t]*\n)"
+_BOUNDARY_RE = re.compile(
+    f"(?P<heading>{_HEADING})|(?P<para>{_PARAGRAPH})|(?P<sent>{_SENTENCE_END})",
+    re.MULTILINE,
+)
+_WORD_RE = re.compile(r"\S+\s*")
+
+_encoding = None
+_encoding_failed = False
+
+
+@dataclass
+class TextChunk:
+    text: str
+    char_start: int
+    char_end: int
+    tokens: int
+    page: Optional[int] = None
+    page_end: Optional[int] = None
+
+
+def _get_encoding():
+    """The tokenizer, or None when it can't be loaded (tried once)."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(ENCODING)
+        except Exception as e:
+            _encoding_failed = True
+            print(f"  [chunker] {ENCODING} 토크나이저 미사용 → 바이트 기준 추정 ({type(e).__name__})")
+    return _encoding
+
+
+def _count_batch(texts: list[str]) -> list[int]:
+    enc = _get_encoding()
+    if enc is None:
+        return [-(-len(t.encode("utf-8")) // 3) for t in texts]
+    return [len(ids) for ids in enc.encode_ordinary_batch(texts)]
+
+
+def count_tokens(text: str) -> int:
+    return _count_batch([text])[0]
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def _strip_span(text: str, start: int, end: int) -> tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _units(text: str) -> list[tuple[int, int, bool]]:
+    """(start, end, is_heading) spans of sentences and headings, in order."""
+    units: list[tuple[int, int, bool]] = []
+    pos = 0
+
+    def close(end: int, heading: bool = False):
+        s, e = _strip_span(text, pos, end)
+        if e > s:
+            units.append((s, e, heading))
+
+    for m in _BOUNDARY_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "heading":
+            close(m.start())
+            pos = m.start()
+            close(m.end(), heading=True)
+        elif kind == "para":
+            close(m.start())
+        else:
+            close(m.end())
+        pos = m.end()
+    close(len(text))
+    return units
+
+
+def _split_long(text: str, start: int, end: int, max_tokens: int,
+                count: Callable[[list[str]], list[int]] = _count_batch) -> list[tuple[int, int]]:
+    """Split one over-budget unit on whitespace (char slices as last resort)."""
+    words = [(m.start(), m.end()) for m in _WORD_RE.finditer(text, start, end)]
+    counts = count([text[s:e] for s, e in words])
+    pieces: list[tuple[int, int]] = []
+    cur_start, cur_tokens = None, 0
+    for (s, e), n in zip(words, counts):
+        if n > max_tokens:
+            if cur_start is not None:
+                pieces.append((cur_start, s))
+                cur_start, cur_tokens = None, 0
+            # 공백 없는 긴 문자열: UTF-8 1글자 ≤ 4바이트 ≤ 4토큰
+            step = max(1, max_tokens // 4)
+            pieces.extend((i, min(i + step, e)) for i in range(s, e, step))
+            continue
+        if cur_start is not None and cur_tokens + n > max_tokens:
+            pieces.append((cur_start, s))
+            cur_start, cur_tokens = None, 0
+        if cur_start is None:
+            cur_start = s
+        cur_tokens += n
+    if cur_start is not None:
+        pieces.append((cur_start, end))
+    return [span for span in (_strip_span(text, s, e) for s, e in pieces) if span[1] > span[0]]
+
+
+def chunk_text(text: str, max_tokens: int = MAX_TOKENS, overlap_tokens: int = OVERLAP_TOKENS,
+               count: Optional[Callable[[list[str]], list[int]]] = None) -> list[TextChunk]:
+    """Pack sentences into chunks of at most `max_tokens` tokens.
+
+    Offsets index into `text` as given; the chunk text is that slice with
+    runs of spaces collapsed. `count(texts)` → token counts, default
+    ENCODING.
+    """
+    count = count or _count_batch
+    min_section = min(MIN_SECTION_TOKENS, max_tokens // 4)
+    units = _units(text)
+    if not units:
+        return []
+    counts = count([text[s:e] for s, e, _ in units])
+
+    # (start, end, tokens, is_heading), long units pre-split
+    spans: list[tuple[int, int, int, bool]] = []
+    for (s, e, heading), n in zip(units, counts):
+        if n <= max_tokens:
+            spans.append((s, e, n, heading))
+            continue
+        pieces = _split_long(text, s, e, max_tokens, count)
+        piece_counts = count([text[ps:pe] for ps, pe in pieces])
+        spans.extend((ps, pe, pn, False) for (ps, pe), pn in zip(pieces, piece_counts))
+
+    groups: list[list[tuple[int, int, int, bool]]] = []
+    cur: list[tuple[int, int, int, bool]] = []
+    cur_tokens = 0
+    carried = 0          # cur 앞부분 중 overlap 으로 넘어온 unit 수
+
+    for span in spans:
+        n, heading = span[2], span[3]
+        cost = n + (1 if cur else 0)     # unit 사이 공백/개행 몫
+        if heading:
+            body = cur[carried:]
+            body_tokens = sum(u[2] for u in body if not u[3])
+            if body_tokens >= min_section or cur_tokens + cost > max_tokens:
+                if body:
+                    groups.append(cur)
+                cur, cur_tokens, carried = [], 0, 0
+                cost = n
+            elif body_tokens == 0:
+                cur = body      # 연속된 제목은 함께 두고, 이전 섹션 overlap 은 버림
+                cur_tokens = sum(u[2] + 1 for u in cur)
+                carried = 0
+                cost = n + (1 if cur else 0)
+        elif cur and cur_tokens + cost > max_tokens:
+            groups.append(cur)
+            tail: list[tuple[int, int, int, bool]] = []
+            tail_tokens = 0
+            for prev in reversed(cur):
+                if prev[3] or tail_tokens + prev[2] + 1 > overlap_tokens \
+                        or tail_tokens + prev[2] + n + 2 > max_tokens:
+                    break
+                tail.insert(0, prev)
+                tail_tokens += prev[2] + 1
+            cur, cur_tokens, carried = tail, tail_tokens, len(tail)
+            cost = n + (1 if cur else 0)
+        cur.append(span)
+        cur_tokens += cost
+    if len(cur) > carried:
+        groups.append(cur)
+
+    texts = [_normalize(text[g[0][0]:g[-1][1]]) for g in groups]
+    token_counts = count(texts)
+    return [
+        TextChunk(text=t, char_start=g[0][0], char_end=g[-1][1], tokens=n)
+        for g, t, n in zip(groups, texts, token_counts)
+    ]
+
+
+def _join_pages(pages: list[tuple[int, str]]) -> tuple[str, list[int], list[int]]:
+    starts: list[int] = []
+    numbers: list[int] = []
+    parts: list[str] = []
+    offset = 0
+    for page_no, page_text in pages:
+        starts.append(offset)
+        numbers.append(page_no)
+        parts.append(page_text)
+        offset += len(page_text) + len(PAGE_SEPARATOR)
+    return PAGE_SEPARATOR.join(parts), starts, numbers
+
+
+def _assign_pages(chunks: list[TextChunk], starts: list[int], numbers: list[int]) -> None:
+    for c in chunks:
+        c.page = numbers[bisect.bisect_right(starts, c.char_start) - 1]
+        c.page_end = numbers[bisect.bisect_right(starts, c.char_end - 1) - 1]
+
+
+def chunk_pages(pages: list[tuple[int, str]], max_tokens: int = MAX_TOKENS,
+                overlap_tokens: int = OVERLAP_TOKENS) -> list[TextChunk]:
+    """Chunk a paged document as one text so chunks may span pages.
+
+    Offsets index into the pages joined with PAGE_SEPARATOR; `page` and
+    `page_end` are the first and last page a chunk touches.
+    """
+    text, starts, numbers = _join_pages(pages)
+    chunks = chunk_text(text, max_tokens, overlap_tokens)
+    _assign_pages(chunks, starts, numbers)
+    return chunks
+
+
+def chunk_hierarchy(text: str, parent_tokens: int = PARENT_TOKENS,
+                    child_tokens: int = CHILD_TOKENS,
+                    child_overlap: int = CHILD_OVERLAP_TOKENS,
+                    child_count: Optional[Callable[[list[str]], list[int]]] = None,
+                    ) -> list[tuple[TextChunk, list[TextChunk]]]:
+    """Two-level split: non-overlapping parents, each re-split into children.
+
+    Child offsets are absolute (same coordinates as the parent's), so a
+    child never crosses its parent's boundary. Parents are sized in
+    ENCODING tokens (Writer context), children with `child_count` when given.
+    """
+    out = []
+    for parent in chunk_text(text, parent_tokens, 0):
+        children = chunk_text(text[parent.char_start:parent.char_end], child_tokens, child_overlap,
+                              count=child_count)
+        for c in children:
+            c.char_start += parent.char_start
+            c.char_end += parent.char_start
+        out.append((parent, children))
+    return out
+
+
+def chunk_pages_hierarchy(pages: list[tuple[int, str]], parent_tokens: int = PARENT_TOKENS,
+                          child_tokens: int = CHILD_TOKENS,
+                          child_overlap: int = CHILD_OVERLAP_TOKENS,
+                          child_count: Optional[Callable[[list[str]], list[int]]] = None,
+                          ) -> list[tuple[TextChunk, list[TextChunk]]]:
+    """`chunk_hierarchy` for a paged document; parents and children get page spans."""
+    text, starts, numbers = _join_pages(pages)
+    out = chunk_hierarchy(text, parent_tokens, child_tokens, child_overlap, child_count)
+    for parent, children in out:
+        _assign_pages([parent, *children], starts, numbers)
+    return out
@@ -0,0 +1,326 @@
+"""Token-budgeted context packing for the Writer.
+
+`writer_stream` used to paste every tool result (cut at 1,200 characters)
+into the prompt. Heavy multi-tool runs — `kosis_data` tables, full
+`naver_blog_read` pages, several documents steps re-citing the same
+section — made the prompt large and slowed time-to-first-token, while the
+1,200-character cut dropped the tail of useful results at random.
+
+This module packs the collected results into one block under a per-model
+token budget:
+
+- Exact duplicates (same tool, args and result) are kept once; citation
+  blocks from `format_chunks_for_writer` that overlap an earlier block
+  (≥ DEDUPE_CONTAINMENT of its 5-char shingles) are dropped
+- JSON results are compacted: lists of objects become `a | b | c` tables
+  with one header row (long cells trimmed), nested objects flatten to
+  `key.sub: value`, empty values are dropped
+- Results are ranked by term overlap with the question (documents results
+  first — the Retriever already graded them; failed calls, `ok` False in
+  the collected entry, last) and emitted in that order
+- When the total is over budget, every result gets an equal share
+  (water-filling: small results keep everything, the rest is split among
+  the large ones). If a share would fall under MIN_RESULT_TOKENS, the
+  lowest-ranked results are dropped instead
+- Cuts happen on whole rows / lines / citation blocks (a long body line is
+  cut to the remaining room) and leave an explicit `…[생략: …]` marker, so
+  the Writer knows the data is partial
+
+Public API:
+- budget_for(model) → int
+- pack_tool_results(question, tool_results, model, tracer) → str
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+
+from config import WRITER_CONTEXT_BUDGET
+from services.chunker import count_tokens
+
+# 모델별 [수집된 정보] 토큰 예산 — 작은 모델일수록 짧게 (TTFT·비용)
+CONTEXT_BUDGETS: dict[str, int] = {
+    "gpt-5.5-nano": 4000,
+    "gpt-4.1-nano": 4000,
+    "gpt-4o-mini": 6000,
+    "gpt-4.1-mini": 8000,
+    "gpt-5-mini": 8000,
+    "gpt-5.5-mini": 8000,
+    "gpt-4o": 10000,
+    "gpt-4.1": 10000,
+    "gpt-5.5": 12000,
+}
+DEFAULT_BUDGET = 6000
+MIN_RESULT_TOKENS = 150      # 이보다 적게 줄 바엔 결과를 통째로 뺌
+MAX_CELL_CHARS = 200         # 표 칸 하나의 최대 길이
+MAX_ARGS_CHARS = 120
+DEDUPE_CONTAINMENT = 0.8
+PARTIAL_MIN_TOKENS = 100     # 남은 자리가 이 이상이면 다음 단위를 잘라서라도 채움
+MARKER_TOKENS = 20
+
+_CITATION_RE = re.compile(r"^\[\d+\] [^\n]+$", re.MULTILINE)
+_TERM_RE = re.compile(r"[0-9A-Za-z]+|[가-힣]+")
+
+
+@dataclass
+class _Block:
+    index: int                   # 원래 순서
+    header: str
+    units: list[str]             # 잘라도 되는 단위 (표 행 / 줄 / 인용 block)
+    sep: str = "\n"
+    score: float = 0.0
+    compressed: bool = False
+    unit_tokens: list[int] = field(default_factory=list)
+
+    @property
+    def tokens(self) -> int:
+        return count_tokens(self.header) + sum(self.unit_tokens) + len(self.unit_tokens)
+
+
+def budget_for(model: str | None) -> int:
+    """Token budget for the Writer's tool-result block (longest matching model prefix)."""
+    if WRITER_CONTEXT_BUDGET > 0:
+        return WRITER_CONTEXT_BUDGET
+    if not model:
+        return DEFAULT_BUDGET
+    matches = [k for k in CONTEXT_BUDGETS if model.startswith(k)]
+    return CONTEXT_BUDGETS[max(matches, key=len)] if matches else DEFAULT_BUDGET
+
+
+# ── JSON → compact text ──────────────────────────────────────
+
+def _cell(value, limit: int = MAX_CELL_CHARS) -> str:
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    text = re.sub(r"\s+", " ", str(value)).strip()
+    return text if not limit or len(text) <= limit else text[:limit] + "…"
+
+
+def _empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _table(rows: list[dict]) -> list[str]:
+    columns: list[str] = []
+    for row in rows:
+        for key, value in row.items():
+            if key not in columns and not _empty(value):
+                columns.append(key)
+    lines = [" | ".join(columns)]
+    for row in rows:
+        lines.append(" | ".join("" if _empty(row.get(c)) else _cell(row.get(c)) for c in columns))
+    return lines
+
+
+def _compact(value, prefix: str = "") -> list[str]:
+    """Flatten parsed JSON into lines; lists of objects become tables."""
+    if isinstance(value, dict):
+        lines: list[str] = []
+        for key, sub in value.items():
+            if _empty(sub):
+                continue
+            name = f"{prefix}.{key}" if prefix else str(key)
+            if isinstance(sub, (dict, list)):
+                lines.extend(_compact(sub, name))
+            else:
+                lines.append(f"{name}: {_cell(sub, limit=0)}")   # 본문은 예산으로만 자름
+        return lines
+    if isinstance(value, list):
+        items = [v for v in value if not _empty(v)]
+        rows = [v for v in items if isinstance(v, dict)]
+        notes = [v for v in items if not isinstance(v, dict)]
+        # 객체 배열 (+ registry 가 붙인 "… 외 N건" 같은 문자열) → 표
+        if rows and all(isinstance(v, str) for v in notes):
+            head = [f"{prefix} ({len(rows)}건)"] if prefix else [f"({len(rows)}건)"]
+            return head + _table(rows) + notes
+        if all(not isinstance(v, (dict, list)) for v in items):
+            return [f"{prefix}: " + ", ".join(_cell(v) for v in items)] if prefix else [", ".join(_cell(v) for v in items)]
+        lines = []
+        for i, sub in enumerate(items):
+            lines.extend(_compact(sub, f"{prefix}[{i}]"))
+        return lines
+    return [f"{prefix}: {_cell(value)}" if prefix else _cell(value)]
+
+
+def _result_units(result: str) -> tuple[list[str], bool]:
+    """Split one tool result into cuttable units; (units, json_compressed)."""
+    text = result.strip()
+    if text[:1] in "{[":
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError:
+            parsed = None
+        if parsed is not None:
+            return _compact(parsed) or ["(빈 결과)"], True
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines()]
+    return [line for line in lines if line] or ["(빈 결과)"], False
+
+
+def _citation_units(result: str) -> list[str]:
+    """Split a `format_chunks_for_writer` payload into its `[n] 출처` blocks."""
+    starts = [m.start() for m in _CITATION_RE.finditer(result)]
+    if not starts:
+        return [result.strip()] if result.strip() else []
+    starts.append(len(result))
+    return [result[a:b].strip() for a, b in zip(starts, starts[1:])]
+
+
+# ── dedupe / rank ────────────────────────────────────────────
+
+def _shingles(text: str, n: int = 5) -> set[str]:
+    body = re.sub(r"\s+", "", text.split("\n", 1)[-1])
+    return {body[i:i + n] for i in range(max(1, len(body) - n + 1))}
+
+
+def _terms(text: str) -> set[str]:
+    """Lower-cased words plus Hangul bigrams (no morphological analyzer needed)."""
+    terms: set[str] = set()
+    for word in _TERM_RE.findall(text.lower()):
+        if "가" <= word[0] <= "힣" and len(word) > 1:
+            terms.update(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            terms.add(word)
+    return terms
+
+
+def _relevance(question_terms: set[str], block: _Block, domain: str, is_error: bool) -> float:
+    if is_error:
+        return -1.0
+    overlap = len(question_terms & _terms(block.header + " " + " ".join(block.units)))
+    score = overlap / len(question_terms) if question_terms else 0.0
+    return score + (1.0 if domain == "documents" else 0.0)
+
+
+# ── budget ───────────────────────────────────────────────────
+
+def _fair_share(sizes: list[int], budget: int) -> int:
+    """Largest cap c with sum(min(size, c)) ≤ budget."""
+    remaining, left = budget, len(sizes)
+    for size in sorted(sizes):
+        if size * left <= remaining:
+            remaining -= size
+            left -= 1
+        else:
+            return remaining // left
+    return max(sizes, default=0)
+
+
+def _cut_text(text: str, max_tokens: int) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+    end = len(text)
+    while end > 0 and count_tokens(text[:end]) > max_tokens:
+        end = int(end * 0.8)
+    return text[:end].rstrip() + "…"
+
+
+def _truncate(block: _Block, max_tokens: int) -> tuple[str, int]:
+    """Render `block` within `max_tokens`; returns (text, tokens omitted)."""
+    used = count_tokens(block.header) + MARKER_TOKENS
+    kept: list[str] = []
+    omitted = 0
+    for i, (unit, n) in enumerate(zip(block.units, block.unit_tokens)):
+        if used + n + 1 > max_tokens:
+            room = max_tokens - used - 1
+            # 긴 본문은 남은 자리만큼 잘라 넣음 — 첫 단위는 항상
+            if not kept or room >= PARTIAL_MIN_TOKENS:
+                cut = _cut_text(unit, max(room, 20))
+                kept.append(cut)
+                omitted += n - count_tokens(cut)
+                i += 1
+            omitted += sum(block.unit_tokens[i:])
+            dropped = len(block.units) - i
+            marker = f"…[생략: {dropped}개 항목, 약 {omitted} 토큰]" if dropped else f"…[생략: 약 {omitted} 토큰]"
+            return f"{block.header}\n{block.sep.join(kept)}{block.sep}{marker}", omitted
+        kept.append(unit)
+        used += n + 1
+    return f"{block.header}\n{block.sep.join(kept)}", 0
+
+
+def pack_tool_results(question: str, tool_results: list[dict],
+                      model: str | None = None, tracer=None) -> str:
+    """Pack tool results for the Writer prompt under the model's token budget.
+
+    Decisions (budget, tokens before / after, dropped and truncated tools,
+    deduped citation blocks) go to `tracer.annotate("writer", ...)`.
+    """
+    if not tool_results:
+        return "(수집된 도구 결과 없음)"
+    budget = budget_for(model)
+    question_terms = _terms(question)
+
+    blocks: list[_Block] = []
+    seen_results: set[tuple[str, str, str]] = set()
+    seen_shingles: list[set[str]] = []
+    exact_dupes = deduped_citations = raw_tokens = 0
+
+    for i, r in enumerate(tool_results):
+        result = r.get("result") or ""
+        args = json.dumps(r.get("args", {}), ensure_ascii=False, sort_keys=True)
+        key = (r.get("tool", ""), args, result)
+        if key in seen_results:
+            exact_dupes += 1
+            continue
+        seen_results.add(key)
+        raw_tokens += count_tokens(result)
+
+        if len(args) > MAX_ARGS_CHARS:
+            args = args[:MAX_ARGS_CHARS] + "…"
+        header = f"[{r.get('domain', '')}] {r.get('tool', '')}({args})"
+        if r.get("domain") == "documents":
+            units = []
+            for unit in _citation_units(result):
+                sh = _shingles(unit)
+                if any(len(sh & prev) >= DEDUPE_CONTAINMENT * len(sh) for prev in seen_shingles):
+                    deduped_citations += 1
+                    continue
+                seen_shingles.append(sh)
+                units.append(unit)
+            if not units:
+                continue
+            block = _Block(i, header, units, sep="\n\n")
+        else:
+            units, compressed = _result_units(result)
+            block = _Block(i, header, units, compressed=compressed)
+        block.unit_tokens = [count_tokens(u) for u in block.units]
+        block.score = _relevance(question_terms, block, r.get("domain", ""), not r.get("ok", True))
+        blocks.append(block)
+
+    blocks.sort(key=lambda b: (-b.score, b.index))
+    sizes = [b.tokens for b in blocks]
+    dropped_tools: list[str] = []
+    while blocks and sum(sizes) > budget and _fair_share(sizes, budget) < MIN_RESULT_TOKENS \
+            and len(blocks) > 1:
+        dropped_tools.append(blocks.pop().header.split("(", 1)[0])
+        sizes.pop()
+    cap = _fair_share(sizes, budget) if sum(sizes) > budget else max(sizes, default=0)
+
+    parts: list[str] = []
+    truncated: list[dict] = []
+    for block, size in zip(blocks, sizes):
+        if size <= cap:
+            parts.append(f"{block.header}\n{block.sep.join(block.units)}")
+            continue
+        text, omitted = _truncate(block, cap)
+        truncated.append({"tool": block.header.split("(", 1)[0], "omitted_tokens": omitted})
+        parts.append(text)
+    if dropped_tools:
+        parts.append(f"…[생략: 관련도가 낮은 도구 결과 {len(dropped_tools)}개 — {', '.join(dropped_tools)}]")
+    packed = "\n\n".join(parts)
+
+    if tracer:
+        tracer.annotate("writer", {
+            "context_budget": budget,
+            "raw_tokens": raw_tokens,
+            "packed_tokens": count_tokens(packed),
+            "results": len(tool_results),
+            "kept": len(blocks),
+            "exact_duplicates": exact_dupes,
+            "deduped_citations": deduped_citations,
+            "json_compressed": sum(b.compressed for b in blocks),
+            "truncated": truncated,
+            "dropped": dropped_tools,
+        })
+    return packed
@@ -6,34 +6,67 @@ came from.
 
 Design choices:
 - Persistent ChromaDB at `./chroma_data/` (committed to .gitignore)
-- OpenAI text-embedding-3-small (1536 dims, cheap)
+- Embeddings from `services/embedders.py` — OpenAI text-embedding-3-small
+  (default) or a local sentence-transformers model (`EMBEDDER=local`).
+  Each embedder gets its own collection, and the collection metadata
+  records the embedder that built it; opening it with another one fails
 - Cosine similarity (Chroma default)
 - One collection per project — single-user demo, not multi-tenant
+- Small-to-big: Chroma holds small child chunks; their parent sections
+  live in `services/parent_store.py` (SQLite) and are joined in by the
+  Writer formatting, not by extra vector queries
+- Every Chroma call goes through `services/chroma_async.py` (thread pool,
+  serialized writes) so searches and uploads don't block the event loop
+- Query embeddings take priority over ingestion batches (OpenAI: shared
+  token budget, local: a thread kept free for queries)
 """
 
 from __future__ import annotations
 
 import os
+import re
 import uuid
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 
 import chromadb
-from openai import AsyncOpenAI
 
-_client = AsyncOpenAI()
+from services import chroma_async, parent_store
+from services.embedders import OPENAI_MODEL, Embedder, get_embedder
 
 CHROMA_PATH = os.path.join(os.path.dirname(__file__), "..", "chroma_data")
 os.makedirs(CHROMA_PATH, exist_ok=True)
 
 COLLECTION_NAME = "k_agent_docs"
-EMBEDDING_MODEL = "text-embedding-3-small"
+LEGACY_EMBEDDER = f"openai:{OPENAI_MODEL}"   # embedder 기록 이전에 만든 collection
 
+
+def collection_name_for(embedder: Embedder) -> str:
+    """Default OpenAI embedder keeps the original name; others get a suffix."""
+    if embedder.name == LEGACY_EMBEDDER:
+        return COLLECTION_NAME
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", embedder.name).strip("-")
+    return f"{COLLECTION_NAME}__{slug}"[:63].rstrip("-_")
+
+
+def open_collection(client, embedder: Embedder, name: Optional[str] = None):
+    """get_or_create the embedder's collection; refuse one built by another embedder."""
+    collection = client.get_or_create_collection(
+        name=name or collection_name_for(embedder),
+        metadata={"hnsw:space": "cosine", "embedder": embedder.name, "dims": embedder.dims},
+    )
+    built_by = (collection.metadata or {}).get("embedder", LEGACY_EMBEDDER)
+    if built_by != embedder.name:
+        raise RuntimeError(
+            f"collection '{collection.name}' 은 {built_by} 로 만들어졌습니다 — "
+            f"현재 embedder {embedder.name} 와 벡터 공간이 다릅니다"
+        )
+    return collection
+
+
+_embedder = get_embedder()
 _chroma = chromadb.PersistentClient(path=CHROMA_PATH)
-_collection = _chroma.get_or_create_collection(
-    name=COLLECTION_NAME,
-    metadata={"hnsw:space": "cosine"},
-)
+_collection = open_collection(_chroma, _embedder)
 
 
 @dataclass
@@ -45,33 +78,47 @@ class Chunk:
     chunk_index: int
     page: Optional[int] = None
     score: Optional[float] = None
+    page_end: Optional[int] = None      # PDF chunk 가 여러 페이지에 걸칠 때 마지막 페이지
+    char_start: Optional[int] = None    # 원문(PDF 는 페이지를 이어 붙인 텍스트) 기준 오프셋
+    char_end: Optional[int] = None
+    parent_id: Optional[str] = None     # parent_store 의 섹션 (small-to-big)
+    content_hash: Optional[str] = None  # 원본 파일 sha256 (업로드 중복 확인)
 
 
 async def embed_one(text: str) -> list[float]:
-    """Embed a single string."""
-    resp = await _client.embeddings.create(model=EMBEDDING_MODEL, input=text)
-    return resp.data[0].embedding
+    """Embed a single string (query priority)."""
+    return (await _embedder.embed([text], kind="query"))[0]
 
 
-async def embed_many(texts: list[str]) -> list[list[float]]:
-    """Batch-embed multiple strings (OpenAI accepts up to ~2048 inputs)."""
+async def embed_many(texts: list[str], on_progress=None, kind: str = "query") -> list[list[float]]:
+    """Batch-embed multiple strings with the configured embedder.
+
+    on_progress(done, total) — optional, called after each batch.
+    kind — "ingest" batches yield the shared token budget to queries.
+    """
     if not texts:
         return []
     out: list[list[float]] = []
     BATCH = 96
     for i in range(0, len(texts), BATCH):
-        batch = texts[i:i + BATCH]
-        resp = await _client.embeddings.create(model=EMBEDDING_MODEL, input=batch)
-        out.extend(d.embedding for d in resp.data)
+        out.extend(await _embedder.embed(texts[i:i + BATCH], kind=kind))
+        if on_progress:
+            on_progress(len(out), len(texts))
     return out
 
 
-async def add_chunks(chunks: list[Chunk]) -> int:
+def chunk_budget(child_tokens: int) -> tuple[int, Optional[Callable[[list[str]], list[int]]]]:
+    """Child chunk (budget, token counter) for the configured embedder — see Embedder.chunk_budget."""
+    return _embedder.chunk_budget(child_tokens)
+
+
+async def add_chunks(chunks: list[Chunk], on_progress=None) -> int:
     """Embed and persist chunks. Returns number added."""
     if not chunks:
         return 0
-    embeddings = await embed_many([c.text for c in chunks])
-    _collection.add(
+    embeddings = await embed_many([c.text for c in chunks], on_progress, kind="ingest")
+    await chroma_async.write(
+        _collection.add,
         ids=[c.id for c in chunks],
         embeddings=embeddings,
         documents=[c.text for c in chunks],
@@ -80,11 +127,22 @@ async def add_chunks(chunks: list[Chunk]) -> int:
             "doc_name": c.doc_name,
             "chunk_index": c.chunk_index,
             "page": c.page if c.page is not None else -1,
+            "page_end": c.page_end if c.page_end is not None else -1,
+            "char_start": c.char_start if c.char_start is not None else -1,
+            "char_end": c.char_end if c.char_end is not None else -1,
+            "parent_id": c.parent_id or "",
+            "content_hash": c.content_hash or "",
         } for c in chunks],
     )
     return len(chunks)
 
 
+def _optional_int(meta: dict, key: str) -> Optional[int]:
+    """Chroma metadata can't hold None — -1 (or a missing key) means unset."""
+    value = meta.get(key, -1)
+    return int(value) if value is not None and value != -1 else None
+
+
 async def search(
     query: str,
     top_k: int = 5,
@@ -93,7 +151,8 @@ async def search(
     """Vector search. Optionally scoped to a specific document."""
     embedding = await embed_one(query)
     where = {"doc_id": doc_id} if doc_id else None
-    res = _collection.query(
+    res = await chroma_async.read(
+        _collection.query,
         query_embeddings=[embedding],
         n_results=top_k,
         where=where,
@@ -115,14 +174,17 @@ async def search(
             doc_id=meta.get("doc_id", ""),
             doc_name=meta.get("doc_name", ""),
             chunk_index=int(meta.get("chunk_index", 0)),
-            page=int(meta.get("page", -1)) if meta.get("page", -1) != -1 else None,
+            page=_optional_int(meta, "page"),
             score=score,
+            page_end=_optional_int(meta, "page_end"),
+            char_start=_optional_int(meta, "char_start"),
+            char_end=_optional_int(meta, "char_end"),
+            parent_id=meta.get("parent_id") or None,
         ))
     return chunks
 
 
-def list_documents() -> list[dict]:
-    """List unique documents currently indexed."""
+def _list_documents_sync() -> list[dict]:
     all_metas = _collection.get(include=["metadatas"]).get("metadatas", [])
     by_doc: dict[str, dict] = {}
     for m in all_metas:
@@ -139,27 +201,60 @@ def list_documents() -> list[dict]:
     return list(by_doc.values())
 
 
-def delete_document(doc_id: str) -> int:
-    """Remove all chunks for a given document. Returns count deleted."""
+async def list_documents() -> list[dict]:
+    """List unique documents currently indexed."""
+    return await chroma_async.read(_list_documents_sync)
+
+
+def _delete_document_sync(doc_id: str) -> int:
     res = _collection.get(where={"doc_id": doc_id}, include=[])
     ids = res.get("ids", [])
     if ids:
         _collection.delete(ids=ids)
+    parent_store.delete_document(doc_id)
     return len(ids)
 
 
-def collection_stats() -> dict:
-    """Quick stats for /api/documents."""
-    count = _collection.count()
+async def delete_document(doc_id: str) -> int:
+    """Remove all chunks for a given document. Returns count deleted."""
+    return await chroma_async.write(_delete_document_sync, doc_id)
+
+
+def _collection_stats_sync() -> dict:
     return {
-        "total_chunks": count,
-        "documents": list_documents(),
+        "total_chunks": _collection.count(),
+        "total_parents": parent_store.stats()["parents"],
+        "collection": _collection.name,
+        **_embedder.info(),
+        "documents": _list_documents_sync(),
     }
 
 
+async def collection_stats() -> dict:
+    """Quick stats for /api/documents."""
+    return await chroma_async.read(_collection_stats_sync)
+
+
+def _find_by_hash_sync(content_hash: str) -> Optional[dict]:
+    res = _collection.get(where={"content_hash": content_hash}, limit=1, include=["metadatas"])
+    metas = res.get("metadatas") or []
+    if not metas:
+        return None
+    return {"doc_id": metas[0].get("doc_id", ""), "doc_name": metas[0].get("doc_name", "")}
+
+
+async def find_by_hash(content_hash: str) -> Optional[dict]:
+    """{doc_id, doc_name} of an indexed document with this file sha256, or None."""
+    return await chroma_async.read(_find_by_hash_sync, content_hash)
+
+
 def new_doc_id() -> str:
     return f"doc-{uuid.uuid4().hex[:10]}"
 
 
 def new_chunk_id(doc_id: str, idx: int) -> str:
     return f"{doc_id}::c{idx}"
+
+
+def new_parent_id(doc_id: str, idx: int) -> str:
+    return f"{doc_id}::p{idx}"
@@ -0,0 +1,113 @@
+"""Shared embedding token budget — queries first, ingestion gets the rest.
+
+Chat questions (retriever search, answer cache lookup) and document
+ingestion call the same embeddings endpoint under one per-minute token
+limit. A large PDF sends hundreds of 96-chunk batches back to back; without
+a budget it ate the whole limit and chat searches hit 429s or queued behind
+it.
+
+Design choices:
+- One token bucket sized EMBED_TOKENS_PER_MIN, refilled continuously
+- Queries never wait on ingestion: they take their tokens immediately and
+  only wait if the bucket is already overdrawn (the API would refuse them
+  anyway)
+- Ingestion waits until the bucket keeps EMBED_QUERY_RESERVE of capacity
+  free *after* its batch, and whenever a query is waiting — so indexing
+  uses only what chat leaves over
+- Counting is by tiktoken (same tokenizer as the embedding model); the
+  bucket is local to the process, not a view of the server-side limit
+- Only the OpenAI embedder draws from it — the local embedder
+  (`services/embedders.py`) has no rate limit and reserves a thread instead
+
+Public API:
+- await acquire(tokens, kind)   # kind: "query" | "ingest"
+- budget_stats() → gauges for /api/metrics
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+EMBED_TOKENS_PER_MIN = int(os.environ.get("EMBED_TOKENS_PER_MIN", "1000000"))
+EMBED_QUERY_RESERVE = float(os.environ.get("EMBED_QUERY_RESERVE", "0.2"))
+MAX_SLEEP_S = 0.5    # 대기 중에도 query 도착을 자주 확인
+
+_capacity = float(EMBED_TOKENS_PER_MIN)
+_rate = _capacity / 60.0
+_level = _capacity
+_updated = time.monotonic()
+_queries_waiting = 0
+
+_stats = {
+    kind: {"tokens": 0, "calls": 0, "waits": 0, "wait_s": 0.0}
+    for kind in ("query", "ingest")
+}
+
+
+def _refill() -> None:
+    global _level, _updated
+    now = time.monotonic()
+    _level = min(_capacity, _level + (now - _updated) * _rate)
+    _updated = now
+
+
+async def _wait_query() -> None:
+    global _queries_waiting
+    _queries_waiting += 1
+    try:
+        while True:
+            _refill()
+            if _level >= 0:
+                return
+            await asyncio.sleep(min(MAX_SLEEP_S, -_level / _rate))
+    finally:
+        _queries_waiting -= 1
+
+
+async def _wait_ingest(tokens: int) -> None:
+    # 한 batch 가 예산 전체보다 크면 reserve 를 남길 수 없으니 여유분 전부로 제한
+    need = min(float(tokens), _capacity * (1 - EMBED_QUERY_RESERVE))
+    floor = _capacity * EMBED_QUERY_RESERVE
+    while True:
+        _refill()
+        if _queries_waiting == 0 and _level - need >= floor:
+            return
+        await asyncio.sleep(min(MAX_SLEEP_S, max(0.01, (floor + need - _level) / _rate)))
+
+
+async def acquire(tokens: int, kind: str) -> None:
+    """Take `tokens` from the shared bucket, waiting if `kind` must yield."""
+    global _level
+    s = _stats[kind]
+    t0 = time.perf_counter()
+    if kind == "query":
+        await _wait_query()
+    else:
+        await _wait_ingest(tokens)
+    waited = time.perf_counter() - t0
+    if waited > 0.001:
+        s["waits"] += 1
+        s["wait_s"] += waited
+    _level -= tokens
+    s["tokens"] += tokens
+    s["calls"] += 1
+
+
+def budget_stats() -> dict:
+    """Gauges for /api/metrics."""
+    _refill()
+    out: dict = {
+        "embed_budget_capacity_tokens": _capacity,
+        "embed_budget_available_tokens": round(_level),
+        "embed_tokens_total": [], "embed_calls_total": [],
+        "embed_budget_waits_total": [], "embed_budget_wait_seconds_total": [],
+    }
+    for kind, s in _stats.items():
+        labels = {"kind": kind}
+        out["embed_tokens_total"].append((labels, s["tokens"]))
+        out["embed_calls_total"].append((labels, s["calls"]))
+        out["embed_budget_waits_total"].append((labels, s["waits"]))
+        out["embed_budget_wait_seconds_total"].append((labels, round(s["wait_s"], 4)))
+    return out
@@ -0,0 +1,276 @@
+"""Embedding providers for the document store.
+
+`document_store` used to call OpenAI `text-embedding-3-small` directly, so
+indexing and search needed the network. An embedder is now chosen by
+config (`EMBEDDER`) and the collection records which one built it:
+
+- OpenAIEmbedder — `text-embedding-3-small` (1536d), 96 texts per request,
+  drawing from the shared token budget (`services/embed_budget.py`)
+- LocalEmbedder  — sentence-transformers on CPU, default
+  `paraphrase-multilingual-MiniLM-L12-v2` (384d, the model the top-level
+  `embedding_search.py` / `rag_pipeline.py` use). Embedding needs no
+  network once the model is in the local HF cache; the rest of the
+  backend counts tokens with tiktoken only when it can be loaded
+  (`services/chunker.py` falls back to a byte estimate)
+
+Design choices (local):
+- The model is loaded once per (name, ONNX flag), behind a lock —
+  like the relevance grader's cross-encoder
+- `EMBEDDER_ONNX=1` loads it with sentence-transformers' ONNX backend
+  (needs `optimum[onnxruntime]`); if that fails it falls back to torch
+- Encoding runs on a dedicated thread pool (EMBED_LOCAL_THREADS) in
+  batches of LOCAL_BATCH. Ingest batches may use all threads but one, so
+  a query embedding never waits behind a large upload
+- Vectors are L2-normalized, matching the collection's cosine space
+- Input limit: the model truncates anything past `max_seq_length` (128
+  for the default) without a word. `chunk_budget()` caps the child chunk
+  size at that limit and counts with the model's own tokenizer, so
+  ingestion cuts children the model can read in full
+
+Public API:
+- get_embedder() → the configured embedder (created once)
+- Embedder.name / .dims / await .embed(texts, kind)
+- Embedder.chunk_budget(child_tokens) → (budget, token counter or None)
+- embedder_stats() → throughput gauges for /api/metrics
+
+    py -m services.embedders bench --n 512              # 설정된 embedder 처리량
+    py -m services.embedders bench --embedder local --onnx
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from abc import ABC, abstractmethod
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from config import EMBEDDER, EMBEDDER_MODEL, EMBEDDER_ONNX
+from services import embed_budget
+from services.chunker import count_tokens
+
+OPENAI_MODEL = "text-embedding-3-small"
+OPENAI_BATCH = 96
+LOCAL_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+LOCAL_BATCH = 32
+EMBED_LOCAL_THREADS = int(os.environ.get("EMBED_LOCAL_THREADS", "2"))
+
+_stats: dict[str, dict] = {}
+
+
+def _record(name: str, texts: int, seconds: float) -> None:
+    s = _stats.setdefault(name, {"texts": 0, "calls": 0, "seconds": 0.0})
+    s["texts"] += texts
+    s["calls"] += 1
+    s["seconds"] += seconds
+
+
+class Embedder(ABC):
+    """Base: `name` goes into collection metadata; `dims` is the vector size."""
+
+    name: str = ""
+    dims: int = 0
+
+    @abstractmethod
+    async def embed(self, texts: list[str], kind: str = "query") -> list[list[float]]:
+        """Vectors for `texts`; `kind` is "query" or "ingest" (budget / thread share)."""
+
+    def chunk_budget(self, child_tokens: int) -> tuple[int, Optional[Callable[[list[str]], list[int]]]]:
+        """(token budget, counter) for chunks this embedder will embed.
+
+        None keeps the chunker's tokenizer (cl100k, the OpenAI models').
+        """
+        return child_tokens, None
+
+    def info(self) -> dict:
+        return {"embedder": self.name, "dims": self.dims}
+
+
+class OpenAIEmbedder(Embedder):
+    def __init__(self, model: str = OPENAI_MODEL, client=None):
+        if client is None:
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI()
+        self.client = client
+        self.model = model
+        self.name = f"openai:{model}"
+        self.dims = {"text-embedding-3-small": 1536, "text-embedding-3-large": 3072}.get(model, 0)
+
+    async def embed(self, texts: list[str], kind: str = "query") -> list[list[float]]:
+        out: list[list[float]] = []
+        for i in range(0, len(texts), OPENAI_BATCH):
+            batch = texts[i:i + OPENAI_BATCH]
+            await embed_budget.acquire(sum(count_tokens(t) for t in batch), kind)
+            t0 = time.perf_counter()
+            resp = await self.client.embeddings.create(model=self.model, input=batch)
+            _record(self.name, len(batch), time.perf_counter() - t0)
+            out.extend(d.embedding for d in resp.data)
+        return out
+
+
+_models: dict[tuple[str, bool], tuple[object, str]] = {}
+_load_lock = threading.Lock()
+
+
+def _load_local(model_name: str, onnx: bool) -> tuple[object, str]:
+    """(SentenceTransformer, backend actually used), loaded once. Blocking."""
+    key = (model_name, onnx)
+    if key in _models:
+        return _models[key]
+    with _load_lock:
+        if key not in _models:
+            from sentence_transformers import SentenceTransformer
+            if onnx:
+                try:
+                    _models[key] = (SentenceTransformer(model_name, device="cpu", backend="onnx"), "onnx")
+                    return _models[key]
+                except Exception as e:
+                    print(f"  [embedders] ONNX 로드 실패 → torch 사용 ({e})")
+            _models[key] = (SentenceTransformer(model_name, device="cpu"), "torch")
+    return _models[key]
+
+
+class LocalEmbedder(Embedder):
+    def __init__(self, model: str = LOCAL_MODEL, onnx: bool = False, threads: int = EMBED_LOCAL_THREADS):
+        self.model_name = model
+        self.onnx = onnx
+        # ONNX 와 torch 는 같은 벡터를 만드므로 name (= collection) 은 같음
+        self.name = f"local:{model}"
+        self.dims = 0                       # 모델을 읽은 뒤 채움
+        self.backend = "onnx" if onnx else "torch"
+        self._threads = max(1, threads)
+        self._pool = ThreadPoolExecutor(max_workers=self._threads, thread_name_prefix="embed")
+        self._ingest_slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._budget_warned = False
+
+    def load(self):
+        model, self.backend = _load_local(self.model_name, self.onnx)
+        self.dims = model.get_sentence_embedding_dimension()
+        return model
+
+    def info(self) -> dict:
+        return {**super().info(), "backend": self.backend, "threads": self._threads}
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        """Token counts in the model's own tokenizer, without [CLS] / [SEP]."""
+        ids = self.load().tokenizer(texts, add_special_tokens=False, verbose=False)["input_ids"]
+        return [len(x) for x in ids]
+
+    def chunk_budget(self, child_tokens: int) -> tuple[int, Optional[Callable[[list[str]], list[int]]]]:
+        limit = self.load().max_seq_length - 2          # [CLS] / [SEP]
+        if child_tokens > limit and not self._budget_warned:
+            self._budget_warned = True
+            print(f"  [embedders] {self.model_name} 입력 한도 {limit} 토큰 → child chunk {child_tokens} → {limit} 토큰")
+        return min(child_tokens, limit), self.count_batch
+
+    def _encode(self, texts: list[str]) -> list[list[float]]:
+        model = self.load()
+        t0 = time.perf_counter()
+        vecs = model.encode(texts, batch_size=LOCAL_BATCH, normalize_embeddings=True,
+                            convert_to_numpy=True, show_progress_bar=False)
+        _record(self.name, len(texts), time.perf_counter() - t0)
+        return vecs.tolist()
+
+    def _slot(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop is not self._slots_loop:
+            self._ingest_slots = asyncio.Semaphore(max(1, self._threads - 1))
+            self._slots_loop = loop
+        return self._ingest_slots
+
+    async def embed(self, texts: list[str], kind: str = "query") -> list[list[float]]:
+        loop = asyncio.get_running_loop()
+        out: list[list[float]] = []
+        for i in range(0, len(texts), LOCAL_BATCH):
+            batch = texts[i:i + LOCAL_BATCH]
+            if kind == "query":
+                out.extend(await loop.run_in_executor(self._pool, self._encode, batch))
+                continue
+            async with self._slot():
+                out.extend(await loop.run_in_executor(self._pool, self._encode, batch))
+        return out
+
+
+def make_embedder(kind: str = EMBEDDER, model: str = EMBEDDER_MODEL, onnx: bool = EMBEDDER_ONNX) -> Embedder:
+    if kind == "local":
+        return LocalEmbedder(model or LOCAL_MODEL, onnx=onnx)
+    if kind == "openai":
+        return OpenAIEmbedder(model or OPENAI_MODEL)
+    raise ValueError(f"알 수 없는 EMBEDDER: {kind} (openai | local)")
+
+
+_embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    global _embedder
+    if _embedder is None:
+        _embedder = make_embedder()
+        if isinstance(_embedder, LocalEmbedder):
+            _embedder.load()                # dims 를 collection metadata 에 기록
+    return _embedder
+
+
+def embedder_stats() -> dict:
+    """Gauges for /api/metrics."""
+    out: dict[str, list] = {"embed_texts_total": [], "embed_seconds_total": [], "embed_texts_per_second": []}
+    for name, s in _stats.items():
+        labels = {"embedder": name}
+        out["embed_texts_total"].append((labels, s["texts"]))
+        out["embed_seconds_total"].append((labels, round(s["seconds"], 4)))
+        out["embed_texts_per_second"].append((labels, round(s["texts"] / s["seconds"], 1) if s["seconds"] else 0.0))
+    return out
+
+
+def _bench_texts(n: int) -> list[str]:
+    base = [
+        "트랜스포머는 어텐션 메커니즘만으로 시퀀스를 처리하는 모델이다.",
+        "검색 증강 생성은 외부 문서를 찾아 LLM 의 답변 근거로 사용한다.",
+        "청크 크기가 작을수록 검색 정밀도는 오르지만 문맥은 줄어든다.",
+        "벡터 데이터베이스는 근사 최근접 이웃 탐색으로 유사한 임베딩을 찾는다.",
+    ]
+    return [f"{base[i % len(base)]} ({i})" for i in range(n)]
+
+
+async def run_bench(embedder: Embedder, n: int) -> dict:
+    texts = _bench_texts(n)
+    if isinstance(embedder, LocalEmbedder):
+        await asyncio.to_thread(embedder.load)      # 로딩 시간은 처리량에서 제외
+    t0 = time.perf_counter()
+    vecs = await embedder.embed(texts, kind="ingest")
+    elapsed = time.perf_counter() - t0
+    t1 = time.perf_counter()
+    await embedder.embed([texts[0]], kind="query")
+    query_ms = (time.perf_counter() - t1) * 1000
+    _, counter = embedder.chunk_budget(0)
+    counts = counter(texts) if counter else [count_tokens(t) for t in texts]
+    return {
+        **embedder.info(),
+        "dims": len(vecs[0]) if vecs else embedder.dims,
+        "texts": n,
+        "seconds": round(elapsed, 3),
+        "texts_per_s": round(n / elapsed, 1) if elapsed else 0.0,
+        "tokens_per_s": round(sum(counts) / elapsed, 1) if elapsed else 0.0,
+        "query_ms": round(query_ms, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="임베딩 provider 처리량 측정")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    bench = sub.add_parser("bench")
+    bench.add_argument("--embedder", default=EMBEDDER, choices=["openai", "local"])
+    bench.add_argument("--model", default=EMBEDDER_MODEL)
+    bench.add_argument("--onnx", action="store_true", default=EMBEDDER_ONNX)
+    bench.add_argument("--n", type=int, default=512)
+    args = parser.parse_args()
+    embedder = make_embedder(args.embedder, args.model, args.onnx)
+    print(asyncio.run(run_bench(embedder, args.n)))
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ Key changes vs week 10:
 """
 
 import asyncio
+import time
 from typing import AsyncGenerator
 
 from agents.state import GraphState
@@ -32,6 +33,8 @@ from agents.retriever import run_retriever, format_chunks_for_writer
 from agents.writer import writer_stream
 from agents.critic import critic_node, build_revision_feedback, PASS_THRESHOLD, MAX_REVISIONS
 from services.memory import append_messages, get_history
+from services import answer_cache
+from services.telemetry import RunTracer
 
 try:
     from langgraph.graph import StateGraph, END
@@ -155,6 +158,29 @@ def _summarize_results(tool_results: list[dict]) -> str:
     return " | ".join(parts)[:600]
 
 
+REPLAY_CHUNK_CHARS = 12   # cache hit 시 토큰 스트림처럼 잘게 나눠 재생
+
+
+async def _replay_cached(entry, similarity: float):
+    """Replay a cached answer as writer tokens (cache_hit → token*)."""
+    now = time.time()
+    yield "cache_hit", {
+        "similarity": round(similarity, 4),
+        "cached_question": entry.question,
+        "age_s": int(now - entry.created_at),
+        "ttl_s": int(entry.expires_at - now),
+        "tools": entry.tools,
+    }
+    yield "edge", {"from": "START", "to": "writer"}
+    yield "node_start", {"node": "writer"}
+    answer = entry.answer
+    for i in range(0, len(answer), REPLAY_CHUNK_CHARS):
+        yield "token", answer[i:i + REPLAY_CHUNK_CHARS]
+        await asyncio.sleep(0)
+    yield "node_end", {"node": "writer", "result_summary": "캐시된 답변 재생"}
+    yield "edge", {"from": "writer", "to": "END"}
+
+
 async def agent_stream(
     question: str,
     model: str | None = None,
@@ -166,19 +192,58 @@ async def agent_stream(
     Event types added in week 11:
     - plan_created  / step_start / step_done / replan_decision
     Plus all events from week 10 (token, critic_score, writer_iteration, ...)
+
+    Semantic answer cache: history-free questions are looked up first; a
+    hit emits `cache_hit` and replays the cached answer as tokens.
+
+    Telemetry: every run ends with a `trace` event (per-stage wall time,
+    TTFT, tokens, tool latencies) right before `done`.
     """
     if thread_id:
         history = get_history(thread_id, limit=10)
     history = history or []
 
     override = model if model and model != "auto" else None
+    tracer = RunTracer()
+
+    # 0) Answer cache — follow-up questions depend on history, so bypass
+    use_cache = not history
+    cache_embedding: list[float] | None = None
+    embed_task: asyncio.Task | None = None
+    if use_cache:
+        t_cache = time.perf_counter()
+        cached, similarity, cache_embedding = await answer_cache.lookup(question, override)
+        tracer.record_stage("cache_lookup", time.perf_counter() - t_cache,
+                            detail="hit" if cached else "miss")
+        if cached:
+            async for ev in _replay_cached(cached, similarity):
+                yield ev
+            if thread_id:
+                append_messages(thread_id, [
+                    {"role": "user", "content": question},
+                    {"role": "assistant", "content": cached.answer},
+                ])
+            yield "trace", tracer.finish(status="cached")
+            yield "done", {
+                "final_score": cached.score,
+                "iterations": 0,
+                "plan_steps": 0,
+                "replan_count": 0,
+                "cached": True,
+            }
+            return
+        if cache_embedding is None:
+            # 빈 캐시는 lookup 이 임베딩하지 않음 — store 용 임베딩은 planner 와 동시에
+            embed_task = asyncio.create_task(answer_cache.embed_question(question))
+    else:
+        answer_cache.record_bypass()
 
     # 1) Planner
     yield "edge", {"from": "START", "to": "planner"}
     yield "node_start", {"node": "planner"}
 
     plan_out = await planner_node(
-        {"question": question, "history": history}, model=override,
+        {"question": question, "history": history}, model=override, tracer=tracer,
     )
     plan: list[dict] = plan_out.get("plan", [])
     plan_reasoning = plan_out.get("_reasoning", "")
@@ -228,7 +293,7 @@ async def agent_stream(
 
             ret_task = asyncio.create_task(run_retriever(
                 step["task"], history=history, model=override,
-                on_event=on_event_q,
+                on_event=on_event_q, tracer=tracer,
             ))
 
             while not ret_task.done() or not queue.empty():
@@ -250,9 +315,11 @@ async def agent_stream(
                 "tool": "agentic_retriever",
                 "args": {"task": step["task"]},
                 "result": citations_payload,
+                "ok": True,
                 "_chunks": [{
                     "doc_name": c.doc_name,
                     "page": c.page,
+                    "page_end": c.page_end,
                     "score": round(c.score or 0, 3),
                     "text": c.text,
                 } for c in chunks],
@@ -276,7 +343,7 @@ async def agent_stream(
 
             agent_task = asyncio.create_task(run_domain_agent(
                 domain, step["task"], model=override,
-                on_event=on_event_q, history=history,
+                on_event=on_event_q, history=history, tracer=tracer,
             ))
 
             while not agent_task.done() or not queue.empty():
@@ -321,7 +388,8 @@ async def agent_stream(
         yield "edge", {"from": "executor", "to": "replanner"}
         yield "node_start", {"node": "replanner"}
 
-        decision = await replanner_node({"question": question, "plan": plan}, model=override)
+        decision = await replanner_node({"question": question, "plan": plan},
+                                        model=override, tracer=tracer)
         action = decision["action"]
         rp_reasoning = decision["_reasoning"]
         new_plan = decision.get("new_plan", [])
@@ -374,6 +442,7 @@ async def agent_stream(
             model=override, history=history,
             revision_feedback=revision_feedback,
             previous_draft=previous_draft,
+            tracer=tracer,
         ):
             answer_chunks.append(token)
             yield "token", token
@@ -396,6 +465,7 @@ async def agent_stream(
             tool_results=all_tool_results,
             iteration=iteration,
             model=override,
+            tracer=tracer,
         )
 
         yield "critic_score", critique
@@ -417,7 +487,16 @@ async def agent_stream(
             {"role": "assistant", "content": final_answer},
         ])
 
+    if use_cache and critique and critique["passed"]:
+        if embed_task is not None:
+            cache_embedding = await embed_task
+        answer_cache.store(
+            question, final_answer, all_tool_results,
+            model=override, embedding=cache_embedding, score=critique["score"],
+        )
+
     yield "edge", {"from": "critic", "to": "END"}
+    yield "trace", tracer.finish()
     yield "done", {
         "final_score": critique["score"] if critique else None,
         "iterations": iteration,
@@ -0,0 +1,422 @@
+"""Background ingest job queue (SQLite) for uploads and bulk imports.
+
+`/api/documents/upload` streams the body to a spool file and enqueues a
+job; worker tasks in the API process extract, chunk and embed it while the
+client polls for stage / progress. `bulk_import --enqueue` adds whole
+directories to the same queue at a lower priority, so a running server
+indexes them without being stopped.
+
+Design choices:
+- Jobs live in SQLite next to the Chroma data (`chroma_data/jobs.sqlite`,
+  WAL) — they survive a restart, and the bulk CLI can enqueue from another
+  process. Workers pick such jobs up on their next poll
+- Priority: lower runs first — interactive uploads (0) before bulk imports
+  (10), oldest first within a priority
+- The doc_id is fixed at enqueue time. Whenever an attempt fails, is
+  cancelled or was interrupted by a restart, its partial chunks are deleted
+  before the job is retried or closed
+- Retry: a failed attempt is re-queued with exponential backoff up to
+  MAX_ATTEMPTS; `retry(job_id)` re-opens an error / cancelled job
+- Cancel: a queued job is closed at once, a running one has its task
+  cancelled
+- Content already indexed (same sha256) ends as `duplicate` — bulk jobs
+  are hashed by the worker. Only chunks of a finished job count; while
+  another job is still ingesting the same content, this one waits in the
+  queue (`not_before`) and checks again, taking over if that job fails
+- Embedding calls of a job go through `services/embed_budget.py`, so chat
+  queries keep priority over indexing
+
+Public API:
+- await start_workers(n)
+- submit(path, doc_name, sha256, size, priority, owns_file) → Job
+- get(job_id) / find_active(sha256) / list_jobs(limit)
+- await cancel(job_id) / retry(job_id)
+- job_stats() → gauges for /api/metrics
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+
+from services import answer_cache
+from services.document_store import delete_document, find_by_hash, new_doc_id
+from services.ingestion import ingest_file
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "chroma_data")
+DB_PATH = os.path.join(DATA_DIR, "jobs.sqlite")
+UPLOAD_DIR = os.path.join(DATA_DIR, "uploads")     # 업로드 spool — job 이 끝나면 삭제
+
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "2"))
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF_S = 5.0        # 5s, 10s, 20s ...
+POLL_S = 2.0                 # 다른 프로세스(bulk_import --enqueue)가 넣은 job 확인 주기
+SAME_CONTENT_WAIT_S = 5.0    # 같은 sha256 을 다른 job 이 인덱싱 중일 때 다시 확인하기까지
+MAX_FINISHED_JOBS = 1000
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+ACTIVE = ("queued", "running")
+FINISHED = ("done", "error", "cancelled", "duplicate")
+
+# stage 별 전체 진행률 구간 — embed 가 대부분의 시간을 차지
+_STAGE_SPAN = {
+    "hash": (0.0, 0.0),
+    "extract": (0.0, 0.1),
+    "chunk": (0.1, 0.15),
+    "embed": (0.15, 0.95),
+    "store": (0.95, 1.0),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    doc_name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    owns_file INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    progress REAL NOT NULL,
+    doc_id TEXT NOT NULL,
+    chunks_added INTEGER NOT NULL,
+    pages INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    max_attempts INTEGER NOT NULL,
+    error TEXT,
+    not_before REAL NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority, created_at);
+CREATE INDEX IF NOT EXISTS jobs_by_sha ON jobs (sha256);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    doc_name: str
+    path: str
+    owns_file: bool
+    sha256: str
+    bytes: int
+    priority: int
+    status: str                # queued | running | done | error | cancelled | duplicate
+    stage: str
+    progress: float
+    doc_id: str
+    chunks_added: int = 0
+    pages: int = 0
+    attempts: int = 0
+    max_attempts: int = MAX_ATTEMPTS
+    error: Optional[str] = None
+    not_before: float = 0.0
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        del d["path"], d["owns_file"]     # 서버 내부 경로는 노출하지 않음
+        return d
+
+
+_COLUMNS = [f.name for f in fields(Job)]
+_SELECT = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+
+_conn: sqlite3.Connection | None = None
+_wake: Optional[asyncio.Event] = None
+_workers: list[asyncio.Task] = []
+_running: dict[str, asyncio.Task] = {}
+_cancel_requested: set[str] = set()
+
+
+def open_queue(path: str = DB_PATH) -> None:
+    global _conn
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # autocommit — 여러 문장을 묶을 때만 BEGIN IMMEDIATE (bulk_import 프로세스와 공유)
+    _conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+    _conn.execute("PRAGMA journal_mode=WAL")
+    _conn.executescript(_SCHEMA)
+
+
+def _db() -> sqlite3.Connection:
+    if _conn is None:
+        open_queue()
+    return _conn
+
+
+def _row_to_job(row) -> Job:
+    job = Job(**dict(zip(_COLUMNS, row)))
+    job.owns_file = bool(job.owns_file)
+    return job
+
+
+def _update(job_id: str, **values) -> None:
+    cols = ", ".join(f"{k} = ?" for k in values)
+    _db().execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*values.values(), job_id))
+
+
+def _remove_file(job: Job) -> None:
+    if job.owns_file:
+        try:
+            os.unlink(job.path)
+        except OSError:
+            pass
+
+
+def submit(path: str, doc_name: str, sha256: str = "", size: int = 0,
+           priority: int = PRIORITY_INTERACTIVE, owns_file: bool = True) -> Job:
+    """Enqueue `path`. With owns_file the job deletes it once finished.
+
+    An empty sha256 is computed by the worker (bulk imports).
+    """
+    job = Job(
+        id=uuid.uuid4().hex[:12], doc_name=doc_name, path=os.path.abspath(path), owns_file=owns_file,
+        sha256=sha256, bytes=size, priority=priority, status="queued", stage="queued", progress=0.0,
+        doc_id=new_doc_id(), created_at=time.time(),
+    )
+    row = asdict(job)
+    row["owns_file"] = int(owns_file)
+    _db().execute(
+        f"INSERT INTO jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+        [row[c] for c in _COLUMNS],
+    )
+    if _wake is not None:
+        _wake.set()
+    return job
+
+
+def get(job_id: str) -> Optional[Job]:
+    row = _db().execute(f"{_SELECT} WHERE id = ?", (job_id,)).fetchone()
+    return _row_to_job(row) if row else None
+
+
+def find_active(sha256: str) -> Optional[Job]:
+    """A queued / running job for the same content — a repeated upload joins it."""
+    row = _db().execute(f"{_SELECT} WHERE sha256 = ? AND status IN (?, ?) LIMIT 1",
+                        (sha256, *ACTIVE)).fetchone()
+    return _row_to_job(row) if row else None
+
+
+def list_jobs(limit: int = 100) -> list[dict]:
+    rows = _db().execute(f"{_SELECT} ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+    return [_row_to_job(r).to_dict() for r in rows]
+
+
+async def cancel(job_id: str) -> Optional[Job]:
+    """Cancel a queued or running job. Other jobs are returned unchanged."""
+    job = get(job_id)
+    if job is None or job.status not in ACTIVE:
+        return job
+    task = _running.get(job_id)
+    if task is not None:
+        _cancel_requested.add(job_id)
+        task.cancel()
+        await asyncio.wait([task])          # 부분 chunk 정리까지 끝난 상태를 반환
+        return get(job_id)
+    # 다른 프로세스가 실행 중인 job 은 건드리지 않음 — queued 만 바로 닫음
+    cur = _db().execute(
+        "UPDATE jobs SET status = 'cancelled', stage = 'cancelled', finished_at = ? "
+        "WHERE id = ? AND status = 'queued'", (time.time(), job_id),
+    )
+    if cur.rowcount:
+        _remove_file(job)
+    return get(job_id)
+
+
+def retry(job_id: str) -> Optional[Job]:
+    """Re-queue an error / cancelled job whose file still exists, else None."""
+    job = get(job_id)
+    if job is None or job.status not in ("error", "cancelled") or not os.path.exists(job.path):
+        return None
+    _update(job_id, status="queued", stage="queued", progress=0.0, attempts=0,
+            error=None, not_before=0.0, finished_at=None)
+    if _wake is not None:
+        _wake.set()
+    return get(job_id)
+
+
+def _claim() -> Optional[Job]:
+    """Take the next ready job: lowest priority value, then oldest."""
+    db = _db()
+    now = time.time()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        row = db.execute(
+            f"{_SELECT} WHERE status = 'queued' AND not_before <= ? ORDER BY priority, created_at LIMIT 1",
+            (now,),
+        ).fetchone()
+        job = _row_to_job(row) if row else None
+        if job is not None:
+            job.status, job.attempts, job.started_at = "running", job.attempts + 1, now
+            db.execute("UPDATE jobs SET status = 'running', attempts = ?, started_at = ? WHERE id = ?",
+                       (job.attempts, now, job.id))
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    return job
+
+
+def _sha256(path: str) -> tuple[str, int]:
+    h = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+            size += len(block)
+    return h.hexdigest(), size
+
+
+def _other_running(job: Job) -> bool:
+    """Another job is ingesting the same content and got there first.
+
+    Two jobs claimed at the same moment are ordered by id, so exactly one waits.
+    """
+    row = _db().execute(
+        "SELECT 1 FROM jobs WHERE sha256 = ? AND status = 'running' AND id != ?"
+        " AND (started_at < ? OR (started_at = ? AND id < ?)) LIMIT 1",
+        (job.sha256, job.id, job.started_at, job.started_at, job.id),
+    ).fetchone()
+    return row is not None
+
+
+def _committed(doc_id: str) -> bool:
+    """Chunks of `doc_id` are a finished ingest, not a running or failed job's partial write."""
+    row = _db().execute("SELECT status FROM jobs WHERE doc_id = ?", (doc_id,)).fetchone()
+    return row is None or row[0] == "done"      # job 이 없으면 ingest_text / bulk_import 직접 인덱싱
+
+
+async def _ingest(job: Job) -> bool:
+    """Run one attempt. False when the job was put back to wait for another job."""
+    def on_progress(stage: str, done: int, total: int) -> None:
+        lo, hi = _STAGE_SPAN.get(stage, (job.progress, job.progress))
+        job.stage = stage
+        job.progress = round(lo + (hi - lo) * (done / total if total else 1.0), 3)
+        _update(job.id, stage=job.stage, progress=job.progress)
+
+    if not job.sha256:
+        on_progress("hash", 0, 1)
+        job.sha256, job.bytes = await asyncio.to_thread(_sha256, job.path)
+        _update(job.id, sha256=job.sha256, bytes=job.bytes)
+    # 다른 worker 가 같은 내용을 인덱싱 중 — 결과를 알 수 없으니 시도 횟수는 그대로 두고 나중에 다시
+    if _other_running(job):
+        _update(job.id, status="queued", stage="waiting", attempts=job.attempts - 1,
+                not_before=time.time() + SAME_CONTENT_WAIT_S)
+        return False
+    existing = await find_by_hash(job.sha256)
+    if existing is not None and _committed(existing["doc_id"]):
+        _update(job.id, status="duplicate", stage="duplicate", progress=1.0,
+                doc_id=existing["doc_id"], finished_at=time.time())
+        return True
+
+    result = await ingest_file(job.path, doc_name=job.doc_name, doc_id=job.doc_id,
+                               content_hash=job.sha256, on_progress=on_progress)
+    _update(job.id, status="done", stage="done", progress=1.0, chunks_added=result["chunks_added"],
+            pages=result["pages"], error=None, finished_at=time.time())
+    # Document answers may change with the new corpus
+    answer_cache.invalidate(domain="documents")
+    return True
+
+
+async def _execute(job: Job) -> None:
+    """One attempt — runs as its own task so cancel() can stop it and wait for the cleanup."""
+    try:
+        if not await _ingest(job):
+            return                           # 대기 중 — 파일은 다음 시도에 필요
+    except asyncio.CancelledError:
+        if job.id not in _cancel_requested:
+            raise                            # 서버 종료 — 다음 시작 때 _recover 가 다시 queued 로
+        await delete_document(job.doc_id)
+        _update(job.id, status="cancelled", stage="cancelled", finished_at=time.time())
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        await delete_document(job.doc_id)
+        if job.attempts < job.max_attempts and os.path.exists(job.path):
+            # 같은 doc_id 로 다시 — 부분 chunk 는 방금 지웠음
+            _update(job.id, status="queued", stage="queued", progress=0.0, error=error,
+                    not_before=time.time() + RETRY_BACKOFF_S * 2 ** (job.attempts - 1))
+        else:
+            _update(job.id, status="error", error=error, finished_at=time.time())
+        return                               # 수동 retry 를 위해 파일은 남겨 둠
+    _remove_file(job)
+
+
+async def _worker() -> None:
+    while True:
+        _wake.clear()
+        job = _claim()
+        if job is None:
+            try:
+                await asyncio.wait_for(_wake.wait(), POLL_S)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        task = asyncio.create_task(_execute(job))
+        _running[job.id] = task
+        try:
+            await task
+        except Exception as e:               # 정리 단계 자체가 실패 — worker 는 계속
+            _update(job.id, status="error", error=f"{type(e).__name__}: {e}", finished_at=time.time())
+        finally:
+            _running.pop(job.id, None)
+            _cancel_requested.discard(job.id)
+
+
+async def _recover() -> None:
+    """Jobs left `running` by a previous process: drop partial chunks, queue again."""
+    rows = _db().execute("SELECT id, doc_id FROM jobs WHERE status = 'running'").fetchall()
+    for job_id, doc_id in rows:
+        await delete_document(doc_id)
+        _update(job_id, status="queued", stage="queued", progress=0.0)
+
+
+def _trim() -> None:
+    """Keep the newest MAX_FINISHED_JOBS finished jobs (and their kept files)."""
+    db = _db()
+    stale = db.execute(
+        f"{_SELECT} WHERE status IN (?, ?, ?, ?) ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+        (*FINISHED, MAX_FINISHED_JOBS),
+    ).fetchall()
+    for row in stale:
+        job = _row_to_job(row)
+        _remove_file(job)
+        db.execute("DELETE FROM jobs WHERE id = ?", (job.id,))
+
+
+async def start_workers(n: int = INGEST_WORKERS) -> None:
+    """Recover interrupted jobs and start `n` worker tasks (once, at startup)."""
+    global _wake
+    _wake = asyncio.Event()
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    await _recover()
+    _trim()
+    _workers.extend(asyncio.create_task(_worker()) for _ in range(max(1, n)))
+
+
+def job_stats() -> dict:
+    """Gauges for /api/metrics."""
+    counts = dict.fromkeys(ACTIVE + FINISHED, 0)
+    for status, n in _db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+        counts[status] = n
+    queued = _db().execute(
+        "SELECT priority, COUNT(*) FROM jobs WHERE status = 'queued' GROUP BY priority"
+    ).fetchall()
+    return {
+        "ingest_jobs": [({"status": s}, n) for s, n in counts.items()],
+        "ingest_queue_depth": [({"priority": str(p)}, n) for p, n in queued],
+        "ingest_workers": len(_workers),
+    }
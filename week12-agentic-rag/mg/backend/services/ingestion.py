@@ -4,23 +4,39 @@ Supported inputs:
 - .txt / .md (plain text)
 - .pdf (via pypdf)
 
-Chunking strategy: paragraph-aware sliding window.
-- Target ~600 tokens (~2400 chars) per chunk
-- 100-char overlap between chunks (preserves context across boundaries)
-- Splits on double newlines first, then merges to target size
+Chunking: `services.chunker` — sentence-aware, budgeted in embedding
+tokens, with character offsets per chunk. PDF pages are chunked as one
+text so a chunk can span pages (`page` … `page_end`).
+
+Small-to-big: each document is split into parent sections (≤1000 tokens,
+no overlap) and every parent into child chunks (≤200 tokens, 20 overlap).
+Children are measured in the embedder's own tokenizer and capped at its
+input limit (`document_store.chunk_budget`), so a local model with a
+128-token window still sees each child in full.
+Only children are embedded; parents and child offsets go to
+`services.parent_store` for the Writer.
+
+File reading, PDF extraction and chunking run in worker threads
+(`asyncio.to_thread`) so ingestion doesn't block the event loop. Results
+carry `pages` and embedded `tokens` for throughput reporting
+(`bulk_import.py`).
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
-import re
 from typing import Optional
 
-from services.document_store import Chunk, new_doc_id, new_chunk_id, add_chunks
+from services import chroma_async, parent_store
+from services.chunker import (
+    CHILD_TOKENS, PAGE_SEPARATOR, TextChunk, chunk_hierarchy, chunk_pages_hierarchy,
+)
+from services.document_store import (
+    Chunk, add_chunks, chunk_budget, new_chunk_id, new_doc_id, new_parent_id,
+)
 
-
-CHUNK_SIZE = 2400   # ~600 tokens
-CHUNK_OVERLAP = 100
+SUPPORTED_EXTS = (".pdf", ".txt", ".md", ".markdown")
 
 
 def _read_text(path: str) -> str:
@@ -47,107 +63,110 @@ def _read_pdf(path: str) -> list[tuple[int, str]]:
     return pages
 
 
-def _normalize(text: str) -> str:
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text.strip()
-
-
-def _split_into_chunks(text: str, max_chars: int = CHUNK_SIZE,
-                       overlap: int = CHUNK_OVERLAP) -> list[str]:
-    """Paragraph-aware chunking. Falls back to character window for long blocks."""
-    text = _normalize(text)
-    if not text:
-        return []
-
-    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
-    chunks: list[str] = []
-    buf = ""
-
-    def flush():
-        nonlocal buf
-        if buf.strip():
-            chunks.append(buf.strip())
-        buf = ""
-
-    for p in paragraphs:
-        # If a single paragraph is longer than max_chars, hard-split it
-        if len(p) > max_chars:
-            flush()
-            i = 0
-            while i < len(p):
-                end = min(i + max_chars, len(p))
-                chunks.append(p[i:end])
-                i = end - overlap if end < len(p) else end
-            continue
-
-        if len(buf) + 2 + len(p) <= max_chars:
-            buf = (buf + "\n\n" + p) if buf else p
-        else:
-            flush()
-            buf = p
-    flush()
-
-    # Add small overlap from previous chunk's tail
-    if overlap > 0 and len(chunks) > 1:
-        overlapped: list[str] = [chunks[0]]
-        for i in range(1, len(chunks)):
-            prev_tail = chunks[i - 1][-overlap:]
-            overlapped.append(prev_tail + "\n" + chunks[i])
-        chunks = overlapped
-
-    return chunks
-
-
-async def ingest_text(text: str, doc_name: str) -> dict:
-    """Ingest plain text. Returns {doc_id, doc_name, chunks_added}."""
-    doc_id = new_doc_id()
-    pieces = _split_into_chunks(text)
-    chunks = [
-        Chunk(
-            id=new_chunk_id(doc_id, i),
-            text=piece,
-            doc_id=doc_id,
-            doc_name=doc_name,
-            chunk_index=i,
-            page=None,
-        )
-        for i, piece in enumerate(pieces)
-    ]
-    added = await add_chunks(chunks)
-    return {"doc_id": doc_id, "doc_name": doc_name, "chunks_added": added}
+def _chunk_tree(chunk_fn, source) -> list[tuple[TextChunk, list[TextChunk]]]:
+    """Run chunk_hierarchy / chunk_pages_hierarchy with the embedder's child budget. Blocking."""
+    child_tokens, child_count = chunk_budget(CHILD_TOKENS)
+    return chunk_fn(source, child_tokens=child_tokens, child_count=child_count)
 
 
-async def ingest_pdf(path: str, doc_name: Optional[str] = None) -> dict:
-    """Ingest a PDF. Each page is chunked separately so `page` metadata is correct."""
-    doc_name = doc_name or os.path.basename(path)
-    doc_id = new_doc_id()
-    pages = _read_pdf(path)
-
-    all_chunks: list[Chunk] = []
-    chunk_idx = 0
-    for page_no, page_text in pages:
-        for piece in _split_into_chunks(page_text):
-            all_chunks.append(Chunk(
-                id=new_chunk_id(doc_id, chunk_idx),
-                text=piece,
+async def _index_hierarchy(source: str, tree: list[tuple[TextChunk, list[TextChunk]]],
+                           doc_id: str, doc_name: str, content_hash: Optional[str] = None,
+                           on_progress=None) -> int:
+    """Embed the children, then record parents + child offsets locally."""
+    parents: list[parent_store.Parent] = []
+    children: list[Chunk] = []
+    for p_idx, (parent, kids) in enumerate(tree):
+        parent_id = new_parent_id(doc_id, p_idx)
+        parents.append(parent_store.Parent(
+            id=parent_id,
+            doc_id=doc_id,
+            doc_name=doc_name,
+            parent_index=p_idx,
+            raw=source[parent.char_start:parent.char_end],
+            tokens=parent.tokens,
+            char_start=parent.char_start,
+            char_end=parent.char_end,
+            page=parent.page,
+            page_end=parent.page_end,
+        ))
+        for kid in kids:
+            idx = len(children)
+            children.append(Chunk(
+                id=new_chunk_id(doc_id, idx),
+                text=kid.text,
                 doc_id=doc_id,
                 doc_name=doc_name,
-                chunk_index=chunk_idx,
-                page=page_no,
+                chunk_index=idx,
+                page=kid.page,
+                page_end=kid.page_end,
+                char_start=kid.char_start,
+                char_end=kid.char_end,
+                parent_id=parent_id,
+                content_hash=content_hash,
             ))
-            chunk_idx += 1
-
-    added = await add_chunks(all_chunks)
-    return {"doc_id": doc_id, "doc_name": doc_name, "chunks_added": added}
 
-
-async def ingest_file(path: str, doc_name: Optional[str] = None) -> dict:
-    """Auto-dispatch by extension."""
+    embed_progress = (lambda done, total: on_progress("embed", done, total)) if on_progress else None
+    added = await add_chunks(children, embed_progress)
+    if on_progress:
+        on_progress("store", 0, 1)
+    await chroma_async.write(parent_store.put_document, parents, [
+        (c.id, c.parent_id, c.chunk_index, c.char_start, c.char_end) for c in children
+    ])
+    return added
+
+
+def _result(doc_id: str, doc_name: str, added: int, tree, pages: int) -> dict:
+    return {
+        "doc_id": doc_id,
+        "doc_name": doc_name,
+        "chunks_added": added,
+        "pages": pages,
+        "tokens": sum(kid.tokens for _, kids in tree for kid in kids),
+    }
+
+
+async def ingest_text(text: str, doc_name: str, doc_id: Optional[str] = None,
+                      content_hash: Optional[str] = None, on_progress=None) -> dict:
+    """Ingest plain text. Returns {doc_id, doc_name, chunks_added, pages, tokens}."""
+    doc_id = doc_id or new_doc_id()
+    if on_progress:
+        on_progress("chunk", 0, 1)
+    tree = await asyncio.to_thread(_chunk_tree, chunk_hierarchy, text)
+    added = await _index_hierarchy(text, tree, doc_id, doc_name, content_hash, on_progress)
+    return _result(doc_id, doc_name, added, tree, pages=1)
+
+
+async def ingest_pdf(path: str, doc_name: Optional[str] = None, doc_id: Optional[str] = None,
+                     content_hash: Optional[str] = None, on_progress=None) -> dict:
+    """Ingest a PDF. Chunks carry the page span they were cut from."""
+    doc_name = doc_name or os.path.basename(path)
+    doc_id = doc_id or new_doc_id()
+    if on_progress:
+        on_progress("extract", 0, 1)
+    pages = await asyncio.to_thread(_read_pdf, path)
+    source = PAGE_SEPARATOR.join(text for _, text in pages)
+    if on_progress:
+        on_progress("chunk", 0, 1)
+    tree = await asyncio.to_thread(_chunk_tree, chunk_pages_hierarchy, pages)
+    added = await _index_hierarchy(source, tree, doc_id, doc_name, content_hash, on_progress)
+    return _result(doc_id, doc_name, added, tree, pages=len(pages))
+
+
+async def ingest_file(path: str, doc_name: Optional[str] = None, doc_id: Optional[str] = None,
+                      content_hash: Optional[str] = None, on_progress=None) -> dict:
+    """Auto-dispatch by extension. `doc_id` is generated unless given.
+
+    content_hash — source file sha256, stored on every chunk for upload dedup.
+    on_progress(stage, done, total) — optional; stages extract → chunk →
+    embed (per batch) → store.
+    """
     ext = os.path.splitext(path)[1].lower()
     if ext == ".pdf":
-        return await ingest_pdf(path, doc_name)
-    if ext in (".txt", ".md", ".markdown"):
-        text = _read_text(path)
-        return await ingest_text(text, doc_name or os.path.basename(path))
+        return await ingest_pdf(path, doc_name, doc_id, content_hash, on_progress)
+    if ext in SUPPORTED_EXTS:
+        if on_progress:
+            on_progress("extract", 0, 1)
+        text = await asyncio.to_thread(_read_text, path)
+        return await ingest_text(text, doc_name or os.path.basename(path), doc_id,
+                                 content_hash, on_progress)
     raise ValueError(f"지원하지 않는 파일 형식: {ext}")
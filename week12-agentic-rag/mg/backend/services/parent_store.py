@@ -0,0 +1,169 @@
+"""Local parent store for the parent-child (small-to-big) index.
+
+Only small child chunks are embedded into Chroma. Each child carries a
+`parent_id`; the parent sections and the children's offsets live here in
+SQLite, so the Writer can be given the surrounding section — or the
+neighbouring children — without another embedding or vector query.
+
+Design choices:
+- SQLite file next to the Chroma data (`chroma_data/parents.sqlite`)
+- Parents keep the raw source slice; text is normalized on read so child
+  offsets (absolute, same coordinates) can cut windows out of it
+- Children rows hold offsets only — their text is already in Chroma
+- Opened lazily; `open_store(":memory:")` swaps in a throwaway store
+- One connection shared by the Chroma write thread, read threads and the
+  event loop — every use holds `_db_lock`, so a `with db:` transaction
+  never interleaves with another thread's statements
+
+Public API:
+- open_store(path)
+- put_document(parents, children)
+- get_parents(ids) → {id: Parent}
+- child_window(parent, child_id, window) → (text, start, end)
+- delete_document(doc_id)
+- stats()
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "..", "chroma_data", "parents.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parents (
+    id TEXT PRIMARY KEY,
+    doc_id TEXT NOT NULL,
+    doc_name TEXT NOT NULL,
+    parent_index INTEGER NOT NULL,
+    raw TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    page INTEGER,
+    page_end INTEGER,
+    char_start INTEGER NOT NULL,
+    char_end INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS children (
+    id TEXT PRIMARY KEY,
+    doc_id TEXT NOT NULL,
+    parent_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    char_start INTEGER NOT NULL,
+    char_end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS children_by_parent ON children (parent_id, chunk_index);
+CREATE INDEX IF NOT EXISTS parents_by_doc ON parents (doc_id);
+"""
+
+_conn: sqlite3.Connection | None = None
+_db_lock = threading.RLock()
+
+
+@dataclass
+class Parent:
+    id: str
+    doc_id: str
+    doc_name: str
+    parent_index: int
+    raw: str
+    tokens: int
+    char_start: int
+    char_end: int
+    page: Optional[int] = None
+    page_end: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        return _normalize(self.raw)
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def open_store(path: str = DB_PATH) -> None:
+    global _conn
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _db_lock:
+        _conn = sqlite3.connect(path, check_same_thread=False)
+        _conn.executescript(_SCHEMA)
+
+
+def _db() -> sqlite3.Connection:
+    """The shared connection. Callers hold `_db_lock` while using it."""
+    if _conn is None:
+        open_store()
+    return _conn
+
+
+def put_document(parents: list[Parent], children: list[tuple[str, str, int, int, int]]) -> None:
+    """Store a document's parents and its children as (id, parent_id, chunk_index, start, end)."""
+    if not parents:
+        return
+    doc_id = parents[0].doc_id
+    with _db_lock, _db() as db:
+        db.executemany(
+            "INSERT OR REPLACE INTO parents VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(p.id, p.doc_id, p.doc_name, p.parent_index, p.raw, p.tokens,
+              p.page, p.page_end, p.char_start, p.char_end) for p in parents],
+        )
+        db.executemany(
+            "INSERT OR REPLACE INTO children VALUES (?, ?, ?, ?, ?, ?)",
+            [(cid, doc_id, pid, idx, start, end) for cid, pid, idx, start, end in children],
+        )
+
+
+def get_parents(ids: list[str]) -> dict[str, Parent]:
+    ids = list(dict.fromkeys(i for i in ids if i))
+    if not ids:
+        return {}
+    marks = ",".join("?" * len(ids))
+    with _db_lock:
+        rows = _db().execute(
+            "SELECT id, doc_id, doc_name, parent_index, raw, tokens, char_start, char_end, page, page_end "
+            f"FROM parents WHERE id IN ({marks})", ids,
+        ).fetchall()
+    return {r[0]: Parent(*r) for r in rows}
+
+
+def child_window(parent: Parent, child_id: str, window: int = 1) -> tuple[str, int, int] | None:
+    """The child plus `window` neighbours on each side, cut from the parent text.
+
+    Returns (text, char_start, char_end) or None when the child is unknown.
+    Neighbours never cross the parent boundary.
+    """
+    with _db_lock:
+        db = _db()
+        row = db.execute("SELECT chunk_index FROM children WHERE id = ?", (child_id,)).fetchone()
+        if row is None:
+            return None
+        idx = row[0]
+        start, end = db.execute(
+            "SELECT MIN(char_start), MAX(char_end) FROM children "
+            "WHERE parent_id = ? AND chunk_index BETWEEN ? AND ?",
+            (parent.id, idx - window, idx + window),
+        ).fetchone()
+    raw = parent.raw[start - parent.char_start:end - parent.char_start]
+    return _normalize(raw), start, end
+
+
+def delete_document(doc_id: str) -> int:
+    with _db_lock, _db() as db:
+        db.execute("DELETE FROM children WHERE doc_id = ?", (doc_id,))
+        return db.execute("DELETE FROM parents WHERE doc_id = ?", (doc_id,)).rowcount
+
+
+def stats() -> dict:
+    with _db_lock:
+        db = _db()
+        parents = db.execute("SELECT COUNT(*) FROM parents").fetchone()[0]
+        children = db.execute("SELECT COUNT(*) FROM children").fetchone()[0]
+    return {"parents": parents, "children": children}
@@ -0,0 +1,279 @@
+"""Local cross-encoder relevance grader for the Retriever.
+
+`_evaluate_relevance` asks an LLM for a 1~5 score on every retrieval round.
+This module scores the same (question, chunk) pairs on CPU with the
+cross-encoder the top-level `rag_pipeline.Reranker` uses, and maps the raw
+logit onto the Retriever's 1~5 scale with thresholds learned from labeled
+rounds. Only rounds whose logit lands in the ambiguous band around the pass
+threshold are sent to the LLM.
+
+Design choices:
+- Round score = max logit over the chunks the LLM would see (top 5).
+  One clearly relevant chunk is enough to answer
+- Calibration is 4 monotone cut points (logit ≥ cut_k → score ≥ k) plus an
+  ambiguous [low, high) band chosen so decisions outside it agree with the
+  labels at the target precision
+- sentence-transformers is optional. If it is missing or the model fails to
+  load, `grade()` returns None and the Retriever stays on the LLM grader
+- No built-in cut points: until `calibrate` has written a calibration file
+  for RELEVANCE_GRADER_MODEL, `grade()` returns None as well
+- Inference runs in `asyncio.to_thread`; the model is loaded once, lazily
+
+Labels: JSONL, one round per line — {"question", "chunks": [text, ...], "score"}.
+With RELEVANCE_LABEL_LOG set, every LLM-graded round is appended to that
+file, so production traffic builds the labeled set.
+
+    py -m services.relevance_grader calibrate labels.jsonl
+    py -m services.relevance_grader score "질문" "chunk 텍스트"
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+from config import RELEVANCE_GRADER, RELEVANCE_GRADER_MODEL
+
+CALIBRATION_PATH = Path(os.environ.get(
+    "RELEVANCE_GRADER_CALIBRATION",
+    Path(__file__).resolve().parent.parent / "grader_calibration.json",
+))
+LABEL_LOG = os.environ.get("RELEVANCE_LABEL_LOG", "")
+
+MAX_CHUNKS = 5            # LLM 평가와 같은 개수
+MAX_CHARS = 1200          # 모델 max_length(512 토큰) 근처에서 자름
+PASS_SCORE = 3            # agents.retriever.RELEVANCE_THRESHOLD 와 같은 값
+TARGET_PRECISION = 0.95   # band 밖 통과/실패 판정이 라벨과 일치해야 하는 비율
+
+_model = None
+_load_failed = False
+_load_lock = threading.Lock()
+_calibration: dict | None = None
+_calibration_loaded = False
+_stats = {"local": 0, "ambiguous": 0, "unavailable": 0}
+
+
+def _load_model():
+    """Load the cross-encoder once. Runs in a worker thread."""
+    global _model, _load_failed
+    if _model is not None or _load_failed:
+        return _model
+    with _load_lock:
+        if _model is None and not _load_failed:
+            try:
+                from sentence_transformers import CrossEncoder
+                _model = CrossEncoder(RELEVANCE_GRADER_MODEL, max_length=512)
+            except Exception as e:
+                _load_failed = True
+                print(f"  [relevance_grader] cross-encoder 미사용 → LLM 평가 유지 ({e})")
+    return _model
+
+
+def enabled() -> bool:
+    return RELEVANCE_GRADER != "llm" and not _load_failed and calibration() is not None
+
+
+def calibration() -> dict | None:
+    """The calibration file for RELEVANCE_GRADER_MODEL, or None if it hasn't been generated."""
+    global _calibration, _calibration_loaded
+    if not _calibration_loaded:
+        _calibration_loaded = True
+        try:
+            cal = json.loads(CALIBRATION_PATH.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            cal = None
+        # 다른 모델로 만든 cut point 는 logit 척도가 달라 쓸 수 없음
+        if cal is not None and cal.get("model") == RELEVANCE_GRADER_MODEL:
+            _calibration = cal
+    return _calibration
+
+
+def to_score(logit: float, cal: dict | None = None) -> int:
+    """Map a raw cross-encoder logit onto the 1~5 scale."""
+    cuts = (cal or calibration())["cuts"]
+    return 1 + sum(1 for c in cuts if logit >= c)
+
+
+def is_ambiguous(logit: float, cal: dict | None = None) -> bool:
+    low, high = (cal or calibration())["ambiguous"]
+    return low <= logit < high
+
+
+def score_pairs(question: str, texts: list[str]) -> list[float]:
+    """Raw logits for (question, text) pairs. Blocking — call via to_thread."""
+    model = _load_model()
+    if model is None:
+        raise RuntimeError("cross-encoder unavailable")
+    pairs = [(question, t[:MAX_CHARS]) for t in texts]
+    return [float(s) for s in model.predict(pairs)]
+
+
+async def grade(question: str, texts: list[str], tracer=None) -> dict | None:
+    """Grade one retrieval round locally.
+
+    Returns {score, logit, ambiguous} or None when the cross-encoder is
+    disabled or unavailable. `ambiguous` rounds should go to the LLM.
+    """
+    if not enabled() or not texts:
+        return None
+    t_start = time.perf_counter()
+    try:
+        logits = await asyncio.to_thread(score_pairs, question, texts[:MAX_CHUNKS])
+    except Exception:
+        _stats["unavailable"] += 1
+        return None
+    if tracer:
+        tracer.record_tool("retriever", "cross_encoder", time.perf_counter() - t_start)
+
+    logit = max(logits)
+    ambiguous = is_ambiguous(logit)
+    _stats["ambiguous" if ambiguous else "local"] += 1
+    return {"score": to_score(logit), "logit": round(logit, 3), "ambiguous": ambiguous}
+
+
+async def warm_up() -> None:
+    """Load the model in the background so the first question doesn't pay for it."""
+    if RELEVANCE_GRADER != "llm" and calibration() is None:
+        print(f"  [relevance_grader] 보정 파일 없음 ({CALIBRATION_PATH.name}) → LLM 평가 유지. "
+              "py -m services.relevance_grader calibrate 로 생성")
+    if enabled():
+        await asyncio.to_thread(_load_model)
+
+
+def log_label(question: str, texts: list[str], score: int) -> None:
+    """Append an LLM-graded round to RELEVANCE_LABEL_LOG (no-op when unset)."""
+    if not LABEL_LOG:
+        return
+    line = json.dumps({"question": question, "chunks": texts[:MAX_CHUNKS], "score": score},
+                      ensure_ascii=False)
+    try:
+        with open(LABEL_LOG, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError:
+        pass
+
+
+def grader_stats() -> dict:
+    """Gauges for /api/metrics."""
+    total = _stats["local"] + _stats["ambiguous"]
+    return {
+        "relevance_grader_rounds": [({"result": k}, v) for k, v in _stats.items()],
+        "relevance_grader_llm_skip_rate": round(_stats["local"] / total, 4) if total else 0.0,
+    }
+
+
+# ── Calibration ──────────────────────────────────────────────
+
+def _best_cut(points: list[tuple[float, int]], k: int) -> float:
+    """Threshold maximizing agreement of (logit ≥ t) with (label ≥ k)."""
+    xs = sorted(x for x, _ in points)
+    candidates = [xs[0] - 1.0] + [(a + b) / 2 for a, b in zip(xs, xs[1:]) if a != b] + [xs[-1] + 1.0]
+    best_t, best_acc = candidates[0], -1
+    for t in candidates:
+        acc = sum((x >= t) == (y >= k) for x, y in points)
+        if acc > best_acc:
+            best_t, best_acc = t, acc
+    return best_t
+
+
+def _ambiguous_band(points: list[tuple[float, int]], cut: float,
+                    precision: float) -> tuple[float, float]:
+    """Widest-confidence [low, high): below low mostly fail, at/above high mostly pass."""
+    ordered = sorted(points)
+    # 기준을 만족하는 구간이 없으면 그쪽은 관측 범위 전체가 경계 구간
+    low = min(ordered[0][0] - 1.0, cut)
+    high = max(ordered[-1][0] + 1.0, cut)
+    # low: largest logit such that rounds below it are ≥ precision "fail"
+    fails = 0
+    for i, (x, y) in enumerate(ordered, start=1):
+        fails += y < PASS_SCORE
+        nxt = ordered[i][0] if i < len(ordered) else x + 1.0
+        if fails / i >= precision and nxt != x:
+            low = min((x + nxt) / 2, cut)
+    # high: smallest logit such that rounds at/above it are ≥ precision "pass"
+    passes = 0
+    for i, (x, y) in enumerate(reversed(ordered), start=1):
+        passes += y >= PASS_SCORE
+        prev = ordered[-i - 1][0] if i < len(ordered) else x - 1.0
+        if passes / i >= precision and prev != x:
+            high = max((x + prev) / 2, cut)
+    return low, high
+
+
+def fit(points: list[tuple[float, int]], precision: float = TARGET_PRECISION) -> dict:
+    """Learn cut points and the ambiguous band from (logit, label) pairs."""
+    if not points:
+        raise ValueError("no labeled rounds")
+    cuts = []
+    for k in (2, 3, 4, 5):
+        t = _best_cut(points, k)
+        cuts.append(max(t, cuts[-1]) if cuts else t)   # 단조 증가 보장
+    low, high = _ambiguous_band(points, cuts[PASS_SCORE - 2], precision)
+
+    cal = {"model": RELEVANCE_GRADER_MODEL, "cuts": [round(c, 4) for c in cuts],
+           "ambiguous": [round(low, 4), round(high, 4)], "source": "calibrated",
+           "labels": len(points), "target_precision": precision}
+    outside = [(x, y) for x, y in points if not is_ambiguous(x, cal)]
+    cal["llm_skip_rate"] = round(len(outside) / len(points), 4)
+    cal["pass_agreement"] = round(
+        sum((to_score(x, cal) >= PASS_SCORE) == (y >= PASS_SCORE) for x, y in outside) / len(outside), 4
+    ) if outside else None
+    cal["exact_agreement"] = round(sum(to_score(x, cal) == y for x, y in points) / len(points), 4)
+    return cal
+
+
+def _read_labels(path: str) -> list[dict]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                row = json.loads(line)
+                if row.get("chunks") and row.get("score") is not None:
+                    rows.append(row)
+    return rows
+
+
+def _main(argv: list[str]) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="py -m services.relevance_grader")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_cal = sub.add_parser("calibrate", help="라벨 JSONL 로 cut point / ambiguous band 학습")
+    p_cal.add_argument("labels")
+    p_cal.add_argument("--precision", type=float, default=TARGET_PRECISION)
+    p_cal.add_argument("--out", default=str(CALIBRATION_PATH))
+    p_score = sub.add_parser("score", help="질문 + chunk 하나의 logit / 점수 확인")
+    p_score.add_argument("question")
+    p_score.add_argument("text")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "score":
+        logit = score_pairs(args.question, [args.text])[0]
+        if calibration() is None:
+            print(f"logit={logit:.3f} (보정 전 — 점수 없음)")
+        else:
+            print(f"logit={logit:.3f} score={to_score(logit)} ambiguous={is_ambiguous(logit)}")
+        return
+
+    rows = _read_labels(args.labels)
+    t0 = time.perf_counter()
+    points = [(max(score_pairs(r["question"], r["chunks"][:MAX_CHUNKS])), int(r["score"])) for r in rows]
+    elapsed = time.perf_counter() - t0
+    cal = fit(points, args.precision)
+    cal["ms_per_round"] = round(elapsed * 1000 / len(points), 1)
+    Path(args.out).write_text(json.dumps(cal, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"labels={cal['labels']}  cuts={cal['cuts']}  ambiguous={cal['ambiguous']}")
+    print(f"LLM 생략 비율={cal['llm_skip_rate']:.1%}  통과 판정 일치={cal['pass_agreement']}  "
+          f"점수 일치={cal['exact_agreement']:.1%}  {cal['ms_per_round']}ms/round")
+    print(f"→ {args.out}")
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
@@ -0,0 +1,349 @@
+"""Per-stage latency / token telemetry for agent_stream.
+
+Modelled on week05 minseon `CostTracker`: every node records its wall time,
+LLM calls (prompt / completion tokens, cost, time-to-first-token) and tool
+latencies on a `RunTracer`. At the end of a run the tracer
+
+1. is emitted to the client as a `trace` SSE event (`RunTracer.finish()`)
+2. is folded into process-wide Prometheus metrics (`/api/metrics`)
+
+Stages: planner / replanner / domain_agent / retriever / writer / critic
+(+ cache_lookup for the answer cache).
+
+Other modules can expose gauges on `/api/metrics` via
+`register_collector(fn)` — fn returns {metric_name: value} or
+{metric_name: [(labels_dict, value), ...]}.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+# ── 모델별 가격 (USD per token) ────────────────────────────
+PRICING: dict[str, dict[str, float]] = {
+    "gpt-4o-mini": {"input": 0.150 / 1_000_000, "output": 0.600 / 1_000_000},
+    "gpt-4o": {"input": 2.50 / 1_000_000, "output": 10.00 / 1_000_000},
+    "gpt-4.1-mini": {"input": 0.40 / 1_000_000, "output": 1.60 / 1_000_000},
+    "gpt-4.1-nano": {"input": 0.10 / 1_000_000, "output": 0.40 / 1_000_000},
+    "text-embedding-3-small": {"input": 0.020 / 1_000_000, "output": 0.0},
+}
+
+METRIC_PREFIX = "kagent"
+
+# Histogram buckets (seconds)
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+@dataclass
+class LLMCall:
+    stage: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    elapsed: float            # 초
+    ttft: float | None        # 스트리밍 호출만
+    cost_usd: float
+
+
+@dataclass
+class ToolCall:
+    stage: str
+    tool: str
+    elapsed: float
+    ok: bool
+
+
+@dataclass
+class StageSpan:
+    stage: str
+    elapsed: float
+    detail: str = ""
+
+
+def _cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    pricing = PRICING.get(model, {"input": 0.0, "output": 0.0})
+    return prompt_tokens * pricing["input"] + completion_tokens * pricing["output"]
+
+
+class RunTracer:
+    """Collects per-stage telemetry for a single agent_stream run.
+
+    사용법:
+        tracer = RunTracer()
+        t0 = time.perf_counter()
+        resp = await client.chat.completions.create(...)
+        tracer.record_llm("planner", model, resp.usage, time.perf_counter() - t0)
+        tracer.record_stage("planner", time.perf_counter() - t0)
+        ...
+        yield "trace", tracer.finish()
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.llm_calls: list[LLMCall] = []
+        self.tool_calls: list[ToolCall] = []
+        self.spans: list[StageSpan] = []
+        self.notes: dict[str, list[dict]] = {}
+        self._finished: dict | None = None
+
+    # ── 기록 ──────────────────────────────────────────────
+
+    def record_stage(self, stage: str, elapsed: float, detail: str = "") -> None:
+        self.spans.append(StageSpan(stage, elapsed, detail))
+
+    def record_llm(
+        self,
+        stage: str,
+        model: str,
+        usage,
+        elapsed: float,
+        ttft: float | None = None,
+    ) -> None:
+        """Record one chat completion. `usage` is the OpenAI usage object (or None)."""
+        prompt = int(getattr(usage, "prompt_tokens", 0) or 0) if usage else 0
+        completion = int(getattr(usage, "completion_tokens", 0) or 0) if usage else 0
+        self.llm_calls.append(LLMCall(
+            stage, model, prompt, completion, elapsed, ttft,
+            _cost(model, prompt, completion),
+        ))
+
+    def record_tool(self, stage: str, tool: str, elapsed: float, ok: bool = True) -> None:
+        self.tool_calls.append(ToolCall(stage, tool, elapsed, ok))
+
+    def annotate(self, stage: str, data: dict) -> None:
+        """Attach free-form decisions (e.g. context packing) to a stage."""
+        self.notes.setdefault(stage, []).append(data)
+
+    # ── 집계 ──────────────────────────────────────────────
+
+    def summary(self) -> dict:
+        by_stage: dict[str, dict] = {}
+
+        def bucket(stage: str) -> dict:
+            if stage not in by_stage:
+                by_stage[stage] = {
+                    "runs": 0, "wall_ms": 0,
+                    "llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                    "cost_usd": 0.0, "ttft_ms": None,
+                    "tool_calls": 0, "tool_ms": 0,
+                }
+            return by_stage[stage]
+
+        for span in self.spans:
+            b = bucket(span.stage)
+            b["runs"] += 1
+            b["wall_ms"] += int(span.elapsed * 1000)
+
+        for call in self.llm_calls:
+            b = bucket(call.stage)
+            b["llm_calls"] += 1
+            b["prompt_tokens"] += call.prompt_tokens
+            b["completion_tokens"] += call.completion_tokens
+            b["cost_usd"] += call.cost_usd
+            if call.ttft is not None and b["ttft_ms"] is None:
+                b["ttft_ms"] = int(call.ttft * 1000)
+
+        for tc in self.tool_calls:
+            b = bucket(tc.stage)
+            b["tool_calls"] += 1
+            b["tool_ms"] += int(tc.elapsed * 1000)
+
+        for b in by_stage.values():
+            b["cost_usd"] = round(b["cost_usd"], 6)
+
+        total_prompt = sum(c.prompt_tokens for c in self.llm_calls)
+        total_completion = sum(c.completion_tokens for c in self.llm_calls)
+        return {
+            "total_ms": int((time.perf_counter() - self.started_at) * 1000),
+            "prompt_tokens": total_prompt,
+            "completion_tokens": total_completion,
+            "cost_usd": round(sum(c.cost_usd for c in self.llm_calls), 6),
+            "llm_calls": len(self.llm_calls),
+            "by_stage": by_stage,
+            "tools": [
+                {"stage": t.stage, "tool": t.tool, "ms": int(t.elapsed * 1000), "ok": t.ok}
+                for t in self.tool_calls
+            ],
+            "notes": self.notes,
+        }
+
+    def finish(self, status: str = "ok") -> dict:
+        """Close the run, fold it into /api/metrics, return the summary."""
+        if self._finished is None:
+            self._finished = {**self.summary(), "status": status}
+            _observe_run(self, status)
+        return self._finished
+
+
+# ── Process-wide Prometheus metrics ─────────────────────────────
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...] = _LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.total += 1
+        self.sum += value
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+
+
+_counters: dict[tuple[str, tuple], float] = {}
+_histograms: dict[tuple[str, tuple], _Histogram] = {}
+_collectors: list[Callable[[], dict]] = []
+
+_HELP = {
+    "runs_total": ("counter", "agent_stream runs by status"),
+    "run_duration_seconds": ("histogram", "agent_stream end-to-end wall time"),
+    "stage_duration_seconds": ("histogram", "wall time per graph stage"),
+    "stage_ttft_seconds": ("histogram", "time-to-first-token of streaming stages"),
+    "llm_calls_total": ("counter", "chat completion calls"),
+    "llm_tokens_total": ("counter", "LLM tokens by stage / model / kind"),
+    "llm_cost_usd_total": ("counter", "estimated LLM cost in USD"),
+    "tool_duration_seconds": ("histogram", "tool execution latency"),
+    "tool_errors_total": ("counter", "tool executions returning an error"),
+    "event_loop_lag_seconds": ("histogram", "asyncio scheduling delay of a periodic probe"),
+}
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _inc(name: str, labels: dict, value: float = 1.0) -> None:
+    key = (name, _labels_key(labels))
+    _counters[key] = _counters.get(key, 0.0) + value
+
+
+def _observe(
+    name: str,
+    labels: dict,
+    value: float,
+    buckets: tuple[float, ...] = _LATENCY_BUCKETS,
+) -> None:
+    key = (name, _labels_key(labels))
+    if key not in _histograms:
+        _histograms[key] = _Histogram(buckets)
+    _histograms[key].observe(value)
+
+
+def _observe_run(tracer: RunTracer, status: str) -> None:
+    _inc("runs_total", {"status": status})
+    _observe("run_duration_seconds", {"status": status},
+             time.perf_counter() - tracer.started_at)
+    for span in tracer.spans:
+        _observe("stage_duration_seconds", {"stage": span.stage}, span.elapsed)
+    for c in tracer.llm_calls:
+        labels = {"stage": c.stage, "model": c.model}
+        _inc("llm_calls_total", labels)
+        _inc("llm_tokens_total", {**labels, "kind": "prompt"}, c.prompt_tokens)
+        _inc("llm_tokens_total", {**labels, "kind": "completion"}, c.completion_tokens)
+        _inc("llm_cost_usd_total", {"stage": c.stage}, c.cost_usd)
+        if c.ttft is not None:
+            _observe("stage_ttft_seconds", {"stage": c.stage}, c.ttft)
+    for t in tracer.tool_calls:
+        _observe("tool_duration_seconds", {"tool": t.tool}, t.elapsed)
+        if not t.ok:
+            _inc("tool_errors_total", {"tool": t.tool})
+
+
+# ── Event-loop lag ─────────────────────────────────────────────
+# A blocking call inside a node (sync Chroma query, PDF parsing, ...) stalls
+# every concurrent stream. The probe sleeps `interval` and measures how late
+# it wakes up; the overshoot is the time the loop was busy elsewhere.
+
+_loop_lag = {"last": 0.0, "max": 0.0}
+_lag_task: asyncio.Task | None = None
+
+
+async def _lag_probe(interval: float) -> None:
+    while True:
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - t0 - interval)
+        _loop_lag["last"] = lag
+        _loop_lag["max"] = max(_loop_lag["max"], lag)
+        _observe("event_loop_lag_seconds", {}, lag, _LAG_BUCKETS)
+
+
+def start_loop_lag_monitor(interval: float = 0.1) -> None:
+    """Start the lag probe on the running loop (call from a startup hook)."""
+    global _lag_task
+    if _lag_task is None or _lag_task.done():
+        _lag_task = asyncio.get_running_loop().create_task(_lag_probe(interval))
+
+
+def loop_lag_stats() -> dict:
+    return {
+        "event_loop_lag_last_seconds": round(_loop_lag["last"], 6),
+        "event_loop_lag_max_seconds": round(_loop_lag["max"], 6),
+    }
+
+
+def register_collector(fn: Callable[[], dict]) -> None:
+    """Expose extra metrics (cache stats, queue depth, ...) on /api/metrics.
+
+    Names ending in `_total` are typed as counters, everything else as gauges.
+    """
+    _collectors.append(fn)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: tuple | dict) -> str:
+    items = labels.items() if isinstance(labels, dict) else labels
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+    lines: list[str] = []
+    names = sorted({n for n, _ in _counters} | {n for n, _ in _histograms})
+    for name in names:
+        full = f"{METRIC_PREFIX}_{name}"
+        mtype, help_text = _HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} {mtype}")
+        for (n, labels), value in sorted(_counters.items()):
+            if n == name:
+                lines.append(f"{full}{_fmt_labels(labels)} {_fmt_value(value)}")
+        for (n, labels), h in sorted(_histograms.items(), key=lambda x: x[0]):
+            if n != name:
+                continue
+            for upper, count in zip(h.buckets, h.counts):
+                lines.append(f"{full}_bucket{_fmt_labels(labels + (('le', upper),))} {count}")
+            lines.append(f"{full}_bucket{_fmt_labels(labels + (('le', '+Inf'),))} {h.total}")
+            lines.append(f"{full}_sum{_fmt_labels(labels)} {_fmt_value(h.sum)}")
+            lines.append(f"{full}_count{_fmt_labels(labels)} {h.total}")
+
+    for collect in _collectors:
+        try:
+            gauges = collect() or {}
+        except Exception:
+            continue
+        for name, value in gauges.items():
+            full = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {full} {'counter' if name.endswith('_total') else 'gauge'}")
+            if isinstance(value, list):
+                for labels, v in value:
+                    lines.append(f"{full}{_fmt_labels(labels)} {_fmt_value(v)}")
+            else:
+                lines.append(f"{full} {_fmt_value(value)}")
+
+    return "\n".join(lines) + "\n"
@@ -60,6 +60,12 @@ async def _next_data_search(path: str, params: dict) -> dict:
         },
         "required": ["query"],
     },
+    # __NEXT_DATA__ 원본 매물 객체 — 이미지·추적용 필드 제외
+    output_schema={
+        "fields": ["query", "region", "count", "items.title", "items.price", "items.status",
+                   "items.region.name", "items.createdAt", "items.href", "items.content"],
+        "max_chars": 200,
+    },
 )
 async def daangn_used_goods_search(query: str, region: str | None = None, limit: int = 5) -> dict:
     async with httpx.AsyncClient(timeout=15, headers={"User-Agent": UA}) as client:
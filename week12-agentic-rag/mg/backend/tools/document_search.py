@@ -42,8 +42,11 @@ async def document_search(query: str, top_k: int = 5) -> dict:
         "results": [{
             "doc_name": c.doc_name,
             "page": c.page,
+            "page_end": c.page_end,
             "score": round(c.score or 0, 3),
             "chunk_index": c.chunk_index,
+            "char_start": c.char_start,
+            "char_end": c.char_end,
             "text": c.text[:600],
         } for c in chunks],
     }
@@ -55,5 +58,5 @@ async def document_search(query: str, top_k: int = 5) -> dict:
     parameters={"type": "object", "properties": {}},
 )
 async def list_uploaded_documents() -> dict:
-    docs = list_documents()
+    docs = await list_documents()
     return {"count": len(docs), "documents": docs}
@@ -65,6 +65,13 @@ async def kosis_meta(orgId: str, tblId: str) -> dict:
         },
         "required": ["orgId", "tblId"],
     },
+    # 행마다 반복되는 기관/통계표 코드는 빼고 시점·분류·값만
+    output_schema={
+        "fields": ["TBL_NM", "PRD_DE", "C1_NM", "C2_NM", "ITM_NM", "DT", "UNIT_NM"],
+        "max_items": 60,
+        "round": 2,
+        "numeric": ["DT"],      # KOSIS 는 수치를 문자열로 줌
+    },
 )
 async def kosis_data(orgId: str, tblId: str, prdSe: str | None = None,
                      newEstPrdCnt: int = 5) -> dict:
@@ -67,6 +67,7 @@ async def gangnamunni_clinic_search(query: str, limit: int = 10) -> dict:
         },
         "required": ["query"],
     },
+    output_schema={"fields": ["query", "count", "posts.title", "posts.url"], "max_items": 10},
 )
 async def naver_blog_search(query: str, limit: int = 10) -> dict:
     # 네이버 검색 모바일 페이지에서 블로그 결과 추출
@@ -98,6 +99,7 @@ async def naver_blog_search(query: str, limit: int = 10) -> dict:
         },
         "required": ["url"],
     },
+    output_schema={"fields": ["title", "url", "body"], "max_chars": 2500},
 )
 async def naver_blog_read(url: str) -> dict:
     # mobile 버전이 더 가벼움
@@ -18,6 +18,7 @@ PROXY = "https://k-skill-proxy.nomadamas.org"
         },
         "required": ["query"],
     },
+    output_schema={"max_items": 10, "max_chars": 300},
 )
 async def naver_news_search(query: str, display: int = 10, sort: str = "date") -> dict:
     async with httpx.AsyncClient(timeout=10) as client:
@@ -13,6 +13,25 @@ Usage:
     )
     async def lotto_results(round: int = None) -> str:
         ...
+
+Output shaping — a tool may declare `output_schema` so the LLM sees a compact
+view while the UI keeps the full result (`execute_tool_shaped`):
+
+    @register_tool(
+        name="naver_blog_search",
+        ...,
+        output_schema={
+            "fields": ["query", "posts.title", "posts.url"],   # 우선 필드 (점 경로, 리스트는 항목마다)
+            "max_items": 10,    # 리스트 최대 길이
+            "max_chars": 300,   # 문자열 최대 길이
+            "round": 2,         # 실수 소수점 자리
+            "numeric": ["DT"],  # 숫자를 문자열로 주는 키 — 숫자로 바꿔 round 적용
+        },
+    )
+
+Without a schema the defaults below still apply (empty values dropped, lists
+and strings capped, floats rounded, compact separators). Error results are
+passed through unchanged.
 """
 
 from typing import Callable, Any
@@ -20,11 +39,16 @@ import json
 
 _tools: dict[str, dict] = {}
 
+DEFAULT_OUTPUT_SCHEMA = {"fields": [], "max_items": 20, "max_chars": 2000, "round": 4, "numeric": []}
+
+_shaping_stats = {"calls": 0, "full_chars": 0, "llm_chars": 0}
+
 
 def register_tool(
     name: str,
     description: str,
     parameters: dict | None = None,
+    output_schema: dict | None = None,
 ):
     """Decorator to register a function as an agent tool."""
     def decorator(func: Callable) -> Callable:
@@ -32,6 +56,7 @@ def register_tool(
             "name": name,
             "description": description,
             "parameters": parameters or {"type": "object", "properties": {}},
+            "output_schema": {**DEFAULT_OUTPUT_SCHEMA, **(output_schema or {})},
             "handler": func,
         }
         return func
@@ -53,19 +78,110 @@ def get_all_tools() -> list[dict]:
     ]
 
 
-async def execute_tool(name: str, arguments: dict) -> str:
-    """Execute a registered tool by name. Returns result as string."""
+def _project(value: Any, paths: list[list[str]]) -> Any:
+    """Keep only `paths` (split dotted fields); lists are projected per item."""
+    if isinstance(value, list):
+        return [_project(v, paths) for v in value]
+    if not isinstance(value, dict):
+        return value
+    groups: dict[str, list[list[str]]] = {}
+    for path in paths:
+        groups.setdefault(path[0], []).append(path[1:])
+    out = {}
+    for key, rests in groups.items():
+        if key not in value:
+            continue
+        out[key] = value[key] if any(not r for r in rests) else _project(value[key], rests)
+    # 스키마와 모양이 다른 응답이면 원본 유지
+    return out or value
+
+
+def _number(text: str) -> Any:
+    """A numeric string as int / float; anything else (e.g. "-") unchanged."""
+    digits = text.strip().replace(",", "")
+    try:
+        return float(digits) if any(c in digits for c in ".eE") else int(digits)
+    except ValueError:
+        return text
+
+
+def _clean(value: Any, schema: dict) -> Any:
+    """Drop empty values, cap lists / strings, round floats."""
+    if isinstance(value, dict):
+        out = {}
+        for k, v in value.items():
+            if k in schema["numeric"] and isinstance(v, str):
+                v = _number(v)
+            v = _clean(v, schema)
+            if v is not None and v != "" and v != [] and v != {}:
+                out[k] = v
+        return out
+    if isinstance(value, list):
+        items = [_clean(v, schema) for v in value[:schema["max_items"]]]
+        if len(value) > schema["max_items"]:
+            items.append(f"… 외 {len(value) - schema['max_items']}건")
+        return items
+    if isinstance(value, float):
+        return round(value, schema["round"])
+    if isinstance(value, str) and schema["max_chars"] and len(value) > schema["max_chars"]:
+        return value[:schema["max_chars"]] + "…"
+    return value
+
+
+def shape_result(result: Any, schema: dict | None = None) -> str:
+    """Compact LLM-facing JSON for a tool result (see module docstring)."""
+    schema = {**DEFAULT_OUTPUT_SCHEMA, **(schema or {})}
+    if schema["fields"]:
+        result = _project(result, [f.split(".") for f in schema["fields"]])
+    return json.dumps(_clean(result, schema), ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+async def execute_tool_shaped(name: str, arguments: dict) -> tuple[str, str, bool]:
+    """Execute a tool; returns (llm_view, full_result, ok).
+
+    `full_result` is what `execute_tool` returns. `llm_view` is the shaped
+    result for the LLM / Writer / Critic; string results and errors are
+    passed through. `ok` is False for an unknown tool, a raised exception or
+    a dict result with an `"error"` key.
+    """
     tool = _tools.get(name)
     if not tool:
-        return json.dumps({"error": f"Unknown tool: {name}"}, ensure_ascii=False)
+        error = json.dumps({"error": f"Unknown tool: {name}"}, ensure_ascii=False)
+        return error, error, False
 
     try:
         result = await tool["handler"](**arguments)
-        if isinstance(result, str):
-            return result
-        return json.dumps(result, ensure_ascii=False, default=str)
     except Exception as e:
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        error = json.dumps({"error": str(e)}, ensure_ascii=False)
+        return error, error, False
+    if isinstance(result, str):
+        return result, result, True
+
+    full = json.dumps(result, ensure_ascii=False, default=str)
+    if isinstance(result, dict) and "error" in result:
+        return full, full, False
+    llm = shape_result(result, tool["output_schema"])
+    _shaping_stats["calls"] += 1
+    _shaping_stats["full_chars"] += len(full)
+    _shaping_stats["llm_chars"] += len(llm)
+    return llm, full, True
+
+
+async def execute_tool(name: str, arguments: dict) -> str:
+    """Execute a registered tool by name. Returns result as string."""
+    _, full, _ = await execute_tool_shaped(name, arguments)
+    return full
+
+
+def shaping_stats() -> dict:
+    """Gauges for /api/metrics."""
+    full = _shaping_stats["full_chars"]
+    return {
+        "tool_result_chars_total": [({"view": "full"}, full),
+                                    ({"view": "llm"}, _shaping_stats["llm_chars"])],
+        "tool_result_shaped_calls_total": _shaping_stats["calls"],
+        "tool_result_shaping_ratio": round(_shaping_stats["llm_chars"] / full, 4) if full else 0.0,
+    }
 
 
 def list_tool_names() -> list[str]:
@@ -62,6 +62,9 @@ function RetrievalPanel({ rounds }: { rounds: RetrievalRound[] }) {
                 >
                   {r.score}/5
                 </span>
+                {r.grader === "cross_encoder" && (
+                  <span className="text-[10px] text-pearl-muted/50">local</span>
+                )}
               </div>
               {r.reasoning && (
                 <p className="text-[10px] text-pearl-muted/70 italic mb-1.5">
@@ -74,7 +77,10 @@ function RetrievalPanel({ rounds }: { rounds: RetrievalRound[] }) {
                     <li key={j} className="text-[10px] text-pearl-dim/80">
                       <span className="text-cyan-400/80">
                         [{j + 1}] {c.doc_name}
-                        {c.page !== null && `, p.${c.page}`}
+                        {c.page !== null &&
+                          (c.page_end != null && c.page_end !== c.page
+                            ? `, pp.${c.page}-${c.page_end}`
+                            : `, p.${c.page}`)}
                       </span>
                       <span className="text-pearl-muted/50"> · {c.score.toFixed(3)}</span>
                       <p className="ml-3 text-pearl-muted/60 line-clamp-2">
@@ -1,13 +1,25 @@
 "use client";
 
 import { useCallback, useEffect, useRef, useState } from "react";
-import type { DocumentInfo } from "@/types/chat";
+import type { DocumentInfo, IngestJob } from "@/types/chat";
 
 const API = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+const JOB_POLL_MS = 1000;
+
+const STAGE_LABEL: Record<string, string> = {
+  queued: "대기 중",
+  waiting: "같은 파일 인덱싱 대기",
+  extract: "텍스트 추출",
+  chunk: "청크 분할",
+  embed: "임베딩",
+  store: "저장",
+  done: "완료",
+};
 
 export default function DocumentPanel() {
   const [docs, setDocs] = useState<DocumentInfo[]>([]);
   const [uploading, setUploading] = useState(false);
+  const [job, setJob] = useState<IngestJob | null>(null);
   const [error, setError] = useState<string | null>(null);
   const inputRef = useRef<HTMLInputElement>(null);
 
@@ -25,6 +37,21 @@ export default function DocumentPanel() {
     refresh();
   }, [refresh]);
 
+  // 업로드는 202 로 바로 돌아오고, 인덱싱은 백그라운드 job — 끝날 때까지 상태를 폴링
+  const waitForJob = async (jobId: string) => {
+    for (;;) {
+      const res = await fetch(`${API}/api/documents/jobs/${encodeURIComponent(jobId)}`);
+      if (!res.ok) throw new Error(`작업 조회 실패 (${res.status})`);
+      const data: IngestJob = await res.json();
+      setJob(data);
+      if (data.status === "done") return;
+      if (data.status === "duplicate") throw new Error("이미 인덱싱된 문서입니다");
+      if (data.status === "cancelled") throw new Error("취소됨");
+      if (data.status === "error") throw new Error(data.error || "인덱싱 실패");
+      await new Promise((r) => setTimeout(r, JOB_POLL_MS));
+    }
+  };
+
   const onUpload = async (file: File) => {
     setError(null);
     setUploading(true);
@@ -39,16 +66,32 @@ export default function DocumentPanel() {
         const data = await res.json().catch(() => ({}));
         setError(data.detail || `업로드 실패 (${res.status})`);
       } else {
+        const data = await res.json();
+        if (data.status === "duplicate") {
+          setError(`이미 인덱싱된 문서입니다: ${data.doc_name}`);
+        } else {
+          await waitForJob(data.job_id);
+        }
         await refresh();
       }
     } catch (e) {
       setError(e instanceof Error ? e.message : "업로드 실패");
     } finally {
+      setJob(null);
       setUploading(false);
       if (inputRef.current) inputRef.current.value = "";
     }
   };
 
+  const onCancel = async () => {
+    if (!job) return;
+    try {
+      await fetch(`${API}/api/documents/jobs/${encodeURIComponent(job.id)}`, {
+        method: "DELETE",
+      });
+    } catch { /* ignore — 폴링이 최종 상태를 보여줌 */ }
+  };
+
   const onDelete = async (docId: string) => {
     try {
       await fetch(`${API}/api/documents/${encodeURIComponent(docId)}`, {
@@ -90,9 +133,23 @@ export default function DocumentPanel() {
                 : "text-pearl-dim cursor-pointer hover:border-gold/40 hover:text-pearl"
             }`}
           >
-            {uploading ? "업로드 중..." : "+ 파일 선택"}
+            {!uploading
+              ? "+ 파일 선택"
+              : job
+                ? `${STAGE_LABEL[job.stage] || job.stage} ${Math.round(job.progress * 100)}%`
+                : "업로드 중..."}
           </span>
         </label>
+        {job && (job.status === "queued" || job.status === "running") && (
+          <div className="mt-2 flex items-center justify-between text-[10px] text-pearl-muted/50">
+            <span>
+              {job.attempts > 1 ? `재시도 ${job.attempts - 1}회` : job.status === "queued" ? "대기열" : ""}
+            </span>
+            <button onClick={onCancel} className="text-red-400/70 hover:text-red-400">
+              취소
+            </button>
+          </div>
+        )}
         {error && (
           <p className="mt-2 text-[10px] text-red-400">{error}</p>
         )}
@@ -349,6 +349,7 @@ export function useChat() {
                 currentRetrievalRound.score = d.score as number;
                 currentRetrievalRound.reasoning = d.reasoning as string;
                 currentRetrievalRound.alternative_query = (d.alternative_query || undefined) as string | undefined;
+                currentRetrievalRound.grader = (d.grader || undefined) as RetrievalRound["grader"];
                 retrievalRounds = [...retrievalRounds, currentRetrievalRound as RetrievalRound];
                 currentRetrievalRound = null;
               }
@@ -55,6 +55,8 @@ export interface AgentEvent {
     | "retrieval_round"
     | "retrieval_result"
     | "retrieval_eval"
+    | "cache_hit"
+    | "trace"
     | "done";
   data: Record<string, unknown>;
 }
@@ -86,6 +88,7 @@ export interface CriticReport {
 export interface RetrievedChunk {
   doc_name: string;
   page: number | null;
+  page_end?: number | null;
   score: number;
   text_snippet?: string;
   text?: string;
@@ -98,6 +101,7 @@ export interface RetrievalRound {
   score: number;
   reasoning: string;
   alternative_query?: string;
+  grader?: "cross_encoder" | "llm" | "none";
 }
 
 export interface DocumentInfo {
@@ -106,6 +110,18 @@ export interface DocumentInfo {
   chunks: number;
 }
 
+export interface IngestJob {
+  id: string;
+  doc_name: string;
+  status: "queued" | "running" | "done" | "error" | "cancelled" | "duplicate";
+  stage: string;
+  progress: number;
+  doc_id: string | null;
+  chunks_added: number;
+  attempts: number;
+  error: string | null;
+}
+
 export interface ChatMessage {
   id: string;
   role: "user" | "assistant";
@@ -0,0 +1,185 @@
+"""Benchmark the week12 token-budgeted chunker against the old splitter.
+
+Compares the sentence-aware chunker (`services.chunker.chunk_text`) with
+the character-window `_split_into_chunks` it replaced (copied below as
+`legacy_split`) on:
+
+- chunk count, embedding tokens (cl100k_base), tokens per chunk, chunks
+  over the token budget
+- retrieval quality on the labeled set — Recall@1/5 and MRR with the
+  offline hash embedding, all samples in one pool (like target_week12)
+- split time on synthetic multi-MB text (samples repeated), per MB, to
+  check the chunker stays linear
+
+    py -m evaluation.chunker_bench
+    py -m evaluation.chunker_bench --max-tokens 400 --sizes-mb 1,4,8 --out reports/chunker.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from evaluation.dataset import REPO_ROOT, gold_gains, load_samples, questions_for
+from evaluation.metrics import recall_at_k, reciprocal_rank
+from evaluation.offline import hash_embedding
+
+BACKEND = REPO_ROOT / "week12-agentic-rag" / "mg" / "backend"
+
+
+# ── 이전 week12 splitter (services/ingestion.py, 문자 기준) ──────
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def legacy_split(text: str, max_chars: int = 2400, overlap: int = 100) -> list[str]:
+    text = _normalize(text)
+    if not text:
+        return []
+
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    chunks: list[str] = []
+    buf = ""
+
+    def flush():
+        nonlocal buf
+        if buf.strip():
+            chunks.append(buf.strip())
+        buf = ""
+
+    for p in paragraphs:
+        if len(p) > max_chars:
+            flush()
+            i = 0
+            while i < len(p):
+                end = min(i + max_chars, len(p))
+                chunks.append(p[i:end])
+                i = end - overlap if end < len(p) else end
+            continue
+
+        if len(buf) + 2 + len(p) <= max_chars:
+            buf = (buf + "\n\n" + p) if buf else p
+        else:
+            flush()
+            buf = p
+    flush()
+
+    if overlap > 0 and len(chunks) > 1:
+        overlapped: list[str] = [chunks[0]]
+        for i in range(1, len(chunks)):
+            prev_tail = chunks[i - 1][-overlap:]
+            overlapped.append(prev_tail + "\n" + chunks[i])
+        chunks = overlapped
+
+    return chunks
+
+
+# ── 측정 ─────────────────────────────────────────────────────
+
+def _token_stats(texts: list[str], count_tokens, budget: int) -> dict:
+    counts = [count_tokens(t) for t in texts]
+    ordered = sorted(counts)
+    return {
+        "chunks": len(counts),
+        "embed_tokens": sum(counts),
+        "tokens_mean": round(sum(counts) / len(counts), 1) if counts else 0,
+        "tokens_p95": ordered[int(0.95 * (len(ordered) - 1))] if counts else 0,
+        "tokens_max": ordered[-1] if counts else 0,
+        "over_budget": sum(c > budget for c in counts),
+    }
+
+
+def _retrieval(chunk_rows: list[tuple[str, str, str]], top_k: int) -> dict:
+    items = questions_for()
+    vectors = [hash_embedding(text) for _, _, text in chunk_rows]   # L2-normalised
+    r1 = rk = mrr = 0.0
+    for item in items:
+        gold = gold_gains(item, chunk_rows)
+        q = hash_embedding(item.question)
+        sims = [sum(a * b for a, b in zip(q, v)) for v in vectors]
+        order = sorted(range(len(sims)), key=sims.__getitem__, reverse=True)[:top_k]
+        retrieved = [chunk_rows[i][0] for i in order]
+        r1 += recall_at_k(retrieved, gold, 1)
+        rk += recall_at_k(retrieved, gold, top_k)
+        mrr += reciprocal_rank(retrieved, gold)
+    n = len(items)
+    return {"recall@1": round(r1 / n, 4), f"recall@{top_k}": round(rk / n, 4), "mrr": round(mrr / n, 4)}
+
+
+def _timing(split, text: str) -> float:
+    t0 = time.perf_counter()
+    split(text)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="week12 청커 비교 (이전 문자 기준 vs 토큰 기준)")
+    parser.add_argument("--max-tokens", type=int, default=0, help="0 이면 chunker.MAX_TOKENS")
+    parser.add_argument("--overlap-tokens", type=int, default=-1, help="-1 이면 chunker.OVERLAP_TOKENS")
+    parser.add_argument("--legacy-chars", type=int, default=2400)
+    parser.add_argument("--legacy-overlap", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--sizes-mb", default="1,4", help="속도 측정용 합성 텍스트 크기")
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND))
+    from services import chunker
+
+    max_tokens = args.max_tokens or chunker.MAX_TOKENS
+    overlap = chunker.OVERLAP_TOKENS if args.overlap_tokens < 0 else args.overlap_tokens
+    splitters = {
+        "legacy": lambda text: legacy_split(text, args.legacy_chars, args.legacy_overlap),
+        "token": lambda text: [c.text for c in chunker.chunk_text(text, max_tokens, overlap)],
+    }
+
+    samples = load_samples()
+    corpus = "\n\n".join(s["content"] for s in samples)
+    results: dict[str, dict] = {}
+    for name, split in splitters.items():
+        rows = [(f"{s['id']}#{i}", s["id"], text)
+                for s in samples for i, text in enumerate(split(s["content"]))]
+        results[name] = {
+            **_token_stats([text for _, _, text in rows], chunker.count_tokens, max_tokens),
+            **_retrieval(rows, args.top_k),
+            "timing": {},
+        }
+
+    for mb in [float(x) for x in args.sizes_mb.split(",") if x.strip()]:
+        repeat = max(1, int(mb * 1_000_000 / len(corpus.encode("utf-8"))))
+        text = "\n\n".join([corpus] * repeat)
+        size_mb = len(text.encode("utf-8")) / 1_000_000
+        for name, split in splitters.items():
+            sec = _timing(split, text)
+            results[name]["timing"][f"{mb:g}MB"] = {
+                "seconds": round(sec, 3), "sec_per_mb": round(sec / size_mb, 3),
+            }
+
+    print(f"max_tokens={max_tokens} overlap_tokens={overlap} | legacy {args.legacy_chars} chars / {args.legacy_overlap} overlap")
+    print(f"{'splitter':<8} {'chunks':>6} {'tokens':>7} {'mean':>6} {'p95':>5} {'max':>5} {'over':>5} "
+          f"{'R@1':>6} {'R@' + str(args.top_k):>6} {'MRR':>6}  s/MB")
+    for name, r in results.items():
+        per_mb = " ".join(f"{k}:{v['sec_per_mb']}" for k, v in r["timing"].items())
+        print(f"{name:<8} {r['chunks']:>6} {r['embed_tokens']:>7} {r['tokens_mean']:>6} {r['tokens_p95']:>5} "
+              f"{r['tokens_max']:>5} {r['over_budget']:>5} {r['recall@1']:>6.3f} "
+              f"{r[f'recall@{args.top_k}']:>6.3f} {r['mrr']:>6.3f}  {per_mb}")
+
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps({
+            "max_tokens": max_tokens, "overlap_tokens": overlap,
+            "legacy_chars": args.legacy_chars, "legacy_overlap": args.legacy_overlap,
+            "results": results,
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"→ {args.out}")
+
+
+if __name__ == "__main__":
+    main()
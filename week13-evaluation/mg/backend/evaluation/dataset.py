@@ -0,0 +1,149 @@
+"""Labeled retrieval set over week05 `data/samples.py`.
+
+Each question is labeled with *anchors* — short verbatim phrases from the
+sample document that a correct answer must be grounded in. Chunk
+boundaries differ per pipeline (week05 500/50 splitter, week12 2400-char
+paragraphs), so gold chunks are resolved at index time: a chunk is
+relevant when it contains an anchor, and its gain (for nDCG) is the number
+of anchors it contains.
+
+`complexity` follows the week05 adaptive classifier labels
+(SIMPLE / MODERATE / COMPLEX).
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from dataclasses import dataclass, field
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+SAMPLES_PATH = REPO_ROOT / "week05-advanced-rag" / "mg" / "backend" / "data" / "samples.py"
+
+
+@dataclass
+class LabeledQuestion:
+    id: str
+    sample_id: str
+    question: str
+    anchors: list[str]
+    complexity: str = "SIMPLE"
+    tags: list[str] = field(default_factory=list)
+
+
+LABELED: list[LabeledQuestion] = [
+    # ── ai-intro ──────────────────────────────────────────
+    LabeledQuestion("ai-01", "ai-intro", "인공지능이라는 용어는 언제 누가 처음 사용했나?",
+                    ["1956년 다트머스 회의"]),
+    LabeledQuestion("ai-02", "ai-intro", "약인공지능과 강인공지능의 차이는?",
+                    ["약인공지능(Weak AI, Narrow AI)은 특정 작업에 특화된",
+                     "강인공지능(Strong AI, General AI)은 인간과 동등한"], "MODERATE"),
+    LabeledQuestion("ai-03", "ai-intro", "지도학습의 대표적인 문제 유형은?",
+                    ["분류(Classification)와 회귀(Regression)가 대표적"]),
+    LabeledQuestion("ai-04", "ai-intro", "강화학습은 어디에 활용되나?",
+                    ["AlphaGo, 자율주행 자동차, 로봇 제어"]),
+    LabeledQuestion("ai-05", "ai-intro", "CNN은 어떤 구조이고 어디에 쓰이나?",
+                    ["필터를 사용하여 이미지의 지역적 특징을 추출"], "MODERATE"),
+    LabeledQuestion("ai-06", "ai-intro", "트랜스포머의 핵심 메커니즘은 무엇인가?",
+                    ["셀프 어텐션(Self-Attention) 메커니즘"]),
+    LabeledQuestion("ai-07", "ai-intro", "책임 있는 AI를 위해 어떤 원칙이 강조되나?",
+                    ["공정성, 투명성, 설명 가능성, 안전성"]),
+    LabeledQuestion("ai-08", "ai-intro", "딥러닝이 발전한 배경과 대규모 언어 모델까지 이어진 흐름을 설명해줘",
+                    ["대량의 데이터와 GPU 연산 능력의 발전",
+                     "BERT, GPT 시리즈 등의 대규모 언어 모델"], "COMPLEX"),
+
+    # ── python-guide ──────────────────────────────────────
+    LabeledQuestion("py-01", "python-guide", "파이썬은 누가 언제 개발했나?",
+                    ["1991년 귀도 반 로섬"]),
+    LabeledQuestion("py-02", "python-guide", "딕셔너리에서 키로 값에 접근하는 시간 복잡도는?",
+                    ["O(1) 시간 복잡도"]),
+    LabeledQuestion("py-03", "python-guide", "리스트 컴프리헨션 예시를 알려줘",
+                    ["리스트 컴프리헨션([x**2 for x in range(10)])"]),
+    LabeledQuestion("py-04", "python-guide", "데코레이터는 어떤 개념을 기반으로 하나?",
+                    ["클로저(closure)와 일급 함수"], "MODERATE"),
+    LabeledQuestion("py-05", "python-guide", "파일을 다룰 때 with 문을 쓰는 이유는?",
+                    ["with 문을 사용하여 자동으로 파일을 닫는"], "MODERATE"),
+    LabeledQuestion("py-06", "python-guide", "asyncio에서 async와 await는 각각 무슨 역할을 하나?",
+                    ["async 키워드로 코루틴(coroutine) 함수를 정의하고"], "MODERATE"),
+    LabeledQuestion("py-07", "python-guide", "파이썬 테스트 프레임워크 중 가장 널리 쓰이는 것은?",
+                    ["pytest는 간결한 문법과 강력한 기능으로"]),
+    LabeledQuestion("py-08", "python-guide", "파이썬이 쓰이는 분야와 분야별 대표 라이브러리를 정리해줘",
+                    ["웹 개발(Django, Flask, FastAPI)"], "COMPLEX"),
+
+    # ── climate-report ────────────────────────────────────
+    LabeledQuestion("cl-01", "climate-report", "산업혁명 이전 대비 지구 평균 기온은 얼마나 올랐나?",
+                    ["약 1.1도 상승"]),
+    LabeledQuestion("cl-02", "climate-report", "해수면은 매년 얼마나 상승하고 있나?",
+                    ["연간 약 3.6mm씩 상승"]),
+    LabeledQuestion("cl-03", "climate-report", "메탄은 CO2보다 온실효과가 얼마나 강한가?",
+                    ["CO2보다 약 80배 강력한"]),
+    LabeledQuestion("cl-04", "climate-report", "산호초 백화 현상이 계속되면 어떻게 되나?",
+                    ["2050년까지 전 세계 산호초의 90% 이상"], "MODERATE"),
+    LabeledQuestion("cl-05", "climate-report", "도시 열섬 효과가 생기는 원인은?",
+                    ["콘크리트, 아스팔트 등 인공 구조물이 태양열을 흡수"], "MODERATE"),
+    LabeledQuestion("cl-06", "climate-report", "CBAM은 어떤 제도이고 왜 도입되었나?",
+                    ["탄소 가격이 낮은 국가에서 생산된 수입품",
+                     "탄소 누출(carbon leakage)"], "MODERATE"),
+    LabeledQuestion("cl-07", "climate-report", "탄소 가격제의 두 가지 방식은?",
+                    ["탄소세(carbon tax)와 배출권 거래제"]),
+    LabeledQuestion("cl-08", "climate-report", "손실과 피해 기금이 만들어진 과정과 탄소 포집 같은 기술적 대응을 함께 설명해줘",
+                    ["2022년 COP27에서 '손실과 피해 기금' 설립",
+                     "직접 공기 포집(DAC, Direct Air Capture)"], "COMPLEX"),
+
+    # ── startup-guide ─────────────────────────────────────
+    LabeledQuestion("st-01", "startup-guide", "시리즈 A 투자 규모는 보통 얼마인가?",
+                    ["보통 30억~100억 원 규모"]),
+    LabeledQuestion("st-02", "startup-guide", "제품-시장 적합성(PMF)이란 무엇인가?",
+                    ['"시장이 원하는 제품을 만든 상태"']),
+    LabeledQuestion("st-03", "startup-guide", "그로스 해킹이라는 용어를 처음 쓴 사람은?",
+                    ["션 엘리스(Sean Ellis)"]),
+    LabeledQuestion("st-04", "startup-guide", "초기 직원에게 스톡옵션은 보통 어느 정도 주나?",
+                    ["0.5%~2%의 스톡옵션"]),
+    LabeledQuestion("st-05", "startup-guide", "쿠팡의 핵심 전략은?",
+                    ['"로켓 배송"이다']),
+    LabeledQuestion("st-06", "startup-guide", "번 레이트와 런웨이는 어떻게 계산하나?",
+                    ["번 레이트는 월간 순 지출액",
+                     "런웨이는 현재 보유 자금으로 운영할 수 있는 개월 수"], "MODERATE"),
+    LabeledQuestion("st-07", "startup-guide", "구독 모델의 장점과 단점은?",
+                    ["예측 가능한 매출(MRR", "초기 고객 획득 비용(CAC)이 높고"], "MODERATE"),
+    LabeledQuestion("st-08", "startup-guide", "당근마켓과 에어비앤비 사례로 좋은 아이디어의 조건을 종합해줘",
+                    ["2015년 중고 거래 앱으로 시작",
+                     '"남는 방을 빌려주는" 단순한 아이디어'], "COMPLEX"),
+]
+
+
+def load_samples() -> list[dict]:
+    """Load week05 SAMPLES by file path (targets have their own `data` / `services` packages)."""
+    spec = importlib.util.spec_from_file_location("_eval_samples", SAMPLES_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.SAMPLES
+
+
+def questions_for(sample_id: str | None = None) -> list[LabeledQuestion]:
+    if sample_id is None:
+        return list(LABELED)
+    return [q for q in LABELED if q.sample_id == sample_id]
+
+
+def gold_gains(item: LabeledQuestion, chunks: list[tuple[str, str, str]]) -> dict[str, int]:
+    """Resolve gold chunks for one question.
+
+    chunks: [(chunk_id, sample_id, text), ...] as indexed by the target.
+    Returns {chunk_id: gain} where gain = number of anchors in the chunk.
+    An anchor split across a chunk boundary falls back to matching either
+    half, so overlap-free splitters still get a gold chunk.
+    """
+    gains: dict[str, int] = {}
+    for anchor in item.anchors:
+        hits = [cid for cid, sid, text in chunks if sid == item.sample_id and anchor in text]
+        if not hits:
+            half = max(4, len(anchor) // 2)
+            head, tail = anchor[:half], anchor[-half:]
+            hits = [
+                cid for cid, sid, text in chunks
+                if sid == item.sample_id and (head in text or tail in text)
+            ]
+        for cid in hits:
+            gains[cid] = gains.get(cid, 0) + 1
+    return gains
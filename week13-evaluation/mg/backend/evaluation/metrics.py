@@ -0,0 +1,81 @@
+"""Ranking metrics + per-pipeline aggregation.
+
+All functions take the retrieved chunk ids in rank order and the gold
+{chunk_id: gain} map from `dataset.gold_gains`.
+"""
+
+from __future__ import annotations
+
+import math
+import statistics
+
+K_VALUES = (1, 3, 5)
+
+
+def recall_at_k(retrieved: list[str], gold: dict[str, int], k: int) -> float:
+    if not gold:
+        return 0.0
+    hits = len(set(retrieved[:k]) & set(gold))
+    return hits / len(gold)
+
+
+def reciprocal_rank(retrieved: list[str], gold: dict[str, int]) -> float:
+    for rank, cid in enumerate(retrieved, start=1):
+        if cid in gold:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(retrieved: list[str], gold: dict[str, int], k: int) -> float:
+    """Graded nDCG (gain = anchors contained); duplicates count once."""
+    seen: set[str] = set()
+    dcg = 0.0
+    for rank, cid in enumerate(retrieved[:k], start=1):
+        if cid in gold and cid not in seen:
+            dcg += (2 ** gold[cid] - 1) / math.log2(rank + 1)
+        seen.add(cid)
+    ideal = sorted(gold.values(), reverse=True)[:k]
+    idcg = sum((2 ** g - 1) / math.log2(rank + 1) for rank, g in enumerate(ideal, start=1))
+    return dcg / idcg if idcg else 0.0
+
+
+def score_question(retrieved: list[str], gold: dict[str, int]) -> dict:
+    row = {f"recall@{k}": recall_at_k(retrieved, gold, k) for k in K_VALUES}
+    row["mrr"] = reciprocal_rank(retrieved, gold)
+    row.update({f"ndcg@{k}": ndcg_at_k(retrieved, gold, k) for k in K_VALUES})
+    return row
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def aggregate(rows: list[dict]) -> dict:
+    """Mean quality metrics, latency percentiles and total / per-question cost."""
+    if not rows:
+        return {}
+    ok = [r for r in rows if not r.get("error")]
+    out: dict = {"questions": len(rows), "errors": len(rows) - len(ok)}
+    if not ok:
+        return out
+
+    metric_keys = [k for k in ok[0]["metrics"]]
+    for key in metric_keys:
+        out[key] = round(statistics.fmean(r["metrics"][key] for r in ok), 4)
+
+    latencies = [r["latency_ms"] for r in ok]
+    out["latency_ms"] = {
+        "mean": round(statistics.fmean(latencies), 1),
+        "p50": round(_percentile(latencies, 50), 1),
+        "p95": round(_percentile(latencies, 95), 1),
+    }
+    out["llm_calls"] = round(statistics.fmean(r["usage"]["llm_calls"] for r in ok), 2)
+    out["prompt_tokens"] = round(statistics.fmean(r["usage"]["prompt_tokens"] for r in ok), 1)
+    out["completion_tokens"] = round(statistics.fmean(r["usage"]["completion_tokens"] for r in ok), 1)
+    out["embedding_tokens"] = round(statistics.fmean(r["usage"]["embedding_tokens"] for r in ok), 1)
+    total_cost = sum(r["usage"]["cost_usd"] for r in ok)
+    out["cost_usd_per_question"] = round(total_cost / len(ok), 6)
+    out["cost_usd_total"] = round(total_cost, 6)
+    return out
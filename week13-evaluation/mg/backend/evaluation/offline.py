@@ -0,0 +1,424 @@
+"""Offline stand-ins for the OpenAI client used by the week05 / week12 code.
+
+`OfflineOpenAI` implements the two surfaces the pipelines touch —
+`chat.completions.create(...)` and `embeddings.create(...)` — and is swapped
+into each module's `_client` global by the targets.
+
+- Chat: a deterministic fake LLM. The role is recognised from the system
+  prompt (HyDE, rerank, multi-query, CRAG, Self-RAG, adaptive, week12
+  retriever) and answered with a lexical heuristic, so the same question
+  always takes the same path through every pipeline. `stream=True` returns
+  the same content as an async iterator of delta chunks (plus a usage
+  chunk with `stream_options.include_usage`); a stream closed early is
+  metered for the text it delivered.
+- Embeddings, three modes:
+    hash   — hashed character n-gram vectors (no network, default)
+    cache  — vectors previously recorded from OpenAI; a miss is an error
+    record — call OpenAI once and write through to the cache
+- `UsageMeter` counts calls and tokens so cost can be compared across
+  pipelines even though nothing is billed.
+
+Token counts are a byte-based estimate (≈ 0.75 token per Hangul syllable),
+because tiktoken downloads its BPE tables on first use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import unicodedata
+from array import array
+from pathlib import Path
+from types import SimpleNamespace
+
+EMBED_DIM = 1536
+EMBEDDING_MODEL = "text-embedding-3-small"
+HASH_MODEL = "hash-ngram-1536"
+
+CACHE_PATH = Path(__file__).resolve().parent.parent / "eval_cache" / "embeddings.sqlite"
+
+# ── 모델별 가격 (USD per token) — week05 llm_service 와 같은 표 ──
+PRICING = {
+    "gpt-4o": {"input": 2.50 / 1_000_000, "output": 10.00 / 1_000_000},
+    "gpt-4o-mini": {"input": 0.15 / 1_000_000, "output": 0.60 / 1_000_000},
+    "gpt-4.1-mini": {"input": 0.40 / 1_000_000, "output": 1.60 / 1_000_000},
+    "gpt-4.1-nano": {"input": 0.10 / 1_000_000, "output": 0.40 / 1_000_000},
+}
+EMBEDDING_PRICE = 0.02 / 1_000_000
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+# ── Lexical helpers shared by the fake roles ─────────────────────
+
+_WORD_RE = re.compile(r"[0-9A-Za-z가-힣]+")
+_PARTICLES = ("은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "로", "으로", "에서", "이란", "란")
+_STOPWORDS = {"무엇인가", "무엇", "어떻게", "얼마나", "알려줘", "설명해줘", "정리해줘", "종합해줘",
+              "어떤", "언제", "누가", "보통", "각각", "무슨", "하나", "되나", "있나", "쓰이나", "하나요"}
+
+
+def keywords(text: str) -> list[str]:
+    out = []
+    for w in _WORD_RE.findall(unicodedata.normalize("NFKC", text)):
+        for p in sorted(_PARTICLES, key=len, reverse=True):
+            if len(w) > len(p) + 1 and w.endswith(p):
+                w = w[: -len(p)]
+                break
+        if len(w) >= 2 and w not in _STOPWORDS:
+            out.append(w)
+    return out
+
+
+def _bigrams(text: str) -> set[str]:
+    s = re.sub(r"\s+", "", unicodedata.normalize("NFKC", text).lower())
+    return {s[i:i + 2] for i in range(len(s) - 1)}
+
+
+def overlap(question: str, text: str) -> float:
+    """Share of the question's keyword bigrams found in text (0~1)."""
+    q = set()
+    for w in keywords(question):
+        q |= _bigrams(w)
+    if not q:
+        return 0.0
+    return len(q & _bigrams(text)) / len(q)
+
+
+def _question_from(user: str) -> str:
+    m = re.search(r"질문:\s*(.+)", user)
+    return (m.group(1) if m else user).strip()
+
+
+# ── Hashed n-gram embeddings ─────────────────────────────────────
+
+def hash_embedding(text: str, dim: int = EMBED_DIM) -> list[float]:
+    """Signed feature hashing of character 2/3-grams, L2-normalised."""
+    s = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text).lower()).strip()
+    vec = [0.0] * dim
+    for n in (2, 3):
+        for i in range(len(s) - n + 1):
+            gram = s[i:i + n]
+            if gram.isspace():
+                continue
+            h = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+            idx = int.from_bytes(h[:4], "little") % dim
+            vec[idx] += 1.0 if h[4] & 1 else -1.0
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+class EmbeddingCache:
+    """SQLite map (model, sha1(text)) → float32 vector."""
+
+    def __init__(self, path: Path = CACHE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, key TEXT NOT NULL, vec BLOB NOT NULL,"
+            " PRIMARY KEY (model, key))"
+        )
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        out = []
+        for t in texts:
+            row = self._db.execute(
+                "SELECT vec FROM embeddings WHERE model = ? AND key = ?", (model, self.key(t)),
+            ).fetchone()
+            out.append(array("f", row[0]).tolist() if row else None)
+        return out
+
+    def put_many(self, model: str, texts: list[str], vectors: list[list[float]]) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, key, vec) VALUES (?, ?, ?)",
+            [(model, self.key(t), array("f", v).tobytes()) for t, v in zip(texts, vectors)],
+        )
+        self._db.commit()
+
+
+# ── Usage meter ──────────────────────────────────────────────────
+
+class UsageMeter:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.embedding_calls = 0
+        self.embedding_tokens = 0
+        self.cost_usd = 0.0
+
+    def add_llm(self, model: str, prompt: int, completion: int) -> None:
+        pricing = PRICING.get(model, PRICING["gpt-4o-mini"])
+        self.llm_calls += 1
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        self.cost_usd += prompt * pricing["input"] + completion * pricing["output"]
+
+    def add_embedding(self, tokens: int) -> None:
+        self.embedding_calls += 1
+        self.embedding_tokens += tokens
+        self.cost_usd += tokens * EMBEDDING_PRICE
+
+    def snapshot(self) -> dict:
+        return {
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "embedding_calls": self.embedding_calls,
+            "embedding_tokens": self.embedding_tokens,
+            "cost_usd": round(self.cost_usd, 8),
+        }
+
+
+# ── Fake LLM roles (system-prompt marker → handler) ──────────────
+
+def _hyde(question: str, user: str) -> str:
+    kw = " ".join(keywords(question))
+    return f"{kw}에 대한 설명이다. {question.rstrip('?')}에 관한 핵심 내용은 다음과 같다."
+
+
+def _rerank(question: str, user: str) -> str:
+    q = _question_from(user.split("\n\n")[0])
+    parts = re.findall(r"\[청크 (\d+)\]\s*(.*?)(?=\n\n\[청크 \d+\]|\Z)", user, re.S)
+    results = [{"index": int(i), "score": round(overlap(q, text) * 10)} for i, text in parts]
+    return json.dumps({"results": results}, ensure_ascii=False)
+
+
+def _multi_query(question: str, user: str) -> str:
+    kw = " ".join(keywords(question))
+    return json.dumps({"queries": [kw, f"{kw} 설명", f"{kw} 특징과 예시"]}, ensure_ascii=False)
+
+
+def _crag_eval(question: str, user: str) -> str:
+    q = _question_from(user.split("\n\n")[0])
+    score = overlap(q, user.split("검색된 문서:", 1)[-1])
+    verdict = "CORRECT" if score >= 0.6 else "AMBIGUOUS" if score >= 0.3 else "INCORRECT"
+    return json.dumps({"verdict": verdict, "confidence": round(score, 2), "reason": "fake"})
+
+
+def _refine(question: str, user: str) -> str:
+    m = re.search(r"원래 질문:\s*(.+)", user)
+    return " ".join(keywords(m.group(1) if m else user))
+
+
+def _need_retrieval(question: str, user: str) -> str:
+    return json.dumps({"need_retrieval": True, "reason": "fake"})
+
+
+def _self_eval(question: str, user: str) -> str:
+    return json.dumps({"score": 8, "is_grounded": True, "feedback": "fake"})
+
+
+def _classify(question: str, user: str) -> str:
+    if any(w in question for w in ("종합", "흐름", "함께", "정리해")):
+        complexity, pipeline = "COMPLEX", "advanced"
+    elif any(w in question for w in ("차이", "이유", "왜", "어떻게", "장점", "원인")):
+        complexity, pipeline = "MODERATE", "rerank"
+    else:
+        complexity, pipeline = "SIMPLE", "basic"
+    return json.dumps({"complexity": complexity, "reason": "fake",
+                       "recommended_pipeline": pipeline})
+
+
+def _rewrite(question: str, user: str) -> str:
+    return json.dumps({"query": " ".join(keywords(_question_from(user)))[:30]}, ensure_ascii=False)
+
+
+def _relevance(question: str, user: str) -> str:
+    q = _question_from(user.split("\n\n")[0])
+    score = overlap(q, user.split("검색된 chunks:", 1)[-1])
+    return json.dumps({"score": 1 + round(score * 4), "reasoning": "fake",
+                       "alternative_query": " ".join(keywords(q)) if score < 0.5 else ""},
+                      ensure_ascii=False)
+
+
+def _answer(question: str, system: str) -> str:
+    """Extractive answer: the context sentence with the best keyword overlap."""
+    context = system.split("---", 1)[-1]
+    sentences = [s.strip() for s in re.split(r"(?<=[.다])\s+", context) if len(s.strip()) > 10]
+    if not sentences:
+        return "문서에 해당 정보가 없습니다"
+    return max(sentences, key=lambda s: overlap(question, s))[:400]
+
+
+_ROLES = [
+    ("가상의 답변", _hyde),
+    ("관련성을 0~10점으로", _rerank),
+    ("3가지 다른 관점", _multi_query),
+    ("검색된 문서들의 관련성", _crag_eval),
+    ("질문을 다른 관점에서 재작성", _refine),
+    ("외부 문서 검색이 필요한지", _need_retrieval),
+    ("생성된 답변의 품질", _self_eval),
+    ("질문의 복잡도를 분류", _classify),
+    ("검색 쿼리 변환", _rewrite),
+    ("검색 결과 평가자", _relevance),
+]
+
+
+class _FakeStream:
+    """`stream=True` response: delta chunks of ~4 characters, then usage."""
+
+    def __init__(self, owner: "OfflineOpenAI", model: str, prompt: int, content: str, include_usage: bool):
+        self._owner = owner
+        self._model = model
+        self._prompt = prompt
+        self._pieces = [content[i:i + 4] for i in range(0, len(content), 4)]
+        self._sent: list[str] = []
+        self._include_usage = include_usage
+        self._metered = False
+        self._closed = False
+
+    def _meter(self) -> int:
+        completion = estimate_tokens("".join(self._sent))
+        if not self._metered:
+            self._owner.meter.add_llm(self._model, self._prompt, completion)
+            self._metered = True
+        return completion
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed:
+            raise StopAsyncIteration
+        if self._pieces:
+            piece = self._pieces.pop(0)
+            self._sent.append(piece)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=piece), finish_reason=None)],
+                usage=None,
+            )
+        self._closed = True
+        completion = self._meter()
+        if self._include_usage:
+            return SimpleNamespace(choices=[], usage=SimpleNamespace(
+                prompt_tokens=self._prompt, completion_tokens=completion,
+                total_tokens=self._prompt + completion,
+            ))
+        raise StopAsyncIteration
+
+    async def close(self) -> None:
+        self._meter()
+        self._closed = True
+
+
+class _ChatCompletions:
+    def __init__(self, owner: "OfflineOpenAI"):
+        self._owner = owner
+
+    async def create(self, *, model: str, messages: list[dict], **kwargs):
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        question = _question_from(user)
+
+        content = None
+        for marker, handler in _ROLES:
+            if marker in system:
+                content = handler(question, user)
+                break
+        if content is None:
+            content = _answer(question, system)
+
+        prompt = sum(estimate_tokens(m.get("content") or "") for m in messages)
+        if self._owner.llm_latency_ms:
+            await asyncio.sleep(self._owner.llm_latency_ms / 1000)
+        if kwargs.get("stream"):
+            include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+            return _FakeStream(self._owner, model, prompt, content, include_usage)
+
+        completion = estimate_tokens(content)
+        self._owner.meter.add_llm(model, prompt, completion)
+
+        return SimpleNamespace(
+            choices=[SimpleNamespace(
+                index=0,
+                message=SimpleNamespace(role="assistant", content=content, tool_calls=None),
+                finish_reason="stop",
+            )],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt, completion_tokens=completion,
+                total_tokens=prompt + completion,
+            ),
+            model=model,
+        )
+
+
+class _Chat:
+    def __init__(self, owner: "OfflineOpenAI"):
+        self.completions = _ChatCompletions(owner)
+
+
+class _Embeddings:
+    def __init__(self, owner: "OfflineOpenAI"):
+        self._owner = owner
+        self._remote = None
+
+    async def create(self, *, model: str = EMBEDDING_MODEL, input, **kwargs):
+        texts = [input] if isinstance(input, str) else list(input)
+        owner = self._owner
+        tokens = sum(estimate_tokens(t) for t in texts)
+        owner.meter.add_embedding(tokens)
+
+        if owner.embedding_mode == "hash":
+            vectors = [hash_embedding(t) for t in texts]
+        else:
+            cached = owner.cache.get_many(model, texts)
+            missing = [t for t, v in zip(texts, cached) if v is None]
+            if missing and owner.embedding_mode == "cache":
+                raise RuntimeError(
+                    f"embedding cache miss ({len(missing)}개) — "
+                    "--embeddings record 로 한 번 실행해 캐시를 채우세요"
+                )
+            if missing:
+                if self._remote is None:
+                    from openai import AsyncOpenAI
+                    self._remote = AsyncOpenAI()
+                resp = await self._remote.embeddings.create(model=model, input=missing)
+                fetched = [d.embedding for d in resp.data]
+                owner.cache.put_many(model, missing, fetched)
+                by_text = dict(zip(missing, fetched))
+                cached = [v if v is not None else by_text[t] for t, v in zip(texts, cached)]
+            vectors = cached
+
+        if owner.embed_latency_ms:
+            await asyncio.sleep(owner.embed_latency_ms / 1000)
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=v, object="embedding")
+                  for i, v in enumerate(vectors)],
+            model=model,
+            usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens),
+        )
+
+
+class OfflineOpenAI:
+    """Drop-in for `AsyncOpenAI()` in the modules under evaluation."""
+
+    def __init__(
+        self,
+        embedding_mode: str = "hash",
+        llm_latency_ms: int = 0,
+        embed_latency_ms: int = 0,
+        cache_path: Path = CACHE_PATH,
+    ):
+        if embedding_mode not in ("hash", "cache", "record"):
+            raise ValueError(f"unknown embedding mode: {embedding_mode}")
+        self.embedding_mode = embedding_mode
+        self.llm_latency_ms = llm_latency_ms
+        self.embed_latency_ms = embed_latency_ms
+        self.cache = EmbeddingCache(cache_path) if embedding_mode != "hash" else None
+        self.meter = UsageMeter()
+        self.chat = _Chat(self)
+        self.embeddings = _Embeddings(self)
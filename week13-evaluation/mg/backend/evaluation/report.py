@@ -0,0 +1,157 @@
+"""JSON / HTML report for the evaluation run."""
+
+from __future__ import annotations
+
+import html
+import json
+from pathlib import Path
+
+# (key, label, higher_is_better)
+COLUMNS = [
+    ("recall@1", "Recall@1", True),
+    ("recall@3", "Recall@3", True),
+    ("recall@5", "Recall@5", True),
+    ("mrr", "MRR", True),
+    ("ndcg@5", "nDCG@5", True),
+    ("latency_p50", "지연 p50 (ms)", False),
+    ("latency_p95", "지연 p95 (ms)", False),
+    ("llm_calls", "LLM 호출", False),
+    ("prompt_tokens", "입력 토큰", False),
+    ("completion_tokens", "출력 토큰", False),
+    ("cost_usd_per_question", "질문당 비용 ($)", False),
+]
+
+QUALITY_TOLERANCE = 0.02   # recall@5 가 최고치에서 이만큼 이내면 "동급"으로 본다
+
+
+def _flat(summary: dict) -> dict:
+    row = dict(summary)
+    lat = summary.get("latency_ms") or {}
+    row["latency_p50"] = lat.get("p50")
+    row["latency_p95"] = lat.get("p95")
+    return row
+
+
+def recommend(pipelines: dict) -> dict | None:
+    """Cheapest pipeline whose recall@5 is within QUALITY_TOLERANCE of the best."""
+    rows = {name: _flat(p["summary"]) for name, p in pipelines.items() if p["summary"].get("recall@5") is not None}
+    if not rows:
+        return None
+    best = max(r["recall@5"] for r in rows.values())
+    candidates = [(name, r) for name, r in rows.items() if r["recall@5"] >= best - QUALITY_TOLERANCE]
+    name, r = min(candidates, key=lambda x: (x[1]["cost_usd_per_question"], x[1]["latency_p50"]))
+    return {
+        "pipeline": name,
+        "recall@5": r["recall@5"],
+        "best_recall@5": best,
+        "cost_usd_per_question": r["cost_usd_per_question"],
+        "latency_p50": r["latency_p50"],
+    }
+
+
+def build_report(results: list[dict]) -> dict:
+    return {
+        "targets": [
+            {**res, "recommendation": recommend(res["pipelines"])}
+            for res in results
+        ],
+    }
+
+
+def _fmt(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.6f}" if value and abs(value) < 0.01 else f"{value:.3f}".rstrip("0").rstrip(".")
+    return str(value)
+
+
+def _summary_table(pipelines: dict) -> str:
+    rows = {name: _flat(p["summary"]) for name, p in pipelines.items()}
+    best: dict[str, float] = {}
+    for key, _, higher in COLUMNS:
+        values = [r.get(key) for r in rows.values() if r.get(key) is not None]
+        if values:
+            best[key] = max(values) if higher else min(values)
+
+    head = "".join(f"<th>{html.escape(label)}</th>" for _, label, _ in COLUMNS)
+    body = []
+    for name, r in rows.items():
+        cells = []
+        for key, _, _ in COLUMNS:
+            v = r.get(key)
+            cls = ' class="best"' if v is not None and v == best.get(key) else ""
+            cells.append(f"<td{cls}>{_fmt(v)}</td>")
+        err = f' <span class="err">({r["errors"]} err)</span>' if r.get("errors") else ""
+        body.append(f"<tr><th>{html.escape(name)}{err}</th>{''.join(cells)}</tr>")
+    return f"<table><tr><th>파이프라인</th>{head}</tr>{''.join(body)}</table>"
+
+
+def _question_table(pipelines: dict) -> str:
+    names = list(pipelines)
+    first = next(iter(pipelines.values()))["rows"]
+    head = "".join(f"<th>{html.escape(n)}</th>" for n in names)
+    body = []
+    for i, q in enumerate(first):
+        cells = []
+        for n in names:
+            row = pipelines[n]["rows"][i]
+            v = row["metrics"]["recall@5"]
+            cls = "hit" if v >= 1 else "partial" if v > 0 else "miss"
+            cells.append(f'<td class="{cls}">{_fmt(v)}</td>')
+        body.append(
+            f"<tr><th>{html.escape(q['id'])}</th><td class=\"q\">{html.escape(q['question'])}</td>"
+            f"<td>{html.escape(q['complexity'])}</td>{''.join(cells)}</tr>"
+        )
+    return (f"<table><tr><th>ID</th><th>질문</th><th>복잡도</th>{head}</tr>"
+            f"{''.join(body)}</table>")
+
+
+_CSS = """
+body { font-family: -apple-system, 'Noto Sans KR', sans-serif; margin: 2rem; color: #222; }
+table { border-collapse: collapse; margin: 1rem 0 2rem; font-size: 13px; }
+th, td { border: 1px solid #ddd; padding: 4px 8px; text-align: right; }
+th { background: #f6f6f6; text-align: left; }
+td.q { text-align: left; max-width: 420px; }
+td.best { background: #dff5e1; font-weight: 600; }
+td.hit { background: #dff5e1; } td.partial { background: #fff4d6; } td.miss { background: #fde2e2; }
+.err { color: #c00; font-weight: normal; }
+.rec { background: #eef4ff; padding: 8px 12px; border-radius: 6px; display: inline-block; }
+.meta { color: #666; font-size: 12px; }
+"""
+
+
+def render_html(report: dict) -> str:
+    parts = [f"<!doctype html><html lang=\"ko\"><head><meta charset=\"utf-8\">"
+             f"<title>RAG 평가 리포트</title><style>{_CSS}</style></head><body>",
+             "<h1>RAG 파이프라인 평가</h1>"]
+    for target in report["targets"]:
+        cfg = target.get("config", {})
+        idx = target.get("index", {})
+        parts.append(f"<h2>{html.escape(target['target'])}</h2>")
+        parts.append(
+            f"<p class=\"meta\">embeddings={html.escape(str(cfg.get('embeddings')))} · "
+            f"model={html.escape(str(cfg.get('model')))} · top_k={cfg.get('top_k')} · "
+            f"chunks={idx.get('chunks')} · fake LLM 지연 {cfg.get('llm_latency_ms')}ms</p>"
+        )
+        rec = target.get("recommendation")
+        if rec:
+            parts.append(
+                f"<p class=\"rec\">추천: <b>{html.escape(rec['pipeline'])}</b> — Recall@5 {_fmt(rec['recall@5'])} "
+                f"(최고 {_fmt(rec['best_recall@5'])}), 질문당 ${_fmt(rec['cost_usd_per_question'])}, "
+                f"p50 {_fmt(rec['latency_p50'])}ms</p>"
+            )
+        parts.append(_summary_table(target["pipelines"]))
+        parts.append("<h3>질문별 Recall@5</h3>")
+        parts.append(_question_table(target["pipelines"]))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def write_reports(report: dict, out_dir: Path) -> tuple[Path, Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    json_path = out_dir / "report.json"
+    html_path = out_dir / "report.html"
+    json_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    html_path.write_text(render_html(report), encoding="utf-8")
+    return json_path, html_path
@@ -0,0 +1,86 @@
+"""Shared evaluation loop for the week05 / week12 targets."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from evaluation.dataset import LabeledQuestion
+from evaluation.metrics import aggregate, score_question
+from evaluation.offline import UsageMeter
+
+# retrieve(item) → (ranked chunk ids, extra fields for the row)
+Retriever = Callable[[LabeledQuestion], Awaitable[tuple[list[str], dict]]]
+
+
+def add_common_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--embeddings", choices=["hash", "cache", "record"], default="hash",
+                        help="hash: n-gram 해시 임베딩 / cache: 기록된 OpenAI 임베딩 / record: OpenAI 호출 후 캐시")
+    parser.add_argument("--llm-latency-ms", type=int, default=0, help="fake LLM 호출당 지연")
+    parser.add_argument("--embed-latency-ms", type=int, default=0, help="임베딩 호출당 지연")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--pipelines", default="", help="comma-separated subset (기본: 전체)")
+    parser.add_argument("--limit", type=int, default=0, help="질문 수 제한 (smoke test)")
+    parser.add_argument("--out", required=True)
+
+
+def select(all_names: list[str], wanted: str) -> list[str]:
+    if not wanted:
+        return all_names
+    names = [n.strip() for n in wanted.split(",") if n.strip()]
+    unknown = [n for n in names if n not in all_names]
+    if unknown:
+        raise SystemExit(f"unknown pipeline(s): {unknown} (available: {all_names})")
+    return names
+
+
+async def evaluate_pipeline(
+    retrieve: Retriever,
+    items: list[LabeledQuestion],
+    gold: dict[str, dict[str, int]],
+    meter: UsageMeter,
+) -> dict:
+    """Run one pipeline over the labeled set. Questions run sequentially so
+    latency is not skewed by contention between them."""
+    rows = []
+    for item in items:
+        meter.reset()
+        t0 = time.perf_counter()
+        error = None
+        try:
+            retrieved, extra = await retrieve(item)
+        except Exception as e:
+            retrieved, extra = [], {}
+            error = f"{type(e).__name__}: {e}"
+        latency_ms = (time.perf_counter() - t0) * 1000
+
+        rows.append({
+            "id": item.id,
+            "sample_id": item.sample_id,
+            "question": item.question,
+            "complexity": item.complexity,
+            "retrieved": retrieved,
+            "gold": gold[item.id],
+            "metrics": score_question(retrieved, gold[item.id]),
+            "latency_ms": round(latency_ms, 1),
+            "usage": meter.snapshot(),
+            "error": error,
+            **extra,
+        })
+
+    summary = aggregate(rows)
+    summary["by_complexity"] = {
+        c: {k: v for k, v in aggregate([r for r in rows if r["complexity"] == c]).items()
+            if k in ("questions", "recall@5", "mrr", "ndcg@5", "cost_usd_per_question")}
+        for c in sorted({r["complexity"] for r in rows})
+    }
+    return {"summary": summary, "rows": rows}
+
+
+def write_result(path: str, payload: dict) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
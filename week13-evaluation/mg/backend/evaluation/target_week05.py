@@ -0,0 +1,153 @@
+"""Evaluate the week05 RAG variants (basic … adaptive) on the labeled set.
+
+Runs in its own process: week05 and week12 both have top-level
+`services` packages. The OpenAI clients are replaced by `OfflineOpenAI`,
+the persistent Chroma client by an in-memory one, and the on-disk BM25
+indexes and the reranker's score cache go to a temp dir, so nothing under week05 is written to
+or billed, and every run scores from scratch.
+
+    py -m evaluation.target_week05 --out reports/week05.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from evaluation.dataset import REPO_ROOT, gold_gains, load_samples, questions_for
+from evaluation.offline import OfflineOpenAI
+from evaluation.runner import add_common_args, evaluate_pipeline, select, write_result
+
+BACKEND = REPO_ROOT / "week05-advanced-rag" / "mg" / "backend"
+_SCRATCH = Path(tempfile.mkdtemp(prefix="eval-week05-"))
+
+
+def _install(fake: OfflineOpenAI):
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline-eval")
+    if fake.embedding_mode == "hash":
+        # hash 임베딩의 코사인 유사도는 OpenAI 보다 낮음 (정답 문서 최고점 0.07~0.3) —
+        # 기본 0.2 그대로면 self_rag 로컬 판단이 정답 청크까지 버림
+        os.environ.setdefault("GRADE_SIM_FLOOR", "0.05")
+    sys.path.insert(0, str(BACKEND))
+
+    import chromadb
+    from services import bm25_index, embedding_service, llm_service, reranker_service, vector_store
+
+    llm_service._client = fake
+    embedding_service._client = fake
+    vector_store._client = chromadb.EphemeralClient()
+    # 점수 캐시가 week05 chroma_data 에 남으면 두 번째 실행은 리랭크 LLM 호출 0회로 잡힘
+    reranker_service.CACHE_PATH = _SCRATCH / "rerank_cache.sqlite"
+    bm25_index.INDEX_DIR = _SCRATCH / "bm25"
+
+    from services.basic_pipeline import run_basic_rag
+    from services.advanced_pipeline import run_hyde_rag, run_rerank_rag, run_advanced_rag
+    from services.hybrid_search import run_hybrid_rag
+    from services.multi_query_service import run_multi_query_rag
+    from services.self_rag_pipeline import run_self_rag
+    from services.crag_pipeline import run_crag
+    from services.adaptive_pipeline import run_adaptive_rag
+
+    # same names as week05 main._RUNNERS
+    return {
+        "basic": run_basic_rag,
+        "hyde": run_hyde_rag,
+        "rerank": run_rerank_rag,
+        "advanced": run_advanced_rag,
+        "hybrid": run_hybrid_rag,
+        "multi_query": run_multi_query_rag,
+        "self_rag": run_self_rag,
+        "crag": run_crag,
+        "adaptive": run_adaptive_rag,
+    }
+
+
+async def _index(fake: OfflineOpenAI, chunk_size: int, overlap: int) -> tuple[dict, list, dict]:
+    from services.chunking_service import chunk_text
+    from services.embedding_service import embed_texts
+    from services import vector_store
+
+    collections: dict[str, str] = {}
+    chunk_rows: list[tuple[str, str, str]] = []
+    t0 = time.perf_counter()
+    fake.meter.reset()
+    for sample in load_samples():
+        sid = sample["id"]
+        name = f"eval-{sid}-{chunk_size}-{overlap}"
+        chunks = chunk_text(sample["content"], chunk_size, overlap)
+        texts = [c.text for c in chunks]
+        embeddings, _ = await embed_texts(texts)
+        await vector_store.add_chunks(name, texts, embeddings, [{"index": c.index} for c in chunks])
+        collections[sid] = name
+        chunk_rows.extend((f"{sid}#{c.index}", sid, c.text) for c in chunks)
+    stats = {
+        "chunks": len(chunk_rows),
+        "chunk_size": chunk_size,
+        "chunk_overlap": overlap,
+        "index_ms": round((time.perf_counter() - t0) * 1000, 1),
+        **fake.meter.snapshot(),
+    }
+    return collections, chunk_rows, stats
+
+
+async def main_async(args) -> None:
+    fake = OfflineOpenAI(args.embeddings, args.llm_latency_ms, args.embed_latency_ms)
+    runners = _install(fake)
+    names = select(list(runners), args.pipelines)
+
+    collections, chunk_rows, index_stats = await _index(fake, args.chunk_size, args.chunk_overlap)
+    items = questions_for()
+    if args.limit:
+        items = items[:args.limit]
+    gold = {item.id: gold_gains(item, chunk_rows) for item in items}
+
+    from services import hyde_service, reranker_service
+
+    pipelines = {}
+    for name in names:
+        runner = runners[name]
+        # HyDE 가상 답변 캐시는 프로세스 전역 — 이전 파이프라인 (hyde) 의 생성을
+        # 다음 파이프라인 (advanced) 이 재사용하면 비용/지연이 낮게 잡힘
+        hyde_service.clear()
+        # 리랭크 점수 캐시도 파이프라인마다 새로 (rerank 의 점수를 advanced 가 재사용하지 않도록)
+        reranker_service._db = None
+        reranker_service.CACHE_PATH = _SCRATCH / f"rerank_cache-{name}.sqlite"
+
+        async def retrieve(item, _runner=runner):
+            result = await _runner(item.question, collections[item.sample_id], args.top_k, args.model)
+            retrieved = [f"{item.sample_id}#{s['index']}" for s in result["sources"]]
+            extra = {"pipeline_total_ms": result["timing"].get("total_ms")}
+            for key in ("selected_pipeline", "corrective_action", "complexity"):
+                if result.get(key) is not None:
+                    extra[f"pipeline_{key}"] = result[key]
+            return retrieved, extra
+
+        print(f"▶ week05/{name}", flush=True)
+        pipelines[name] = await evaluate_pipeline(retrieve, items, gold, fake.meter)
+
+    write_result(args.out, {
+        "target": "week05",
+        "config": {
+            "embeddings": args.embeddings, "model": args.model, "top_k": args.top_k,
+            "llm_latency_ms": args.llm_latency_ms, "embed_latency_ms": args.embed_latency_ms,
+        },
+        "index": index_stats,
+        "pipelines": pipelines,
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="week05 RAG 파이프라인 평가")
+    add_common_args(parser)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Evaluate the week12 agentic retriever on the labeled set.
+
+All four samples are ingested with week12 `ingest_text` into one in-memory
+collection (doc_name = sample id), so the retriever searches across
+documents the way the chat app does. Scored ids are the embedded child
+chunks; the parent store is in-memory as well.
+
+Pipelines:
+- vector          — `document_store.search(question)` (single embedding search)
+- agentic         — `run_retriever` (rewrite → search → self-eval → retry)
+
+    py -m evaluation.target_week12 --out reports/week12.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from evaluation.dataset import REPO_ROOT, gold_gains, load_samples, questions_for
+from evaluation.offline import OfflineOpenAI
+from evaluation.runner import add_common_args, evaluate_pipeline, select, write_result
+
+BACKEND = REPO_ROOT / "week12-agentic-rag" / "mg" / "backend"
+
+
+def _install(fake: OfflineOpenAI, model: str):
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline-eval")
+    # 로컬 cross-encoder 는 모델 다운로드가 필요 — RELEVANCE_GRADER=auto 로 켜서 비교
+    os.environ.setdefault("RELEVANCE_GRADER", "llm")
+    os.environ.setdefault("EMBEDDER", "openai")      # OfflineOpenAI 가 임베딩을 대신함
+    sys.path.insert(0, str(BACKEND))
+
+    import chromadb
+    from services import document_store, parent_store
+    from services.embedders import OpenAIEmbedder
+    from agents import retriever
+
+    parent_store.open_store(":memory:")
+
+    document_store._embedder = OpenAIEmbedder(client=fake)
+    document_store._collection = chromadb.EphemeralClient().get_or_create_collection(
+        name=f"eval_{document_store.COLLECTION_NAME}",
+        metadata={"hnsw:space": "cosine"},
+    )
+    retriever._client = fake
+
+    async def vector(question: str, top_k: int):
+        chunks = await document_store.search(question, top_k=top_k)
+        return chunks, {}
+
+    async def agentic(question: str, top_k: int):
+        result = await retriever.run_retriever(question, model=model, top_k=top_k)
+        return result["chunks"], {
+            "rounds": len(result["rounds"]),
+            "final_score": result["final_score"],
+            "llm_graded_rounds": sum(r["grader"] == "llm" for r in result["rounds"]),
+        }
+
+    return {"vector": vector, "agentic": agentic}
+
+
+async def _index(fake: OfflineOpenAI) -> tuple[list, dict]:
+    from services import document_store
+    from services.ingestion import ingest_text
+
+    t0 = time.perf_counter()
+    fake.meter.reset()
+    for sample in load_samples():
+        await ingest_text(sample["content"], sample["id"])
+    stored = document_store._collection.get(include=["documents", "metadatas"])
+    chunk_rows = [
+        (cid, (meta or {}).get("doc_name", ""), text)
+        for cid, text, meta in zip(stored["ids"], stored["documents"], stored["metadatas"])
+    ]
+    stats = {
+        "chunks": len(chunk_rows),
+        "index_ms": round((time.perf_counter() - t0) * 1000, 1),
+        **fake.meter.snapshot(),
+    }
+    return chunk_rows, stats
+
+
+async def main_async(args) -> None:
+    fake = OfflineOpenAI(args.embeddings, args.llm_latency_ms, args.embed_latency_ms)
+    runners = _install(fake, args.model)
+    names = select(list(runners), args.pipelines)
+
+    chunk_rows, index_stats = await _index(fake)
+    items = questions_for()
+    if args.limit:
+        items = items[:args.limit]
+    gold = {item.id: gold_gains(item, chunk_rows) for item in items}
+
+    pipelines = {}
+    for name in names:
+        runner = runners[name]
+
+        async def retrieve(item, _runner=runner):
+            chunks, extra = await _runner(item.question, args.top_k)
+            return [c.id for c in chunks], extra
+
+        print(f"▶ week12/{name}", flush=True)
+        pipelines[name] = await evaluate_pipeline(retrieve, items, gold, fake.meter)
+
+    write_result(args.out, {
+        "target": "week12",
+        "config": {
+            "embeddings": args.embeddings, "model": args.model, "top_k": args.top_k,
+            "llm_latency_ms": args.llm_latency_ms, "embed_latency_ms": args.embed_latency_ms,
+        },
+        "index": index_stats,
+        "pipelines": pipelines,
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="week12 agentic retriever 평가")
+    add_common_args(parser)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Run every evaluation target in its own process and build the report.
+
+    py run_eval.py                                  # 오프라인 (hash 임베딩 + fake LLM)
+    py run_eval.py --embeddings record              # 실제 임베딩을 한 번 기록
+    py run_eval.py --embeddings cache --llm-latency-ms 400
+    py run_eval.py --targets week05 --pipelines basic,hybrid,rerank
+
+Outputs reports/report.json and reports/report.html.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from evaluation.report import build_report, write_reports
+
+BACKEND_DIR = Path(__file__).resolve().parent
+TARGETS = ("week05", "week12")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RAG 파이프라인 품질 / 비용 평가")
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--embeddings", choices=["hash", "cache", "record"], default="hash")
+    parser.add_argument("--llm-latency-ms", type=int, default=0)
+    parser.add_argument("--embed-latency-ms", type=int, default=0)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--pipelines", default="", help="target 에 없는 이름은 무시")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--out-dir", default=str(BACKEND_DIR / "reports"))
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    results = []
+    for target in [t.strip() for t in args.targets.split(",") if t.strip()]:
+        if target not in TARGETS:
+            raise SystemExit(f"unknown target: {target} (available: {TARGETS})")
+        out = out_dir / f"{target}.json"
+        cmd = [
+            sys.executable, "-m", f"evaluation.target_{target}",
+            "--embeddings", args.embeddings,
+            "--llm-latency-ms", str(args.llm_latency_ms),
+            "--embed-latency-ms", str(args.embed_latency_ms),
+            "--top-k", str(args.top_k),
+            "--model", args.model,
+            "--limit", str(args.limit),
+            "--out", str(out),
+        ]
+        if args.pipelines:
+            subset = _pipelines_for(target, args.pipelines)
+            if not subset:
+                continue
+            cmd += ["--pipelines", subset]
+        print(f"━━ {target} ━━", flush=True)
+        subprocess.run(cmd, cwd=BACKEND_DIR, check=True)
+        results.append(json.loads(out.read_text(encoding="utf-8")))
+
+    report = build_report(results)
+    json_path, html_path = write_reports(report, out_dir)
+
+    print()
+    for target in report["targets"]:
+        print(f"[{target['target']}]")
+        print(f"  {'pipeline':<12} {'R@1':>6} {'R@5':>6} {'MRR':>6} {'nDCG@5':>7} {'p50 ms':>8} {'calls':>6} {'$/q':>10}")
+        for name, p in target["pipelines"].items():
+            s = p["summary"]
+            if "recall@5" not in s:
+                print(f"  {name:<12} (all {s.get('errors')} questions failed)")
+                continue
+            print(
+                f"  {name:<12} {s['recall@1']:>6.3f} {s['recall@5']:>6.3f} {s['mrr']:>6.3f} "
+                f"{s['ndcg@5']:>7.3f} {s['latency_ms']['p50']:>8.1f} {s['llm_calls']:>6} "
+                f"{s['cost_usd_per_question']:>10.6f}"
+            )
+        rec = target.get("recommendation")
+        if rec:
+            print(f"  → 추천: {rec['pipeline']} (R@5 {rec['recall@5']:.3f}, ${rec['cost_usd_per_question']:.6f}/q)")
+    print(f"\n리포트: {json_path}\n        {html_path}")
+
+
+_KNOWN = {
+    "week05": {"basic", "hyde", "rerank", "advanced", "hybrid", "multi_query", "self_rag", "crag", "adaptive"},
+    "week12": {"vector", "agentic"},
+}
+
+
+def _pipelines_for(target: str, wanted: str) -> str:
+    names = [n.strip() for n in wanted.split(",") if n.strip() in _KNOWN[target]]
+    return ",".join(names)
+
+
+if __name__ == "__main__":
+    main()